@@ -36,6 +36,22 @@ def create_app(config_name='development'):
     socketio.init_app(app, cors_allowed_origins=app.config['CORS_ORIGINS'], async_mode='threading')
     migrate.init_app(app, db)
 
+    from .services import activity_service  # noqa: F401 - registers the activity event hooks
+    from .services import risk_service  # noqa: F401 - registers the risk score hooks
+    from .services.email_queue import email_queue
+    from .services.paynow_poller import paynow_poller
+    from .services.report_jobs import report_job_queue
+    from .utils.email_templates import init_email_templates
+    email_queue.init_app(app)
+    paynow_poller.init_app(app)
+    report_job_queue.init_app(app)
+    init_email_templates()
+
+    # The Paynow poller runs in serving processes only, not in CLI commands
+    @app.before_request
+    def start_background_workers():
+        paynow_poller.start()
+
     # JWT error handlers
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
@@ -21,14 +21,24 @@ class Config:
     JWT_HEADER_NAME = 'Authorization'
     JWT_HEADER_TYPE = 'Bearer'
 
-    # Mail
-    MAIL_SERVER = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
-    MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
+    # Mail (SMTP_* names are still honoured for older deployments)
+    MAIL_SERVER = os.getenv('MAIL_SERVER', os.getenv('SMTP_HOST', 'smtp.gmail.com'))
+    MAIL_PORT = int(os.getenv('MAIL_PORT', os.getenv('SMTP_PORT', 587)))
     MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'True') == 'True'
     MAIL_USE_SSL = os.getenv('MAIL_USE_SSL', 'False') == 'True'
-    MAIL_USERNAME = os.getenv('MAIL_USERNAME')
-    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD')
-    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'noreply@bantubuzz.com')
+    MAIL_USERNAME = os.getenv('MAIL_USERNAME', os.getenv('SMTP_USER'))
+    MAIL_PASSWORD = os.getenv('MAIL_PASSWORD', os.getenv('SMTP_PASSWORD'))
+    MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', os.getenv('SMTP_FROM', 'noreply@bantubuzz.com'))
+    # Without SMTP credentials (dev mode) emails are logged instead of sent
+    MAIL_SUPPRESS_SEND = os.getenv('MAIL_SUPPRESS_SEND', 'False' if MAIL_PASSWORD else 'True') == 'True'
+
+    # Email delivery queue
+    EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', 2))  # Worker threads (and pooled SMTP connections)
+    EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', 50))  # Messages sent per connection checkout
+    EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 6))
+    EMAIL_RETRY_BACKOFF_SECONDS = int(os.getenv('EMAIL_RETRY_BACKOFF_SECONDS', 30))  # Doubles per attempt
+    EMAIL_POLL_INTERVAL_SECONDS = int(os.getenv('EMAIL_POLL_INTERVAL_SECONDS', 10))
+    EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv('EMAIL_OUTBOX_RETENTION_DAYS', 7))  # Sent/failed rows hold OTPs and reset links
 
     # Redis & Celery
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
@@ -41,6 +51,29 @@ class Config:
     PAYNOW_RETURN_URL = os.getenv('PAYNOW_RETURN_URL')
     PAYNOW_RESULT_URL = os.getenv('PAYNOW_RESULT_URL')
 
+    # Paynow status poller
+    PAYNOW_POLLER_ENABLED = os.getenv('PAYNOW_POLLER_ENABLED', 'true').lower() == 'true'
+    PAYNOW_POLL_WORKERS = int(os.getenv('PAYNOW_POLL_WORKERS', 8))  # Concurrent status requests
+    PAYNOW_POLL_BATCH_SIZE = int(os.getenv('PAYNOW_POLL_BATCH_SIZE', 100))
+    PAYNOW_POLL_INTERVAL_SECONDS = int(os.getenv('PAYNOW_POLL_INTERVAL_SECONDS', 5))
+    PAYNOW_POLL_BACKOFF_SECONDS = int(os.getenv('PAYNOW_POLL_BACKOFF_SECONDS', 5))  # Doubles per attempt
+    PAYNOW_POLL_MAX_BACKOFF_SECONDS = int(os.getenv('PAYNOW_POLL_MAX_BACKOFF_SECONDS', 300))
+    PAYNOW_POLL_TIMEOUT_SECONDS = int(os.getenv('PAYNOW_POLL_TIMEOUT_SECONDS', 10))
+    PAYNOW_POLL_EXPIRE_HOURS = int(os.getenv('PAYNOW_POLL_EXPIRE_HOURS', 48))
+
+    # Admin dashboard statistics snapshot
+    DASHBOARD_SNAPSHOT_SECONDS = int(os.getenv('DASHBOARD_SNAPSHOT_SECONDS', 30))  # Max age before one request recomputes it
+
+    # Admin route authorization
+    ADMIN_AUTH_CACHE_SECONDS = int(os.getenv('ADMIN_AUTH_CACHE_SECONDS', 30))  # Max age of a cached (is_admin, admin_role, is_active)
+    ADMIN_BULK_MAX_IDS = int(os.getenv('ADMIN_BULK_MAX_IDS', 500))  # Ids accepted by one bulk moderation request
+
+    # Background admin report jobs
+    REPORT_JOB_WORKERS = int(os.getenv('REPORT_JOB_WORKERS', 2))
+    REPORT_RESULT_TTL_SECONDS = int(os.getenv('REPORT_RESULT_TTL_SECONDS', 900))  # Identical requests reuse a result this long
+    REPORT_JOB_TIMEOUT_SECONDS = int(os.getenv('REPORT_JOB_TIMEOUT_SECONDS', 300))  # Running jobs older than this are retried
+    REPORT_JOB_POLL_INTERVAL_SECONDS = int(os.getenv('REPORT_JOB_POLL_INTERVAL_SECONDS', 10))
+
     # Frontend
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
 
@@ -1,10 +1,43 @@
 """
 Admin authorization decorators for BantuBuzz API
+
+Every admin route goes through these. They authorize on the cached
+(is_admin, admin_role, is_active) triple from admin_auth_cache rather than
+loading the admin's User row; routes that need the row itself use
+get_current_user, which loads it once per request.
 """
 from functools import wraps
 from flask import jsonify
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from app.models import User
+from app.services.admin_auth_cache import get_admin_auth
+
+
+def _authorize(allowed_roles=None):
+    """Error response for the current request, or None if the admin may proceed"""
+    try:
+        verify_jwt_in_request()
+        auth = get_admin_auth(get_jwt_identity())
+    except Exception as e:
+        return jsonify({'error': 'Unauthorized', 'message': str(e)}), 401
+
+    if not auth:
+        return jsonify({'error': 'User not found'}), 404
+
+    if not auth['is_admin']:
+        return jsonify({'error': 'Admin access required'}), 403
+
+    if not auth['is_active']:
+        return jsonify({'error': 'Account is suspended'}), 403
+
+    # Super admin has access to everything
+    if allowed_roles and auth['admin_role'] != 'super_admin' and auth['admin_role'] not in allowed_roles:
+        return jsonify({
+            'error': 'Insufficient permissions',
+            'message': f'Required role: {", ".join(allowed_roles)}',
+            'your_role': auth['admin_role']
+        }), 403
+
+    return None
 
 
 def admin_required(fn):
@@ -14,24 +47,10 @@ def admin_required(fn):
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        try:
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
-
-            if not user:
-                return jsonify({'error': 'User not found'}), 404
-
-            if not user.is_admin:
-                return jsonify({'error': 'Admin access required'}), 403
-
-            if not user.is_active:
-                return jsonify({'error': 'Account is suspended'}), 403
-
-            return fn(*args, **kwargs)
-
-        except Exception as e:
-            return jsonify({'error': 'Unauthorized', 'message': str(e)}), 401
+        denied = _authorize()
+        if denied:
+            return denied
+        return fn(*args, **kwargs)
 
     return wrapper
 
@@ -50,36 +69,10 @@ def role_required(*allowed_roles):
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            try:
-                verify_jwt_in_request()
-                current_user_id = get_jwt_identity()
-                user = User.query.get(current_user_id)
-
-                if not user:
-                    return jsonify({'error': 'User not found'}), 404
-
-                if not user.is_admin:
-                    return jsonify({'error': 'Admin access required'}), 403
-
-                if not user.is_active:
-                    return jsonify({'error': 'Account is suspended'}), 403
-
-                # Super admin has access to everything
-                if user.admin_role == 'super_admin':
-                    return fn(*args, **kwargs)
-
-                # Check if user's role is in allowed roles
-                if user.admin_role not in allowed_roles:
-                    return jsonify({
-                        'error': 'Insufficient permissions',
-                        'message': f'Required role: {", ".join(allowed_roles)}',
-                        'your_role': user.admin_role
-                    }), 403
-
-                return fn(*args, **kwargs)
-
-            except Exception as e:
-                return jsonify({'error': 'Unauthorized', 'message': str(e)}), 401
+            denied = _authorize(allowed_roles)
+            if denied:
+                return denied
+            return fn(*args, **kwargs)
 
         return wrapper
     return decorator
@@ -11,7 +11,7 @@ from .otp import OTP
 from .collaboration import Collaboration
 from .review import Review
 from .category import Category
-from .wallet import Wallet, WalletTransaction
+from .wallet import Wallet, WalletTransaction, WalletLedgerEntry, WalletBalanceSnapshot
 from .payment import Payment, PaymentVerification
 from .cashout import CashoutRequest
 from .custom_package_request import CustomPackageRequest
@@ -24,6 +24,14 @@ from .creator_subscription import CreatorSubscription
 from .verification_application import VerificationApplication
 from .thunzi_account import ThunziAccount
 from .connected_platform import ConnectedPlatform
+from .email_outbox import EmailOutbox
+from .rollup import (
+    RollupWatermark, PaymentDailyRollup, GrowthDailyRollup, RevenueDailyRollup, MarketplaceDailyRollup
+)
+from .paynow_poll import PaynowPoll, PaynowWebhookEvent
+from .activity_event import ActivityEvent
+from .user_risk_score import UserRiskScore
+from .report_job import ReportJob
 
 # Import milestone models BEFORE their parent models
 from .collaboration_milestone import CollaborationMilestone
@@ -55,6 +63,8 @@ __all__ = [
     'Category',
     'Wallet',
     'WalletTransaction',
+    'WalletLedgerEntry',
+    'WalletBalanceSnapshot',
     'Payment',
     'PaymentVerification',
     'CashoutRequest',
@@ -72,4 +82,15 @@ __all__ = [
     'CampaignMilestone',
     'ThunziAccount',
     'ConnectedPlatform',
+    'EmailOutbox',
+    'RollupWatermark',
+    'PaymentDailyRollup',
+    'GrowthDailyRollup',
+    'RevenueDailyRollup',
+    'MarketplaceDailyRollup',
+    'PaynowPoll',
+    'PaynowWebhookEvent',
+    'ActivityEvent',
+    'UserRiskScore',
+    'ReportJob',
 ]
@@ -0,0 +1,41 @@
+from datetime import datetime
+from app import db
+
+
+class ActivityEvent(db.Model):
+    """
+    One entry in the admin activity feed
+
+    Append-only: rows are written when users, bookings, collaborations,
+    payments, cashouts, campaigns and reviews are created or change status
+    (see activity_service) and are never updated. Names shown in the feed are
+    resolved when it is read, so meta only stores ids.
+    """
+    __tablename__ = 'activity_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(40), nullable=False)  # e.g. booking_created, cashout_approved
+    category = db.Column(db.String(20), nullable=False)  # users, bookings, collaborations, payments, campaigns, reviews
+
+    # The row the event is about
+    source_type = db.Column(db.String(20), nullable=False)  # user, booking, collaboration, payment, cashout, campaign, review
+    source_id = db.Column(db.Integer, nullable=False)
+
+    title = db.Column(db.String(255))
+    description = db.Column(db.String(500))
+    amount = db.Column(db.Numeric(10, 2))
+    status = db.Column(db.String(30))  # Source status when the event happened
+    link = db.Column(db.String(255))
+    meta = db.Column(db.JSON)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_activity_events_created_id', 'created_at', 'id'),
+        db.Index('ix_activity_events_category_created_id', 'category', 'created_at', 'id'),
+        db.Index('ix_activity_events_amount', 'amount'),
+        db.Index('ix_activity_events_source', 'source_type', 'source_id'),
+    )
+
+    def __repr__(self):
+        return f'<ActivityEvent {self.id} - {self.event_type} {self.source_type}:{self.source_id}>'
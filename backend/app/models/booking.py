@@ -29,6 +29,11 @@ class Booking(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_bookings_updated_at', 'updated_at'),  # Growth rollup: activations, incremental refresh
+        db.Index('ix_bookings_payment_status_brand', 'payment_status', 'brand_id'),  # Risk scores: failed payments
+    )
+
     # Relationships
     messages = db.relationship('Message', backref='booking', lazy='dynamic')
 
@@ -21,6 +21,12 @@ class BrandProfile(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Admin directory search: substring ILIKE on PostgreSQL
+        db.Index('ix_brand_profiles_company_name_trgm', 'company_name', postgresql_using='gin',
+                 postgresql_ops={'company_name': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+
     # Relationships
     campaigns = db.relationship('Campaign', backref='brand', lazy='dynamic', cascade='all, delete-orphan')
     bookings_as_brand = db.relationship('Booking', foreign_keys='Booking.brand_id', backref='brand', lazy='dynamic')
@@ -32,6 +32,7 @@ class CashoutRequest(db.Model):
     creator_notes = db.Column(db.Text)
 
     # Admin processing
+    approved_at = db.Column(db.DateTime)
     assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'))  # Admin assigned to process
     assigned_at = db.Column(db.DateTime)
 
@@ -84,6 +85,7 @@ class CashoutRequest(db.Model):
             'payment_details': self.payment_details,
             'status': self.status,
             'creator_notes': self.creator_notes,
+            'approved_at': self.approved_at.isoformat() if self.approved_at else None,
             'assigned_to': self.assigned_to,
             'assigned_at': self.assigned_at.isoformat() if self.assigned_at else None,
             'processed_by': self.processed_by,
@@ -56,6 +56,11 @@ class Collaboration(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_collaborations_created_at', 'created_at'),  # Marketplace rollup: collaborations by day
+        db.Index('ix_collaborations_status_updated_at', 'status', 'updated_at'),  # Risk scores: recent cancellations
+    )
+
     # Relationships
     brand = db.relationship('BrandProfile', backref=db.backref('collaborations', lazy='dynamic'))
     creator = db.relationship('CreatorProfile', backref=db.backref('collaborations', lazy='dynamic'))
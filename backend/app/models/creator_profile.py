@@ -43,6 +43,15 @@ class CreatorProfile(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Admin directory search: substring ILIKE on PostgreSQL
+        db.Index('ix_creator_profiles_username_trgm', 'username', postgresql_using='gin',
+                 postgresql_ops={'username': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+        # Featured eligibility: social_links key existence (jsonb ?) on PostgreSQL
+        db.Index('ix_creator_profiles_social_links_gin', db.text('(social_links::jsonb)'),
+                 postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
+
     # Relationships
     packages = db.relationship('Package', backref='creator', lazy='dynamic', cascade='all, delete-orphan')
     bookings_as_creator = db.relationship('Booking', foreign_keys='Booking.creator_id', backref='creator', lazy='dynamic')
@@ -41,6 +41,11 @@ class Dispute(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     resolved_at = db.Column(db.DateTime, nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_disputes_raised_by_user_id', 'raised_by_user_id'),  # Risk scores: disputes per user
+        db.Index('ix_disputes_against_user_id', 'against_user_id'),
+    )
+
     # Relationships
     collaboration = db.relationship('Collaboration', backref='disputes', foreign_keys=[collaboration_id])
     raised_by = db.relationship('User', foreign_keys=[raised_by_user_id], backref='disputes_raised')
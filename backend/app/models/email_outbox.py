@@ -0,0 +1,48 @@
+from datetime import datetime
+from app import db
+
+
+class EmailOutbox(db.Model):
+    """Persistent queue of outgoing emails, drained by the email worker pool"""
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Message
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html_body = db.Column(db.Text)
+    text_body = db.Column(db.Text)
+    sender = db.Column(db.String(255))
+
+    # Delivery tracking
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime)  # When a worker claimed the row
+    last_error = db.Column(db.Text)
+    sent_at = db.Column(db.DateTime)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    def to_dict(self):
+        """Convert outbox entry to dictionary"""
+        return {
+            'id': self.id,
+            'to_email': self.to_email,
+            'subject': self.subject,
+            'status': self.status,
+            'attempts': self.attempts,
+            'next_attempt_at': self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            'last_error': self.last_error,
+            'sent_at': self.sent_at.isoformat() if self.sent_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<EmailOutbox {self.id} - {self.status} - {self.to_email}>'
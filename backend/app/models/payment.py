@@ -47,6 +47,15 @@ class Payment(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     completed_at = db.Column(db.DateTime)
 
+    __table_args__ = (
+        db.Index('ix_payments_status', 'status'),
+        db.Index('ix_payments_created_at', 'created_at'),
+        db.Index('ix_payments_verified_at', 'verified_at'),
+        db.Index('ix_payments_updated_at', 'updated_at'),  # Incremental rollup refresh
+        db.Index('ix_payments_paynow_poll_url', 'paynow_poll_url'),  # Paynow poller
+        db.Index('ix_payments_paynow_reference', 'paynow_reference'),  # Paynow webhook
+    )
+
     # Relationships
     booking = db.relationship('Booking', backref='payments', foreign_keys=[booking_id])
     user = db.relationship('User', foreign_keys=[user_id])
@@ -0,0 +1,81 @@
+from datetime import datetime
+from app import db
+
+
+class PaynowPoll(db.Model):
+    """
+    Background polling state for one Paynow poll URL
+
+    A poll URL can cover several rows (a cart payment creates one Payment per
+    booking), so state is keyed by URL. Status endpoints read this cached status
+    instead of calling Paynow.
+    """
+    __tablename__ = 'paynow_polls'
+
+    id = db.Column(db.Integer, primary_key=True)
+    poll_url = db.Column(db.String(500), unique=True, nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, paid, cancelled, expired
+    paynow_status = db.Column(db.String(50))  # Last raw status from Paynow, e.g. 'sent', 'paid'
+
+    # Backoff
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_poll_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_polled_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_paynow_polls_status_next_poll', 'status', 'next_poll_at'),
+    )
+
+    def to_dict(self):
+        """Convert poll state to dictionary"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'paynow_status': self.paynow_status,
+            'attempts': self.attempts,
+            'next_poll_at': self.next_poll_at.isoformat() if self.next_poll_at else None,
+            'last_polled_at': self.last_polled_at.isoformat() if self.last_polled_at else None
+        }
+
+    def __repr__(self):
+        return f'<PaynowPoll {self.id} - {self.status}>'
+
+
+class PaynowWebhookEvent(db.Model):
+    """
+    A Paynow status callback, recorded once and processed asynchronously
+
+    Paynow repeats the same callback until it is acknowledged, so event_key
+    (a hash of reference, Paynow reference and status) is unique and repeats
+    are dropped on arrival.
+    """
+    __tablename__ = 'paynow_webhook_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_key = db.Column(db.String(64), unique=True, nullable=False)
+
+    reference = db.Column(db.String(100))  # Our reference, e.g. BOOKING-12 or CART-1_2
+    paynow_reference = db.Column(db.String(100))
+    paynow_status = db.Column(db.String(50))
+    poll_url = db.Column(db.String(500))
+    payload = db.Column(db.JSON)
+
+    state = db.Column(db.String(20), nullable=False, default='queued')  # queued, processed, ignored, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_paynow_webhook_events_state_id', 'state', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<PaynowWebhookEvent {self.id} - {self.paynow_status} ({self.state})>'
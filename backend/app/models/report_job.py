@@ -0,0 +1,57 @@
+from datetime import datetime
+from app import db
+
+
+class ReportJob(db.Model):
+    """
+    An admin report run in the background, and its stored result
+
+    Jobs are keyed by spec_hash, a hash of the normalized report name and
+    parameters. While a completed job's result is unexpired, identical
+    requests are served that result instead of running the report again
+    (see report_jobs).
+    """
+    __tablename__ = 'report_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)  # Random hex, handed to the client
+    report = db.Column(db.String(50), nullable=False)  # growth, revenue, marketplace-health, risk
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    spec_hash = db.Column(db.String(64), nullable=False)  # sha256 of the normalized spec
+
+    # Lifecycle: queued → running → completed | failed
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'))
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime)  # Result is reused until then, and purged after
+
+    __table_args__ = (
+        db.Index('ix_report_jobs_spec_hash_status', 'spec_hash', 'status'),
+        db.Index('ix_report_jobs_status_created_at', 'status', 'created_at'),
+        db.Index('ix_report_jobs_expires_at', 'expires_at'),
+    )
+
+    def to_dict(self, include_result=False):
+        """Convert report job to dictionary"""
+        data = {
+            'id': self.id,
+            'report': self.report,
+            'params': self.params,
+            'status': self.status,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+    def __repr__(self):
+        return f'<ReportJob {self.id} - {self.report} {self.status}>'
@@ -0,0 +1,130 @@
+from datetime import datetime
+from app import db
+
+
+class RollupWatermark(db.Model):
+    """Refresh bookkeeping for an incrementally maintained rollup table"""
+    __tablename__ = 'rollup_watermarks'
+
+    name = db.Column(db.String(50), primary_key=True)  # Rollup table name
+    watermark = db.Column(db.DateTime)      # Source rows updated before this are rolled up
+    refreshed_at = db.Column(db.DateTime)   # When the last refresh finished
+
+    def __repr__(self):
+        return f'<RollupWatermark {self.name} @ {self.watermark}>'
+
+
+class PaymentDailyRollup(db.Model):
+    """Completed payment totals per UTC day, for admin payment statistics"""
+    __tablename__ = 'payment_daily_rollup'
+
+    day = db.Column(db.Date, primary_key=True)
+
+    # Completed payments by the day they were created
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_amount = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    # Completed payments by the day they were verified
+    verified_count = db.Column(db.Integer, nullable=False, default=0)
+    verified_amount = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert rollup row to dictionary"""
+        return {
+            'day': self.day.isoformat(),
+            'completed_count': self.completed_count,
+            'completed_amount': float(self.completed_amount),
+            'verified_count': self.verified_count,
+            'verified_amount': float(self.verified_amount),
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
+
+    def __repr__(self):
+        return f'<PaymentDailyRollup {self.day}>'
+
+
+class GrowthDailyRollup(db.Model):
+    """Signups per UTC day, and how many of that day's brands have since booked"""
+    __tablename__ = 'growth_daily_rollup'
+
+    day = db.Column(db.Date, primary_key=True)
+
+    signups = db.Column(db.Integer, nullable=False, default=0)
+    creator_signups = db.Column(db.Integer, nullable=False, default=0)
+    brand_signups = db.Column(db.Integer, nullable=False, default=0)
+
+    # Users who signed up this day and have a confirmed or completed booking
+    activated_users = db.Column(db.Integer, nullable=False, default=0)
+
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert rollup row to dictionary"""
+        return {
+            'day': self.day.isoformat(),
+            'signups': self.signups,
+            'creator_signups': self.creator_signups,
+            'brand_signups': self.brand_signups,
+            'activated_users': self.activated_users,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
+
+    def __repr__(self):
+        return f'<GrowthDailyRollup {self.day}>'
+
+
+class RevenueDailyRollup(db.Model):
+    """Payment volume (GMV), refunds and platform fees per UTC day"""
+    __tablename__ = 'revenue_daily_rollup'
+
+    day = db.Column(db.Date, primary_key=True)
+
+    # Completed or paid payments by the day they were created
+    gmv_count = db.Column(db.Integer, nullable=False, default=0)
+    gmv_amount = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    refunded_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # Platform fees on earnings by the day they were credited
+    platform_fees = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert rollup row to dictionary"""
+        return {
+            'day': self.day.isoformat(),
+            'gmv_count': self.gmv_count,
+            'gmv_amount': float(self.gmv_amount),
+            'refunded_count': self.refunded_count,
+            'platform_fees': float(self.platform_fees),
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
+
+    def __repr__(self):
+        return f'<RevenueDailyRollup {self.day}>'
+
+
+class MarketplaceDailyRollup(db.Model):
+    """Collaborations started and cancelled per UTC day"""
+    __tablename__ = 'marketplace_daily_rollup'
+
+    day = db.Column(db.Date, primary_key=True)
+
+    collaborations_created = db.Column(db.Integer, nullable=False, default=0)
+    collaborations_cancelled = db.Column(db.Integer, nullable=False, default=0)  # By the day they were cancelled
+
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert rollup row to dictionary"""
+        return {
+            'day': self.day.isoformat(),
+            'collaborations_created': self.collaborations_created,
+            'collaborations_cancelled': self.collaborations_cancelled,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
+
+    def __repr__(self):
+        return f'<MarketplaceDailyRollup {self.day}>'
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import DDL, event
 from app import db
 import secrets
 
@@ -27,6 +28,13 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_users_created_at', 'created_at'),  # Growth rollup: signups by day
+        # Admin directory search: substring ILIKE on PostgreSQL
+        db.Index('ix_users_email_trgm', 'email', postgresql_using='gin',
+                 postgresql_ops={'email': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
+
     # Relationships
     creator_profile = db.relationship('CreatorProfile', backref='user', uselist=False, cascade='all, delete-orphan')
     brand_profile = db.relationship('BrandProfile', backref='user', uselist=False, cascade='all, delete-orphan')
@@ -95,3 +103,10 @@ class User(db.Model):
 
     def __repr__(self):
         return f'<User {self.email} ({self.user_type})>'
+
+
+# Trigram indexes on users and the profile tables need pg_trgm
+event.listen(
+    User.__table__, 'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
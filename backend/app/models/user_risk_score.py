@@ -0,0 +1,49 @@
+from datetime import datetime
+from app import db
+
+
+class UserRiskScore(db.Model):
+    """
+    Precomputed risk signals for one user, behind the admin risk report
+
+    Rebuilt nightly and recomputed for the users involved whenever a dispute is
+    raised, a collaboration is cancelled or a booking payment fails (see
+    risk_service). Only users with at least one signal have a row.
+    """
+    __tablename__ = 'user_risk_scores'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+
+    dispute_count = db.Column(db.Integer, nullable=False, default=0)  # Raised by or against the user
+    creator_cancellations = db.Column(db.Integer, nullable=False, default=0)  # As creator, last 30 days
+    brand_cancellations = db.Column(db.Integer, nullable=False, default=0)  # As brand, last 30 days
+    failed_payments = db.Column(db.Integer, nullable=False, default=0)  # Bookings with a failed payment
+    score = db.Column(db.Integer, nullable=False, default=0)  # Weighted sum of the signals above
+
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_user_risk_scores_score', 'score'),
+        db.Index('ix_user_risk_scores_dispute_count', 'dispute_count'),
+        db.Index('ix_user_risk_scores_creator_cancellations', 'creator_cancellations'),
+        db.Index('ix_user_risk_scores_brand_cancellations', 'brand_cancellations'),
+        db.Index('ix_user_risk_scores_failed_payments', 'failed_payments'),
+    )
+
+    # Relationships
+    user = db.relationship('User', backref=db.backref('risk_score', uselist=False, passive_deletes=True))
+
+    def to_dict(self):
+        """Convert risk score to dictionary"""
+        return {
+            'user_id': self.user_id,
+            'dispute_count': self.dispute_count,
+            'creator_cancellations': self.creator_cancellations,
+            'brand_cancellations': self.brand_cancellations,
+            'failed_payments': self.failed_payments,
+            'score': self.score,
+            'computed_at': self.computed_at.isoformat() if self.computed_at else None
+        }
+
+    def __repr__(self):
+        return f'<UserRiskScore user {self.user_id}: {self.score}>'
@@ -23,6 +23,12 @@ class Wallet(db.Model):
     transactions = db.relationship('WalletTransaction', backref='wallet', lazy='dynamic')
     cashout_requests = db.relationship('CashoutRequest', backref='wallet', lazy='dynamic')
 
+    __table_args__ = (
+        # Last line of defence against overdraft; wallet_ledger guards its updates too
+        db.CheckConstraint('available_balance >= 0', name='ck_wallets_available_balance_non_negative'),
+        db.CheckConstraint('pending_clearance >= 0', name='ck_wallets_pending_clearance_non_negative'),
+    )
+
     def to_dict(self):
         """Convert wallet to dictionary"""
         return {
@@ -67,6 +73,11 @@ class WalletTransaction(db.Model):
     collaboration_id = db.Column(db.Integer, db.ForeignKey('collaborations.id'))
     booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'))
     cashout_request_id = db.Column(db.Integer, db.ForeignKey('cashout_requests.id'))
+    milestone_id = db.Column(db.Integer, db.ForeignKey('collaboration_milestones.id'))
+
+    # Unique per logical credit, e.g. 'collaboration:12:release', so a retried or
+    # concurrent release cannot pay out twice
+    idempotency_key = db.Column(db.String(100), unique=True)
 
     # Financial breakdown
     gross_amount = db.Column(db.Numeric(10, 2))  # Before fees
@@ -82,6 +93,17 @@ class WalletTransaction(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Clearance job: matured pending_clearance rows
+        db.Index('ix_wallet_transactions_status_available_at', 'status', 'available_at'),
+        # Wallet screen: a user's pending clearance, and history in keyset order
+        db.Index('ix_wallet_transactions_user_status_available_at', 'user_id', 'status', 'available_at'),
+        db.Index('ix_wallet_transactions_user_created_at', 'user_id', 'created_at', 'id'),
+        # Revenue rollup: platform fees by day, incremental refresh
+        db.Index('ix_wallet_transactions_created_at', 'created_at'),
+        db.Index('ix_wallet_transactions_updated_at', 'updated_at'),
+    )
+
     def to_dict(self):
         """Convert transaction to dictionary"""
         return {
@@ -100,6 +122,7 @@ class WalletTransaction(db.Model):
             'collaboration_id': self.collaboration_id,
             'booking_id': self.booking_id,
             'cashout_request_id': self.cashout_request_id,
+            'milestone_id': self.milestone_id,
             'gross_amount': float(self.gross_amount) if self.gross_amount else None,
             'platform_fee': float(self.platform_fee) if self.platform_fee else None,
             'platform_fee_percentage': float(self.platform_fee_percentage) if self.platform_fee_percentage else None,
@@ -112,3 +135,80 @@ class WalletTransaction(db.Model):
 
     def __repr__(self):
         return f'<WalletTransaction {self.id} - {self.transaction_type} - {self.amount}>'
+
+
+class WalletLedgerEntry(db.Model):
+    """
+    One leg of a double-entry wallet posting. Append-only: rows are never updated
+    or deleted, corrections are posted as new 'adjustment' entries.
+
+    Every posting moves an amount between two accounts, so its legs sum to zero.
+    Accounts are the wallet balance buckets plus 'cashout_hold' (requested, not yet
+    paid out) and 'external' (money entering or leaving the platform wallets).
+    """
+    __tablename__ = 'wallet_ledger_entries'
+
+    id = db.Column(db.Integer, primary_key=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('wallet_transactions.id'))
+
+    kind = db.Column(db.String(20), nullable=False)     # 'earning', 'clearance', 'credit', 'cashout', 'payout', 'cashout_cancel', 'debit', 'adjustment'
+    account = db.Column(db.String(20), nullable=False)  # 'pending_clearance', 'available', 'cashout_hold', 'withdrawn', 'external'
+    amount = db.Column(db.Numeric(10, 2), nullable=False)  # Signed: positive credits the account
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_wallet_ledger_entries_wallet_id_id', 'wallet_id', 'id'),
+    )
+
+    def to_dict(self):
+        """Convert ledger entry to dictionary"""
+        return {
+            'id': self.id,
+            'wallet_id': self.wallet_id,
+            'transaction_id': self.transaction_id,
+            'kind': self.kind,
+            'account': self.account,
+            'amount': float(self.amount),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<WalletLedgerEntry {self.id} - {self.account} {self.amount}>'
+
+
+class WalletBalanceSnapshot(db.Model):
+    """Per-wallet account balances as of a ledger entry id, taken by the reconciliation job"""
+    __tablename__ = 'wallet_balance_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    wallet_id = db.Column(db.Integer, db.ForeignKey('wallets.id'), nullable=False)
+    last_entry_id = db.Column(db.Integer, nullable=False, default=0)  # Entries up to this id are included
+
+    pending_clearance = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    available_balance = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    cashout_hold = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+    withdrawn_total = db.Column(db.Numeric(10, 2), nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_wallet_balance_snapshots_wallet_id_id', 'wallet_id', 'id'),
+    )
+
+    def to_dict(self):
+        """Convert snapshot to dictionary"""
+        return {
+            'id': self.id,
+            'wallet_id': self.wallet_id,
+            'last_entry_id': self.last_entry_id,
+            'pending_clearance': float(self.pending_clearance),
+            'available_balance': float(self.available_balance),
+            'cashout_hold': float(self.cashout_hold),
+            'withdrawn_total': float(self.withdrawn_total),
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<WalletBalanceSnapshot {self.id} - Wallet {self.wallet_id} @ {self.last_entry_id}>'
@@ -8,6 +8,8 @@ This package contains all admin-related routes organized by feature:
 - collaborations: Collaboration and payment management
 - categories: Category and niche management (using existing routes/categories.py)
 - featured: Featured creators management
+- exports: Streaming CSV / JSON Lines finance exports
+- report_jobs: Background admin reports with cached results
 """
 
 from flask import Blueprint
@@ -28,5 +30,7 @@ from . import disputes
 from . import reports
 from . import subscriptions
 from . import payments
+from . import exports
+from . import report_jobs
 
 __all__ = ['bp']
@@ -3,9 +3,13 @@ Admin Cashout Management routes - Manage cashout requests
 """
 from flask import jsonify, request
 from datetime import datetime
+from sqlalchemy import insert, update
 from app import db
 from app.models import CashoutRequest, Wallet, WalletTransaction, User, CreatorProfile, Notification
 from app.decorators.admin import admin_required, role_required
+from app.services import wallet_ledger, activity_service
+from app.utils.bulk import parse_id_list
+from app.utils.notifications import queue_notifications, emit_notifications
 from . import bp
 
 
@@ -146,12 +150,8 @@ def approve_cashout(cashout_id):
         if not wallet:
             return jsonify({'error': 'Wallet not found for this cashout request'}), 404
 
-        # Check if wallet has sufficient balance
-        if wallet.available_balance < cashout.amount:
-            return jsonify({'error': f'Insufficient balance. Available: ${wallet.available_balance}, Requested: ${cashout.amount}'}), 400
-
-        # Deduct amount from available balance
-        wallet.available_balance -= cashout.amount
+        # The amount was moved out of the available balance into the cashout
+        # hold when the creator submitted the request, so nothing to deduct here
 
         # Update cashout status
         cashout.status = 'approved'
@@ -196,10 +196,95 @@ def approve_cashout(cashout_id):
         }), 500
 
 
+@bp.route('/cashouts/bulk/approve', methods=['PUT'])
+@admin_required
+def bulk_approve_cashouts():
+    """
+    Approve many pending cashout requests at once
+
+    Body: { cashout_ids: [int] }
+
+    One UPDATE approves every listed request that is still pending; their
+    withdrawal transactions, activity events and notifications are each
+    inserted in one statement, all in the same transaction. Requests that were
+    missing or no longer pending are returned as skipped.
+    """
+    try:
+        try:
+            cashout_ids = parse_id_list(request.get_json(silent=True), 'cashout_ids')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        approved = db.session.execute(
+            update(CashoutRequest)
+            .where(CashoutRequest.id.in_(cashout_ids), CashoutRequest.status == 'pending')
+            .values(status='approved', approved_at=datetime.utcnow())
+            .returning(CashoutRequest.id, CashoutRequest.wallet_id, CashoutRequest.creator_id,
+                       CashoutRequest.amount, CashoutRequest.status, CashoutRequest.payment_method,
+                       CashoutRequest.request_reference)
+            .execution_options(synchronize_session='fetch')
+        ).mappings().all()
+
+        notifications = []
+        if approved:
+            wallet_users = dict(db.session.query(Wallet.id, Wallet.user_id).filter(
+                Wallet.id.in_({cashout['wallet_id'] for cashout in approved})
+            ).all())
+
+            # The amounts already sit in each wallet's cashout hold, so only the
+            # withdrawal records are added here, as in approve_cashout
+            db.session.execute(insert(WalletTransaction), [
+                {
+                    'wallet_id': cashout['wallet_id'],
+                    'user_id': wallet_users[cashout['wallet_id']],
+                    'transaction_type': 'withdrawal',
+                    'amount': cashout['amount'],
+                    'description': f"Cashout approved - Reference: {cashout['request_reference']}",
+                    'status': 'withdrawn',
+                    'cashout_request_id': cashout['id'],
+                    'transaction_metadata': {'cashout_reference': cashout['request_reference']}
+                }
+                for cashout in approved
+            ])
+            activity_service.record_events(
+                [(CashoutRequest, dict(cashout)) for cashout in approved], event_type='cashout_approved'
+            )
+            notifications = queue_notifications([
+                {
+                    'user_id': wallet_users[cashout['wallet_id']],
+                    'notification_type': 'success',
+                    'title': 'Cashout Approved',
+                    'message': f"Your cashout request for ${cashout['amount']} has been approved and deducted from your balance. Payment will be processed within 2-3 business days."
+                }
+                for cashout in approved
+            ])
+
+        db.session.commit()
+        emit_notifications(notifications)
+
+        approved_ids = {cashout['id'] for cashout in approved}
+        return jsonify({
+            'success': True,
+            'message': f'{len(approved_ids)} cashout requests approved',
+            'data': {
+                'approved': [cashout_id for cashout_id in cashout_ids if cashout_id in approved_ids],
+                'skipped': [cashout_id for cashout_id in cashout_ids if cashout_id not in approved_ids]
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Failed to approve cashouts',
+            'message': str(e)
+        }), 500
+
+
 @bp.route('/cashouts/<int:cashout_id>/reject', methods=['PUT'])
 @admin_required
 def reject_cashout(cashout_id):
-    """Reject a cashout request"""
+    """Reject a cashout request and release the held amount back to the available balance"""
     try:
         data = request.get_json()
         reason = data.get('reason', 'No reason provided')
@@ -213,6 +298,15 @@ def reject_cashout(cashout_id):
 
         cashout.status = 'rejected'
         cashout.admin_notes = reason
+
+        # Return the held amount to the creator's available balance
+        transaction = WalletTransaction.query.filter_by(cashout_request_id=cashout.id).first()
+        if transaction:
+            transaction.status = 'cancelled'
+            transaction.updated_at = datetime.utcnow()
+        wallet_ledger.post_transfer(
+            cashout.wallet_id, 'cashout_cancel', 'cashout_hold', 'available', cashout.amount, transaction=transaction
+        )
         db.session.commit()
 
         # Send notification
@@ -264,7 +358,7 @@ def complete_cashout(cashout_id):
 
         # Update wallet
         wallet = cashout.wallet
-        wallet.withdrawn_total = (wallet.withdrawn_total or 0) + cashout.amount
+        wallet_ledger.post_transfer(wallet.id, 'payout', 'cashout_hold', 'withdrawn', cashout.amount)
 
         # Update the existing withdrawal transaction to completed status
         # The transaction was already created when cashout was approved
@@ -3,6 +3,7 @@ Admin Collaboration Management routes - Payments, cancellations, and collaborati
 """
 from flask import jsonify, request
 from datetime import datetime
+from decimal import Decimal
 from sqlalchemy import cast, String
 from app import db
 from app.models import (
@@ -10,9 +11,26 @@ from app.models import (
     User, CreatorProfile, BrandProfile, Notification
 )
 from app.decorators.admin import admin_required, role_required
+from app.services import wallet_ledger
+from app.utils.fieldsets import FieldsetSpec, Expansion
 from . import bp
 
 
+COLLABORATION_FIELDSET = FieldsetSpec(Collaboration, expansions={
+    'brand': Expansion(lambda brand: {
+        'id': brand.id,
+        'company_name': brand.company_name,
+        'email': brand.user.email
+    }, nested=('user',)),
+    'creator': Expansion(lambda creator: {
+        'id': creator.id,
+        'username': creator.username,
+        'email': creator.user.email
+    }, nested=('user',)),
+    'payment': Expansion(),  # Loaded by the route, Payment has no relationship to Collaboration
+})
+
+
 @bp.route('/collaborations', methods=['GET'])
 @admin_required
 def get_collaborations():
@@ -23,8 +41,15 @@ def get_collaborations():
         - payment_status: pending, paid, released
         - search: search by brand/creator name
         - page, per_page: pagination
+        - fields: comma-separated collaboration columns to return
+        - expand: comma-separated relations to include (brand, creator, payment), default all
     """
     try:
+        try:
+            fieldset = COLLABORATION_FIELDSET.parse()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
         status = request.args.get('status')
         payment_status = request.args.get('payment_status')
         search = request.args.get('search', '')
@@ -60,29 +85,22 @@ def get_collaborations():
         query = query.order_by(Collaboration.created_at.desc())
 
         # Paginate
-        paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+        paginated = fieldset.apply(query).paginate(page=page, per_page=per_page, error_out=False)
+
+        # Include payment information for admin
+        payments = {}
+        if fieldset.expands('payment') and paginated.items:
+            for payment in Payment.query.filter(
+                Payment.collaboration_id.in_([collab.id for collab in paginated.items])
+            ).order_by(Payment.id.desc()):
+                payments[payment.collaboration_id] = payment
 
         collabs_data = []
         for collab in paginated.items:
-            collab_dict = collab.to_dict()
-            collab_dict['brand'] = {
-                'id': collab.brand.id,
-                'company_name': collab.brand.company_name,
-                'email': collab.brand.user.email
-            }
-            collab_dict['creator'] = {
-                'id': collab.creator.id,
-                'username': collab.creator.username,
-                'email': collab.creator.user.email
-            }
-
-            # Include payment information for admin
-            payment = Payment.query.filter_by(collaboration_id=collab.id).first()
-            if payment:
-                collab_dict['payment'] = payment.to_dict()
-            else:
-                collab_dict['payment'] = None
-
+            collab_dict = fieldset.serialize(collab, lambda c: c.to_dict())
+            if fieldset.expands('payment'):
+                payment = payments.get(collab.id)
+                collab_dict['payment'] = payment.to_dict() if payment else None
             collabs_data.append(collab_dict)
 
         return jsonify({
@@ -279,20 +297,25 @@ def release_escrow(collaboration_id):
         if not creator_wallet:
             return jsonify({'error': 'Creator wallet not found'}), 404
 
-        # Add funds to wallet
-        creator_wallet.balance += collab.amount
-        creator_wallet.total_earned = (creator_wallet.total_earned or 0) + collab.amount
-
-        # Create transaction record
+        # Credit the wallet through the ledger; shares its idempotency key with
+        # release_escrow_to_wallet so a collaboration is only ever paid once
         transaction = WalletTransaction(
             wallet_id=creator_wallet.id,
-            type='credit',
+            user_id=creator_wallet.user_id,
+            transaction_type='earning',
             amount=collab.amount,
             description=f'Payment for collaboration: {collab.title}',
-            status='completed',
-            collaboration_id=collaboration_id
+            status='available',
+            clearance_required=False,
+            collaboration_id=collaboration_id,
+            idempotency_key=f'collaboration:{collaboration_id}:release'
         )
-        db.session.add(transaction)
+        transaction, created = wallet_ledger.record_transaction(
+            transaction, 'earning', 'external', 'available', earned=True
+        )
+        if not created:
+            db.session.rollback()
+            return jsonify({'error': 'Funds already released to wallet'}), 400
 
         # Update payment record
         payment = Payment.query.filter_by(
@@ -320,7 +343,7 @@ def release_escrow(collaboration_id):
             'data': {
                 'collaboration_id': collaboration_id,
                 'amount': float(collab.amount),
-                'creator_new_balance': float(creator_wallet.balance)
+                'creator_new_balance': float(creator_wallet.available_balance)
             }
         }), 200
 
@@ -415,16 +438,16 @@ def approve_cancellation(collaboration_id):
 
         if progress == 0:
             # No work done - full refund to brand
-            brand_refund = total_amount
-            creator_payment = 0
+            brand_refund = wallet_ledger.to_money(total_amount)
+            creator_payment = wallet_ledger.ZERO
         elif progress < 50:
             # Less than 50% done - 75% refund to brand, 25% to creator
-            brand_refund = total_amount * 0.75
-            creator_payment = total_amount * 0.25
+            brand_refund = wallet_ledger.to_money(total_amount * Decimal('0.75'))
+            creator_payment = wallet_ledger.to_money(total_amount) - brand_refund
         else:
             # 50% or more done - 25% refund to brand, 75% to creator
-            brand_refund = total_amount * 0.25
-            creator_payment = total_amount * 0.75
+            brand_refund = wallet_ledger.to_money(total_amount * Decimal('0.25'))
+            creator_payment = wallet_ledger.to_money(total_amount) - brand_refund
 
         # Get wallets
         brand_wallet = Wallet.query.filter_by(user_id=collab.brand.user_id).first()
@@ -432,30 +455,33 @@ def approve_cancellation(collaboration_id):
 
         # Refund brand
         if brand_refund > 0 and brand_wallet:
-            brand_wallet.balance += brand_refund
             brand_transaction = WalletTransaction(
                 wallet_id=brand_wallet.id,
-                type='credit',
+                user_id=brand_wallet.user_id,
+                transaction_type='refund',
                 amount=brand_refund,
                 description=f'Refund for cancelled collaboration: {collab.title}',
-                status='completed',
-                collaboration_id=collaboration_id
+                status='available',
+                clearance_required=False,
+                collaboration_id=collaboration_id,
+                idempotency_key=f'collaboration:{collaboration_id}:cancellation_refund'
             )
-            db.session.add(brand_transaction)
+            wallet_ledger.record_transaction(brand_transaction, 'refund', 'external', 'available')
 
         # Pay creator for work done
         if creator_payment > 0 and creator_wallet:
-            creator_wallet.balance += creator_payment
-            creator_wallet.total_earned = (creator_wallet.total_earned or 0) + creator_payment
             creator_transaction = WalletTransaction(
                 wallet_id=creator_wallet.id,
-                type='credit',
+                user_id=creator_wallet.user_id,
+                transaction_type='earning',
                 amount=creator_payment,
                 description=f'Partial payment for cancelled collaboration: {collab.title}',
-                status='completed',
-                collaboration_id=collaboration_id
+                status='available',
+                clearance_required=False,
+                collaboration_id=collaboration_id,
+                idempotency_key=f'collaboration:{collaboration_id}:cancellation_payment'
             )
-            db.session.add(creator_transaction)
+            wallet_ledger.record_transaction(creator_transaction, 'earning', 'external', 'available', earned=True)
 
         # Update collaboration
         collab.status = 'cancelled'
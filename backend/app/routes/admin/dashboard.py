@@ -1,15 +1,12 @@
 """
 Admin Dashboard routes - Overview statistics and quick actions
 """
-from flask import jsonify
-from sqlalchemy import func, cast, String
-from datetime import datetime, timedelta
-from app import db
-from app.models import (
-    User, CreatorProfile, BrandProfile, Collaboration, CashoutRequest,
-    Payment, Campaign, Booking, Review, Wallet, WalletTransaction
-)
+from flask import jsonify, current_app
+from datetime import datetime
+from app.models import User, Collaboration, CashoutRequest
 from app.decorators.admin import admin_required
+from app.services.dashboard_service import compute_dashboard_stats, DASHBOARD_SNAPSHOT, _pending_cancellation
+from app.services.snapshot_cache import snapshot_cache
 from . import bp
 
 
@@ -25,284 +22,21 @@ def get_dashboard_stats():
         - Financial statistics (revenue, pending cashouts)
         - Platform activity metrics
         - Recent activity feed
+
+    Statistics are a shared snapshot, recomputed by a single request at most
+    once every DASHBOARD_SNAPSHOT_SECONDS however many admins are polling.
     """
     try:
-        # ===== USER STATISTICS =====
-        total_users = User.query.filter_by(is_active=True).count()
-
-        creators_count = User.query.filter_by(
-            user_type='creator',
-            is_active=True
-        ).count()
-
-        brands_count = User.query.filter_by(
-            user_type='brand',
-            is_active=True
-        ).count()
-
-        # Unverified users needing attention
-        unverified_creators = User.query.join(CreatorProfile).filter(
-            User.user_type == 'creator',
-            User.is_verified == False,
-            User.is_active == True
-        ).count()
-
-        unverified_brands = User.query.join(BrandProfile).filter(
-            User.user_type == 'brand',
-            User.is_verified == False,
-            User.is_active == True
-        ).count()
-
-        # New users this week
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        new_users_this_week = User.query.filter(
-            User.created_at >= week_ago
-        ).count()
-
-        # New signups today
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        new_users_today = User.query.filter(
-            User.created_at >= today_start
-        ).count()
-
-        # Suspended accounts (is_active = False)
-        suspended_accounts = User.query.filter_by(is_active=False).count()
-
-        # Failed payments
-        from app.models import Booking
-        failed_payments = Booking.query.filter(
-            Booking.payment_status == 'failed'
-        ).count()
-
-        # ===== COLLABORATION STATISTICS =====
-        active_collaborations = Collaboration.query.filter_by(
-            status='in_progress'
-        ).count()
-
-        completed_collaborations = Collaboration.query.filter_by(
-            status='completed'
-        ).count()
-
-        cancelled_collaborations = Collaboration.query.filter_by(
-            status='cancelled'
-        ).count()
-
-        # Pending cancellation requests
-        pending_cancellations = Collaboration.query.filter(
-            Collaboration.cancellation_request.isnot(None),
-            cast(Collaboration.cancellation_request['status'], String) == 'pending'
-        ).count()
-
-        # ===== CASHOUT STATISTICS =====
-        pending_cashouts = CashoutRequest.query.filter_by(
-            status='pending'
-        ).count()
-
-        pending_cashouts_amount = db.session.query(
-            func.sum(CashoutRequest.amount)
-        ).filter_by(status='pending').scalar() or 0
-
-        approved_cashouts_pending_processing = CashoutRequest.query.filter_by(
-            status='approved'
-        ).count()
-
-        # ===== FINANCIAL STATISTICS =====
-        # Total transaction volume (all completed/paid payments)
-        total_transaction_volume = db.session.query(
-            func.sum(Payment.amount)
-        ).filter(
-            Payment.status.in_(['completed', 'paid'])
-        ).scalar() or 0
-
-        # Calculate actual platform revenue (15% commission from wallet transactions)
-        platform_revenue = db.session.query(
-            func.sum(WalletTransaction.platform_fee)
-        ).filter(
-            WalletTransaction.transaction_type == 'earning',
-            WalletTransaction.platform_fee.isnot(None)
-        ).scalar() or 0
-
-        # Transaction volume this month
-        first_day_month = datetime.utcnow().replace(
-            day=1, hour=0, minute=0, second=0, microsecond=0
+        stats, computed_at = snapshot_cache.get(
+            DASHBOARD_SNAPSHOT,
+            compute_dashboard_stats,
+            current_app.config.get('DASHBOARD_SNAPSHOT_SECONDS', 30)
         )
-        month_transaction_volume = db.session.query(
-            func.sum(Payment.amount)
-        ).filter(
-            Payment.status.in_(['completed', 'paid']),
-            Payment.created_at >= first_day_month
-        ).scalar() or 0
 
-        # Platform revenue this month (15% commission)
-        month_platform_revenue = db.session.query(
-            func.sum(WalletTransaction.platform_fee)
-        ).filter(
-            WalletTransaction.transaction_type == 'earning',
-            WalletTransaction.platform_fee.isnot(None),
-            WalletTransaction.created_at >= first_day_month
-        ).scalar() or 0
-
-        # Transaction volume this week
-        week_transaction_volume = db.session.query(
-            func.sum(Payment.amount)
-        ).filter(
-            Payment.status.in_(['completed', 'paid']),
-            Payment.created_at >= week_ago
-        ).scalar() or 0
-
-        # Platform revenue this week (15% commission)
-        week_platform_revenue = db.session.query(
-            func.sum(WalletTransaction.platform_fee)
-        ).filter(
-            WalletTransaction.transaction_type == 'earning',
-            WalletTransaction.platform_fee.isnot(None),
-            WalletTransaction.created_at >= week_ago
-        ).scalar() or 0
-
-        # Total in escrow (pending collaborations)
-        escrow_amount = db.session.query(
-            func.sum(Collaboration.amount)
-        ).filter_by(status='in_progress').scalar() or 0
-
-        # ===== PLATFORM ACTIVITY =====
-        active_campaigns = Campaign.query.filter(
-            Campaign.status.in_(['active', 'published'])
-        ).count()
-
-        active_bookings = Booking.query.filter_by(
-            status='confirmed'
-        ).count()
-
-        total_reviews = Review.query.count()
-
-        # Average platform rating
-        avg_rating = db.session.query(
-            func.avg(Review.rating)
-        ).scalar() or 0
-
-        # ===== FEATURED CREATORS =====
-        # Check if featured field exists
-        try:
-            featured_count = CreatorProfile.query.filter_by(
-                is_featured=True
-            ).count()
-        except:
-            featured_count = 0
-
-        # ===== RECENT ACTIVITY =====
-        # Recent cashout requests (last 10) - simplified to avoid relationship issues
-        cashouts_data = []
-        try:
-            recent_cashouts = CashoutRequest.query.order_by(
-                CashoutRequest.created_at.desc()
-            ).limit(10).all()
-
-            for cashout in recent_cashouts:
-                # Get user and creator info separately
-                user = User.query.get(cashout.wallet.user_id) if cashout.wallet else None
-                creator = CreatorProfile.query.filter_by(user_id=user.id).first() if user else None
-
-                cashouts_data.append({
-                    'id': cashout.id,
-                    'creator_name': creator.username if creator else (user.email if user else 'Unknown'),
-                    'creator_id': creator.id if creator else None,
-                    'amount': float(cashout.amount),
-                    'status': cashout.status,
-                    'created_at': cashout.created_at.isoformat(),
-                    'payment_method': cashout.payment_method
-                })
-        except Exception as e:
-            # If cashouts fail, just return empty list
-            cashouts_data = []
-
-        # Recent user registrations (last 10)
-        recent_users = User.query.order_by(
-            User.created_at.desc()
-        ).limit(10).all()
-
-        users_data = []
-        for user in recent_users:
-            users_data.append({
-                'id': user.id,
-                'email': user.email,
-                'user_type': user.user_type,
-                'is_verified': user.is_verified,
-                'is_active': user.is_active,
-                'created_at': user.created_at.isoformat()
-            })
-
-        # Recent cancellation requests (last 5)
-        recent_cancellations = Collaboration.query.filter(
-            Collaboration.cancellation_request.isnot(None),
-            cast(Collaboration.cancellation_request['status'], String) == 'pending'
-        ).order_by(
-            Collaboration.created_at.desc()
-        ).limit(5).all()
-
-        cancellations_data = []
-        for collab in recent_cancellations:
-            cancellations_data.append({
-                'id': collab.id,
-                'title': collab.title,
-                'brand_id': collab.brand_id,
-                'creator_id': collab.creator_id,
-                'amount': float(collab.amount),
-                'requested_by': collab.cancellation_request.get('requested_by'),
-                'reason': collab.cancellation_request.get('reason'),
-                'requested_at': collab.cancellation_request.get('requested_at')
-            })
-
-        # ===== CONSTRUCT RESPONSE =====
         return jsonify({
             'success': True,
-            'data': {
-                'users': {
-                    'total': total_users,
-                    'creators': creators_count,
-                    'brands': brands_count,
-                    'unverified_creators': unverified_creators,
-                    'unverified_brands': unverified_brands,
-                    'new_this_week': new_users_this_week,
-                    'new_today': new_users_today,
-                    'suspended': suspended_accounts,
-                    'failed_payments': failed_payments
-                },
-                'collaborations': {
-                    'active': active_collaborations,
-                    'completed': completed_collaborations,
-                    'cancelled': cancelled_collaborations,
-                    'pending_cancellations': pending_cancellations
-                },
-                'cashouts': {
-                    'pending_count': pending_cashouts,
-                    'pending_amount': float(pending_cashouts_amount),
-                    'approved_pending_processing': approved_cashouts_pending_processing
-                },
-                'revenue': {
-                    'total': float(platform_revenue),
-                    'this_month': float(month_platform_revenue),
-                    'this_week': float(week_platform_revenue),
-                    'platform_revenue': float(platform_revenue),
-                    'platform_revenue_month': float(month_platform_revenue),
-                    'platform_revenue_week': float(week_platform_revenue),
-                    'transaction_volume': float(total_transaction_volume),
-                    'transaction_volume_month': float(month_transaction_volume),
-                    'transaction_volume_week': float(week_transaction_volume),
-                    'in_escrow': float(escrow_amount)
-                },
-                'platform': {
-                    'active_campaigns': active_campaigns,
-                    'active_bookings': active_bookings,
-                    'total_reviews': total_reviews,
-                    'average_rating': float(avg_rating) if avg_rating else 0
-                },
-                'featured_creators': featured_count,
-                'recent_activity': {
-                    'cashouts': cashouts_data,
-                    'users': users_data,
-                    'cancellations': cancellations_data
-                }
-            }
+            'data': stats,
+            'generated_at': datetime.utcfromtimestamp(computed_at).isoformat()
         }), 200
 
     except Exception as e:
@@ -331,7 +65,7 @@ def get_quick_actions():
 
         pending_cancellations = Collaboration.query.filter(
             Collaboration.cancellation_request.isnot(None),
-            cast(Collaboration.cancellation_request['status'], String) == 'pending'
+            _pending_cancellation()
         ).count()
 
         return jsonify({
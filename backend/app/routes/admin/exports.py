@@ -0,0 +1,121 @@
+"""
+Admin Export Routes
+Streaming CSV / JSON Lines exports of payments, wallet transactions and cashouts
+"""
+
+from flask import current_app, jsonify, request, Response, stream_with_context
+from datetime import datetime
+from app.decorators.admin import admin_required
+from app.services import export_service
+from . import bp
+
+
+def _export_params():
+    """Format and date range shared by every export. Raises ValueError on bad input."""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in export_service.EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(export_service.EXPORT_FORMATS)}")
+
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    return (
+        export_format,
+        datetime.fromisoformat(start_date) if start_date else None,
+        datetime.fromisoformat(end_date) if end_date else None
+    )
+
+
+def _stream_export(name, query, export_format):
+    """Chunked response that writes rows as the cursor produces them"""
+    mimetype, extension = export_service.EXPORT_FORMATS[export_format]
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{extension}"
+
+    def generate():
+        try:
+            yield from export_service.stream_rows(query, export_format)
+        except Exception:
+            # Headers are already sent: mark the file as incomplete, then re-raise
+            # so the server aborts the chunked response instead of ending it cleanly
+            current_app.logger.exception(f"Export {name} failed mid-stream")
+            yield export_service.error_trailer(export_format)
+            raise
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename={filename}',
+            'X-Accel-Buffering': 'no',  # Let nginx pass chunks straight through
+            'Cache-Control': 'no-store'
+        }
+    )
+
+
+@bp.route('/exports/payments', methods=['GET'])
+@admin_required
+def export_payments():
+    """
+    Stream payments as CSV or JSON Lines
+    Query params: format (csv, jsonl), status, payment_method, start_date, end_date
+    """
+    try:
+        export_format, start_date, end_date = _export_params()
+        query = export_service.payments_export_query(
+            status=request.args.get('status'),
+            payment_method=request.args.get('payment_method'),
+            start_date=start_date,
+            end_date=end_date
+        )
+        return _stream_export('payments', query, export_format)
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/exports/wallet-transactions', methods=['GET'])
+@admin_required
+def export_wallet_transactions():
+    """
+    Stream wallet transactions as CSV or JSON Lines
+    Query params: format (csv, jsonl), status, transaction_type, user_id, start_date, end_date
+    """
+    try:
+        export_format, start_date, end_date = _export_params()
+        query = export_service.wallet_transactions_export_query(
+            status=request.args.get('status'),
+            transaction_type=request.args.get('transaction_type'),
+            user_id=request.args.get('user_id', type=int),
+            start_date=start_date,
+            end_date=end_date
+        )
+        return _stream_export('wallet-transactions', query, export_format)
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/exports/cashouts', methods=['GET'])
+@admin_required
+def export_cashouts():
+    """
+    Stream cashout requests as CSV or JSON Lines
+    Query params: format (csv, jsonl), status, payment_method, start_date, end_date
+    """
+    try:
+        export_format, start_date, end_date = _export_params()
+        query = export_service.cashouts_export_query(
+            status=request.args.get('status'),
+            payment_method=request.args.get('payment_method'),
+            start_date=start_date,
+            end_date=end_date
+        )
+        return _stream_export('cashouts', query, export_format)
+
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
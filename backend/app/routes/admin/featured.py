@@ -3,11 +3,51 @@ Admin Featured Creators Management - Set and manage featured creators on homepag
 """
 from flask import jsonify, request
 from datetime import datetime
+from sqlalchemy import Integer, case, column, func, update, values
+from sqlalchemy.dialects.postgresql import JSONB
 from app import db
 from app.models import CreatorProfile, User, Notification
 from app.decorators.admin import admin_required
 from . import bp
 
+FEATURED_PLATFORMS = ('tiktok', 'instagram')
+
+
+def _has_social_link(platform):
+    """Creators whose social_links has a key for platform (JSONB ? on PostgreSQL, GIN-indexed)"""
+    if db.engine.dialect.name == 'postgresql':
+        return db.cast(CreatorProfile.social_links, JSONB).has_key(platform)
+    return func.json_extract(CreatorProfile.social_links, f'$.{platform}').isnot(None)
+
+
+def _set_featured_orders(orders):
+    """
+    Set featured_order for many featured creators in one UPDATE
+
+    Args:
+        orders: {creator_id: featured_order}
+
+    Returns:
+        int: Number of creators updated
+    """
+    if db.engine.dialect.name == 'postgresql':
+        new_orders = values(
+            column('id', Integer), column('featured_order', Integer), name='new_orders'
+        ).data(list(orders.items()))
+        statement = update(CreatorProfile).where(
+            CreatorProfile.id == new_orders.c.id
+        ).values(featured_order=new_orders.c.featured_order)
+    else:
+        # SQLite has no column-aliased VALUES in UPDATE ... FROM
+        statement = update(CreatorProfile).where(
+            CreatorProfile.id.in_(orders)
+        ).values(featured_order=case(orders, value=CreatorProfile.id))
+
+    result = db.session.execute(
+        statement.where(CreatorProfile.is_featured.is_(True)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
 
 @bp.route('/creators/featured', methods=['GET'])
 @admin_required
@@ -77,22 +117,26 @@ def get_eligible_creators():
         search = request.args.get('search', '')
         platform = request.args.get('platform')  # 'tiktok', 'instagram', or None for all
 
-        # Base query - verified and active creators
-        query = CreatorProfile.query.join(User).filter(
+        # Compact projection for the admin grid, creator and user in one query
+        query = db.session.query(
+            CreatorProfile.id,
+            CreatorProfile.username,
+            CreatorProfile.profile_picture,
+            CreatorProfile.follower_count,
+            CreatorProfile.categories,
+            CreatorProfile.social_links,
+            CreatorProfile.is_featured,
+            CreatorProfile.featured_type,
+            User.id.label('user_id'),
+            User.email
+        ).join(User, CreatorProfile.user_id == User.id).filter(
             User.is_verified == True,
             User.is_active == True
         )
 
-        # Platform filter - check if creator has the platform in their social_links
-        if platform:
-            if platform.lower() == 'tiktok':
-                query = query.filter(
-                    db.cast(CreatorProfile.social_links, db.String).ilike('%tiktok%')
-                )
-            elif platform.lower() == 'instagram':
-                query = query.filter(
-                    db.cast(CreatorProfile.social_links, db.String).ilike('%instagram%')
-                )
+        # Platform filter - creators with the platform in their social_links
+        if platform and platform.lower() in FEATURED_PLATFORMS:
+            query = query.filter(_has_social_link(platform.lower()))
 
         # Search filter
         if search:
@@ -103,30 +147,32 @@ def get_eligible_creators():
                 )
             )
 
-        # Check if featured field exists
-        try:
-            # Order: non-featured first, then by follower count
-            query = query.order_by(
-                CreatorProfile.is_featured.asc(),
-                CreatorProfile.follower_count.desc()
-            )
-        except Exception:
-            # Featured field doesn't exist, just order by followers
-            query = query.order_by(CreatorProfile.follower_count.desc())
+        # Order: non-featured first, then by follower count
+        query = query.order_by(
+            CreatorProfile.is_featured.asc(),
+            CreatorProfile.follower_count.desc(),
+            CreatorProfile.id
+        )
 
         paginated = query.paginate(page=page, per_page=per_page, error_out=False)
 
-        creators_data = []
-        for creator in paginated.items:
-            data = creator.to_dict()
-            data['user'] = creator.user.to_dict()
-            try:
-                data['is_featured'] = creator.is_featured
-                data['featured_type'] = creator.featured_type
-            except:
-                data['is_featured'] = False
-                data['featured_type'] = None
-            creators_data.append(data)
+        creators_data = [
+            {
+                'id': row.id,
+                'username': row.username,
+                'profile_picture': row.profile_picture,
+                'follower_count': row.follower_count or 0,
+                'categories': row.categories or [],
+                'social_links': row.social_links or {},
+                'is_featured': bool(row.is_featured),
+                'featured_type': row.featured_type,
+                'user': {
+                    'id': row.user_id,
+                    'email': row.email
+                }
+            }
+            for row in paginated.items
+        ]
 
         return jsonify({
             'success': True,
@@ -302,20 +348,18 @@ def reorder_featured_creators():
         if not creator_orders:
             return jsonify({'error': 'No creator orders provided'}), 400
 
-        # Update each creator's order
-        for item in creator_orders:
-            creator_id = item.get('creator_id')
-            order = item.get('order', 0)
-
-            creator = CreatorProfile.query.get(creator_id)
-            if creator and creator.is_featured:
-                creator.featured_order = order
+        try:
+            orders = {int(item['creator_id']): int(item.get('order', 0)) for item in creator_orders}
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Each creator order needs an integer creator_id and order'}), 400
 
+        # One UPDATE for the whole list; creators that are not featured are skipped
+        reordered = _set_featured_orders(orders)
         db.session.commit()
 
         return jsonify({
             'success': True,
-            'message': f'Reordered {len(creator_orders)} featured creators',
+            'message': f'Reordered {reordered} featured creators',
             'data': creator_orders
         }), 200
 
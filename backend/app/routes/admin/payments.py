@@ -8,10 +8,37 @@ from datetime import datetime, timedelta
 from app import db
 from app.models import Payment, Booking, User, BrandProfile, CreatorProfile, PaymentVerification, CreatorSubscription, CreatorSubscriptionPlan
 from app.decorators.admin import admin_required
+from app.services import rollup_service
 from flask_jwt_extended import get_jwt_identity
+from app.utils.fieldsets import FieldsetSpec, Expansion
 from . import bp
 
 
+PAYMENT_TYPE_DISPLAY = {
+    'direct-package': 'Package Purchase',
+    'campaign_application-campaign': 'Campaign Application Accepted',
+    'campaign_package-package': 'Package Added to Campaign',
+    'direct-revision': 'Paid Revision',
+    'brief_proposal-brief': 'Brief Proposal Accepted'
+}
+
+
+def _payment_type_display(booking):
+    return PAYMENT_TYPE_DISPLAY.get(f'{booking.booking_type}-{booking.payment_category}', 'Payment')
+
+
+BOOKING_FIELDSET = FieldsetSpec(
+    Booking,
+    expansions={
+        'package': Expansion(lambda package: package.to_dict()),
+        'campaign': Expansion(lambda campaign: campaign.to_dict()),
+        'creator': Expansion(lambda creator: creator.to_dict(include_user=True), nested=('user',)),
+        'brand': Expansion(lambda brand: brand.to_dict(include_user=True), nested=('user',)),
+    },
+    computed={'payment_type_display': (_payment_type_display, ('booking_type', 'payment_category'))}
+)
+
+
 @bp.route('/payments', methods=['GET'])
 @admin_required
 def get_all_payments():
@@ -172,55 +199,11 @@ def get_payment_statistics():
     Get payment statistics for admin dashboard
     """
     try:
-        today = datetime.utcnow().date()
-        month_start = datetime(today.year, today.month, 1)
-
-        # Pending payments
-        pending_payments = Payment.query.filter_by(status='pending').all()
-        pending_count = len(pending_payments)
-        pending_amount = sum(float(p.amount) for p in pending_payments)
-
-        # Also count bookings with pending proof
-        pending_bookings = Booking.query.filter(
-            Booking.payment_status == 'pending',
-            Booking.proof_of_payment.isnot(None)
-        ).all()
-        pending_count += len(pending_bookings)
-        pending_amount += sum(float(b.amount) for b in pending_bookings)
-
-        # Verified today
-        verified_today = Payment.query.filter(
-            Payment.verified_at >= datetime.combine(today, datetime.min.time()),
-            Payment.status == 'completed'
-        ).all()
-        verified_today_count = len(verified_today)
-        verified_today_amount = sum(float(p.amount) for p in verified_today)
-
-        # This month
-        month_payments = Payment.query.filter(
-            Payment.created_at >= month_start,
-            Payment.status == 'completed'
-        ).all()
-        month_count = len(month_payments)
-        month_amount = sum(float(p.amount) for p in month_payments)
-
-        # Total verified
-        total_verified = Payment.query.filter_by(status='completed').all()
-        total_verified_count = len(total_verified)
-        total_verified_amount = sum(float(p.amount) for p in total_verified)
+        statistics = rollup_service.get_payment_statistics()
 
         return jsonify({
             'success': True,
-            'statistics': {
-                'pending_count': pending_count,
-                'pending_amount': pending_amount,
-                'verified_today_count': verified_today_count,
-                'verified_today_amount': verified_today_amount,
-                'month_count': month_count,
-                'month_amount': month_amount,
-                'total_verified_count': total_verified_count,
-                'total_verified_amount': total_verified_amount
-            }
+            'statistics': statistics
         }), 200
 
     except Exception as e:
@@ -577,8 +560,15 @@ def get_all_bookings():
     """
     Get all bookings with optional filters
     Query params: payment_status, payment_category, booking_type, start_date, end_date, limit, offset
+        - fields: comma-separated booking columns to return (and payment_type_display)
+        - expand: comma-separated relations to include (package, campaign, creator, brand), default all
     """
     try:
+        try:
+            fieldset = BOOKING_FIELDSET.parse()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
         # Get query parameters
         payment_status = request.args.get('payment_status')
         payment_category = request.args.get('payment_category')
@@ -606,29 +596,10 @@ def get_all_bookings():
         total = query.count()
 
         # Get paginated results
-        bookings = query.order_by(Booking.created_at.desc()).limit(limit).offset(offset).all()
-
-        # Format bookings with full details
-        bookings_data = []
-        for booking in bookings:
-            booking_dict = booking.to_dict(include_relations=True)
-
-            # Add payment type display
-            payment_category = booking.payment_category if hasattr(booking, 'payment_category') else 'package'
-            booking_type_val = booking.booking_type if hasattr(booking, 'booking_type') else 'direct'
-
-            payment_type_map = {
-                'direct-package': 'Package Purchase',
-                'campaign_application-campaign': 'Campaign Application Accepted',
-                'campaign_package-package': 'Package Added to Campaign',
-                'direct-revision': 'Paid Revision',
-                'brief_proposal-brief': 'Brief Proposal Accepted'
-            }
-
-            key = f'{booking_type_val}-{payment_category}'
-            booking_dict['payment_type_display'] = payment_type_map.get(key, 'Payment')
+        bookings = fieldset.apply(query.order_by(Booking.created_at.desc())).limit(limit).offset(offset).all()
 
-            bookings_data.append(booking_dict)
+        # Relations are loaded once for the page, not per booking
+        bookings_data = [fieldset.serialize(booking, lambda b: b.to_dict()) for booking in bookings]
 
         return jsonify({
             'success': True,
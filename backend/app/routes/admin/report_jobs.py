@@ -0,0 +1,73 @@
+"""
+Admin Report Jobs - Run reports in the background and fetch their stored results
+"""
+from flask import jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from app import db
+from app.models import ReportJob
+from app.decorators.admin import admin_required
+from app.services.report_jobs import report_job_queue, job_room
+from . import bp
+
+
+@bp.route('/report-jobs', methods=['POST'])
+@admin_required
+def create_report_job():
+    """
+    Queue a report, or reuse an identical one
+
+    Body:
+      - report: growth | revenue | marketplace-health | risk
+      - params: e.g. {"days": 90} for growth, {"months": 12} for revenue
+
+    Returns the job (with its result if an unexpired one already exists).
+    Subscribe to its completion with the `subscribe_report_job` socket event,
+    or poll GET /report-jobs/<id>.
+    """
+    try:
+        data = request.get_json() or {}
+        params = data.get('params') or {}
+        if not isinstance(params, dict):
+            return jsonify({'success': False, 'error': 'params must be an object'}), 400
+
+        try:
+            job, reused = report_job_queue.submit(data.get('report'), params, requested_by=int(get_jwt_identity()))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        return jsonify({
+            'success': True,
+            'reused': reused,
+            'room': job_room(job.id),
+            'data': job.to_dict(include_result=job.status == 'completed')
+        }), 200 if job.status == 'completed' else 202
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': 'Failed to queue report',
+            'message': str(e)
+        }), 500
+
+
+@bp.route('/report-jobs/<job_id>', methods=['GET'])
+@admin_required
+def get_report_job(job_id):
+    """Job status, and the stored result once it has completed"""
+    try:
+        job = db.session.get(ReportJob, job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'Report job not found'}), 404
+
+        return jsonify({
+            'success': True,
+            'data': job.to_dict(include_result=job.status == 'completed')
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': 'Failed to fetch report job',
+            'message': str(e)
+        }), 500
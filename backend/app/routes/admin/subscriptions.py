@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 from app import db
 from app.models import User, Subscription, SubscriptionPlan
 from app.decorators.admin import admin_required
+from app.services.platform_fee_service import platform_fee_resolver
 from . import bp
 
 
@@ -195,6 +196,7 @@ def admin_change_plan(subscription_id):
         subscription.modified_by_admin = get_jwt_identity()
         subscription.updated_at = datetime.utcnow()
 
+        platform_fee_resolver.invalidate_on_commit(subscription.user_id)
         db.session.commit()
 
         return jsonify({
@@ -240,6 +242,7 @@ def admin_cancel_subscription(subscription_id):
         subscription.admin_note = f"{datetime.utcnow().isoformat()}: {reason}"
         subscription.updated_at = datetime.utcnow()
 
+        platform_fee_resolver.invalidate_on_commit(subscription.user_id)
         db.session.commit()
 
         return jsonify({
@@ -283,6 +286,7 @@ def admin_reactivate_subscription(subscription_id):
         if subscription.current_period_end < datetime.utcnow():
             subscription.set_billing_period(subscription.billing_cycle)
 
+        platform_fee_resolver.invalidate_on_commit(subscription.user_id)
         db.session.commit()
 
         return jsonify({
@@ -345,6 +349,7 @@ def update_plan(plan_id):
                 setattr(plan, field, data[field])
 
         plan.updated_at = datetime.utcnow()
+        platform_fee_resolver.invalidate_on_commit()
         db.session.commit()
 
         return jsonify({
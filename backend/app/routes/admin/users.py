@@ -2,12 +2,49 @@
 Admin User Management routes - Verify, suspend, manage users
 """
 from flask import jsonify, request
-from sqlalchemy import or_
+from sqlalchemy import select, union, update
+from sqlalchemy.orm import contains_eager
 from app import db
 from app.models import User, CreatorProfile, BrandProfile, Notification
 from app.decorators.admin import admin_required, role_required
+from app.services.admin_auth_cache import invalidate_admin_auth
+from app.utils.bulk import parse_id_list
+from app.utils.notifications import queue_notifications, emit_notifications
 from . import bp
 
+# Bulk action -> (column, new value, notification title, message, type)
+BULK_USER_ACTIONS = {
+    'verify': ('is_verified', True, 'Account Verified',
+               'Your account has been verified! You now have full access to all platform features.', 'success'),
+    'unverify': ('is_verified', False, 'Verification Removed',
+                 'Your account verification has been removed. Please contact support for more information.', 'warning'),
+    'activate': ('is_active', True, 'Account Activated',
+                 'Your account has been reactivated. You can now log in and use all platform features.', 'success'),
+    'deactivate': ('is_active', False, 'Account Suspended',
+                   'Your account has been suspended. Reason: {reason}. Please contact support.', 'error'),
+}
+
+
+def _contains(search):
+    """ILIKE pattern matching search anywhere, with LIKE wildcards in it taken literally"""
+    escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _search_user_ids(search):
+    """
+    Ids of users whose email, creator username or brand company name contains search
+
+    One branch per column rather than an OR across joined tables, so that each
+    branch can use its own trigram index on PostgreSQL.
+    """
+    pattern = _contains(search)
+    return union(
+        select(User.id).where(User.email.ilike(pattern, escape='\\')),
+        select(CreatorProfile.user_id).where(CreatorProfile.username.ilike(pattern, escape='\\')),
+        select(BrandProfile.user_id).where(BrandProfile.company_name.ilike(pattern, escape='\\'))
+    )
+
 
 @bp.route('/users', methods=['GET'])
 @admin_required
@@ -18,7 +55,7 @@ def get_users():
         - user_type: creator, brand, admin
         - is_verified: true, false
         - is_active: true, false
-        - search: search by email or name
+        - search: search by email, creator username or brand company name
         - page: page number
         - per_page: items per page
     """
@@ -29,10 +66,13 @@ def get_users():
         is_active = request.args.get('is_active') or None
         search = request.args.get('search', '').strip()
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
 
-        # Base query
-        query = User.query
+        # Base query, with each user's profile loaded in the same query
+        query = User.query.outerjoin(User.creator_profile).outerjoin(User.brand_profile).options(
+            contains_eager(User.creator_profile),
+            contains_eager(User.brand_profile)
+        )
 
         # Apply filters (only if values are not empty)
         if user_type:
@@ -47,11 +87,7 @@ def get_users():
             query = query.filter(User.is_active == active_bool)
 
         if search:
-            query = query.filter(
-                or_(
-                    User.email.ilike(f'%{search}%')
-                )
-            )
+            query = query.filter(User.id.in_(_search_user_ids(search)))
 
         # Order by creation date
         query = query.order_by(User.created_at.desc())
@@ -214,6 +250,7 @@ def activate_user(user_id):
 
         user.is_active = True
         db.session.commit()
+        invalidate_admin_auth(user_id)
 
         # Send notification
         notification = Notification(
@@ -253,6 +290,7 @@ def deactivate_user(user_id):
 
         user.is_active = False
         db.session.commit()
+        invalidate_admin_auth(user_id)
 
         # Send notification
         notification = Notification(
@@ -279,6 +317,74 @@ def deactivate_user(user_id):
         }), 500
 
 
+@bp.route('/users/bulk/<action>', methods=['PUT'])
+@admin_required
+def bulk_update_users(action):
+    """
+    Verify, unverify, activate or deactivate many users at once
+
+    Body: { user_ids: [int], reason: str (deactivate only) }
+
+    One UPDATE changes every listed user not already in the target state, and
+    their notifications are inserted in one statement, all in one transaction.
+    Users that were missing or already in that state are returned as skipped.
+    """
+    if action not in BULK_USER_ACTIONS:
+        return jsonify({'error': f'Unknown action: {action}'}), 404
+
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            user_ids = parse_id_list(data, 'user_ids')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        column_name, value, title, message, notification_type = BULK_USER_ACTIONS[action]
+        column = getattr(User, column_name)
+        reason = data.get('reason') or 'Account suspended by administrator'
+
+        updated = db.session.execute(
+            update(User)
+            .where(User.id.in_(user_ids), column.isnot(value))
+            .values({column_name: value})
+            .returning(User.id)
+            .execution_options(synchronize_session='fetch')
+        ).scalars().all()
+
+        notifications = queue_notifications([
+            {
+                'user_id': user_id,
+                'notification_type': notification_type,
+                'title': title,
+                'message': message.format(reason=reason)
+            }
+            for user_id in updated
+        ])
+        db.session.commit()
+
+        if column_name == 'is_active':
+            invalidate_admin_auth(*updated)
+        emit_notifications(notifications)
+
+        updated_set = set(updated)
+        return jsonify({
+            'success': True,
+            'message': f'{len(updated)} users updated',
+            'data': {
+                'updated': [user_id for user_id in user_ids if user_id in updated_set],
+                'skipped': [user_id for user_id in user_ids if user_id not in updated_set]
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': f'Failed to {action} users',
+            'message': str(e)
+        }), 500
+
+
 @bp.route('/users/<int:user_id>', methods=['DELETE'])
 @role_required('super_admin')
 def delete_user(user_id):
@@ -332,6 +438,7 @@ def delete_user(user_id):
         email = user.email
         db.session.delete(user)
         db.session.commit()
+        invalidate_admin_auth(user_id)
 
         return jsonify({
             'success': True,
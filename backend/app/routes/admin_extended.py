@@ -4,34 +4,18 @@ This file should be imported alongside the main admin.py
 """
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from functools import wraps
 from sqlalchemy import func, or_, desc
 from datetime import datetime, timedelta
 from app import db
 from app.models import (
-    User, Campaign, Booking, Collaboration, Review,
+    Campaign, Booking, Collaboration, Review,
     CampaignApplication, Package, CreatorProfile, BrandProfile
 )
+from app.decorators.admin import admin_required
 
 bp = Blueprint('admin_extended', __name__)
 
 
-def admin_required(fn):
-    """Decorator to ensure only admins can access a route"""
-    @wraps(fn)
-    @jwt_required()
-    def wrapper(*args, **kwargs):
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
-
-        if not user or not user.is_admin:
-            return jsonify({'error': 'Admin access required'}), 403
-
-        return fn(*args, **kwargs)
-    return wrapper
-
-
 # ============================================================================
 # COLLABORATION MANAGEMENT
 # ============================================================================
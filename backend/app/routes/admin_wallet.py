@@ -2,23 +2,13 @@
 Admin Wallet Routes - Payment verification and cashout management
 """
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.decorators.admin import admin_required
 from app.services import payment_service, cashout_service
 
 bp = Blueprint('admin_wallet', __name__)
 
 
-def admin_required(fn):
-    """Decorator to require admin privileges"""
-    def wrapper(*args, **kwargs):
-        claims = get_jwt()
-        if not claims.get('is_admin'):
-            return jsonify({'error': 'Admin access required'}), 403
-        return fn(*args, **kwargs)
-    wrapper.__name__ = fn.__name__
-    return wrapper
-
-
 # ============================================================================
 # PAYMENT MANAGEMENT
 # ============================================================================
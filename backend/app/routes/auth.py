@@ -66,10 +66,10 @@ def register_creator():
         # Generate OTP
         otp = OTP(user_id=user.id, purpose='registration', expiry_minutes=10)
         db.session.add(otp)
-        db.session.commit()
 
-        # Send OTP email
+        # Queue the OTP email in the same transaction
         send_otp_email(user.email, otp.code, purpose='registration')
+        db.session.commit()
 
         return jsonify({
             'message': 'Creator account created successfully. Please check your email for the verification code.',
@@ -116,10 +116,10 @@ def register_brand():
         # Generate OTP
         otp = OTP(user_id=user.id, purpose='registration', expiry_minutes=10)
         db.session.add(otp)
-        db.session.commit()
 
-        # Send OTP email
+        # Queue the OTP email in the same transaction
         send_otp_email(user.email, otp.code, purpose='registration')
+        db.session.commit()
 
         return jsonify({
             'message': 'Brand account created successfully. Please check your email for the verification code.',
@@ -278,10 +278,10 @@ def resend_otp():
         # Generate new OTP
         otp = OTP(user_id=user.id, purpose='registration', expiry_minutes=10)
         db.session.add(otp)
-        db.session.commit()
 
-        # Send OTP email
+        # Queue the OTP email in the same transaction
         send_otp_email(user.email, otp.code, purpose='registration')
+        db.session.commit()
 
         return jsonify({
             'message': 'Verification code sent successfully'
@@ -325,10 +325,10 @@ def forgot_password():
         if user:
             # Generate reset token
             reset_token = user.generate_reset_token()
-            db.session.commit()
 
-            # Send reset email
+            # Queue the reset email in the same transaction
             send_password_reset_email(user.email, reset_token)
+            db.session.commit()
 
         # Always return success to prevent email enumeration
         return jsonify({'message': 'If the email exists, a password reset link has been sent'}), 200
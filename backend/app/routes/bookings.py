@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy import insert, update
 from werkzeug.utils import secure_filename
 import os
 from app import db
@@ -8,8 +9,10 @@ from app.models import (
     Booking, Package, Campaign, BrandProfile, CreatorProfile, User, Collaboration,
     Proposal, CollaborationMilestone, Subscription, SubscriptionPlan, Brief
 )
+from app.services import activity_service
+from app.services.email_service import send_booking_confirmation_email
 from app.services.payment_service import initiate_payment, check_payment_status, process_payment_webhook
-from app.utils.notifications import notify_new_booking, notify_booking_status
+from app.utils.notifications import notify_new_booking, notify_booking_status, queue_notifications, emit_notifications
 
 bp = Blueprint('bookings', __name__)
 
@@ -135,13 +138,19 @@ def create_booking():
         )
 
         db.session.add(booking)
+        db.session.flush()
+
+        # Confirmation emails commit with the booking
+        creator_user = User.query.get(package.creator.user_id)
+        if creator_user:
+            send_booking_confirmation_email(booking, user.email, creator_user.email)
+
         db.session.commit()
 
         # Refresh booking to load relationships
         db.session.refresh(booking)
 
         # Notify creator of new booking
-        creator_user = User.query.get(package.creator.user_id)
         if creator_user:
             notify_new_booking(
                 creator_id=creator_user.id,
@@ -348,6 +357,8 @@ def get_payment_status(booking_id):
 def cart_checkout():
     """
     Cart checkout: create all bookings then initiate ONE combined Paynow payment.
+    Runs in a constant number of database round trips whatever the cart size,
+    and commits bookings, payments and notifications together.
     Body: { package_ids: [1, 2, ...] }
     Returns: { booking_ids, redirect_url, poll_url, payment_reference, total }
     """
@@ -360,7 +371,10 @@ def cart_checkout():
             return jsonify({'error': 'Brand profile not found'}), 404
 
         data = request.get_json()
-        package_ids = data.get('package_ids', [])
+        try:
+            package_ids = [int(pkg_id) for pkg_id in data.get('package_ids', [])]
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid package IDs'}), 400
         if not package_ids:
             return jsonify({'error': 'No packages provided'}), 400
 
@@ -394,40 +408,42 @@ def cart_checkout():
                     'upgrade_required': True
                 }), 403
 
-        # --- 1. Create all bookings ---
-        bookings = []
-        total = 0.0
-        for pkg_id in package_ids:
-            package = Package.query.get(pkg_id)
-            if not package:
-                return jsonify({'error': f'Package {pkg_id} not found'}), 404
-
-            booking = Booking(
-                package_id=package.id,
-                creator_id=package.creator_id,
-                brand_id=brand.id,
-                amount=package.price,
-                total_price=package.price,
-            )
-            db.session.add(booking)
-            db.session.flush()  # get booking.id before commit
-            bookings.append((booking, package))
-            total += float(package.price)
-
-        db.session.commit()
-
-        # Notify creators
-        for booking, package in bookings:
-            db.session.refresh(booking)
-            creator_user = User.query.get(package.creator.user_id)
-            if creator_user:
-                notify_new_booking(
-                    creator_id=creator_user.id,
-                    brand_name=brand.company_name or user.email,
-                    booking_id=booking.id
-                )
-
-        # --- 2. Initiate ONE combined Paynow payment ---
+        # --- 1. Load every package (and its creator's user id) in one query ---
+        rows = db.session.query(Package, CreatorProfile.user_id).join(
+            CreatorProfile, Package.creator_id == CreatorProfile.id
+        ).filter(Package.id.in_(set(package_ids))).all()
+        packages = {package.id: (package, creator_user_id) for package, creator_user_id in rows}
+
+        missing = [pkg_id for pkg_id in package_ids if pkg_id not in packages]
+        if missing:
+            return jsonify({'error': f'Package {missing[0]} not found'}), 404
+
+        cart = [packages[pkg_id] for pkg_id in package_ids]
+        total = sum(float(package.price) for package, _ in cart)
+
+        # --- 2. Insert all bookings with one multi-row INSERT ---
+        inserted = db.session.execute(
+            insert(Booking).returning(Booking.id, Booking.package_id),
+            [
+                {
+                    'package_id': package.id,
+                    'creator_id': package.creator_id,
+                    'brand_id': brand.id,
+                    'amount': package.price,
+                    'total_price': package.price,
+                    'payment_method': 'paynow'
+                }
+                for package, _ in cart
+            ]
+        ).all()
+
+        # RETURNING order is not guaranteed - match ids back to cart lines by package
+        ids_by_package = {}
+        for booking_id, package_id in sorted(inserted):
+            ids_by_package.setdefault(package_id, []).append(booking_id)
+        booking_ids = [ids_by_package[package.id].pop(0) for package, _ in cart]
+
+        # --- 3. Initiate ONE combined Paynow payment ---
         import os
         from paynow import Paynow
         from flask import current_app
@@ -443,7 +459,6 @@ def cart_checkout():
             return_url = os.getenv('PAYNOW_RETURN_URL')
             result_url = os.getenv('PAYNOW_RESULT_URL')
 
-        booking_ids = [b.id for b, _ in bookings]
         cart_ref = f"CART-{'_'.join(str(i) for i in booking_ids)}"
 
         paynow = Paynow(
@@ -454,7 +469,7 @@ def cart_checkout():
         )
 
         payment = paynow.create_payment(cart_ref, user.email)
-        for booking, package in bookings:
+        for package, _ in cart:
             payment.add(package.title, float(package.price))
 
         response = paynow.send(payment)
@@ -471,27 +486,53 @@ def cart_checkout():
             poll_url.split('guid=')[-1] if '?guid=' in poll_url else None
         )
 
-        # Store payment reference on all bookings
+        # --- 4. Payment records, booking references and notifications, then ONE commit ---
         from app.models import Payment as PaymentModel
-        for booking, package in bookings:
-            booking.payment_method = 'paynow'
-            booking.payment_reference = f'PAYNOW-{payment_hash}'
-
-            pay_rec = PaymentModel(
-                booking_id=booking.id,
-                user_id=brand.user_id,
-                amount=float(package.price),
-                payment_method='paynow',
-                payment_type='automated',
-                status='pending',
-                escrow_status='pending',
-                paynow_poll_url=poll_url,
-                paynow_reference=payment_hash,
-                external_reference=cart_ref,
-            )
-            db.session.add(pay_rec)
+        db.session.execute(
+            update(Booking).where(Booking.id.in_(booking_ids)).values(payment_reference=f'PAYNOW-{payment_hash}')
+        )
+        payment_rows = [
+            {
+                'booking_id': booking_id,
+                'user_id': brand.user_id,
+                'amount': package.price,
+                'payment_method': 'paynow',
+                'payment_type': 'automated',
+                'status': 'pending',
+                'escrow_status': 'pending',
+                'paynow_poll_url': poll_url,
+                'paynow_reference': payment_hash,
+                'external_reference': cart_ref
+            }
+            for booking_id, (package, _) in zip(booking_ids, cart)
+        ]
+        inserted_payments = db.session.execute(
+            insert(PaymentModel).returning(PaymentModel.id, PaymentModel.booking_id), payment_rows
+        )
+        payment_ids = {booking_id: payment_id for payment_id, booking_id in inserted_payments}
+
+        # Bulk inserts skip the flush hooks - record their activity events directly
+        activity_service.record_events([
+            (Booking, {'id': booking_id, 'package_id': package.id, 'creator_id': package.creator_id,
+                       'brand_id': brand.id, 'amount': package.price, 'status': 'pending', 'payment_status': 'pending'})
+            for booking_id, (package, _) in zip(booking_ids, cart)
+        ] + [
+            (PaymentModel, {**row, 'id': payment_ids[row['booking_id']], 'payment_reference': None})
+            for row in payment_rows
+        ])
+        notifications = queue_notifications([
+            {
+                'user_id': creator_user_id,
+                'notification_type': 'booking',
+                'title': 'New Booking Request',
+                'message': f'{brand.company_name or user.email} has requested to book your services',
+                'action_url': f'/bookings/{booking_id}'
+            }
+            for booking_id, (_, creator_user_id) in zip(booking_ids, cart)
+        ])
 
         db.session.commit()
+        emit_notifications(notifications)
 
         return jsonify({
             'success': True,
@@ -514,17 +555,14 @@ def cart_checkout():
 @jwt_required()
 def cart_payment_status():
     """
-    Poll Paynow status for a cart (multiple booking IDs).
+    Payment status for a cart (multiple booking IDs).
     Body: { booking_ids: [1,2,...], poll_url: '...' }
-    Marks all bookings paid + creates collaborations when confirmed.
+    Reads cached state only - the Paynow poller marks the bookings paid and
+    creates their collaborations once Paynow confirms.
     """
     try:
-        import os
-        from paynow import Paynow
-        from flask import current_app
-        from datetime import timedelta
+        from app.services.paynow_poller import get_cached_status
 
-        user_id = int(get_jwt_identity())
         data = request.get_json()
         booking_ids = data.get('booking_ids', [])
         poll_url = data.get('poll_url', '')
@@ -533,78 +571,12 @@ def cart_payment_status():
             return jsonify({'error': 'No booking IDs provided'}), 400
 
         # Check if already paid
-        all_paid = all(
-            Booking.query.get(bid).payment_status in ('paid', 'verified')
-            for bid in booking_ids
-            if Booking.query.get(bid)
-        )
-        if all_paid:
-            return jsonify({'paid': True, 'status': 'paid'}), 200
-
-        # Poll Paynow
-        try:
-            integration_id = current_app.config.get('PAYNOW_INTEGRATION_ID') or os.getenv('PAYNOW_INTEGRATION_ID')
-            integration_key = current_app.config.get('PAYNOW_INTEGRATION_KEY') or os.getenv('PAYNOW_INTEGRATION_KEY')
-            return_url = current_app.config.get('PAYNOW_RETURN_URL') or os.getenv('PAYNOW_RETURN_URL')
-            result_url = current_app.config.get('PAYNOW_RESULT_URL') or os.getenv('PAYNOW_RESULT_URL')
-        except RuntimeError:
-            integration_id = os.getenv('PAYNOW_INTEGRATION_ID')
-            integration_key = os.getenv('PAYNOW_INTEGRATION_KEY')
-            return_url = os.getenv('PAYNOW_RETURN_URL')
-            result_url = os.getenv('PAYNOW_RESULT_URL')
-
-        paynow = Paynow(
-            integration_id=integration_id,
-            integration_key=integration_key,
-            return_url=return_url,
-            result_url=result_url
-        )
-
-        status_response = paynow.check_transaction_status(poll_url)
-        paynow_paid = getattr(status_response, 'paid', False)
-        paynow_status = getattr(status_response, 'status', 'pending')
-
-        if paynow_paid:
-            # Mark all bookings paid and create collaborations
-            for bid in booking_ids:
-                booking = Booking.query.get(bid)
-                if not booking or booking.payment_status == 'paid':
-                    continue
-
-                booking.payment_status = 'paid'
-                booking.escrow_status = 'escrowed'
-                booking.escrowed_at = datetime.utcnow()
-                booking.status = 'accepted'
-
-                # Create collaboration for each booking
-                existing_collab = Collaboration.query.filter_by(booking_id=booking.id).first()
-                if not existing_collab:
-                    package = Package.query.get(booking.package_id)
-                    start_date = datetime.utcnow()
-                    expected_completion = None
-                    if package and package.duration_days:
-                        expected_completion = start_date + timedelta(days=package.duration_days)
-
-                    collab = Collaboration(
-                        collaboration_type='package',
-                        booking_id=booking.id,
-                        creator_id=booking.creator_id,
-                        brand_id=booking.brand_id,
-                        title=f"Collaboration for {package.title if package else 'Package'}",
-                        description=package.description if package else '',
-                        amount=booking.amount,
-                        status='in_progress',
-                        start_date=start_date,
-                        expected_completion_date=expected_completion,
-                        deliverables=package.deliverables if package and package.deliverables else [],
-                        progress_percentage=0
-                    )
-                    db.session.add(collab)
-
-            db.session.commit()
+        statuses = db.session.query(Booking.payment_status).filter(Booking.id.in_(booking_ids)).all()
+        if statuses and all(status in ('paid', 'verified') for status, in statuses):
             return jsonify({'paid': True, 'status': 'paid'}), 200
 
-        return jsonify({'paid': False, 'status': paynow_status}), 200
+        status, paynow_status = get_cached_status(poll_url)
+        return jsonify({'paid': False, 'status': paynow_status or status or 'pending'}), 200
 
     except Exception as e:
         import traceback
@@ -680,7 +652,8 @@ def cart_upload_pop():
 def payment_webhook():
     """Handle Paynow payment webhook/IPN"""
     try:
-        data = request.form.to_dict() or request.get_json()
+        # Keep the received field order - Paynow's hash is computed over it
+        data = list(request.form.items(multi=True)) or request.get_json(silent=True) or {}
         success = process_payment_webhook(data)
 
         if success:
@@ -956,8 +929,8 @@ def verify_bank_transfer_payment(booking_id):
                             print(f"[VERIFY_PAYMENT] Notified creator {creator_user.id} about revision request")
 
                         # Emit Socket.IO update
-                        from app.routes.collaborations import emit_collaboration_update
-                        emit_collaboration_update(collaboration.id)
+                        from app.routes.collaborations import emit_collaboration_update, REVISION_FIELDS
+                        emit_collaboration_update(collaboration, REVISION_FIELDS)
                         print(f"[VERIFY_PAYMENT] Socket.IO update emitted for collaboration {collaboration_id}")
                     else:
                         print(f"[VERIFY_PAYMENT] ERROR: Collaboration {collaboration_id} not found")
@@ -1017,7 +990,6 @@ def verify_bank_transfer_payment(booking_id):
         elif booking.booking_type == 'brief':
             # For briefs: Create collaboration with milestones
             # Find the accepted proposal by creator and brand
-            from app.models import Brief
             proposal = None
 
             # Try to find proposal by matching creator and booking details
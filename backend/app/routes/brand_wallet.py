@@ -2,9 +2,9 @@
 Brand Wallet Routes - API endpoints for brand wallet operations
 """
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app.services.wallet_service import get_or_create_wallet, get_wallet_transactions
-from app.models import User
+from app.utils.current_user import get_current_user
 
 bp = Blueprint('brand_wallet', __name__, url_prefix='/api/brand/wallet')
 
@@ -14,14 +14,12 @@ bp = Blueprint('brand_wallet', __name__, url_prefix='/api/brand/wallet')
 def get_brand_wallet():
     """Get brand wallet balance and details"""
     try:
-        current_user_id = get_jwt_identity()
-
         # Verify user is a brand
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         if not user or user.user_type != 'brand':
             return jsonify({'error': 'Unauthorized - Brand access only'}), 403
 
-        wallet = get_or_create_wallet(current_user_id)
+        wallet = get_or_create_wallet(user.id)
         return jsonify({
             'success': True,
             'wallet': wallet.to_dict()
@@ -35,17 +33,15 @@ def get_brand_wallet():
 def get_brand_transactions():
     """Get brand wallet transaction history"""
     try:
-        current_user_id = get_jwt_identity()
-
         # Verify user is a brand
-        user = User.query.get(current_user_id)
+        user = get_current_user()
         if not user or user.user_type != 'brand':
             return jsonify({'error': 'Unauthorized - Brand access only'}), 403
 
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
 
-        result = get_wallet_transactions(current_user_id, page, per_page)
+        result = get_wallet_transactions(user.id, page, per_page)
         return jsonify({
             'success': True,
             **result
@@ -1,11 +1,12 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from datetime import datetime
 from app import db
-from app.models import BrandProfile, SavedCreator, CreatorProfile, User
+from app.models import BrandProfile, SavedCreator, CreatorProfile
 from app.utils import save_profile_picture, delete_profile_picture
 from app.utils.file_upload import save_and_compress_image
 from app.utils.image_compression import delete_image_variants
+from app.utils.current_user import get_current_user, get_current_profile
 
 bp = Blueprint('brands', __name__)
 
@@ -29,8 +30,7 @@ def get_brand(brand_id):
 def get_own_profile():
     """Get current user's brand profile"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user or user.user_type != 'brand':
             return jsonify({'error': 'Brand profile not found'}), 404
@@ -50,8 +50,7 @@ def get_own_profile():
 def update_profile():
     """Update brand profile"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user or user.user_type != 'brand':
             return jsonify({'error': 'Not authorized'}), 403
@@ -106,8 +105,7 @@ def update_profile():
 def upload_logo():
     """Upload brand logo with automatic compression"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user or user.user_type != 'brand':
             return jsonify({'error': 'Not authorized'}), 403
@@ -166,8 +164,7 @@ def upload_logo():
 def get_saved_creators():
     """Get saved creators for current brand"""
     try:
-        user_id = int(get_jwt_identity())
-        brand = BrandProfile.query.filter_by(user_id=user_id).first()
+        brand = get_current_profile('brand')
 
         if not brand:
             return jsonify({'error': 'Brand profile not found'}), 404
@@ -186,8 +183,7 @@ def get_saved_creators():
 def save_creator(creator_id):
     """Save a creator"""
     try:
-        user_id = int(get_jwt_identity())
-        brand = BrandProfile.query.filter_by(user_id=user_id).first()
+        brand = get_current_profile('brand')
 
         if not brand:
             return jsonify({'error': 'Brand profile not found'}), 404
@@ -217,8 +213,7 @@ def save_creator(creator_id):
 def unsave_creator(creator_id):
     """Unsave a creator"""
     try:
-        user_id = int(get_jwt_identity())
-        brand = BrandProfile.query.filter_by(user_id=user_id).first()
+        brand = get_current_profile('brand')
 
         if not brand:
             return jsonify({'error': 'Brand profile not found'}), 404
@@ -1,20 +1,24 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
-from app import db, socketio
+from app import db
 from app.models import Collaboration, BrandProfile, CreatorProfile, User, CollaborationMilestone, MilestoneDeliverable
 from app.utils.notifications import notify_collaboration_status, notify_collaboration_update
+from app.utils.collaboration_events import queue_collaboration_update
 
 bp = Blueprint('collaborations', __name__)
 
 
 
-def emit_collaboration_update(collaboration_id):
-    """Emit Socket.IO event when collaboration is updated"""
+DELIVERABLE_FIELDS = ['draft_deliverables', 'submitted_deliverables', 'progress_percentage', 'last_update', 'last_update_date']
+REVISION_FIELDS = ['draft_deliverables', 'revision_requests', 'total_revisions_used', 'paid_revisions', 'last_update', 'last_update_date']
+STATUS_FIELDS = ['status', 'progress_percentage', 'notes', 'cancellation_request', 'actual_completion_date']
+
+
+def emit_collaboration_update(collaboration, changed_fields=None):
+    """Emit Socket.IO event to the collaboration participants when it is updated"""
     try:
-        socketio.emit('collaboration_updated', {
-            'collaboration_id': collaboration_id
-        }, namespace='/')
+        queue_collaboration_update(collaboration, changed_fields)
     except Exception as e:
         print(f"Socket.IO emit error: {e}")
 
@@ -130,6 +134,9 @@ def update_progress(collab_id):
         collaboration.updated_at = datetime.utcnow()
         db.session.commit()
 
+        # Emit Socket.IO update
+        emit_collaboration_update(collaboration, ['progress_percentage', 'last_update', 'last_update_date', 'notes'])
+
         return jsonify({
             'message': 'Progress updated successfully',
             'collaboration': collaboration.to_dict()
@@ -230,7 +237,7 @@ def submit_draft_deliverable(collab_id):
         db.session.commit()
 
         # Emit Socket.IO update
-        emit_collaboration_update(collaboration.id)
+        emit_collaboration_update(collaboration, DELIVERABLE_FIELDS)
 
         # Notify brand about new deliverable for review
         brand_user = User.query.get(collaboration.brand.user_id)
@@ -433,7 +440,7 @@ def approve_deliverable(collab_id, deliverable_id):
 
         # Emit Socket.IO update
         try:
-            emit_collaboration_update(collaboration.id)
+            emit_collaboration_update(collaboration, DELIVERABLE_FIELDS + STATUS_FIELDS)
             print(f"[APPROVE_DELIVERABLE] Socket.IO update emitted")
         except Exception as e:
             print(f"[APPROVE_DELIVERABLE] WARNING: Failed to emit Socket.IO update: {str(e)}")
@@ -542,7 +549,7 @@ def request_revision(collab_id, deliverable_id):
         db.session.commit()
 
         # Emit Socket.IO update
-        emit_collaboration_update(collaboration.id)
+        emit_collaboration_update(collaboration, REVISION_FIELDS)
 
         # Notify creator about revision request
         creator_user = User.query.get(collaboration.creator.user_id)
@@ -729,7 +736,7 @@ def complete_revision_payment(collab_id):
         db.session.commit()
 
         # Emit Socket.IO update
-        emit_collaboration_update(collaboration.id)
+        emit_collaboration_update(collaboration, REVISION_FIELDS)
 
         # Notify creator about revision request
         creator_user = User.query.get(collaboration.creator.user_id)
@@ -817,7 +824,7 @@ def update_deliverable(collab_id, deliverable_id):
         db.session.commit()
 
         # Emit Socket.IO update
-        emit_collaboration_update(collaboration.id)
+        emit_collaboration_update(collaboration, DELIVERABLE_FIELDS)
 
         # Notify brand about updated deliverable
         brand_user = User.query.get(collaboration.brand.user_id)
@@ -1040,6 +1047,9 @@ def complete_collaboration(collab_id):
 
             db.session.commit()
 
+        # Emit Socket.IO update
+        emit_collaboration_update(collaboration, STATUS_FIELDS + ['last_update'])
+
         # Notify creator - customize based on escrow status
         creator_user = User.query.get(collaboration.creator.user_id)
         if creator_user:
@@ -1125,6 +1135,9 @@ def request_cancellation(collab_id):
 
             db.session.commit()
 
+            # Emit Socket.IO update
+            emit_collaboration_update(collaboration, ['cancellation_request'])
+
             # TODO: Send email/notification to support team
             # For now, notify the creator about the cancellation request
             creator_user = User.query.get(collaboration.creator.user_id)
@@ -1149,6 +1162,9 @@ def request_cancellation(collab_id):
 
             db.session.commit()
 
+            # Emit Socket.IO update
+            emit_collaboration_update(collaboration, STATUS_FIELDS)
+
             # Notify brand about cancellation
             brand_user = User.query.get(collaboration.brand.user_id)
             if brand_user:
@@ -1202,6 +1218,9 @@ def cancel_collaboration(collab_id):
 
         db.session.commit()
 
+        # Emit Socket.IO update
+        emit_collaboration_update(collaboration, STATUS_FIELDS)
+
         # Notify brand about cancellation
         brand_user = User.query.get(collaboration.brand.user_id)
         if brand_user:
@@ -9,6 +9,7 @@ from app.models import (
     CreatorProfile, CreatorSubscriptionPlan, CreatorSubscription,
     User
 )
+from app.services import wallet_ledger
 from app.services.payment_service import PaymentService
 from datetime import datetime, timedelta
 import os
@@ -264,34 +265,18 @@ def verify_subscription_payment(subscription_id):
                 'subscription': subscription.to_dict()
             }), 200
 
-        # Check payment status with Paynow
+        # Paynow payments are confirmed by the background poller
         if subscription.paynow_poll_url:
-            payment_status = PaymentService.check_paynow_status(subscription.paynow_poll_url)
-
-            if payment_status['status'] == 'paid':
-                # Activate subscription
-                subscription.activate_subscription()
-                db.session.commit()
-
-                return jsonify({
-                    'message': 'Payment verified and subscription activated',
-                    'subscription': subscription.to_dict()
-                }), 200
-
-            elif payment_status['status'] == 'cancelled':
-                subscription.status = 'cancelled'
-                db.session.commit()
-
+            if subscription.status == 'cancelled':
                 return jsonify({
                     'message': 'Payment was cancelled',
                     'subscription': subscription.to_dict()
                 }), 200
 
-            else:
-                return jsonify({
-                    'message': 'Payment still pending',
-                    'subscription': subscription.to_dict()
-                }), 200
+            return jsonify({
+                'message': 'Payment still pending',
+                'subscription': subscription.to_dict()
+            }), 200
 
         return jsonify({
             'message': 'Manual payment verification required',
@@ -451,9 +436,6 @@ def pay_with_wallet():
                 'error': f'Insufficient wallet balance. Available: ${float(wallet.available_balance):.2f}, Required: ${float(amount):.2f}'
             }), 400
 
-        # Deduct from wallet
-        wallet.available_balance -= amount
-        
         # Create wallet transaction
         transaction = WalletTransaction(
             wallet_id=wallet.id,
@@ -465,7 +447,12 @@ def pay_with_wallet():
             clearance_required=False
         )
 
-        db.session.add(transaction)
+        # Deduct from wallet
+        try:
+            wallet_ledger.record_transaction(transaction, 'debit', 'available', 'external')
+        except wallet_ledger.InsufficientFundsError:
+            db.session.rollback()
+            return jsonify({'error': 'Insufficient wallet balance'}), 400
 
         # Activate subscription
         subscription.payment_verified = True
@@ -1,16 +1,30 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from datetime import datetime
 from app import db
 from app.models import CreatorProfile, User, Review, Package
 from app.utils import save_profile_picture, delete_profile_picture
 from app.utils.file_upload import save_and_compress_image
 from app.utils.image_compression import delete_image_variants
+from app.utils.current_user import get_current_user
+from app.utils.fieldsets import FieldsetSpec, Expansion
 from sqlalchemy import or_, and_, func
 
 bp = Blueprint('creators', __name__)
 
 
+CREATOR_FIELDSET = FieldsetSpec(
+    CreatorProfile,
+    expansions={'user': Expansion(lambda user: user.to_public_dict(), joined=True)},
+    computed={
+        'display_name': (lambda creator: creator.username or 'Creator', ('username',)),
+        'badges': (lambda creator: creator.get_badges(), ()),
+    },
+    # Read by the search filter and the sorts below
+    load_always=('user_id', 'username', 'bio', 'categories', 'follower_count', 'created_at')
+)
+
+
 @bp.route('/featured', methods=['GET'])
 def get_featured_creators():
     """
@@ -130,8 +144,18 @@ def get_featured_creators():
 
 @bp.route('/', methods=['GET'])
 def get_creators():
-    """Get all creators with filters"""
+    """
+    Get all creators with filters
+
+    fields= limits the profile columns returned (e.g. to leave out gallery and
+    gallery_images), expand= (default user) controls whether the user is included.
+    """
     try:
+        try:
+            fieldset = CREATOR_FIELDSET.parse()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         # Get query parameters
         category = request.args.get('category')
         location = request.args.get('location')
@@ -207,7 +231,7 @@ def get_creators():
 
         # Get all creators first, we'll filter by search and categories in Python
         # This is because categories/bio/username need case-insensitive partial matching
-        all_creators = query.all()
+        all_creators = fieldset.apply(query).all()
 
         # Apply search filter - check bio, username, email, AND categories
         if search:
@@ -263,7 +287,7 @@ def get_creators():
                             )
                         )
 
-            all_creators = query.all()
+            all_creators = fieldset.apply(query).all()
             # Filter by category in Python (case-insensitive partial match)
             category_lower = category.lower()
             all_creators = [
@@ -282,7 +306,7 @@ def get_creators():
             if not packages:
                 continue
 
-            creator_dict = creator.to_dict(include_user=True, public_view=True)
+            creator_dict = fieldset.serialize(creator, lambda c: c.to_dict(public_view=True))
 
             # Get review stats
             reviews = Review.query.filter_by(creator_id=creator.id).all()
@@ -455,8 +479,7 @@ def get_creator(creator_id):
 def get_own_profile():
     """Get current user's creator profile"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user or user.user_type != 'creator':
             return jsonify({'error': 'Creator profile not found'}), 404
@@ -476,8 +499,7 @@ def get_own_profile():
 def update_profile():
     """Update creator profile"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user or user.user_type != 'creator':
             return jsonify({'error': 'Not authorized'}), 403
@@ -586,8 +608,7 @@ def update_profile():
 def upload_profile_picture():
     """Upload creator profile picture with automatic compression"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user or user.user_type != 'creator':
             return jsonify({'error': 'Not authorized'}), 403
@@ -646,8 +667,7 @@ def upload_profile_picture():
 def upload_gallery_image():
     """Upload image to creator's gallery with automatic compression"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user or user.user_type != 'creator':
             return jsonify({'error': 'Not authorized'}), 403
@@ -718,8 +738,7 @@ def upload_gallery_image():
 def delete_gallery_image(index):
     """Delete image from creator's gallery (supports both old and new format)"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = get_current_user()
 
         if not user or user.user_type != 'creator':
             return jsonify({'error': 'Not authorized'}), 403
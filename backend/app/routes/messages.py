@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import Message, User
+from app.services.presence_service import presence_service
 
 bp = Blueprint('messages', __name__)
 
@@ -105,6 +106,9 @@ def get_conversations():
         user_ids = set([u[0] for u in sent.all()] + [u[0] for u in received.all()])
         users = User.query.filter(User.id.in_(user_ids)).all()
 
+        # One bulk presence lookup for the whole list
+        online_user_ids = presence_service.online_user_ids(user_ids)
+
         conversations = []
         for user in users:
             last_message = Message.query.filter(
@@ -121,7 +125,8 @@ def get_conversations():
             conversations.append({
                 'user': user.to_dict(),
                 'last_message': last_message.to_dict() if last_message else None,
-                'unread_count': unread_count
+                'unread_count': unread_count,
+                'is_online': user.id in online_user_ids
             })
 
         return jsonify({'conversations': conversations}), 200
@@ -1,12 +1,14 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, timedelta
-from app import db, socketio
+from app import db
 from app.models import (
     Collaboration, CollaborationMilestone, MilestoneDeliverable,
     User, CreatorProfile, WalletTransaction, Wallet
 )
+from app.services import wallet_ledger
 from app.utils.notifications import create_notification
+from app.routes.collaborations import emit_collaboration_update
 
 bp = Blueprint('milestones', __name__)
 
@@ -144,13 +146,8 @@ def submit_deliverable(collaboration_id, milestone_number):
             action_url=f'/brand/collaborations/{collaboration_id}'
         )
 
-        # Emit socket event
-        try:
-            socketio.emit('collaboration_updated', {
-                'collaboration_id': collaboration_id
-            }, namespace='/')
-        except:
-            pass
+        # Tell the brand and creator
+        emit_collaboration_update(collaboration)
 
         return jsonify({
             'message': 'Deliverable submitted successfully',
@@ -295,8 +292,8 @@ def approve_milestone(collaboration_id, milestone_number):
             clearance_days=30,
             completed_at=milestone.approved_at,
             available_at=milestone.approved_at + timedelta(days=14),
-            escrow_release_date=milestone.escrow_release_date,
             milestone_id=milestone.id,
+            idempotency_key=f'milestone:{milestone.id}:release',
             collaboration_id=collaboration.id,
             gross_amount=gross_amount,
             platform_fee=platform_fee,
@@ -309,10 +306,14 @@ def approve_milestone(collaboration_id, milestone_number):
                 'brand_name': collaboration.brand.company_name
             }
         )
-        db.session.add(transaction)
 
-        # Update wallet pending clearance
-        wallet.pending_clearance = float(wallet.pending_clearance or 0) + net_amount
+        # Insert the transaction and credit the wallet atomically
+        transaction, created = wallet_ledger.record_transaction(
+            transaction, 'earning', 'external', 'pending_clearance', net_amount, earned=True
+        )
+        if not created:
+            db.session.rollback()
+            return jsonify({'error': 'Funds already released for this milestone'}), 400
 
         # Unlock next milestone if exists
         next_milestone = CollaborationMilestone.query.filter_by(
@@ -344,13 +345,8 @@ def approve_milestone(collaboration_id, milestone_number):
             action_url=f'/creator/collaborations/{collaboration_id}'
         )
 
-        # Emit socket event
-        try:
-            socketio.emit('collaboration_updated', {
-                'collaboration_id': collaboration_id
-            }, namespace='/')
-        except:
-            pass
+        # Tell the brand and creator
+        emit_collaboration_update(collaboration, ['progress_percentage', 'status', 'actual_completion_date'])
 
         return jsonify({
             'message': 'Milestone approved and escrow triggered',
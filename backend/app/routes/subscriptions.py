@@ -9,6 +9,7 @@ from werkzeug.utils import secure_filename
 from app import db
 from app.models import User, Subscription, SubscriptionPlan
 from app.services.payment_service import initiate_subscription_payment, check_subscription_payment_status
+from app.services.platform_fee_service import platform_fee_resolver
 
 bp = Blueprint('subscriptions', __name__)
 
@@ -130,6 +131,7 @@ def subscribe():
             subscription.set_billing_period(billing_cycle)
             subscription.last_payment_date = datetime.utcnow()
             db.session.add(subscription)
+            platform_fee_resolver.invalidate_on_commit(user_id)
             db.session.commit()
 
             return jsonify({
@@ -235,6 +237,7 @@ def upgrade_subscription():
 
         current_sub.last_payment_date = datetime.utcnow()
 
+        platform_fee_resolver.invalidate_on_commit(user_id)
         db.session.commit()
 
         return jsonify({
@@ -282,6 +285,7 @@ def cancel_subscription():
         subscription.cancellation_reason = reason
         subscription.updated_at = datetime.utcnow()
 
+        platform_fee_resolver.invalidate_on_commit(user_id)
         db.session.commit()
 
         return jsonify({
@@ -326,6 +330,7 @@ def reactivate_subscription():
         subscription.cancellation_reason = None
         subscription.updated_at = datetime.utcnow()
 
+        platform_fee_resolver.invalidate_on_commit(user_id)
         db.session.commit()
 
         return jsonify({
@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import User
+from app.services.presence_service import presence_service
 
 bp = Blueprint('users', __name__)
 
@@ -85,3 +86,27 @@ def update_profile():
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/presence', methods=['GET'])
+@jwt_required()
+def get_presence():
+    """Bulk online presence lookup (?ids=1,2,3), e.g. for conversation lists"""
+    try:
+        raw_ids = request.args.get('ids', '')
+        try:
+            user_ids = [int(uid) for uid in raw_ids.split(',') if uid.strip()]
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma separated list of integers'}), 400
+
+        if len(user_ids) > 500:
+            return jsonify({'error': 'A maximum of 500 ids can be queried at once'}), 400
+
+        online = presence_service.online_user_ids(user_ids)
+
+        return jsonify({
+            'presence': {str(uid): uid in online for uid in user_ids}
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
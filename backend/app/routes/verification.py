@@ -4,11 +4,14 @@ Handles creator verification applications and admin review
 """
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import update
 from app import db
 from app.models import (
     CreatorProfile, VerificationApplication, User,
     CreatorSubscription, CreatorSubscriptionPlan
 )
+from app.decorators.admin import admin_required
+from app.utils.bulk import parse_id_list
 from datetime import datetime
 import os
 from werkzeug.utils import secure_filename
@@ -305,6 +308,53 @@ def approve_verification(app_id):
         return jsonify({'error': str(e)}), 500
 
 
+@verification_bp.route('/api/admin/verification/applications/bulk/approve', methods=['POST'])
+@admin_required
+def bulk_approve_verification():
+    """
+    Approve many pending verification applications at once (admin only)
+
+    Body: { application_ids: [int] }
+
+    One UPDATE approves the applications that are still pending and a second
+    marks their creators verified, in one transaction. Applications that were
+    missing or no longer pending are returned as skipped.
+    """
+    try:
+        try:
+            application_ids = parse_id_list(request.get_json(silent=True), 'application_ids')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        approved = db.session.execute(
+            update(VerificationApplication)
+            .where(VerificationApplication.id.in_(application_ids), VerificationApplication.status == 'pending')
+            .values(status='approved', reviewed_by=int(get_jwt_identity()), reviewed_at=datetime.utcnow())
+            .returning(VerificationApplication.id, VerificationApplication.creator_id)
+            .execution_options(synchronize_session='fetch')
+        ).all()
+
+        if approved:
+            db.session.execute(
+                update(CreatorProfile)
+                .where(CreatorProfile.id.in_({row.creator_id for row in approved}))
+                .values(is_verified=True)
+                .execution_options(synchronize_session='fetch')
+            )
+        db.session.commit()
+
+        approved_ids = {row.id for row in approved}
+        return jsonify({
+            'message': f'{len(approved_ids)} verification applications approved',
+            'approved': [app_id for app_id in application_ids if app_id in approved_ids],
+            'skipped': [app_id for app_id in application_ids if app_id not in approved_ids]
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
 @verification_bp.route('/api/admin/verification/applications/<int:app_id>/reject', methods=['POST'])
 @jwt_required()
 def reject_verification(app_id):
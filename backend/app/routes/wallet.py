@@ -14,7 +14,7 @@ def get_wallet_balance():
     """Get creator's wallet balance"""
     try:
         user_id = int(get_jwt_identity())
-        wallet = wallet_service.calculate_wallet_balances(user_id)
+        wallet = wallet_service.get_wallet_balances(user_id)
 
         return jsonify({
             'success': True,
@@ -51,9 +51,12 @@ def get_transactions():
         limit = request.args.get('limit', 50, type=int)
         offset = request.args.get('offset', 0, type=int)
         transaction_type = request.args.get('type', None)
+        cursor = request.args.get('cursor', None)
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
 
         result = wallet_service.get_transaction_history(
-            user_id, limit, offset, transaction_type
+            user_id, limit, offset, transaction_type,
+            cursor=cursor, include_total=include_total
         )
 
         return jsonify({
@@ -61,6 +64,8 @@ def get_transactions():
             **result
         }), 200
 
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,408 @@
+"""
+Activity Service - Append-only event stream behind the admin activity feed
+
+Creating a user, booking, collaboration, payment, cashout, campaign or review,
+and moving a booking, collaboration, payment or cashout to a new status,
+appends a row to activity_events. Rows are collected in a Session after_flush
+hook and written with one multi-row INSERT per flush, inside the same
+transaction as the change itself.
+
+Bulk inserts that bypass the unit of work (e.g. cart checkout) call
+record_events() explicitly. History from before the table existed is loaded
+with backfill_activity_events() (the `backfill-activity` CLI command).
+
+The feed is read newest first with keyset pagination on (created_at, id), so
+any page costs one indexed range scan.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import event, inspect, select, func, exists, tuple_
+from sqlalchemy.orm import Session
+from app import db
+from app.models import (
+    ActivityEvent, User, CreatorProfile, BrandProfile, Collaboration,
+    CashoutRequest, Payment, Campaign, Booking, Review
+)
+from app.services import rollup_service
+
+ACTIVITY_CATEGORIES = ('users', 'bookings', 'collaborations', 'payments', 'campaigns', 'reviews')
+
+# Amount at or above which an event counts as high value (USD)
+HIGH_VALUE_THRESHOLD = 100
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _amount(value):
+    return float(value) if value is not None else None
+
+
+def _user_event(user):
+    return {
+        'title': f'New {user.user_type} registered',
+        'description': user.email,
+        'amount': None,
+        'status': 'verified' if user.is_verified else 'pending',
+        'link': f'/admin/users/{user.id}',
+        'meta': {'user_id': user.id, 'user_type': user.user_type, 'is_verified': bool(user.is_verified)}
+    }
+
+
+def _booking_event(booking):
+    return {
+        'title': f'Booking {booking.status}',
+        'amount': _amount(booking.amount),
+        'status': booking.status,
+        'link': '/admin/bookings',
+        'meta': {
+            'booking_id': booking.id,
+            'brand_id': booking.brand_id,
+            'creator_id': booking.creator_id,
+            'package_id': booking.package_id,
+            'payment_status': booking.payment_status
+        }
+    }
+
+
+def _collaboration_event(collaboration):
+    return {
+        'title': collaboration.title or 'Untitled Collaboration',
+        'amount': _amount(collaboration.amount),
+        'status': collaboration.status,
+        'link': '/admin/collaborations',
+        'meta': {
+            'collaboration_id': collaboration.id,
+            'brand_id': collaboration.brand_id,
+            'creator_id': collaboration.creator_id
+        }
+    }
+
+
+def _payment_event(payment):
+    reference = payment.payment_reference or payment.external_reference
+    return {
+        'title': f'Payment {payment.status}',
+        'description': f'Ref: {reference or payment.id}',
+        'amount': _amount(payment.amount),
+        'status': payment.status,
+        'link': '/admin/payments',
+        'meta': {'payment_id': payment.id, 'method': payment.payment_method, 'reference': reference}
+    }
+
+
+def _cashout_event(cashout):
+    return {
+        'title': f'Cashout {cashout.status}',
+        'amount': _amount(cashout.amount),
+        'status': cashout.status,
+        'link': '/admin/cashouts',
+        'meta': {'cashout_id': cashout.id, 'creator_id': cashout.creator_id, 'method': cashout.payment_method}
+    }
+
+
+def _campaign_event(campaign):
+    return {
+        'title': campaign.title or 'Untitled Campaign',
+        'amount': _amount(campaign.budget),
+        'status': campaign.status,
+        'link': '/admin/campaigns',
+        'meta': {'campaign_id': campaign.id, 'brand_id': campaign.brand_id}
+    }
+
+
+def _review_event(review):
+    return {
+        'title': f'Review posted — {review.rating}★',
+        'amount': None,
+        'status': 'published',
+        'link': '/admin/reviews',
+        'meta': {'review_id': review.id, 'rating': review.rating, 'brand_id': review.brand_id,
+                 'creator_id': review.creator_id}
+    }
+
+
+# model -> (source_type, category, builder, creation event, {new status: status event})
+ACTIVITY_SOURCES = {
+    User: ('user', 'users', _user_event, 'user_registered', {}),
+    Booking: ('booking', 'bookings', _booking_event, 'booking_created', {
+        'completed': 'booking_completed',
+        'cancelled': 'booking_cancelled'
+    }),
+    Collaboration: ('collaboration', 'collaborations', _collaboration_event, 'collaboration_started', {
+        'completed': 'collaboration_completed',
+        'cancelled': 'collaboration_cancelled'
+    }),
+    Payment: ('payment', 'payments', _payment_event, 'payment_made', {
+        'completed': 'payment_completed',
+        'failed': 'payment_failed',
+        'refunded': 'payment_refunded'
+    }),
+    CashoutRequest: ('cashout', 'payments', _cashout_event, 'cashout_requested', {
+        'approved': 'cashout_approved',
+        'processing': 'cashout_processing',
+        'completed': 'cashout_completed',
+        'failed': 'cashout_failed',
+        'cancelled': 'cashout_cancelled'
+    }),
+    Campaign: ('campaign', 'campaigns', _campaign_event, 'campaign_launched', {}),
+    Review: ('review', 'reviews', _review_event, 'review_posted', {}),
+}
+
+
+def build_event(model, source, event_type, created_at=None):
+    """Activity event row (a dict for activity_events) for a source object"""
+    source_type, category, builder, _, _ = ACTIVITY_SOURCES[model]
+    return {
+        'event_type': event_type,
+        'category': category,
+        'source_type': source_type,
+        'source_id': source.id,
+        'description': None,
+        **builder(source),
+        'created_at': created_at or datetime.utcnow()
+    }
+
+
+def _write(connection, rows):
+    if rows:
+        connection.execute(ActivityEvent.__table__.insert(), rows)
+
+
+def record_events(sources, event_type=None):
+    """
+    Record events for rows written without the unit of work
+
+    Args:
+        sources: (model, row) pairs, where row is a dict of the row's
+            column values including 'id'
+        event_type: Status event (e.g. 'cashout_approved') for rows moved by a
+            set-based UPDATE. Defaults to each model's creation event, for
+            bulk inserts.
+    """
+    _write(db.session.connection(), [
+        build_event(model, SimpleNamespace(**row), event_type or ACTIVITY_SOURCES[model][3],
+                    None if event_type else row.get('created_at'))
+        for model, row in sources
+    ])
+
+
+def _load_previous_status(target, value, oldvalue, initiator):
+    return value
+
+
+# Keep the previous status in the attribute history even if it was expired when
+# set, so re-saving an unchanged status is not recorded as a transition
+for _model, _spec in ACTIVITY_SOURCES.items():
+    if _spec[4]:
+        event.listen(_model.status, 'set', _load_previous_status, active_history=True, retval=True)
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_flushed_activity(session, flush_context):
+    """Append events for tracked objects created or moved to a new status in this flush"""
+    rows = []
+    for obj in session.new:
+        spec = ACTIVITY_SOURCES.get(type(obj))
+        if spec:
+            rows.append(build_event(type(obj), obj, spec[3], getattr(obj, 'created_at', None)))
+
+    for obj in session.dirty:
+        spec = ACTIVITY_SOURCES.get(type(obj))
+        if not spec or not spec[4]:
+            continue
+        history = inspect(obj).attrs.status.history
+        if history.added and history.added[0] not in history.deleted:
+            event_type = spec[4].get(history.added[0])
+            if event_type:
+                rows.append(build_event(type(obj), obj, event_type))
+
+    _write(session.connection(), rows)
+
+
+# ---------------------------------------------------------------------------
+# Reading the feed
+# ---------------------------------------------------------------------------
+
+def encode_cursor(activity_event):
+    return f'{activity_event.created_at.isoformat()}_{activity_event.id}'
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a feed cursor. Raises ValueError if it is malformed."""
+    created_at, _, event_id = cursor.rpartition('_')
+    return datetime.fromisoformat(created_at), int(event_id)
+
+
+def feed_query(category='all', since=None, high_value=False):
+    """Filtered activity events, newest first"""
+    query = select(ActivityEvent)
+    if category != 'all':
+        query = query.where(ActivityEvent.category == category)
+    if since:
+        query = query.where(ActivityEvent.created_at >= since)
+    if high_value:
+        query = query.where(ActivityEvent.amount >= HIGH_VALUE_THRESHOLD)
+    return query
+
+
+def get_feed_page(query, per_page, cursor=None, page=None):
+    """
+    One page of a feed query
+
+    Pages after the first are found by cursor (the last event of the previous
+    page); an explicit page number falls back to OFFSET for older clients.
+
+    Returns:
+        tuple: (events, next_cursor or None)
+    """
+    if cursor:
+        created_at, event_id = decode_cursor(cursor)
+        query = query.where(tuple_(ActivityEvent.created_at, ActivityEvent.id) < tuple_(created_at, event_id))
+    elif page and page > 1:
+        query = query.offset((page - 1) * per_page)
+
+    events = db.session.scalars(
+        query.order_by(ActivityEvent.created_at.desc(), ActivityEvent.id.desc()).limit(per_page + 1)
+    ).all()
+
+    next_cursor = encode_cursor(events[per_page - 1]) if len(events) > per_page else None
+    return events[:per_page], next_cursor
+
+
+def count_feed(query):
+    return db.session.scalar(select(func.count()).select_from(query.subquery()))
+
+
+def _names(profile_model, name_column, ids):
+    if not ids:
+        return {}
+    rows = db.session.execute(
+        select(profile_model.id, name_column, User.email)
+        .join(User, User.id == profile_model.user_id)
+        .where(profile_model.id.in_(ids))
+    ).all()
+    return {profile_id: name or email for profile_id, name, email in rows}
+
+
+def serialize_feed(events):
+    """
+    Feed dicts for a page of events, resolving brand and creator names and
+    current collaboration flags with one query each
+    """
+    metas = [event.meta or {} for event in events]
+    brands = _names(BrandProfile, BrandProfile.company_name, {m['brand_id'] for m in metas if m.get('brand_id')})
+    creators = _names(CreatorProfile, CreatorProfile.username, {m['creator_id'] for m in metas if m.get('creator_id')})
+
+    collaboration_ids = {m['collaboration_id'] for m in metas if m.get('collaboration_id')}
+    flags = {}
+    if collaboration_ids:
+        now = datetime.utcnow()
+        for collaboration_id, status, expected, cancellation in db.session.execute(
+            select(Collaboration.id, Collaboration.status, Collaboration.expected_completion_date,
+                   Collaboration.cancellation_request).where(Collaboration.id.in_(collaboration_ids))
+        ):
+            flags[collaboration_id] = [
+                flag for flag, raised in (
+                    ('overdue', status == 'in_progress' and expected is not None and expected < now),
+                    ('cancellation_requested', bool(cancellation))
+                ) if raised
+            ]
+
+    feed = []
+    for activity_event, meta in zip(events, metas):
+        meta = dict(meta)
+        brand = brands.get(meta.get('brand_id'), 'Unknown Brand')
+        creator = creators.get(meta.get('creator_id'), 'Unknown Creator')
+        description = activity_event.description
+
+        item = {
+            'id': f'activity-{activity_event.id}',
+            'type': activity_event.event_type,
+            'category': activity_event.category,
+            'title': activity_event.title,
+            'amount': _amount(activity_event.amount),
+            'status': activity_event.status,
+            'created_at': activity_event.created_at.isoformat(),
+            'link': activity_event.link,
+            'meta': meta
+        }
+
+        source_type = activity_event.source_type
+        if source_type in ('booking', 'collaboration'):
+            arrow = '→' if source_type == 'booking' else '↔'
+            description = f'{brand} {arrow} {creator}'
+            meta.update(brand=brand, creator=creator)
+        elif source_type == 'cashout':
+            description = creators.get(meta.get('creator_id'), 'Unknown')
+            meta['creator'] = description
+        elif source_type == 'campaign':
+            description = f'By {brand}'
+            meta['brand'] = brand
+        elif source_type == 'review':
+            description = brand
+            meta['reviewer'] = brand
+
+        if source_type == 'booking':
+            item['payment_status'] = meta.get('payment_status')
+        if source_type == 'collaboration':
+            item['flags'] = flags.get(meta.get('collaboration_id'), [])
+
+        item['description'] = description
+        feed.append(item)
+    return feed
+
+
+# ---------------------------------------------------------------------------
+# Backfill
+# ---------------------------------------------------------------------------
+
+def _backfill_source(model, event_type, timestamp, status=None, batch_size=BACKFILL_BATCH_SIZE):
+    """Append event_type for every source row (with the given status) that lacks it"""
+    source_type = ACTIVITY_SOURCES[model][0]
+    already_recorded = exists().where(
+        ActivityEvent.source_type == source_type,
+        ActivityEvent.source_id == model.id,
+        ActivityEvent.event_type == event_type
+    )
+
+    written = 0
+    last_id = 0
+    while True:
+        query = select(model).where(model.id > last_id, ~already_recorded)
+        if status is not None:
+            query = query.where(model.status == status)
+        sources = db.session.scalars(query.order_by(model.id).limit(batch_size)).all()
+        if not sources:
+            return written
+
+        _write(db.session.connection(), [
+            build_event(model, source, event_type, getattr(source, timestamp, None)) for source in sources
+        ])
+        db.session.commit()
+        written += len(sources)
+        last_id = sources[-1].id
+        db.session.expunge_all()
+
+
+def backfill_activity_events(batch_size=BACKFILL_BATCH_SIZE):
+    """
+    Write activity events for rows that existed before the hooks did
+
+    Creation events take the row's created_at; status events the row's
+    updated_at. Rows that already have an event are skipped, so the backfill
+    can be re-run safely. The marketplace rollup counts cancellations from
+    these events; if any were backfilled it is rebuilt on its next refresh,
+    since they are dated before its watermark.
+
+    Returns:
+        dict: Events written per event type
+    """
+    written = {}
+    for model, (_, _, _, creation_event, status_events) in ACTIVITY_SOURCES.items():
+        written[creation_event] = _backfill_source(model, creation_event, 'created_at', batch_size=batch_size)
+        for status, event_type in status_events.items():
+            written[event_type] = _backfill_source(model, event_type, 'updated_at', status, batch_size)
+
+    if written.get('collaboration_cancelled'):
+        rollup_service.reset_report_rollup('marketplace_daily_rollup')
+    return written
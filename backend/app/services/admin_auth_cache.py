@@ -0,0 +1,53 @@
+"""
+Admin Auth Cache - Short-lived cache of the fields admin routes authorize on
+
+An admin page fires several API calls per screen, and each one loaded the
+admin's full User row just to read is_admin, admin_role and is_active. Those
+three fields are cached per user id for ADMIN_AUTH_CACHE_SECONDS in the
+snapshot cache store (Redis when available, otherwise process memory).
+
+Activating or deactivating an account drops its entry, so a suspension takes
+effect on the next request. Without Redis that only reaches the current
+process; other processes pick it up when their entry ages out.
+"""
+import time
+from flask import current_app
+from app import db
+from app.models import User
+from app.services.snapshot_cache import snapshot_cache
+
+KEY_PREFIX = 'admin_auth:'
+
+
+def _max_age():
+    return current_app.config.get('ADMIN_AUTH_CACHE_SECONDS', 30)
+
+
+def get_admin_auth(user_id):
+    """
+    Authorization fields for a user, from the cache when fresh
+
+    Returns:
+        dict: is_admin, admin_role and is_active, or None if the user does not exist
+    """
+    name = f'{KEY_PREFIX}{int(user_id)}'
+    max_age = _max_age()
+    cached = snapshot_cache.store.read(name)
+    if cached and time.time() - cached[1] < max_age:
+        return cached[0]
+
+    row = db.session.query(User.is_admin, User.admin_role, User.is_active).filter(
+        User.id == int(user_id)
+    ).first()
+    if row is None:
+        return None
+
+    auth = {'is_admin': bool(row.is_admin), 'admin_role': row.admin_role, 'is_active': bool(row.is_active)}
+    snapshot_cache.store.write(name, auth, time.time(), max_age)
+    return auth
+
+
+def invalidate_admin_auth(*user_ids):
+    """Drop cached authorization for users whose admin flags or active status changed"""
+    for user_id in user_ids:
+        snapshot_cache.store.delete(f'{KEY_PREFIX}{int(user_id)}')
@@ -5,7 +5,8 @@ from datetime import datetime
 import random
 from app import db
 from app.models import CashoutRequest, Wallet, WalletTransaction, User, CreatorProfile
-from app.services.wallet_service import get_or_create_wallet, calculate_wallet_balances
+from app.services import wallet_ledger
+from app.services.wallet_service import get_or_create_wallet
 from app.utils.email_service import send_cashout_request_notification_to_admin, send_cashout_completed_notification
 
 
@@ -23,6 +24,7 @@ def submit_cashout_request(user_id, cashout_data):
     if amount < 10:
         raise ValueError("Minimum cashout amount is $10")
 
+    # Fast path for the common case; the ledger update below is the authoritative check
     if amount > float(wallet.available_balance):
         raise ValueError(f"Insufficient balance. Available: ${wallet.available_balance}")
 
@@ -61,10 +63,6 @@ def submit_cashout_request(user_id, cashout_data):
     db.session.add(cashout)
     db.session.flush()
 
-    # Lock amount in wallet
-    wallet.available_balance = float(wallet.available_balance) - amount
-    wallet.updated_at = datetime.utcnow()
-
     # Create transaction record
     transaction = WalletTransaction(
         wallet_id=wallet.id,
@@ -80,15 +78,23 @@ def submit_cashout_request(user_id, cashout_data):
             'payment_method': cashout_data['payment_method']
         }
     )
-    db.session.add(transaction)
+    # Lock amount in wallet - fails without writing anything if a concurrent
+    # cashout or debit already spent the balance
+    try:
+        wallet_ledger.record_transaction(transaction, 'cashout', 'available', 'cashout_hold', amount)
+    except wallet_ledger.InsufficientFundsError:
+        db.session.rollback()
+        raise ValueError(f"Insufficient balance. Available: ${get_or_create_wallet(user_id).available_balance}")
 
     db.session.commit()
 
     # Send email notification to admin
     try:
-        send_cashout_request_notification_to_admin(cashout)
+        send_cashout_request_notification_to_admin(cashout, notify_admins_cashout_request(cashout))
+        db.session.commit()
     except Exception as e:
         # Log error but don't fail the request
+        db.session.rollback()
         print(f"Failed to send cashout email notification: {str(e)}")
 
     return cashout
@@ -124,8 +130,7 @@ def process_cashout_complete(cashout_id, admin_user_id, completion_data):
         transaction.updated_at = datetime.utcnow()
 
     # Update wallet stats
-    wallet.withdrawn_total = float(wallet.withdrawn_total or 0) + float(cashout.amount)
-    wallet.updated_at = datetime.utcnow()
+    wallet_ledger.post_transfer(wallet.id, 'payout', 'cashout_hold', 'withdrawn', cashout.amount, transaction=transaction)
 
     db.session.commit()
 
@@ -134,8 +139,10 @@ def process_cashout_complete(cashout_id, admin_user_id, completion_data):
         user = User.query.get(cashout.user_id)
         if user and user.email:
             send_cashout_completed_notification(cashout, user.email)
+            db.session.commit()
     except Exception as e:
         # Log error but don't fail the completion
+        db.session.rollback()
         print(f"Failed to send cashout completion email: {str(e)}")
 
     return cashout
@@ -158,10 +165,6 @@ def cancel_cashout_request(cashout_id, cancelled_by_user_id, reason):
     cashout.cancelled_by = cancelled_by_user_id
     cashout.cancellation_reason = reason
 
-    # Refund to wallet
-    wallet.available_balance = float(wallet.available_balance) + float(cashout.amount)
-    wallet.updated_at = datetime.utcnow()
-
     # Update transaction
     transaction = WalletTransaction.query.filter_by(
         cashout_request_id=cashout.id
@@ -171,6 +174,9 @@ def cancel_cashout_request(cashout_id, cancelled_by_user_id, reason):
         transaction.status = 'cancelled'
         transaction.updated_at = datetime.utcnow()
 
+    # Refund to wallet
+    wallet_ledger.post_transfer(wallet.id, 'cashout_cancel', 'cashout_hold', 'available', cashout.amount, transaction=transaction)
+
     db.session.commit()
     return cashout
 
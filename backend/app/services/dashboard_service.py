@@ -0,0 +1,242 @@
+"""
+Dashboard Service - Admin overview statistics in a handful of statements
+
+Every counter for a table is computed in a single pass over that table with
+aggregate FILTER clauses, instead of one COUNT/SUM query per number. The
+result is plain JSON so it can be stored as a shared snapshot (see
+snapshot_cache) and served to every admin polling the dashboard.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from app import db
+from app.models import (
+    User, CreatorProfile, BrandProfile, Collaboration, CashoutRequest,
+    Payment, Campaign, Booking, Review, Wallet, WalletTransaction
+)
+
+# Snapshot name used for the dashboard statistics
+DASHBOARD_SNAPSHOT = 'admin_dashboard_stats'
+
+
+def _count(condition):
+    return func.count().filter(condition)
+
+
+def _sum(column, condition):
+    return func.sum(column).filter(condition)
+
+
+def _float(value):
+    return float(value) if value else 0.0
+
+
+def _pending_cancellation():
+    return Collaboration.cancellation_request['status'].as_string() == 'pending'
+
+
+def _user_stats(week_ago, today_start):
+    active = User.is_active.is_(True)
+    row = db.session.execute(
+        select(
+            _count(active).label('total'),
+            _count(active & (User.user_type == 'creator')).label('creators'),
+            _count(active & (User.user_type == 'brand')).label('brands'),
+            _count(active & (User.user_type == 'creator') & User.is_verified.is_(False)
+                   & CreatorProfile.id.isnot(None)).label('unverified_creators'),
+            _count(active & (User.user_type == 'brand') & User.is_verified.is_(False)
+                   & BrandProfile.id.isnot(None)).label('unverified_brands'),
+            _count(User.created_at >= week_ago).label('new_this_week'),
+            _count(User.created_at >= today_start).label('new_today'),
+            _count(User.is_active.is_(False)).label('suspended')
+        ).select_from(User)
+        .outerjoin(CreatorProfile, CreatorProfile.user_id == User.id)
+        .outerjoin(BrandProfile, BrandProfile.user_id == User.id)
+    ).one()
+    return row._asdict()
+
+
+def _financial_stats(week_ago, first_day_month):
+    paid = Payment.status.in_(['completed', 'paid'])
+    volume = db.session.execute(
+        select(
+            _sum(Payment.amount, paid).label('total'),
+            _sum(Payment.amount, paid & (Payment.created_at >= first_day_month)).label('month'),
+            _sum(Payment.amount, paid & (Payment.created_at >= week_ago)).label('week')
+        )
+    ).one()
+
+    earning = (WalletTransaction.transaction_type == 'earning') & WalletTransaction.platform_fee.isnot(None)
+    fees = db.session.execute(
+        select(
+            _sum(WalletTransaction.platform_fee, earning).label('total'),
+            _sum(WalletTransaction.platform_fee, earning & (WalletTransaction.created_at >= first_day_month)).label('month'),
+            _sum(WalletTransaction.platform_fee, earning & (WalletTransaction.created_at >= week_ago)).label('week')
+        )
+    ).one()
+    return volume, fees
+
+
+def _recent_cashouts(limit=10):
+    rows = db.session.execute(
+        select(
+            CashoutRequest.id,
+            CashoutRequest.amount,
+            CashoutRequest.status,
+            CashoutRequest.created_at,
+            CashoutRequest.payment_method,
+            User.email,
+            CreatorProfile.id.label('creator_id'),
+            CreatorProfile.username
+        ).select_from(CashoutRequest)
+        .outerjoin(Wallet, Wallet.id == CashoutRequest.wallet_id)
+        .outerjoin(User, User.id == Wallet.user_id)
+        .outerjoin(CreatorProfile, CreatorProfile.user_id == User.id)
+        .order_by(CashoutRequest.created_at.desc())
+        .limit(limit)
+    ).all()
+
+    return [{
+        'id': row.id,
+        'creator_name': row.username if row.creator_id else (row.email or 'Unknown'),
+        'creator_id': row.creator_id,
+        'amount': float(row.amount),
+        'status': row.status,
+        'created_at': row.created_at.isoformat(),
+        'payment_method': row.payment_method
+    } for row in rows]
+
+
+def _recent_users(limit=10):
+    rows = db.session.execute(
+        select(User.id, User.email, User.user_type, User.is_verified, User.is_active, User.created_at)
+        .order_by(User.created_at.desc())
+        .limit(limit)
+    ).all()
+
+    return [{
+        'id': row.id,
+        'email': row.email,
+        'user_type': row.user_type,
+        'is_verified': row.is_verified,
+        'is_active': row.is_active,
+        'created_at': row.created_at.isoformat()
+    } for row in rows]
+
+
+def _recent_cancellations(limit=5):
+    rows = db.session.execute(
+        select(
+            Collaboration.id, Collaboration.title, Collaboration.brand_id,
+            Collaboration.creator_id, Collaboration.amount, Collaboration.cancellation_request
+        ).where(
+            Collaboration.cancellation_request.isnot(None),
+            _pending_cancellation()
+        ).order_by(Collaboration.created_at.desc()).limit(limit)
+    ).all()
+
+    return [{
+        'id': row.id,
+        'title': row.title,
+        'brand_id': row.brand_id,
+        'creator_id': row.creator_id,
+        'amount': float(row.amount),
+        'requested_by': row.cancellation_request.get('requested_by'),
+        'reason': row.cancellation_request.get('reason'),
+        'requested_at': row.cancellation_request.get('requested_at')
+    } for row in rows]
+
+
+def compute_dashboard_stats():
+    """
+    Compute the admin dashboard statistics
+
+    Returns:
+        dict: JSON-serializable statistics, shaped like the /dashboard/stats payload
+    """
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day_month = today_start.replace(day=1)
+
+    users = _user_stats(week_ago, today_start)
+
+    bookings = db.session.execute(
+        select(
+            _count(Booking.payment_status == 'failed').label('failed_payments'),
+            _count(Booking.status == 'confirmed').label('confirmed')
+        )
+    ).one()
+
+    collaborations = db.session.execute(
+        select(
+            _count(Collaboration.status == 'in_progress').label('active'),
+            _count(Collaboration.status == 'completed').label('completed'),
+            _count(Collaboration.status == 'cancelled').label('cancelled'),
+            _count(Collaboration.cancellation_request.isnot(None) & _pending_cancellation()).label('pending_cancellations'),
+            _sum(Collaboration.amount, Collaboration.status == 'in_progress').label('in_escrow')
+        )
+    ).one()
+
+    cashouts = db.session.execute(
+        select(
+            _count(CashoutRequest.status == 'pending').label('pending_count'),
+            _sum(CashoutRequest.amount, CashoutRequest.status == 'pending').label('pending_amount'),
+            _count(CashoutRequest.status == 'approved').label('approved')
+        )
+    ).one()
+
+    volume, fees = _financial_stats(week_ago, first_day_month)
+
+    # Small tables: one round trip of scalar subqueries
+    platform = db.session.execute(
+        select(
+            select(func.count()).select_from(Campaign)
+            .where(Campaign.status.in_(['active', 'published'])).scalar_subquery().label('active_campaigns'),
+            select(func.count()).select_from(Review).scalar_subquery().label('total_reviews'),
+            select(func.avg(Review.rating)).scalar_subquery().label('average_rating'),
+            select(func.count()).select_from(CreatorProfile)
+            .where(CreatorProfile.is_featured.is_(True)).scalar_subquery().label('featured')
+        )
+    ).one()
+
+    return {
+        'users': {
+            **users,
+            'failed_payments': bookings.failed_payments
+        },
+        'collaborations': {
+            'active': collaborations.active,
+            'completed': collaborations.completed,
+            'cancelled': collaborations.cancelled,
+            'pending_cancellations': collaborations.pending_cancellations
+        },
+        'cashouts': {
+            'pending_count': cashouts.pending_count,
+            'pending_amount': _float(cashouts.pending_amount),
+            'approved_pending_processing': cashouts.approved
+        },
+        'revenue': {
+            'total': _float(fees.total),
+            'this_month': _float(fees.month),
+            'this_week': _float(fees.week),
+            'platform_revenue': _float(fees.total),
+            'platform_revenue_month': _float(fees.month),
+            'platform_revenue_week': _float(fees.week),
+            'transaction_volume': _float(volume.total),
+            'transaction_volume_month': _float(volume.month),
+            'transaction_volume_week': _float(volume.week),
+            'in_escrow': _float(collaborations.in_escrow)
+        },
+        'platform': {
+            'active_campaigns': platform.active_campaigns,
+            'active_bookings': bookings.confirmed,
+            'total_reviews': platform.total_reviews,
+            'average_rating': _float(platform.average_rating)
+        },
+        'featured_creators': platform.featured,
+        'recent_activity': {
+            'cashouts': _recent_cashouts(),
+            'users': _recent_users(),
+            'cancellations': _recent_cancellations()
+        }
+    }
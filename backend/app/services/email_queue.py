@@ -0,0 +1,418 @@
+"""
+Email Queue - Single delivery path for all outgoing email
+
+Messages are written to the email_outbox table and drained by a bounded pool
+of worker threads. Each worker claims a batch of due messages and sends the
+whole batch over one pooled, already authenticated SMTP connection. Failed
+messages are retried with exponential backoff until EMAIL_MAX_ATTEMPTS.
+
+Queued rows are part of the caller's transaction: they are sent only once the
+caller commits, and are discarded with it on rollback. Delivered and failed
+rows carry OTP codes and reset links, so they are deleted once they are older
+than EMAIL_OUTBOX_RETENTION_DAYS.
+"""
+import smtplib
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formataddr, parseaddr
+from sqlalchemy import and_, or_, event, func
+from sqlalchemy.orm import Session
+from app import db
+
+# Hours between purges of old delivered and failed rows by the workers
+PURGE_INTERVAL = timedelta(hours=1)
+
+
+class SMTPConnectionPool:
+    """Keeps authenticated SMTP connections open for reuse between batches"""
+
+    def __init__(self, host, port, username=None, password=None, use_tls=True, use_ssl=False,
+                 size=2, timeout=30, max_idle_seconds=60):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.size = size
+        self.timeout = timeout
+        self.max_idle_seconds = max_idle_seconds
+        self._idle = []  # [(connection, released_at)]
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _open(self):
+        if self.use_ssl:
+            connection = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                connection.starttls()
+        if self.username and self.password:
+            connection.login(self.username, self.password)
+        self.connections_opened += 1
+        return connection
+
+    @staticmethod
+    def _is_alive(connection):
+        try:
+            return connection.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.quit()
+        except Exception:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def acquire(self):
+        """Get an idle live connection, or open a new one"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                connection, released_at = self._idle.pop()
+
+            idle_for = (datetime.utcnow() - released_at).total_seconds()
+            if idle_for < self.max_idle_seconds and self._is_alive(connection):
+                return connection
+            self._close(connection)
+
+        return self._open()
+
+    def release(self, connection, broken=False):
+        """Return a connection to the pool, closing it if broken or the pool is full"""
+        if broken:
+            self._close(connection)
+            return
+
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((connection, datetime.utcnow()))
+                return
+        self._close(connection)
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except (smtplib.SMTPServerDisconnected, OSError):
+            broken = True
+            raise
+        finally:
+            self.release(connection, broken=broken)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
+
+
+def build_message(to_email, subject, html_body=None, text_body=None, sender=None):
+    """Build a MIME message with a plain-text part and an optional HTML part"""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = sender
+    msg['To'] = to_email
+
+    if text_body:
+        msg.attach(MIMEText(text_body, 'plain'))
+    if html_body:
+        msg.attach(MIMEText(html_body, 'html'))
+
+    return msg
+
+
+def deliver_batch(pool, messages):
+    """
+    Send messages over a single pooled connection
+
+    Args:
+        pool: SMTPConnectionPool
+        messages: List of (key, MIME message) tuples
+
+    Returns:
+        dict: key -> None on success, or (error string, retryable bool) on failure
+    """
+    results = {}
+    remaining = list(messages)
+
+    try:
+        with pool.connection() as connection:
+            while remaining:
+                key, msg = remaining[0]
+                try:
+                    connection.send_message(msg)
+                    results[key] = None
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused) as e:
+                    # Permanent for this message, the connection is still fine
+                    results[key] = (str(e), False)
+                except smtplib.SMTPDataError as e:
+                    results[key] = (str(e), e.smtp_code < 500)
+                remaining.pop(0)
+    except Exception as e:
+        # Connection level failure - everything not yet sent is retried later
+        for key, _ in remaining:
+            results[key] = (str(e), True)
+
+    return results
+
+
+class EmailQueue:
+    """Bounded worker pool draining the email_outbox table"""
+
+    def __init__(self):
+        self.app = None
+        self.pool = None
+        self._workers = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+        self._purge_lock = threading.Lock()
+        self._last_purge = None
+
+    def init_app(self, app):
+        self.app = app
+        config = app.config
+        self.worker_count = config.get('EMAIL_WORKERS', 2)
+        self.batch_size = config.get('EMAIL_BATCH_SIZE', 50)
+        self.max_attempts = config.get('EMAIL_MAX_ATTEMPTS', 6)
+        self.backoff_base = config.get('EMAIL_RETRY_BACKOFF_SECONDS', 30)
+        self.poll_interval = config.get('EMAIL_POLL_INTERVAL_SECONDS', 10)
+        self.retention_days = config.get('EMAIL_OUTBOX_RETENTION_DAYS', 7)
+        self.suppress_send = config.get('MAIL_SUPPRESS_SEND', False)
+        self.default_sender = config.get('MAIL_DEFAULT_SENDER')
+        self.pool = SMTPConnectionPool(
+            host=config.get('MAIL_SERVER'),
+            port=config.get('MAIL_PORT'),
+            username=config.get('MAIL_USERNAME'),
+            password=config.get('MAIL_PASSWORD'),
+            use_tls=config.get('MAIL_USE_TLS', True),
+            use_ssl=config.get('MAIL_USE_SSL', False),
+            size=self.worker_count
+        )
+
+    def _sender(self, sender=None):
+        name, address = parseaddr(sender or self.default_sender or '')
+        return formataddr((name or 'BantuBuzz', address))
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def enqueue_many(self, emails):
+        """
+        Queue several emails in the current transaction
+
+        The rows are flushed, not committed: the caller commits them together
+        with the change they announce, and the workers are woken on commit.
+
+        Args:
+            emails: Iterable of dicts with to_email, subject, html_body, text_body and optional sender
+
+        Returns:
+            list: The created EmailOutbox rows
+        """
+        from app.models import EmailOutbox
+
+        rows = []
+        for email in emails:
+            row = EmailOutbox(
+                to_email=email['to_email'],
+                subject=email['subject'],
+                html_body=email.get('html_body'),
+                text_body=email.get('text_body'),
+                sender=self._sender(email.get('sender')),
+                status='pending',
+                next_attempt_at=datetime.utcnow()
+            )
+            db.session.add(row)
+            rows.append(row)
+
+        if rows:
+            db.session.flush()
+            db.session.info['email_queued'] = True
+
+        return rows
+
+    def wake(self):
+        """Start the workers if needed and have them look for due messages now"""
+        self.start()
+        self._wakeup.set()
+
+    def enqueue(self, to_email, subject, html_body=None, text_body=None, sender=None):
+        """Queue a single email"""
+        return self.enqueue_many([{
+            'to_email': to_email,
+            'subject': subject,
+            'html_body': html_body,
+            'text_body': text_body,
+            'sender': sender
+        }])[0]
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the worker threads once per process"""
+        if self._workers or self.app is None:
+            return
+
+        # EMAIL_WORKERS=0 disables background delivery (drain with `flask drain-email-outbox`)
+        with self._start_lock:
+            if self._workers:
+                return
+            for index in range(self.worker_count):
+                worker = threading.Thread(target=self._run_worker, name=f'email-worker-{index}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self.pool:
+            self.pool.close_all()
+
+    def _run_worker(self):
+        while not self._stop.is_set():
+            processed = 0
+            with self.app.app_context():
+                try:
+                    processed = self.process_batch()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Email worker error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+            if not processed:
+                self._purge_if_due()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _purge_if_due(self):
+        """Purge old rows at most once per PURGE_INTERVAL across all workers"""
+        now = datetime.utcnow()
+        with self._purge_lock:
+            if self._last_purge and now - self._last_purge < PURGE_INTERVAL:
+                return
+            self._last_purge = now
+
+        with self.app.app_context():
+            try:
+                self.purge_outbox()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Email outbox purge error: {str(e)}")
+            finally:
+                db.session.remove()
+
+    def purge_outbox(self, retention_days=None):
+        """
+        Delete delivered and permanently failed rows older than the retention period
+
+        Returns:
+            int: Number of rows deleted
+        """
+        from app.models import EmailOutbox
+
+        days = self.retention_days if retention_days is None else retention_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        deleted = EmailOutbox.query.filter(
+            EmailOutbox.status.in_(('sent', 'failed')),
+            func.coalesce(EmailOutbox.sent_at, EmailOutbox.created_at) < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def _claim_batch(self):
+        """Mark a batch of due messages as sending and return them"""
+        from app.models import EmailOutbox
+
+        now = datetime.utcnow()
+        stale_lock = now - timedelta(minutes=10)
+
+        rows = EmailOutbox.query.filter(
+            or_(
+                and_(EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now),
+                # Rows claimed by a worker that died mid-batch
+                and_(EmailOutbox.status == 'sending', EmailOutbox.locked_at < stale_lock)
+            )
+        ).order_by(EmailOutbox.id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+        for row in rows:
+            row.status = 'sending'
+            row.locked_at = now
+            row.attempts = (row.attempts or 0) + 1
+        db.session.commit()
+
+        return rows
+
+    def process_batch(self):
+        """Claim and deliver one batch. Returns the number of messages processed."""
+        rows = self._claim_batch()
+        if not rows:
+            return 0
+
+        if self.suppress_send:
+            results = {row.id: None for row in rows}
+            for row in rows:
+                print(f"Email sending suppressed - would send to {row.to_email}: {row.subject}")
+        else:
+            messages = [
+                (row.id, build_message(row.to_email, row.subject, row.html_body, row.text_body, row.sender))
+                for row in rows
+            ]
+            results = deliver_batch(self.pool, messages)
+
+        now = datetime.utcnow()
+        for row in rows:
+            failure = results.get(row.id)
+            row.locked_at = None
+            if failure is None:
+                row.status = 'sent'
+                row.sent_at = now
+                row.last_error = None
+                continue
+
+            error, retryable = failure
+            row.last_error = error[:1000]
+            if retryable and row.attempts < self.max_attempts:
+                row.status = 'pending'
+                row.next_attempt_at = now + timedelta(seconds=self.backoff_base * (2 ** (row.attempts - 1)))
+            else:
+                row.status = 'failed'
+                print(f"Email {row.id} to {row.to_email} failed permanently: {error}")
+
+        db.session.commit()
+        return len(rows)
+
+
+# Singleton instance
+email_queue = EmailQueue()
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_after_commit(session):
+    if session.info.pop('email_queued', False):
+        email_queue.wake()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_after_rollback(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('email_queued', None)
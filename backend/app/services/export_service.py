@@ -0,0 +1,195 @@
+"""
+Export Service - Streaming CSV / JSON Lines exports for finance reconciliation
+
+Exports select plain columns (no ORM objects, no relation loading) and read
+them through a server-side cursor with yield_per, so each chunk of rows is
+serialized and handed to the HTTP response as soon as it is fetched. Memory
+stays constant whatever the date range.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import select
+from app import db
+from app.models import Payment, WalletTransaction, CashoutRequest, User
+
+# Rows fetched from the cursor (and written to the response) per chunk
+EXPORT_CHUNK_ROWS = 1000
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl')
+}
+
+EXPORT_FAILED_MESSAGE = 'EXPORT FAILED - this file is incomplete'
+
+
+def _json_value(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return _json_value(value)
+
+
+def stream_rows(query, export_format='csv', chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Execute a column query and yield it as CSV or JSON Lines text chunks
+
+    Args:
+        query: A select() of labelled columns
+        export_format: 'csv' or 'jsonl'
+        chunk_rows: Rows per cursor fetch and per yielded chunk
+
+    Yields:
+        str: Serialized chunks, starting with the CSV header row
+    """
+    result = db.session.execute(query.execution_options(yield_per=chunk_rows))
+    columns = list(result.keys())
+
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue()
+
+        for rows in result.partitions():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows([_csv_value(value) for value in row] for row in rows)
+            yield buffer.getvalue()
+    else:
+        for rows in result.partitions():
+            yield ''.join(
+                json.dumps({column: _json_value(value) for column, value in zip(columns, row)}) + '\n'
+                for row in rows
+            )
+
+
+def error_trailer(export_format):
+    """
+    Last line written when an export fails part way through
+
+    The status line and headers are already sent by then, so this marker is
+    what tells a reader the file was cut short.
+    """
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow([EXPORT_FAILED_MESSAGE])
+        return buffer.getvalue()
+    return json.dumps({'error': EXPORT_FAILED_MESSAGE, 'complete': False}) + '\n'
+
+
+def _date_range(query, column, start_date=None, end_date=None):
+    if start_date:
+        query = query.where(column >= start_date)
+    if end_date:
+        query = query.where(column <= end_date)
+    return query
+
+
+def payments_export_query(status=None, payment_method=None, start_date=None, end_date=None):
+    """Payments with the paying user's email, oldest first"""
+    query = select(
+        Payment.id,
+        Payment.created_at,
+        Payment.completed_at,
+        Payment.verified_at,
+        Payment.user_id,
+        User.email.label('user_email'),
+        Payment.booking_id,
+        Payment.collaboration_id,
+        Payment.amount,
+        Payment.currency,
+        Payment.payment_method,
+        Payment.payment_type,
+        Payment.status,
+        Payment.escrow_status,
+        Payment.payment_reference,
+        Payment.external_reference,
+        Payment.paynow_reference
+    ).outerjoin(User, User.id == Payment.user_id)
+
+    if status:
+        query = query.where(Payment.status == status)
+    if payment_method:
+        query = query.where(Payment.payment_method == payment_method)
+    return _date_range(query, Payment.created_at, start_date, end_date).order_by(Payment.id)
+
+
+def wallet_transactions_export_query(status=None, transaction_type=None, user_id=None,
+                                     start_date=None, end_date=None):
+    """Wallet transactions with the wallet owner's email, oldest first"""
+    query = select(
+        WalletTransaction.id,
+        WalletTransaction.created_at,
+        WalletTransaction.user_id,
+        User.email.label('user_email'),
+        WalletTransaction.wallet_id,
+        WalletTransaction.transaction_type,
+        WalletTransaction.status,
+        WalletTransaction.amount,
+        WalletTransaction.currency,
+        WalletTransaction.gross_amount,
+        WalletTransaction.platform_fee,
+        WalletTransaction.platform_fee_percentage,
+        WalletTransaction.net_amount,
+        WalletTransaction.collaboration_id,
+        WalletTransaction.booking_id,
+        WalletTransaction.milestone_id,
+        WalletTransaction.cashout_request_id,
+        WalletTransaction.completed_at,
+        WalletTransaction.available_at,
+        WalletTransaction.cleared_at,
+        WalletTransaction.description
+    ).outerjoin(User, User.id == WalletTransaction.user_id)
+
+    if status:
+        query = query.where(WalletTransaction.status == status)
+    if transaction_type:
+        query = query.where(WalletTransaction.transaction_type == transaction_type)
+    if user_id:
+        query = query.where(WalletTransaction.user_id == user_id)
+    return _date_range(query, WalletTransaction.created_at, start_date, end_date).order_by(WalletTransaction.id)
+
+
+def cashouts_export_query(status=None, payment_method=None, start_date=None, end_date=None):
+    """Cashout requests with the creator's email, oldest first"""
+    query = select(
+        CashoutRequest.id,
+        CashoutRequest.request_reference,
+        CashoutRequest.requested_at,
+        CashoutRequest.user_id,
+        User.email.label('user_email'),
+        CashoutRequest.creator_id,
+        CashoutRequest.amount,
+        CashoutRequest.cashout_fee,
+        CashoutRequest.net_amount,
+        CashoutRequest.currency,
+        CashoutRequest.payment_method,
+        CashoutRequest.payment_details,
+        CashoutRequest.status,
+        CashoutRequest.transaction_reference,
+        CashoutRequest.processed_by,
+        CashoutRequest.processed_at,
+        CashoutRequest.completed_at,
+        CashoutRequest.failed_at,
+        CashoutRequest.failure_reason,
+        CashoutRequest.cancelled_at
+    ).outerjoin(User, User.id == CashoutRequest.user_id)
+
+    if status:
+        query = query.where(CashoutRequest.status == status)
+    if payment_method:
+        query = query.where(CashoutRequest.payment_method == payment_method)
+    return _date_range(query, CashoutRequest.requested_at, start_date, end_date).order_by(CashoutRequest.id)
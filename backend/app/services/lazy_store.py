@@ -0,0 +1,52 @@
+"""
+Lazy Store - Redis-backed service state with an in-process fallback
+
+Presence, the platform fee cache and the snapshot cache keep their state in
+Redis when REDIS_URL is reachable, so every app instance shares it, and
+otherwise in process memory. LazyStore makes that choice once, on first use,
+so importing a service never opens a connection.
+"""
+import os
+import threading
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is optional for local development
+    redis = None
+
+
+class LazyStore:
+    """Builds a service's Redis or in-memory store the first time it is needed"""
+
+    def __init__(self, label, redis_store, memory_store, redis_url=None):
+        """
+        Args:
+            label: Service name used in the fallback message
+            redis_store: Callable taking a Redis client and returning the Redis store
+            memory_store: Callable returning the in-memory store
+            redis_url: Redis to try, defaulting to REDIS_URL
+        """
+        self.label = label
+        self.redis_store = redis_store
+        self.memory_store = memory_store
+        self.redis_url = redis_url or os.getenv('REDIS_URL')
+        self._store = None
+        self._init_lock = threading.Lock()
+
+    def get(self):
+        """Lazily pick Redis if it answers, otherwise fall back to memory"""
+        if self._store is None:
+            with self._init_lock:
+                if self._store is None:
+                    self._store = self._create_store()
+        return self._store
+
+    def _create_store(self):
+        if redis is not None and self.redis_url:
+            try:
+                client = redis.Redis.from_url(self.redis_url, socket_timeout=2, decode_responses=True)
+                client.ping()
+                return self.redis_store(client)
+            except Exception as e:
+                print(f"{self.label}: Redis unavailable ({e}), using in-memory store")
+        return self.memory_store()
@@ -2,8 +2,14 @@
 Payment Service - Handles payment verification and management
 """
 from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
 from app import db
-from app.models import Payment, PaymentVerification, Booking, WalletTransaction, Collaboration, User, BrandProfile, Subscription
+from app.models import (
+    Payment, PaymentVerification, Booking, WalletTransaction, Collaboration,
+    Subscription, CreatorSubscription, Package
+)
+from app.services import wallet_ledger
+from app.services.platform_fee_service import platform_fee_resolver, DEFAULT_PLATFORM_FEE
 from app.services.wallet_service import get_or_create_wallet
 from app.utils.email_service import send_payment_verified_notification
 
@@ -15,25 +21,10 @@ class PaymentService:
     def get_brand_platform_fee(brand_id):
         """Get platform fee percentage for a brand based on their subscription tier"""
         try:
-            brand = BrandProfile.query.get(brand_id)
-            if not brand:
-                return 10.00  # Default to 10% if brand not found
-
-            # Get brand's active subscription
-            active_subscription = Subscription.query.filter_by(
-                user_id=brand.user_id,
-                status='active'
-            ).first()
-
-            if not active_subscription or not active_subscription.plan:
-                return 10.00  # Default to 10% for Free tier
-
-            # Return the platform fee from the subscription plan
-            return float(active_subscription.plan.platform_fee_percentage or 10.00)
-
+            return platform_fee_resolver.for_brand(brand_id)
         except Exception as e:
             print(f"Error getting brand platform fee: {str(e)}")
-            return 10.00  # Default to 10% on error
+            return DEFAULT_PLATFORM_FEE  # Default to 10% on error
 
     @staticmethod
     def initiate_paynow_payment(amount, email, reference, description):
@@ -225,13 +216,21 @@ def verify_manual_payment(payment_id, admin_user_id, verification_data):
     db.session.add(verification)
     db.session.commit()
 
-    # Send email notification to creator
+    # Notify creator in-app; the email is only sent if they are not online
     try:
         # Get creator email from booking
-        if booking.creator_id:
-            creator_user = User.query.filter_by(id=booking.creator_id).first()
+        if booking.creator:
+            creator_user = booking.creator.user
             if creator_user and creator_user.email:
-                send_payment_verified_notification(payment, creator_user.email)
+                from app.utils.notifications import create_notification
+                create_notification(
+                    user_id=creator_user.id,
+                    notification_type='payment',
+                    title='Payment Verified',
+                    message=f'Payment of ${payment.amount} has been verified',
+                    action_url=f'/bookings/{booking.id}',
+                    email_fallback=lambda: send_payment_verified_notification(payment, creator_user.email)
+                )
     except Exception as e:
         # Log error but don't fail the verification
         print(f"Failed to send payment verified email: {str(e)}")
@@ -418,6 +417,7 @@ def release_escrow_to_wallet(collaboration_id, platform_fee_percentage=15):
         platform_fee_percentage=platform_fee_percentage,
         net_amount=creator_amount,
         description=description,
+        idempotency_key=f'collaboration:{collaboration.id}:release',
         transaction_metadata={
             **metadata,
             'upfront_platform_fee': upfront_platform_fee,
@@ -426,7 +426,14 @@ def release_escrow_to_wallet(collaboration_id, platform_fee_percentage=15):
             'breakdown': f'Brand paid ${total_paid:.2f} (${original_collab_price:.2f} + ${upfront_platform_fee:.2f} upfront fee). Platform takes ${platform_commission:.2f} commission. Creator receives ${creator_amount:.2f}.'
         }
     )
-    db.session.add(transaction)
+
+    # Insert the transaction and credit the wallet atomically; a concurrent
+    # release of the same collaboration loses on the idempotency key
+    transaction, created = wallet_ledger.record_transaction(
+        transaction, 'earning', 'external', 'pending_clearance', creator_amount, earned=True
+    )
+    if not created:
+        raise ValueError("Funds already released to wallet")
 
     # Update payment escrow status to released
     payment.escrow_status = 'released'
@@ -435,11 +442,6 @@ def release_escrow_to_wallet(collaboration_id, platform_fee_percentage=15):
     if booking:
         booking.escrow_status = 'released'
 
-    # Update wallet balances
-    wallet.pending_clearance = float(wallet.pending_clearance or 0) + creator_amount
-    wallet.total_earned = float(wallet.total_earned or 0) + creator_amount
-    wallet.updated_at = datetime.utcnow()
-
     # Commit all changes
     db.session.commit()
 
@@ -581,10 +583,13 @@ def initiate_payment(booking, user_email, package_title):
 
 
 def check_payment_status(booking):
-    """Check Paynow payment status"""
-    import os
-    from paynow import Paynow
-    from flask import current_app
+    """
+    Payment status for a booking from the database and the Paynow poller cache
+
+    Does not call Paynow - the background poller (app/services/paynow_poller.py)
+    applies confirmed payments.
+    """
+    from app.services.paynow_poller import get_cached_status
 
     # First check if already paid in database
     if booking.payment_status == 'paid':
@@ -604,148 +609,189 @@ def check_payment_status(booking):
             'message': 'No payment initiated'
         }
 
-    try:
-        # Get Paynow credentials
-        try:
-            integration_id = current_app.config.get('PAYNOW_INTEGRATION_ID') or os.getenv('PAYNOW_INTEGRATION_ID')
-            integration_key = current_app.config.get('PAYNOW_INTEGRATION_KEY') or os.getenv('PAYNOW_INTEGRATION_KEY')
-            return_url = current_app.config.get('PAYNOW_RETURN_URL') or os.getenv('PAYNOW_RETURN_URL')
-            result_url = current_app.config.get('PAYNOW_RESULT_URL') or os.getenv('PAYNOW_RESULT_URL')
-        except RuntimeError:
-            integration_id = os.getenv('PAYNOW_INTEGRATION_ID')
-            integration_key = os.getenv('PAYNOW_INTEGRATION_KEY')
-            return_url = os.getenv('PAYNOW_RETURN_URL')
-            result_url = os.getenv('PAYNOW_RESULT_URL')
+    status, paynow_status = get_cached_status(payment_record.paynow_poll_url)
+    return {
+        'status': paynow_status or status,
+        'paid': False,
+        'message': 'Payment not yet completed'
+    }
 
-        # Initialize Paynow
-        paynow = Paynow(
-            integration_id=integration_id,
-            integration_key=integration_key,
-            return_url=return_url,
-            result_url=result_url
-        )
 
-        # Check status from Paynow
-        status = paynow.check_transaction_status(payment_record.paynow_poll_url)
+def _create_booking_collaboration(booking, package):
+    """Collaboration for a cart booking once it has been paid"""
+    start_date = datetime.utcnow()
+    expected_completion = None
+    if package and package.duration_days:
+        expected_completion = start_date + timedelta(days=package.duration_days)
 
-        if status.paid:
-            # Update booking and payment status
-            booking.payment_status = 'paid'
-            booking.escrow_status = 'escrowed'
-            booking.escrowed_at = datetime.utcnow()
+    return Collaboration(
+        collaboration_type='package',
+        booking_id=booking.id,
+        creator_id=booking.creator_id,
+        brand_id=booking.brand_id,
+        title=f"Collaboration for {package.title if package else 'Package'}",
+        description=package.description if package else '',
+        amount=booking.amount,
+        status='in_progress',
+        start_date=start_date,
+        expected_completion_date=expected_completion,
+        deliverables=package.deliverables if package and package.deliverables else [],
+        progress_percentage=0
+    )
 
-            payment_record.status = 'completed'
-            payment_record.completed_at = datetime.utcnow()
-            payment_record.escrow_status = 'escrowed'
-            payment_record.held_amount = booking.amount
 
-            # Update collaboration payment status ONLY (NOT escrow)
-            collaboration = Collaboration.query.filter_by(booking_id=booking.id).first()
-            if collaboration:
-                collaboration.payment_status = 'paid'
-                # Do NOT set escrow_status - escrow only triggers on collaboration completion
-                # Do NOT change collaboration.status - brand controls workflow
+def apply_paynow_paid(poll_urls):
+    """
+    Apply confirmed Paynow payments for a batch of poll URLs
 
-            db.session.commit()
+    Loads every affected payment, booking, collaboration, package and
+    subscription with one IN query each. Cart bookings are accepted and get
+    their collaboration; single bookings only update an existing one. The
+    caller commits.
 
-            return {
-                'status': 'paid',
-                'paid': True,
-                'message': 'Payment confirmed'
-            }
-        else:
-            return {
-                'status': status.status if hasattr(status, 'status') else 'pending',
-                'paid': False,
-                'message': 'Payment not yet completed'
-            }
+    Returns:
+        int: Number of payments and subscriptions updated
+    """
+    now = datetime.utcnow()
 
-    except Exception as e:
-        print(f"Error checking payment status: {str(e)}")
-        return {
-            'status': booking.payment_status,
-            'paid': False,
-            'message': f'Error checking status: {str(e)}'
+    payments = Payment.query.filter(
+        Payment.paynow_poll_url.in_(poll_urls),
+        Payment.status == 'pending'
+    ).all()
+
+    booking_ids = [p.booking_id for p in payments if p.booking_id]
+    bookings = {}
+    collaborations = {}
+    packages = {}
+    if booking_ids:
+        bookings = {b.id: b for b in Booking.query.filter(Booking.id.in_(booking_ids))}
+        collaborations = {
+            c.booking_id: c for c in Collaboration.query.filter(Collaboration.booking_id.in_(booking_ids))
         }
+        package_ids = {b.package_id for b in bookings.values() if b.package_id}
+        if package_ids:
+            packages = {p.id: p for p in Package.query.filter(Package.id.in_(package_ids))}
+
+    for payment in payments:
+        payment.status = 'completed'
+        payment.completed_at = now
+        payment.escrow_status = 'escrowed'
+
+        booking = bookings.get(payment.booking_id)
+        if not booking:
+            continue
+        payment.held_amount = booking.amount
+
+        # Escrow state lives on the payment - bookings have no escrow columns
+        booking.payment_status = 'paid'
+
+        collaboration = collaborations.get(booking.id)
+        if collaboration:
+            # Payment status only - escrow triggers on collaboration completion
+            collaboration.payment_status = 'paid'
+        elif (payment.external_reference or '').startswith('CART-'):
+            booking.status = 'accepted'
+            db.session.add(_create_booking_collaboration(booking, packages.get(booking.package_id)))
+
+    subscriptions = Subscription.query.filter(
+        Subscription.paynow_poll_url.in_(poll_urls),
+        Subscription.status == 'pending'
+    ).all()
+    for subscription in subscriptions:
+        subscription.status = 'active'
+        platform_fee_resolver.invalidate_on_commit(subscription.user_id)
+        subscription.last_payment_date = now
+        if subscription.plan:
+            subscription.last_payment_amount = subscription.plan.price_monthly if subscription.billing_cycle == 'monthly' else subscription.plan.price_yearly
+        if not subscription.current_period_end:
+            subscription.set_billing_period(subscription.billing_cycle)
+
+    creator_subscriptions = CreatorSubscription.query.filter(
+        CreatorSubscription.paynow_poll_url.in_(poll_urls),
+        CreatorSubscription.payment_verified.isnot(True)
+    ).all()
+    for subscription in creator_subscriptions:
+        subscription.activate_subscription()
+
+    return len(payments) + len(subscriptions) + len(creator_subscriptions)
+
+
+def apply_paynow_cancelled(poll_urls):
+    """Apply cancelled Paynow payments for a batch of poll URLs. The caller commits."""
+    return CreatorSubscription.query.filter(
+        CreatorSubscription.paynow_poll_url.in_(poll_urls),
+        CreatorSubscription.payment_verified.isnot(True),
+        CreatorSubscription.status.in_(['pending_payment', 'pending'])
+    ).update({'status': 'cancelled'}, synchronize_session=False)
 
 
 def process_payment_webhook(data):
-    """Process Paynow payment webhook/IPN"""
-    import os
-    from paynow import Paynow
-    from flask import current_app
+    """
+    Record a Paynow payment webhook/IPN for asynchronous processing
 
-    try:
-        # Get Paynow credentials
-        try:
-            integration_id = current_app.config.get('PAYNOW_INTEGRATION_ID') or os.getenv('PAYNOW_INTEGRATION_ID')
-            integration_key = current_app.config.get('PAYNOW_INTEGRATION_KEY') or os.getenv('PAYNOW_INTEGRATION_KEY')
-            return_url = current_app.config.get('PAYNOW_RETURN_URL') or os.getenv('PAYNOW_RETURN_URL')
-            result_url = current_app.config.get('PAYNOW_RESULT_URL') or os.getenv('PAYNOW_RESULT_URL')
-        except RuntimeError:
-            integration_id = os.getenv('PAYNOW_INTEGRATION_ID')
-            integration_key = os.getenv('PAYNOW_INTEGRATION_KEY')
-            return_url = os.getenv('PAYNOW_RETURN_URL')
-            result_url = os.getenv('PAYNOW_RESULT_URL')
+    Only verifies the hash and stores the event - the Paynow poller thread
+    applies the payment, booking, collaboration and subscription updates.
+    Repeated callbacks hit the unique event key and return straight away.
 
-        # Initialize Paynow
-        paynow = Paynow(
-            integration_id=integration_id,
-            integration_key=integration_key,
-            return_url=return_url,
-            result_url=result_url
-        )
+    Args:
+        data: Callback fields as a dict or as (key, value) pairs in received order
 
-        # Parse webhook data
-        reference = data.get('reference')
-        paynow_reference = data.get('paynowreference')
-        status = data.get('status')
-        amount = data.get('amount')
+    Returns:
+        bool: True if the callback was accepted (new or repeated), False if invalid
+    """
+    import hashlib
+    from flask import current_app
+    from sqlalchemy.exc import IntegrityError
+    from app.models import PaynowWebhookEvent
+    from app.services.paynow_poller import paynow_poller, verify_hash
 
-        # Find payment by reference
-        payment_record = Payment.query.filter_by(paynow_reference=paynow_reference).first()
+    try:
+        pairs = list(data.items()) if isinstance(data, dict) else list(data)
+        fields = {key.lower(): value for key, value in pairs}
 
-        if not payment_record:
-            # Try to find by external reference
-            external_ref = data.get('merchantreference') or data.get('reference')
-            if external_ref and 'BOOKING-' in external_ref:
-                booking_id = int(external_ref.replace('BOOKING-', ''))
-                payment_record = Payment.query.filter_by(booking_id=booking_id).first()
+        integration_key = current_app.config.get('PAYNOW_INTEGRATION_KEY')
+        if integration_key and not verify_hash(pairs, integration_key):
+            print(f"Webhook rejected - invalid hash for reference {fields.get('reference')}")
+            return False
 
-        if not payment_record:
-            print(f"Payment not found for webhook data: {data}")
+        reference = fields.get('reference') or fields.get('merchantreference')
+        paynow_reference = fields.get('paynowreference')
+        status = fields.get('status')
+        if not status or not (reference or paynow_reference):
+            print(f"Webhook rejected - missing fields: {fields}")
             return False
 
-        # Update payment status based on Paynow status
-        if status and status.lower() in ['paid', 'delivered', 'awaiting delivery']:
-            payment_record.status = 'completed'
-            payment_record.completed_at = datetime.utcnow()
-            payment_record.escrow_status = 'escrowed'
-            payment_record.held_amount = payment_record.amount
-
-            # Update booking
-            booking = Booking.query.get(payment_record.booking_id)
-            if booking:
-                booking.payment_status = 'paid'
-                booking.escrow_status = 'escrowed'
-                booking.escrowed_at = datetime.utcnow()
-
-                # Update collaboration payment status ONLY (NOT escrow)
-                collaboration = Collaboration.query.filter_by(booking_id=booking.id).first()
-                if collaboration:
-                    collaboration.payment_status = 'paid'
-                    # Do NOT set escrow_status - escrow only triggers on collaboration completion
-                    # Do NOT change collaboration.status - brand controls workflow
+        event_key = hashlib.sha256(
+            f"{reference}|{paynow_reference}|{status.lower()}".encode('utf-8')
+        ).hexdigest()
 
-            db.session.commit()
-            return True
-        else:
-            # Update status but don't mark as paid
-            payment_record.payment_reference = f'PAYNOW-{paynow_reference}' if paynow_reference else payment_record.payment_reference
-            db.session.commit()
+        # Fast path for Paynow's repeated callbacks
+        if PaynowWebhookEvent.query.filter_by(event_key=event_key).first():
             return True
 
+        try:
+            with db.session.begin_nested():
+                db.session.add(PaynowWebhookEvent(
+                    event_key=event_key,
+                    reference=reference,
+                    paynow_reference=paynow_reference,
+                    paynow_status=status,
+                    poll_url=fields.get('pollurl'),
+                    payload=fields,
+                    state='queued',
+                    attempts=0
+                ))
+        except IntegrityError:
+            # A concurrent repeat of the same callback got there first
+            pass
+        db.session.commit()
+
+        paynow_poller.start()
+        paynow_poller.wake()
+        return True
+
     except Exception as e:
+        db.session.rollback()
         print(f"Webhook processing error: {str(e)}")
         return False
 
@@ -755,7 +801,7 @@ def release_milestone_escrow(milestone_id, platform_fee_percentage=15):
     Release escrow for a specific completed milestone to creator wallet
     Only releases the portion allocated to this milestone
     """
-    from app.models import CollaborationMilestone, Collaboration, Transaction, WalletTransaction
+    from app.models import CollaborationMilestone, Collaboration, WalletTransaction
     from datetime import timedelta
 
     milestone = CollaborationMilestone.query.get(milestone_id)
@@ -769,10 +815,16 @@ def release_milestone_escrow(milestone_id, platform_fee_percentage=15):
     if not collaboration:
         raise ValueError(f"Collaboration not found for milestone {milestone_id}")
 
-    # Check if wallet transaction already exists for this milestone
-    existing_transaction = WalletTransaction.query.filter_by(
-        milestone_id=milestone_id,
-        transaction_type='milestone_earning'
+    # Check if wallet transaction already exists for this milestone, by key or,
+    # for payouts recorded before keys existed, by milestone
+    existing_transaction = WalletTransaction.query.filter(
+        or_(
+            WalletTransaction.idempotency_key == f'milestone:{milestone_id}:release',
+            and_(
+                WalletTransaction.milestone_id == milestone_id,
+                WalletTransaction.transaction_type == 'milestone_earning'
+            )
+        )
     ).first()
 
     if existing_transaction:
@@ -804,6 +856,7 @@ def release_milestone_escrow(milestone_id, platform_fee_percentage=15):
         platform_fee_percentage=platform_fee_percentage,
         net_amount=creator_amount,
         description=f"Milestone payment: {milestone.title}",
+        idempotency_key=f'milestone:{milestone.id}:release',
         transaction_metadata={
             'milestone_title': milestone.title,
             'milestone_number': milestone.milestone_number,
@@ -811,12 +864,13 @@ def release_milestone_escrow(milestone_id, platform_fee_percentage=15):
             'brand_name': collaboration.brand.company_name if collaboration.brand else 'Unknown'
         }
     )
-    db.session.add(transaction)
 
-    # Update wallet pending clearance
-    wallet.pending_clearance = float(wallet.pending_clearance or 0) + creator_amount
-    wallet.total_earned = float(wallet.total_earned or 0) + creator_amount
-    wallet.updated_at = datetime.utcnow()
+    # Insert the transaction and credit the wallet atomically
+    transaction, created = wallet_ledger.record_transaction(
+        transaction, 'earning', 'external', 'pending_clearance', creator_amount, earned=True
+    )
+    if not created:
+        raise ValueError("Funds already released for this milestone")
 
     db.session.commit()
 
@@ -905,10 +959,8 @@ def initiate_subscription_payment(subscription, user_email, plan_name, amount, b
 
 
 def check_subscription_payment_status(subscription):
-    """Check Paynow payment status for subscription"""
-    import os
-    from paynow import Paynow
-    from flask import current_app
+    """Payment status for a subscription from the database and the Paynow poller cache"""
+    from app.services.paynow_poller import get_cached_status
 
     # Check if subscription payment is already confirmed
     if subscription.status == 'active' and subscription.last_payment_date:
@@ -925,58 +977,9 @@ def check_subscription_payment_status(subscription):
             'message': 'No payment initiated'
         }
 
-    try:
-        # Get Paynow credentials
-        try:
-            integration_id = current_app.config.get('PAYNOW_INTEGRATION_ID') or os.getenv('PAYNOW_INTEGRATION_ID')
-            integration_key = current_app.config.get('PAYNOW_INTEGRATION_KEY') or os.getenv('PAYNOW_INTEGRATION_KEY')
-            return_url = current_app.config.get('PAYNOW_RETURN_URL') or os.getenv('PAYNOW_RETURN_URL')
-            result_url = current_app.config.get('PAYNOW_RESULT_URL') or os.getenv('PAYNOW_RESULT_URL')
-        except RuntimeError:
-            integration_id = os.getenv('PAYNOW_INTEGRATION_ID')
-            integration_key = os.getenv('PAYNOW_INTEGRATION_KEY')
-            return_url = os.getenv('PAYNOW_RETURN_URL')
-            result_url = os.getenv('PAYNOW_RESULT_URL')
-
-        # Initialize Paynow
-        paynow = Paynow(
-            integration_id=integration_id,
-            integration_key=integration_key,
-            return_url=return_url,
-            result_url=result_url
-        )
-
-        # Check status from Paynow
-        status = paynow.check_transaction_status(subscription.paynow_poll_url)
-
-        if status.paid:
-            # Activate subscription
-            subscription.status = 'active'
-            subscription.last_payment_date = datetime.utcnow()
-            subscription.last_payment_amount = subscription.plan.price_monthly if subscription.billing_cycle == 'monthly' else subscription.plan.price_yearly
-
-            # Set billing period if not already set
-            if not subscription.current_period_end:
-                subscription.set_billing_period(subscription.billing_cycle)
-
-            db.session.commit()
-
-            return {
-                'status': 'paid',
-                'paid': True,
-                'message': 'Payment confirmed and subscription activated'
-            }
-        else:
-            return {
-                'status': status.status if hasattr(status, 'status') else 'pending',
-                'paid': False,
-                'message': 'Payment not yet completed'
-            }
-
-    except Exception as e:
-        print(f"Error checking subscription payment status: {str(e)}")
-        return {
-            'status': 'pending',
-            'paid': False,
-            'message': f'Error checking status: {str(e)}'
-        }
+    status, paynow_status = get_cached_status(subscription.paynow_poll_url)
+    return {
+        'status': paynow_status or status,
+        'paid': False,
+        'message': 'Payment not yet completed'
+    }
@@ -0,0 +1,414 @@
+"""
+Paynow Poller - Background status polling for outstanding Paynow payments
+
+Every pending poll URL (booking and cart payments, brand and creator
+subscriptions) gets a paynow_polls row. A single poller thread per process
+claims the rows that are due, asks Paynow for their status concurrently over a
+bounded thread pool sharing one keep-alive HTTP session, and applies the
+resulting state transitions in one batch per cycle. Pending URLs back off
+exponentially. Status endpoints only read the cached state.
+
+Paynow status callbacks take the same path: the webhook only records the
+event, and the poller thread applies it on its next cycle.
+"""
+import hashlib
+import hmac
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import select
+from app import db
+
+PAID_STATUSES = {'paid', 'awaiting delivery', 'delivered'}
+CANCELLED_STATUSES = {'cancelled', 'failed'}
+
+
+def verify_hash(pairs, integration_key):
+    """Check the SHA512 hash Paynow signs status messages with, over the fields in received order"""
+    received = None
+    joined = ''
+    for key, value in pairs:
+        if key.lower() == 'hash':
+            received = value
+        else:
+            joined += value
+    if not received:
+        return False
+    # Same as the Paynow SDK, which lowercases the key
+    expected = hashlib.sha512((joined + integration_key.lower()).encode('utf-8')).hexdigest().upper()
+    return hmac.compare_digest(expected, received.upper())
+
+
+def classify_status(status):
+    """Map a raw Paynow status to paid, cancelled or pending"""
+    status = (status or '').lower()
+    if status in PAID_STATUSES:
+        return 'paid'
+    if status in CANCELLED_STATUSES:
+        return 'cancelled'
+    return 'pending'
+
+
+def parse_status_response(body, integration_key=None):
+    """
+    Parse a Paynow status response
+
+    Returns:
+        tuple: (outcome, raw status) where outcome is paid, cancelled or pending
+
+    Raises:
+        ValueError: If the response is an error or its hash does not match
+    """
+    pairs = parse_qsl(body, keep_blank_values=True)
+    data = {key.lower(): value for key, value in pairs}
+
+    status = data.get('status', '').lower()
+    if not status:
+        raise ValueError('Empty status response')
+    if status == 'error':
+        raise ValueError(data.get('error') or 'Paynow returned an error')
+
+    if integration_key and 'hash' in data and not verify_hash(pairs, integration_key):
+        raise ValueError('Status response hash mismatch')
+
+    return classify_status(status), status
+
+
+def _booking_id(reference):
+    """Booking id from a single booking payment reference (BOOKING-<id>)"""
+    if reference and reference.startswith('BOOKING-') and reference[len('BOOKING-'):].isdigit():
+        return int(reference[len('BOOKING-'):])
+    return None
+
+
+def get_cached_status(poll_url):
+    """Last known poller state for a poll URL: (status, raw Paynow status)"""
+    from app.models import PaynowPoll
+
+    if not poll_url:
+        return None, None
+    poll = PaynowPoll.query.filter_by(poll_url=poll_url).first()
+    if not poll:
+        return 'pending', None
+    return poll.status, poll.paynow_status
+
+
+class PaynowPoller:
+    """Single background thread fanning Paynow status checks out to a bounded pool"""
+
+    def __init__(self):
+        self.app = None
+        self.session = None
+        self._executor = None
+        self._thread = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        config = app.config
+        self.enabled = config.get('PAYNOW_POLLER_ENABLED', True)
+        self.worker_count = max(1, config.get('PAYNOW_POLL_WORKERS', 8))
+        self.batch_size = config.get('PAYNOW_POLL_BATCH_SIZE', 100)
+        self.poll_interval = config.get('PAYNOW_POLL_INTERVAL_SECONDS', 5)
+        self.backoff_base = config.get('PAYNOW_POLL_BACKOFF_SECONDS', 5)
+        self.backoff_max = config.get('PAYNOW_POLL_MAX_BACKOFF_SECONDS', 300)
+        self.timeout = config.get('PAYNOW_POLL_TIMEOUT_SECONDS', 10)
+        self.expire_after = timedelta(hours=config.get('PAYNOW_POLL_EXPIRE_HOURS', 48))
+        self.integration_key = config.get('PAYNOW_INTEGRATION_KEY')
+
+        # One keep-alive connection per pool thread
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.worker_count)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def backoff(self, attempts):
+        """Delay before the next poll of a URL that has been polled `attempts` times"""
+        return timedelta(seconds=min(self.backoff_max, self.backoff_base * (2 ** max(attempts - 1, 0))))
+
+    # ------------------------------------------------------------------
+    # Thread
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the poller thread once per process"""
+        if self._thread or self.app is None or not self.enabled:
+            return
+
+        # PAYNOW_POLLER_ENABLED=false disables it (run cycles with `flask poll-paynow`)
+        with self._start_lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._run, name='paynow-poller', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+    def wake(self):
+        """Poll right away, e.g. after a new payment was initiated"""
+        self._wakeup.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            processed = 0
+            with self.app.app_context():
+                try:
+                    processed = self.run_once()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Paynow poller error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    # ------------------------------------------------------------------
+    # Cycle
+    # ------------------------------------------------------------------
+
+    def discover(self):
+        """Create poll rows for outstanding poll URLs that do not have one yet"""
+        from app.models import PaynowPoll, Payment, Subscription, CreatorSubscription
+
+        known = select(PaynowPoll.poll_url)
+        sources = [
+            select(Payment.paynow_poll_url).where(
+                Payment.status == 'pending',
+                Payment.paynow_poll_url.isnot(None),
+                Payment.paynow_poll_url.notin_(known)
+            ),
+            select(Subscription.paynow_poll_url).where(
+                Subscription.status == 'pending',
+                Subscription.paynow_poll_url.isnot(None),
+                Subscription.paynow_poll_url.notin_(known)
+            ),
+            select(CreatorSubscription.paynow_poll_url).where(
+                CreatorSubscription.status.in_(['pending_payment', 'pending']),
+                CreatorSubscription.payment_verified.isnot(True),
+                CreatorSubscription.paynow_poll_url.isnot(None),
+                CreatorSubscription.paynow_poll_url.notin_(known)
+            )
+        ]
+
+        urls = set()
+        for query in sources:
+            urls.update(db.session.execute(query.distinct()).scalars())
+
+        now = datetime.utcnow()
+        for url in urls:
+            db.session.add(PaynowPoll(poll_url=url, status='pending', attempts=0, next_poll_at=now))
+
+        if urls:
+            try:
+                db.session.commit()
+            except Exception:
+                # Another process registered some of them first
+                db.session.rollback()
+        return len(urls)
+
+    def _claim_due(self):
+        """Lease a batch of due poll rows so other processes skip them"""
+        from app.models import PaynowPoll
+
+        now = datetime.utcnow()
+        rows = PaynowPoll.query.filter(
+            PaynowPoll.status == 'pending',
+            PaynowPoll.next_poll_at <= now
+        ).order_by(PaynowPoll.next_poll_at).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+        lease = now + timedelta(seconds=self.timeout * 2 + self.poll_interval)
+        claimed = [(row.id, row.poll_url) for row in rows]
+        for row in rows:
+            row.next_poll_at = lease
+        db.session.commit()
+
+        return claimed
+
+    def fetch_status(self, poll_url):
+        """Ask Paynow for one poll URL. Returns (outcome, raw status, error)."""
+        try:
+            response = self.session.post(poll_url, data={}, timeout=self.timeout)
+            response.raise_for_status()
+            outcome, raw_status = parse_status_response(response.text, self.integration_key)
+            return outcome, raw_status, None
+        except Exception as e:
+            return None, None, str(e)
+
+    def poll_many(self, poll_urls):
+        """Fetch statuses concurrently on the bounded pool. Returns url -> result."""
+        if self._executor is None:
+            with self._start_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.worker_count, thread_name_prefix='paynow-poll'
+                    )
+        return dict(zip(poll_urls, self._executor.map(self.fetch_status, poll_urls)))
+
+    def apply_results(self, results):
+        """
+        Record poll results and apply payment transitions in one transaction
+
+        Args:
+            results: dict poll_url -> (outcome, raw status, error)
+        """
+        from app.models import PaynowPoll
+        from app.services.payment_service import apply_paynow_paid, apply_paynow_cancelled
+
+        now = datetime.utcnow()
+        rows = PaynowPoll.query.filter(
+            PaynowPoll.poll_url.in_(list(results)),
+            PaynowPoll.status == 'pending'
+        ).with_for_update().all()
+
+        paid, cancelled = [], []
+        for row in rows:
+            outcome, raw_status, error = results[row.poll_url]
+            row.attempts = (row.attempts or 0) + 1
+            row.last_polled_at = now
+
+            if error:
+                row.last_error = error[:1000]
+            else:
+                row.last_error = None
+                row.paynow_status = raw_status
+
+            if outcome == 'paid':
+                row.status = 'paid'
+                paid.append(row.poll_url)
+            elif outcome == 'cancelled':
+                row.status = 'cancelled'
+                cancelled.append(row.poll_url)
+            elif row.created_at and now - row.created_at > self.expire_after:
+                row.status = 'expired'
+            else:
+                row.next_poll_at = now + self.backoff(row.attempts)
+
+        if paid:
+            apply_paynow_paid(paid)
+        if cancelled:
+            apply_paynow_cancelled(cancelled)
+        db.session.commit()
+
+        if paid or cancelled:
+            print(f"Paynow poller: {len(paid)} paid, {len(cancelled)} cancelled")
+        return len(rows)
+
+    def _resolve_poll_urls(self, events):
+        """Poll URL for each webhook event: from the callback itself, else via its payment"""
+        from app.models import Payment
+
+        resolved = {event.id: event.poll_url for event in events if event.poll_url}
+        unresolved = [event for event in events if event.id not in resolved]
+        if not unresolved:
+            return resolved
+
+        paynow_references = {event.paynow_reference for event in unresolved if event.paynow_reference}
+        booking_ids = {_booking_id(event.reference) for event in unresolved} - {None}
+
+        by_reference, by_booking = {}, {}
+        if paynow_references:
+            by_reference = dict(db.session.query(Payment.paynow_reference, Payment.paynow_poll_url).filter(
+                Payment.paynow_reference.in_(paynow_references), Payment.paynow_poll_url.isnot(None)
+            ))
+        if booking_ids:
+            by_booking = dict(db.session.query(Payment.booking_id, Payment.paynow_poll_url).filter(
+                Payment.booking_id.in_(booking_ids), Payment.paynow_poll_url.isnot(None)
+            ))
+
+        for event in unresolved:
+            poll_url = by_reference.get(event.paynow_reference) or by_booking.get(_booking_id(event.reference))
+            if poll_url:
+                resolved[event.id] = poll_url
+        return resolved
+
+    def process_webhook_events(self):
+        """Apply a batch of queued webhook events. Returns the number of events handled."""
+        from app.models import PaynowPoll, PaynowWebhookEvent
+        from app.services.payment_service import apply_paynow_paid, apply_paynow_cancelled
+
+        events = PaynowWebhookEvent.query.filter_by(state='queued').order_by(
+            PaynowWebhookEvent.id
+        ).limit(self.batch_size).with_for_update(skip_locked=True).all()
+        if not events:
+            return 0
+
+        now = datetime.utcnow()
+        try:
+            poll_urls = self._resolve_poll_urls(events)
+            polls = {
+                poll.poll_url: poll for poll in PaynowPoll.query.filter(
+                    PaynowPoll.poll_url.in_(set(poll_urls.values()))
+                ).with_for_update()
+            } if poll_urls else {}
+
+            paid, cancelled = set(), set()
+            for event in events:
+                event.attempts = (event.attempts or 0) + 1
+                event.processed_at = now
+                poll_url = poll_urls.get(event.id)
+                if not poll_url:
+                    event.state = 'ignored'
+                    event.last_error = 'No payment found for callback'
+                    continue
+
+                event.state = 'processed'
+                poll = polls.get(poll_url)
+                if poll is None:
+                    poll = PaynowPoll(poll_url=poll_url, status='pending', attempts=0, next_poll_at=now)
+                    db.session.add(poll)
+                    polls[poll_url] = poll
+                if poll.status in ('paid', 'cancelled'):
+                    continue
+
+                poll.paynow_status = (event.paynow_status or '').lower() or poll.paynow_status
+                outcome = classify_status(event.paynow_status)
+                if outcome == 'paid':
+                    poll.status = 'paid'
+                    paid.add(poll_url)
+                elif outcome == 'cancelled':
+                    poll.status = 'cancelled'
+                    cancelled.add(poll_url)
+
+            if paid:
+                apply_paynow_paid(list(paid))
+            if cancelled:
+                apply_paynow_cancelled(list(cancelled))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Paynow webhook processing error: {str(e)}")
+            # Retry the batch on the next cycle, giving up after a few attempts
+            for event in PaynowWebhookEvent.query.filter(PaynowWebhookEvent.id.in_([e.id for e in events])):
+                event.attempts = (event.attempts or 0) + 1
+                event.last_error = str(e)[:1000]
+                if event.attempts >= 5:
+                    event.state = 'failed'
+            db.session.commit()
+
+        return len(events)
+
+    def run_once(self):
+        """One webhook, discovery, claim, poll and apply cycle. Returns the number of items handled."""
+        handled = self.process_webhook_events()
+        self.discover()
+        claimed = self._claim_due()
+        if not claimed:
+            return handled
+
+        results = self.poll_many([poll_url for _, poll_url in claimed])
+        return handled + self.apply_results(results)
+
+
+# Singleton instance
+paynow_poller = PaynowPoller()
@@ -0,0 +1,180 @@
+"""
+Platform Fee Service - Cached per-brand platform fee resolution
+
+The fee a brand pays depends on its active subscription plan. It is read on
+every payment, escrow release and milestone release, but only changes when a
+subscription or plan changes, so resolved fees are cached per brand user for
+PLATFORM_FEE_CACHE_TTL seconds and invalidated by the code paths that change
+them.
+
+The cache lives in Redis (shared by all app instances) when REDIS_URL is
+reachable, otherwise in process memory. With the memory store, other
+processes see a change once their entry expires.
+
+Writers call invalidate_on_commit() before committing. The entry is dropped
+only after the commit succeeds, so a concurrent read cannot re-cache the old
+fee from the uncommitted state.
+"""
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.services.lazy_store import LazyStore
+
+DEFAULT_PLATFORM_FEE = 10.0
+
+# Seconds a resolved fee is served without re-reading the subscription
+PLATFORM_FEE_CACHE_TTL = int(os.getenv('PLATFORM_FEE_CACHE_TTL', 300))
+
+# Session.info key collecting invalidations until the transaction commits
+PENDING_INVALIDATIONS = 'platform_fee_invalidations'
+
+
+class MemoryFeeStore:
+    """In-process fee cache used when Redis is unavailable"""
+
+    def __init__(self):
+        self._fees = {}  # user_id -> (fee, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        entry = self._fees.get(user_id)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def set(self, user_id, fee, ttl):
+        with self._lock:
+            self._fees[user_id] = (fee, time.time() + ttl)
+
+    def delete(self, user_id):
+        with self._lock:
+            self._fees.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._fees.clear()
+
+
+class RedisFeeStore:
+    """Redis fee cache: one expiring key per brand user, plus a generation for clear()"""
+
+    KEY_PREFIX = 'platform_fee:'
+    GENERATION_KEY = 'platform_fee:generation'
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, user_id):
+        generation = self.client.get(self.GENERATION_KEY) or '0'
+        return f'{self.KEY_PREFIX}{generation}:{user_id}'
+
+    def get(self, user_id):
+        value = self.client.get(self._key(user_id))
+        return float(value) if value is not None else None
+
+    def set(self, user_id, fee, ttl):
+        self.client.set(self._key(user_id), fee, ex=ttl)
+
+    def delete(self, user_id):
+        self.client.delete(self._key(user_id))
+
+    def clear(self):
+        # Old generations age out on their TTL
+        self.client.incr(self.GENERATION_KEY)
+
+
+class PlatformFeeResolver:
+    """Resolves and caches the platform fee percentage per brand"""
+
+    def __init__(self, redis_url=None, ttl=PLATFORM_FEE_CACHE_TTL):
+        self.ttl = ttl
+        self._store = LazyStore('Platform fee cache', RedisFeeStore, MemoryFeeStore, redis_url)
+        self._brand_users = {}  # brand profile id -> user id, never changes
+
+    @property
+    def store(self):
+        """Redis store if it answered on first use, otherwise the in-memory store"""
+        return self._store.get()
+
+    def _safe(self, operation, *args, default=None):
+        try:
+            return operation(*args)
+        except Exception as e:
+            # The cache must never block a payment - fall through to the database
+            print(f"Platform fee cache error: {str(e)}")
+            return default
+
+    @staticmethod
+    def _load(user_id):
+        """Fee from the brand's active subscription plan, in one query"""
+        from app.models import Subscription, SubscriptionPlan
+
+        fee = db.session.query(SubscriptionPlan.platform_fee_percentage).join(
+            Subscription, Subscription.plan_id == SubscriptionPlan.id
+        ).filter(
+            Subscription.user_id == user_id,
+            Subscription.status == 'active'
+        ).order_by(Subscription.id.desc()).limit(1).scalar()
+
+        return float(fee) if fee is not None else DEFAULT_PLATFORM_FEE
+
+    def for_user(self, brand_user_id):
+        """Platform fee percentage for a brand's user id"""
+        user_id = int(brand_user_id)
+        fee = self._safe(self.store.get, user_id)
+        if fee is not None:
+            return fee
+
+        fee = self._load(user_id)
+        self._safe(self.store.set, user_id, fee, self.ttl)
+        return fee
+
+    def for_brand(self, brand_id):
+        """Platform fee percentage for a brand profile id"""
+        from app.models import BrandProfile
+
+        user_id = self._brand_users.get(brand_id)
+        if user_id is None:
+            user_id = db.session.query(BrandProfile.user_id).filter(BrandProfile.id == brand_id).scalar()
+            if user_id is None:
+                return DEFAULT_PLATFORM_FEE
+            self._brand_users[brand_id] = user_id
+        return self.for_user(user_id)
+
+    def invalidate(self, brand_user_id):
+        """Forget a brand's cached fee after its subscription changed"""
+        self._safe(self.store.delete, int(brand_user_id))
+
+    def invalidate_all(self):
+        """Forget every cached fee, e.g. after a plan was edited"""
+        self._safe(self.store.clear)
+
+    @staticmethod
+    def invalidate_on_commit(brand_user_id=None):
+        """Invalidate a brand's fee (or every fee, if None) once the current transaction commits"""
+        pending = db.session.info.setdefault(PENDING_INVALIDATIONS, set())
+        pending.add(int(brand_user_id) if brand_user_id is not None else None)
+
+
+# Singleton instance
+platform_fee_resolver = PlatformFeeResolver()
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending_invalidations(session):
+    pending = session.info.pop(PENDING_INVALIDATIONS, None)
+    if not pending:
+        return
+    if None in pending:
+        platform_fee_resolver.invalidate_all()
+        return
+    for user_id in pending:
+        platform_fee_resolver.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_invalidations(session):
+    session.info.pop(PENDING_INVALIDATIONS, None)
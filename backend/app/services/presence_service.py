@@ -0,0 +1,140 @@
+"""
+Presence Service - Tracks which users currently have the app open
+
+Each user has a set of live Socket.IO connections (sid -> expiry). A user is
+online while at least one connection has heartbeated within PRESENCE_TTL
+seconds, so sockets on a crashed worker age out on their own.
+
+State lives in Redis (shared by all app instances) when REDIS_URL is reachable,
+otherwise in process memory.
+"""
+import os
+import threading
+import time
+from app.services.lazy_store import LazyStore
+
+# Seconds a connection stays alive without a heartbeat
+PRESENCE_TTL = int(os.getenv('PRESENCE_TTL', 60))
+
+# Clients are expected to heartbeat well inside the TTL
+HEARTBEAT_INTERVAL = PRESENCE_TTL // 3
+
+
+class MemoryPresenceStore:
+    """In-process presence store used when Redis is unavailable"""
+
+    def __init__(self):
+        self._connections = {}  # user_id -> {sid: expires_at}
+        self._lock = threading.Lock()
+
+    def touch(self, user_id, sid, ttl):
+        with self._lock:
+            self._connections.setdefault(user_id, {})[sid] = time.time() + ttl
+
+    def remove(self, user_id, sid):
+        with self._lock:
+            sids = self._connections.get(user_id)
+            if sids is None:
+                return
+            sids.pop(sid, None)
+            if not sids:
+                del self._connections[user_id]
+
+    def counts(self, user_ids):
+        now = time.time()
+        result = {}
+        with self._lock:
+            for user_id in user_ids:
+                sids = self._connections.get(user_id, {})
+                # Drop expired connections while we are here
+                for sid in [s for s, expires_at in sids.items() if expires_at <= now]:
+                    del sids[sid]
+                if not sids:
+                    self._connections.pop(user_id, None)
+                result[user_id] = len(sids)
+        return result
+
+
+class RedisPresenceStore:
+    """Redis presence store: one sorted set per user, scored by connection expiry"""
+
+    KEY_PREFIX = 'presence:user:'
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, user_id):
+        return f'{self.KEY_PREFIX}{user_id}'
+
+    def touch(self, user_id, sid, ttl):
+        key = self._key(user_id)
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zadd(key, {sid: now + ttl})
+        pipe.zremrangebyscore(key, '-inf', now)
+        pipe.expire(key, ttl)
+        pipe.execute()
+
+    def remove(self, user_id, sid):
+        self.client.zrem(self._key(user_id), sid)
+
+    def counts(self, user_ids):
+        now = time.time()
+        pipe = self.client.pipeline()
+        for user_id in user_ids:
+            pipe.zcount(self._key(user_id), f'({now}', '+inf')
+        return dict(zip(user_ids, pipe.execute()))
+
+
+class PresenceService:
+    """Reference-counted, TTL based online presence registry keyed by user id"""
+
+    def __init__(self, redis_url=None, ttl=PRESENCE_TTL):
+        self.ttl = ttl
+        self._store = LazyStore('Presence tracking', RedisPresenceStore, MemoryPresenceStore, redis_url)
+
+    @property
+    def store(self):
+        """Redis store if it answered on first use, otherwise the in-memory store"""
+        return self._store.get()
+
+    def _safe(self, operation, *args, default=None):
+        try:
+            return operation(*args)
+        except Exception as e:
+            # Presence must never break sockets or notifications
+            print(f"Presence error: {str(e)}")
+            return default
+
+    def connect(self, user_id, sid):
+        """Register a new socket for a user"""
+        self._safe(self.store.touch, int(user_id), sid, self.ttl)
+
+    def heartbeat(self, user_id, sid):
+        """Extend a socket's lifetime by another TTL"""
+        self._safe(self.store.touch, int(user_id), sid, self.ttl)
+
+    def disconnect(self, user_id, sid):
+        """Remove a socket; the user stays online while other sockets remain"""
+        self._safe(self.store.remove, int(user_id), sid)
+
+    def socket_count(self, user_id):
+        """Number of live sockets for a user"""
+        counts = self._safe(self.store.counts, [int(user_id)], default={})
+        return counts.get(int(user_id), 0)
+
+    def is_online(self, user_id):
+        """True if the user has at least one live socket"""
+        return self.socket_count(user_id) > 0
+
+    def online_user_ids(self, user_ids):
+        """Bulk presence lookup - returns the subset of user_ids that are online"""
+        user_ids = list({int(uid) for uid in user_ids if uid is not None})
+        if not user_ids:
+            return set()
+        counts = self._safe(self.store.counts, user_ids, default={})
+        return {uid for uid, count in counts.items() if count > 0}
+
+
+# Singleton instance
+presence_service = PresenceService()
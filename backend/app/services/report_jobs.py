@@ -0,0 +1,225 @@
+"""
+Report Jobs - Admin reports run in the background with cached results
+
+An admin POSTs a report spec (report name plus parameters) and gets a job
+id back straight away. Jobs are written to the report_jobs table and run by
+a small pool of worker threads; when one finishes, a `report_job_completed`
+Socket.IO event goes to the `report_job_<id>` room, and clients that are not
+subscribed can poll the job instead.
+
+Each job is keyed by a sha256 of its normalized spec. A completed result is
+kept for REPORT_RESULT_TTL_SECONDS, and identical requests in that window
+(or while an identical job is still queued or running) get the existing job
+rather than running the report again. Expired jobs are purged by the workers.
+"""
+import hashlib
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_, update
+from app import db, socketio
+from app.services.report_service import normalize_spec, build_report
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+def hash_spec(spec):
+    """Content hash of a normalized report spec"""
+    canonical = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def job_room(job_id):
+    """Socket.IO room notified when a job finishes"""
+    return f'report_job_{job_id}'
+
+
+class ReportJobQueue:
+    """Bounded worker pool running queued report jobs"""
+
+    def __init__(self):
+        self.app = None
+        self._workers = []
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        config = app.config
+        self.worker_count = config.get('REPORT_JOB_WORKERS', 2)
+        self.ttl = timedelta(seconds=config.get('REPORT_RESULT_TTL_SECONDS', 900))
+        self.timeout = timedelta(seconds=config.get('REPORT_JOB_TIMEOUT_SECONDS', 300))
+        self.poll_interval = config.get('REPORT_JOB_POLL_INTERVAL_SECONDS', 10)
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def find_reusable(self, spec_hash):
+        """An unexpired result, or an identical job still in progress, for spec_hash"""
+        from app.models import ReportJob
+
+        now = datetime.utcnow()
+        return ReportJob.query.filter(
+            ReportJob.spec_hash == spec_hash,
+            or_(
+                and_(ReportJob.status == 'completed', ReportJob.expires_at > now),
+                and_(ReportJob.status.in_(ACTIVE_STATUSES), ReportJob.created_at > now - self.timeout)
+            )
+        ).order_by(ReportJob.created_at.desc()).first()
+
+    def submit(self, report, params=None, requested_by=None):
+        """
+        Queue a report, or reuse an identical job
+
+        Args:
+            report: Report name (see report_service.REPORTS)
+            params: Report parameters
+            requested_by: Admin user id
+
+        Returns:
+            tuple: (ReportJob, reused)
+
+        Raises:
+            ValueError: The report spec is invalid
+        """
+        from app.models import ReportJob
+
+        spec = normalize_spec(report, params)
+        spec_hash = hash_spec(spec)
+
+        job = self.find_reusable(spec_hash)
+        if job:
+            return job, True
+
+        job = ReportJob(
+            id=uuid.uuid4().hex,
+            report=spec['report'],
+            params=spec['params'],
+            spec_hash=spec_hash,
+            status='queued',
+            requested_by=requested_by
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self.start()
+        self._wakeup.set()
+        return job, False
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the worker threads once per process"""
+        if self._workers or self.app is None:
+            return
+
+        # REPORT_JOB_WORKERS=0 disables background runs (drain with `flask run-report-jobs`)
+        with self._start_lock:
+            if self._workers:
+                return
+            for index in range(self.worker_count):
+                worker = threading.Thread(target=self._run_worker, name=f'report-worker-{index}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def _run_worker(self):
+        while not self._stop.is_set():
+            processed = False
+            with self.app.app_context():
+                try:
+                    processed = self.process_next()
+                    if not processed:
+                        self.purge_expired()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Report worker error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _claim(self):
+        """Mark the oldest runnable job as running and return it"""
+        from app.models import ReportJob
+
+        now = datetime.utcnow()
+        candidates = ReportJob.query.filter(
+            or_(
+                ReportJob.status == 'queued',
+                # Jobs whose worker died mid-run
+                and_(ReportJob.status == 'running', ReportJob.started_at < now - self.timeout)
+            )
+        ).order_by(ReportJob.created_at).limit(5).all()
+
+        for job in candidates:
+            # Conditional update, so two workers never run the same job
+            claimed = db.session.execute(
+                update(ReportJob).where(
+                    ReportJob.id == job.id,
+                    ReportJob.status == job.status,
+                    ReportJob.started_at == job.started_at
+                ).values(status='running', started_at=now)
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return db.session.get(ReportJob, job.id)
+        return None
+
+    def process_next(self):
+        """Run one queued job. Returns True if a job was run."""
+        job = self._claim()
+        if job is None:
+            return False
+
+        try:
+            job.result = build_report(job.report, job.params)
+            job.status = 'completed'
+        except Exception as e:
+            db.session.rollback()
+            job.status = 'failed'
+            job.error = str(e)
+            print(f"Report job {job.id} ({job.report}) failed: {str(e)}")
+
+        now = datetime.utcnow()
+        job.completed_at = now
+        job.expires_at = now + self.ttl
+        db.session.commit()
+
+        self._notify(job)
+        return True
+
+    def _notify(self, job):
+        try:
+            socketio.emit('report_job_completed', {
+                'job_id': job.id,
+                'report': job.report,
+                'status': job.status
+            }, room=job_room(job.id), namespace='/')
+        except Exception as e:
+            print(f"Report job {job.id}: completion event not sent ({str(e)})")
+
+    def purge_expired(self):
+        """Delete finished jobs whose results have expired. Returns the number deleted."""
+        from app.models import ReportJob
+
+        deleted = ReportJob.query.filter(
+            ReportJob.status.in_(('completed', 'failed')),
+            ReportJob.expires_at < datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+
+# Singleton instance
+report_job_queue = ReportJobQueue()
@@ -0,0 +1,382 @@
+"""
+Report Service - Admin business intelligence reports
+
+Each report is a function returning a JSON-serializable dict. The admin
+report routes return them directly, and report jobs (see report_jobs) run
+them in the background and store the results. REPORTS maps a report name to
+its builder and the parameters it accepts, so a report spec can be validated
+and normalized before it is hashed.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from app import db
+from app.models import (
+    User, CreatorProfile, BrandProfile, Collaboration, Payment,
+    Booking, Review, Dispute, UserRiskScore
+)
+from app.services import rollup_service, risk_service
+
+
+# ============================================================================
+# GROWTH
+# ============================================================================
+
+def growth_report(days=30):
+    """Growth metrics - user acquisition and activation over the last `days` days"""
+    start_day = (datetime.utcnow() - timedelta(days=days)).date()
+
+    # Daily signups and activations from the growth rollup
+    daily = rollup_service.get_daily_series('growth_daily_rollup', start_day)
+
+    # Activation rate (users who made at least one booking)
+    total_users = sum(row['signups'] for row in daily.values())
+    activated_users = sum(row['activated_users'] for row in daily.values())
+    activation_rate = (activated_users / total_users * 100) if total_users > 0 else 0
+
+    # Current totals
+    active = User.is_active.is_(True)
+    total_creators, total_brands = db.session.query(
+        func.count(User.id).filter(active, User.user_type == 'creator'),
+        func.count(User.id).filter(active, User.user_type == 'brand')
+    ).one()
+
+    return {
+        'period_days': days,
+        'daily_signups': [
+            {
+                'date': str(day),
+                'total': row['signups'],
+                'creators': row['creator_signups'],
+                'brands': row['brand_signups']
+            }
+            for day, row in daily.items() if row['signups']
+        ],
+        'activation_rate': round(activation_rate, 2),
+        'total_users': total_users,
+        'activated_users': activated_users,
+        'current_totals': {
+            'creators': total_creators,
+            'brands': total_brands,
+            'total': total_creators + total_brands
+        }
+    }
+
+
+# ============================================================================
+# REVENUE
+# ============================================================================
+
+def revenue_report(months=6):
+    """Revenue metrics - platform earnings and transaction volume over the last `months` months"""
+    start_date = datetime.utcnow() - timedelta(days=months * 30)
+
+    # Monthly transaction volume, platform fees and refunds from the revenue rollup
+    revenue_by_month = {}
+    refunded_payments = 0
+    for day, row in rollup_service.get_daily_series('revenue_daily_rollup', start_date.date()).items():
+        month = revenue_by_month.setdefault(day.strftime('%Y-%m'), {'volume': 0, 'transactions': 0, 'fees': 0})
+        month['volume'] += float(row['gmv_amount'])
+        month['transactions'] += row['gmv_count']
+        month['fees'] += float(row['platform_fees'])
+        refunded_payments += row['refunded_count']
+
+    # Refund rate
+    total_payments = sum(month['transactions'] for month in revenue_by_month.values()) + refunded_payments
+    refund_rate = (refunded_payments / total_payments * 100) if total_payments > 0 else 0
+
+    # Top creators by revenue
+    top_creators = db.session.query(
+        CreatorProfile.id,
+        CreatorProfile.username,
+        func.sum(Collaboration.amount).label('total_earned'),
+        func.count(Collaboration.id).label('collaborations')
+    ).join(
+        Collaboration, CreatorProfile.id == Collaboration.creator_id
+    ).filter(
+        Collaboration.status == 'completed',
+        Collaboration.created_at >= start_date
+    ).group_by(
+        CreatorProfile.id, CreatorProfile.username
+    ).order_by(func.sum(Collaboration.amount).desc()).limit(10).all()
+
+    # Top brands by spend
+    top_brands = db.session.query(
+        BrandProfile.id,
+        BrandProfile.company_name,
+        func.sum(Booking.amount).label('total_spent'),
+        func.count(Booking.id).label('bookings')
+    ).join(
+        Booking, BrandProfile.id == Booking.brand_id
+    ).filter(
+        Booking.status.in_(['confirmed', 'completed']),
+        Booking.created_at >= start_date
+    ).group_by(
+        BrandProfile.id, BrandProfile.company_name
+    ).order_by(func.sum(Booking.amount).desc()).limit(10).all()
+
+    return {
+        'period_months': months,
+        'monthly_data': [
+            {
+                'month': month,
+                'volume': data['volume'],
+                'fees': data['fees'],
+                'transactions': data['transactions']
+            }
+            for month, data in sorted(revenue_by_month.items())
+            if data['transactions'] or data['fees']
+        ],
+        'refund_rate': round(refund_rate, 2),
+        'top_creators': [
+            {
+                'id': c.id,
+                'name': c.username,
+                'total_earned': float(c.total_earned or 0),
+                'collaborations': c.collaborations
+            }
+            for c in top_creators
+        ],
+        'top_brands': [
+            {
+                'id': b.id,
+                'name': b.company_name,
+                'total_spent': float(b.total_spent or 0),
+                'bookings': b.bookings
+            }
+            for b in top_brands
+        ]
+    }
+
+
+# ============================================================================
+# MARKETPLACE HEALTH
+# ============================================================================
+
+def marketplace_health_report():
+    """Marketplace health metrics - collaboration quality and delivery"""
+    # Active vs completed ratio and on-time delivery in one pass
+    completed = Collaboration.status == 'completed'
+    with_dates = completed & Collaboration.expected_completion_date.isnot(None) & \
+        Collaboration.actual_completion_date.isnot(None)
+    active_collabs, completed_collabs, completed_on_time, completed_with_dates = db.session.query(
+        func.count(Collaboration.id).filter(Collaboration.status == 'in_progress'),
+        func.count(Collaboration.id).filter(completed),
+        func.count(Collaboration.id).filter(
+            with_dates, Collaboration.actual_completion_date <= Collaboration.expected_completion_date
+        ),
+        func.count(Collaboration.id).filter(with_dates)
+    ).one()
+    total_collabs = active_collabs + completed_collabs
+
+    # Dispute rate
+    total_disputes = Dispute.query.count()
+    dispute_rate = (total_disputes / total_collabs * 100) if total_collabs > 0 else 0
+
+    on_time_rate = (completed_on_time / completed_with_dates * 100) if completed_with_dates > 0 else 0
+
+    # Cancellation rate by month (last 6 months) from the marketplace rollup
+    six_months_ago = datetime.utcnow() - timedelta(days=180)
+
+    cancellation_by_month = {}
+    for day, row in rollup_service.get_daily_series('marketplace_daily_rollup', six_months_ago.date()).items():
+        month = cancellation_by_month.setdefault(day.strftime('%Y-%m'), {'total': 0, 'cancelled': 0})
+        month['total'] += row['collaborations_created']
+        month['cancelled'] += row['collaborations_cancelled']
+
+    # Average rating
+    avg_rating = db.session.query(func.avg(Review.rating)).scalar() or 0
+    total_reviews = Review.query.count()
+
+    return {
+        'collaboration_ratio': {
+            'active': active_collabs,
+            'completed': completed_collabs,
+            'total': total_collabs
+        },
+        'dispute_rate': round(dispute_rate, 2),
+        'on_time_delivery_rate': round(on_time_rate, 2),
+        'cancellation_by_month': [
+            {
+                'month': month,
+                'total': data['total'],
+                'cancelled': data['cancelled'],
+                'rate': round((data['cancelled'] / data['total'] * 100) if data['total'] > 0 else 0, 2)
+            }
+            for month, data in sorted(cancellation_by_month.items())
+            if data['total']
+        ],
+        'average_rating': round(float(avg_rating), 2),
+        'total_reviews': total_reviews
+    }
+
+
+# ============================================================================
+# RISK
+# ============================================================================
+
+def _flagged(column, minimum, limit=None):
+    query = db.session.query(
+        User.id, User.email, User.user_type, column.label('signal')
+    ).join(
+        UserRiskScore, UserRiskScore.user_id == User.id
+    ).filter(column >= minimum).order_by(column.desc(), User.id)
+    return query.limit(limit).all() if limit else query.all()
+
+
+def risk_report():
+    """Risk metrics - flagged users and suspicious activity"""
+    # Per-user signals come from user_risk_scores, rebuilt nightly and
+    # updated as disputes, cancellations and failed payments happen
+    if risk_service.last_refreshed() is None:
+        risk_service.refresh_risk_scores()
+
+    users_with_disputes = _flagged(UserRiskScore.dispute_count, 2)
+
+    # Creators, then brands, with multiple cancellations in the last 30 days
+    users_with_cancellations = (
+        _flagged(UserRiskScore.creator_cancellations, 2) + _flagged(UserRiskScore.brand_cancellations, 2)
+    )
+
+    # Failed payment accounts
+    failed_payment_users = _flagged(UserRiskScore.failed_payments, 1, limit=20)
+
+    # Highest composite scores
+    highest_risk_users = db.session.query(User.email, User.user_type, UserRiskScore).join(
+        UserRiskScore, UserRiskScore.user_id == User.id
+    ).order_by(UserRiskScore.score.desc(), User.id).limit(20).all()
+
+    # Suspended accounts log
+    suspended_users = User.query.filter_by(is_active=False).order_by(
+        User.updated_at.desc()
+    ).limit(20).all()
+
+    # High-value transactions (top 20)
+    high_value_transactions = db.session.query(
+        Payment.id,
+        Payment.amount,
+        Payment.status,
+        Payment.created_at,
+        Booking.id.label('booking_id'),
+        BrandProfile.company_name,
+        CreatorProfile.username
+    ).join(
+        Booking, Payment.booking_id == Booking.id
+    ).join(
+        BrandProfile, Booking.brand_id == BrandProfile.id
+    ).join(
+        CreatorProfile, Booking.creator_id == CreatorProfile.id
+    ).order_by(Payment.amount.desc()).limit(20).all()
+
+    return {
+        'users_with_multiple_disputes': [
+            {
+                'user_id': u.id,
+                'email': u.email,
+                'user_type': u.user_type,
+                'dispute_count': u.signal
+            }
+            for u in users_with_disputes
+        ],
+        'users_with_recent_cancellations': [
+            {
+                'user_id': u.id,
+                'email': u.email,
+                'user_type': u.user_type,
+                'cancellation_count': u.signal
+            }
+            for u in users_with_cancellations
+        ],
+        'failed_payment_accounts': [
+            {
+                'user_id': u.id,
+                'email': u.email,
+                'user_type': u.user_type,
+                'failed_count': u.signal
+            }
+            for u in failed_payment_users
+        ],
+        'highest_risk_users': [
+            {
+                'email': email,
+                'user_type': user_type,
+                **score.to_dict()
+            }
+            for email, user_type, score in highest_risk_users
+        ],
+        'scores_computed_at': risk_service.last_refreshed().isoformat(),
+        'suspended_accounts': [
+            {
+                'user_id': u.id,
+                'email': u.email,
+                'user_type': u.user_type,
+                'suspended_at': u.updated_at.isoformat()
+            }
+            for u in suspended_users
+        ],
+        'high_value_transactions': [
+            {
+                'payment_id': t.id,
+                'amount': float(t.amount),
+                'status': t.status,
+                'date': t.created_at.isoformat(),
+                'booking_id': t.booking_id,
+                'brand': t.company_name,
+                'creator': t.username
+            }
+            for t in high_value_transactions
+        ]
+    }
+
+
+# ============================================================================
+# REPORT SPECS
+# ============================================================================
+
+# name -> (builder, {parameter: (default, allowed values)})
+REPORTS = {
+    'growth': (growth_report, {'days': (30, (7, 30, 90, 180, 365))}),
+    'revenue': (revenue_report, {'months': (6, (1, 3, 6, 12))}),
+    'marketplace-health': (marketplace_health_report, {}),
+    'risk': (risk_report, {}),
+}
+
+
+def normalize_spec(report, params=None):
+    """
+    Validate a report spec and fill in defaults
+
+    Args:
+        report: Report name, a key of REPORTS
+        params: Report parameters (missing ones take their defaults)
+
+    Returns:
+        dict: {'report': name, 'params': {...}} with every parameter set
+
+    Raises:
+        ValueError: Unknown report or parameter, or a value that is not allowed
+    """
+    if report not in REPORTS:
+        raise ValueError(f'Unknown report: {report}')
+    accepted = REPORTS[report][1]
+    params = params or {}
+
+    unknown = set(params) - set(accepted)
+    if unknown:
+        raise ValueError(f'Unknown parameters for {report}: {", ".join(sorted(unknown))}')
+
+    normalized = {}
+    for name, (default, allowed) in accepted.items():
+        try:
+            value = int(params.get(name, default))
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} must be an integer')
+        if value not in allowed:
+            raise ValueError(f'{name} must be one of {", ".join(str(v) for v in allowed)}')
+        normalized[name] = value
+    return {'report': report, 'params': normalized}
+
+
+def build_report(report, params=None):
+    """Run a report from its spec"""
+    spec = normalize_spec(report, params)
+    return REPORTS[report][0](**spec['params'])
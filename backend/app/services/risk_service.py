@@ -0,0 +1,259 @@
+"""
+Risk Service - Precomputed per-user risk signals behind the admin risk report
+
+user_risk_scores holds, for every user with at least one signal, their
+dispute count, creator and brand cancellations over the last 30 days, failed
+booking payments and a weighted composite score. The admin risk report reads
+it with indexed ordering instead of joining disputes, collaborations and
+bookings on every request.
+
+The table is rebuilt nightly (scripts/compute_risk_scores.py or the
+`compute-risk-scores` CLI command), which also ages cancellations out of the
+30 day window. In between, a Session after_flush hook recomputes the rows of
+the users involved whenever a dispute is raised, a collaboration is cancelled
+or a booking payment fails, inside the same transaction as the change. Both
+paths upsert, so concurrent writers for the same user do not collide.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect, select, func, union
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app import db
+from app.models import (
+    UserRiskScore, RollupWatermark, Dispute, Collaboration, Booking, CreatorProfile, BrandProfile, ActivityEvent
+)
+# Registers its after_flush hook first: the cancellation events it writes are
+# read when the hook below rescores the same flush
+from app.services import activity_service  # noqa: F401
+
+RISK_SCORES = 'user_risk_scores'
+
+# Cancellations older than this no longer count towards a user's risk
+CANCELLATION_WINDOW = timedelta(days=30)
+
+# Composite score = sum of each signal times its weight
+RISK_WEIGHTS = {
+    'dispute_count': 3,
+    'creator_cancellations': 2,
+    'brand_cancellations': 2,
+    'failed_payments': 1,
+}
+
+# Users recomputed per statement when scoring a set of users
+RISK_BATCH_SIZE = 500
+
+# Dialect -> INSERT construct supporting ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+# ---------------------------------------------------------------------------
+# Computing scores
+# ---------------------------------------------------------------------------
+
+def _dispute_counts(user_ids):
+    """Disputes each user raised or was the subject of, counted once per dispute"""
+    raised = select(Dispute.id, Dispute.raised_by_user_id.label('user_id'))
+    against = select(Dispute.id, Dispute.against_user_id.label('user_id'))
+    if user_ids is not None:
+        raised = raised.where(Dispute.raised_by_user_id.in_(user_ids))
+        against = against.where(Dispute.against_user_id.in_(user_ids))
+
+    # Two indexed lookups instead of an OR join; UNION drops self-disputes counted twice
+    parties = union(raised, against).subquery()
+    return select(parties.c.user_id, func.count()).group_by(parties.c.user_id)
+
+
+def _cancelled_at():
+    """
+    When each collaboration was cancelled
+
+    Dated by its latest collaboration_cancelled activity event, which never
+    moves (collaborations.updated_at changes again on later edits). A
+    collaboration created already cancelled has no such event and is dated by
+    its creation.
+    """
+    cancelled_event = select(func.max(ActivityEvent.created_at)).where(
+        ActivityEvent.source_type == 'collaboration',
+        ActivityEvent.source_id == Collaboration.id,
+        ActivityEvent.event_type == 'collaboration_cancelled'
+    ).scalar_subquery()
+    return func.coalesce(cancelled_event, Collaboration.created_at)
+
+
+def _cancellation_counts(profile_model, profile_column, user_ids, since):
+    query = select(profile_model.user_id, func.count(Collaboration.id)).join(
+        Collaboration, profile_column == profile_model.id
+    ).where(
+        Collaboration.status == 'cancelled',
+        _cancelled_at() >= since
+    ).group_by(profile_model.user_id)
+    if user_ids is not None:
+        query = query.where(profile_model.user_id.in_(user_ids))
+    return query
+
+
+def _failed_payment_counts(user_ids):
+    query = select(BrandProfile.user_id, func.count(Booking.id)).join(
+        Booking, Booking.brand_id == BrandProfile.id
+    ).where(Booking.payment_status == 'failed').group_by(BrandProfile.user_id)
+    if user_ids is not None:
+        query = query.where(BrandProfile.user_id.in_(user_ids))
+    return query
+
+
+def compute_risk_scores(connection, user_ids=None):
+    """
+    Risk signals per user, from the source tables
+
+    Args:
+        connection: Connection to read through (the session's, so that
+            unflushed changes in a flush hook are visible)
+        user_ids: Only score these users (None: everyone)
+
+    Returns:
+        dict: user_id -> user_risk_scores row, for users with any signal
+    """
+    since = datetime.utcnow() - CANCELLATION_WINDOW
+    signals = {
+        'dispute_count': _dispute_counts(user_ids),
+        'creator_cancellations': _cancellation_counts(CreatorProfile, Collaboration.creator_id, user_ids, since),
+        'brand_cancellations': _cancellation_counts(BrandProfile, Collaboration.brand_id, user_ids, since),
+        'failed_payments': _failed_payment_counts(user_ids),
+    }
+
+    now = datetime.utcnow()
+    scores = {}
+    for column, query in signals.items():
+        for user_id, count in connection.execute(query):
+            row = scores.setdefault(user_id, {'user_id': user_id, **dict.fromkeys(RISK_WEIGHTS, 0)})
+            row[column] = count
+
+    for row in scores.values():
+        row['score'] = sum(row[column] * weight for column, weight in RISK_WEIGHTS.items())
+        row['computed_at'] = now
+    return scores
+
+
+def _upsert(connection, scores):
+    """
+    Write scores with INSERT ... ON CONFLICT (user_id) DO UPDATE
+
+    Two transactions scoring the same user at once both succeed (the later
+    write wins) instead of the second failing on the primary key.
+    """
+    if not scores:
+        return
+    table = UserRiskScore.__table__
+    insert = UPSERT_INSERTS[connection.dialect.name](table)
+    connection.execute(
+        insert.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={column: insert.excluded[column] for column in (*RISK_WEIGHTS, 'score', 'computed_at')}
+        ),
+        list(scores.values())
+    )
+
+
+def _store(connection, scores, user_ids):
+    """Make the stored rows of user_ids match scores, dropping users left without a signal"""
+    _upsert(connection, scores)
+    cleared = set(user_ids) - set(scores)
+    if cleared:
+        table = UserRiskScore.__table__
+        connection.execute(table.delete().where(table.c.user_id.in_(cleared)))
+
+
+def update_risk_scores(user_ids, connection=None):
+    """
+    Recompute the stored risk rows of a set of users
+
+    Args:
+        user_ids: Users whose disputes, cancellations or payments changed
+        connection: Connection to write through (default: the session's)
+    """
+    connection = connection or db.session.connection()
+    user_ids = sorted(set(user_ids))
+    for start in range(0, len(user_ids), RISK_BATCH_SIZE):
+        batch = user_ids[start:start + RISK_BATCH_SIZE]
+        _store(connection, compute_risk_scores(connection, batch), batch)
+
+
+def refresh_risk_scores():
+    """
+    Rebuild user_risk_scores from scratch (the nightly job)
+
+    Returns:
+        int: Number of users with a risk signal
+    """
+    started = datetime.utcnow()
+    connection = db.session.connection()
+    scores = compute_risk_scores(connection)
+    _upsert(connection, scores)
+
+    # Every user scored above was written at or after started; older rows
+    # belong to users who no longer have a signal
+    table = UserRiskScore.__table__
+    connection.execute(table.delete().where(table.c.computed_at < started))
+
+    state = db.session.get(RollupWatermark, RISK_SCORES)
+    if state is None:
+        state = RollupWatermark(name=RISK_SCORES)
+        db.session.add(state)
+    state.watermark = started
+    state.refreshed_at = datetime.utcnow()
+    db.session.commit()
+    return len(scores)
+
+
+def last_refreshed():
+    """When the nightly rebuild last finished, or None if it never ran"""
+    state = db.session.get(RollupWatermark, RISK_SCORES)
+    return state.refreshed_at if state else None
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates
+# ---------------------------------------------------------------------------
+
+def _changed(obj, attribute, value):
+    history = inspect(obj).attrs[attribute].history
+    return value in (history.added or ()) or value in (history.deleted or ())
+
+
+def _profile_user_ids(connection, profile_model, profile_ids):
+    if not profile_ids:
+        return set()
+    return set(connection.execute(
+        select(profile_model.user_id).where(profile_model.id.in_(profile_ids))
+    ).scalars())
+
+
+@event.listens_for(Session, 'after_flush')
+def _rescore_flushed_users(session, flush_context):
+    """Recompute the risk rows of users touched by disputes, cancellations or failed payments in this flush"""
+    user_ids, creator_ids, brand_ids = set(), set(), set()
+
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, Dispute):
+            user_ids.update((obj.raised_by_user_id, obj.against_user_id))
+        elif isinstance(obj, Collaboration) and obj.status == 'cancelled':
+            creator_ids.add(obj.creator_id)
+            brand_ids.add(obj.brand_id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Collaboration) and _changed(obj, 'status', 'cancelled'):
+            creator_ids.add(obj.creator_id)
+            brand_ids.add(obj.brand_id)
+        elif isinstance(obj, Booking) and _changed(obj, 'payment_status', 'failed'):
+            brand_ids.add(obj.brand_id)
+
+    if not (user_ids or creator_ids or brand_ids):
+        return
+
+    connection = session.connection()
+    user_ids |= _profile_user_ids(connection, CreatorProfile, creator_ids - {None})
+    user_ids |= _profile_user_ids(connection, BrandProfile, brand_ids - {None})
+    update_risk_scores(user_ids - {None}, connection)
@@ -0,0 +1,446 @@
+"""
+Rollup Service - Incrementally maintained daily rollup tables for admin statistics
+
+Each rollup keeps a watermark in rollup_watermarks. A refresh only recomputes
+the days touched by source rows updated since the previous watermark, so its
+cost follows recent activity rather than total history. Readers combine the
+rollup (days before today) with a small live query for today.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import (
+    Payment, Booking, User, BrandProfile, Collaboration, WalletTransaction, ActivityEvent,
+    PaymentDailyRollup, GrowthDailyRollup, RevenueDailyRollup, MarketplaceDailyRollup, RollupWatermark
+)
+
+# Re-scan rows updated this long before the last watermark, to catch
+# transactions that flushed before the previous refresh but committed after it
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Endpoints refresh a rollup on read when it is older than this
+ROLLUP_MAX_AGE = timedelta(minutes=5)
+
+
+def day_of(column):
+    """UTC calendar day of a timestamp column, typed as a date on every backend"""
+    return func.date(column, type_=db.Date)
+
+
+def _get_watermark(name):
+    state = db.session.get(RollupWatermark, name)
+    if state is None:
+        state = RollupWatermark(name=name)
+        db.session.add(state)
+    return state
+
+
+def is_stale(name, max_age=ROLLUP_MAX_AGE):
+    """True if a rollup has never been refreshed or was refreshed more than max_age ago"""
+    state = db.session.get(RollupWatermark, name)
+    return state is None or state.refreshed_at is None or datetime.utcnow() - state.refreshed_at > max_age
+
+
+# ============================================================================
+# PAYMENTS
+# ============================================================================
+
+def _payment_days_to_refresh(since):
+    """Days whose payment totals may have changed since the watermark (None: all)"""
+    if since is None:
+        return None
+
+    rows = db.session.query(day_of(Payment.created_at), day_of(Payment.verified_at)).filter(
+        Payment.updated_at >= since - WATERMARK_OVERLAP
+    ).distinct().all()
+
+    days = set()
+    for created, verified in rows:
+        days.update(day for day in (created, verified) if day)
+    return days
+
+
+def refresh_payment_daily_rollup():
+    """
+    Recompute payment_daily_rollup for every day touched since the last refresh
+
+    Returns:
+        int: Number of days recomputed
+    """
+    started = datetime.utcnow()
+    state = _get_watermark('payment_daily_rollup')
+    days = _payment_days_to_refresh(state.watermark)
+    if days is not None and not days:
+        state.watermark = started
+        state.refreshed_at = datetime.utcnow()
+        db.session.commit()
+        return 0
+
+    completed = Payment.status == 'completed'
+    created_day = day_of(Payment.created_at)
+    verified_day = day_of(Payment.verified_at)
+
+    by_created = db.session.query(
+        created_day, func.count(Payment.id), func.coalesce(func.sum(Payment.amount), 0)
+    ).filter(completed)
+    by_verified = db.session.query(
+        verified_day, func.count(Payment.id), func.coalesce(func.sum(Payment.amount), 0)
+    ).filter(completed, Payment.verified_at.isnot(None))
+
+    if days is not None:
+        by_created = by_created.filter(created_day.in_(days))
+        by_verified = by_verified.filter(verified_day.in_(days))
+
+    totals = {}
+    for day, count, amount in by_created.group_by(created_day):
+        totals.setdefault(day, [0, 0, 0, 0])[0:2] = [count, amount]
+    for day, count, amount in by_verified.group_by(verified_day):
+        totals.setdefault(day, [0, 0, 0, 0])[2:4] = [count, amount]
+
+    # Days that no longer have any completed payments are reset to zero
+    for day in days or ():
+        totals.setdefault(day, [0, 0, 0, 0])
+
+    try:
+        query = PaymentDailyRollup.query
+        if days is not None:
+            query = query.filter(PaymentDailyRollup.day.in_(days))
+        query.delete(synchronize_session=False)
+
+        now = datetime.utcnow()
+        db.session.add_all([
+            PaymentDailyRollup(
+                day=day,
+                completed_count=completed_count,
+                completed_amount=completed_amount,
+                verified_count=verified_count,
+                verified_amount=verified_amount,
+                refreshed_at=now
+            )
+            for day, (completed_count, completed_amount, verified_count, verified_amount) in totals.items()
+        ])
+
+        state.watermark = started
+        state.refreshed_at = now
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent refresh wrote the same days first
+        db.session.rollback()
+        return 0
+
+    return len(totals)
+
+
+def get_payment_statistics():
+    """
+    Admin payment statistics in a fixed number of small queries
+
+    Historical totals come from payment_daily_rollup (days before today); today's
+    figures and pending items come from live aggregates restricted by index.
+    """
+    if is_stale('payment_daily_rollup'):
+        refresh_payment_daily_rollup()
+
+    today = datetime.utcnow().date()
+    today_start = datetime.combine(today, datetime.min.time())
+    month_start = today.replace(day=1)
+
+    pending = Payment.status == 'pending'
+    completed_today = (Payment.status == 'completed') & (Payment.created_at >= today_start)
+    verified_today = (Payment.status == 'completed') & (Payment.verified_at >= today_start)
+
+    live = db.session.query(
+        func.count(Payment.id).filter(pending),
+        func.coalesce(func.sum(Payment.amount).filter(pending), 0),
+        func.count(Payment.id).filter(completed_today),
+        func.coalesce(func.sum(Payment.amount).filter(completed_today), 0),
+        func.count(Payment.id).filter(verified_today),
+        func.coalesce(func.sum(Payment.amount).filter(verified_today), 0)
+    ).filter(or_(
+        pending,
+        Payment.created_at >= today_start,
+        Payment.verified_at >= today_start
+    )).one()
+
+    # Bookings with pending proof of payment
+    pending_booking_count, pending_booking_amount = db.session.query(
+        func.count(Booking.id),
+        func.coalesce(func.sum(Booking.amount), 0)
+    ).filter(
+        Booking.payment_status == 'pending',
+        Booking.proof_of_payment.isnot(None)
+    ).one()
+
+    in_month = PaymentDailyRollup.day >= month_start
+    history = db.session.query(
+        func.coalesce(func.sum(PaymentDailyRollup.completed_count), 0),
+        func.coalesce(func.sum(PaymentDailyRollup.completed_amount), 0),
+        func.coalesce(func.sum(PaymentDailyRollup.completed_count).filter(in_month), 0),
+        func.coalesce(func.sum(PaymentDailyRollup.completed_amount).filter(in_month), 0)
+    ).filter(PaymentDailyRollup.day < today).one()
+
+    return {
+        'pending_count': live[0] + pending_booking_count,
+        'pending_amount': float(live[1]) + float(pending_booking_amount),
+        'verified_today_count': live[4],
+        'verified_today_amount': float(live[5]),
+        'month_count': int(history[2]) + live[2],
+        'month_amount': float(history[3]) + float(live[3]),
+        'total_verified_count': int(history[0]) + live[2],
+        'total_verified_amount': float(history[1]) + float(live[3])
+    }
+
+
+# ============================================================================
+# REPORT ROLLUPS (growth, revenue, marketplace health)
+# ============================================================================
+#
+# Each report rollup is described by a touched-days function (which days may
+# have changed since a timestamp) and a compute function (the rollup values
+# for a set of days, or for all days when given None). The same compute
+# function fills the table on refresh and answers today's figures live.
+
+# Bookings that count as a brand having activated
+ACTIVATING_BOOKING_STATUSES = ('confirmed', 'completed')
+
+# Payments that count towards transaction volume
+SETTLED_PAYMENT_STATUSES = ('completed', 'paid')
+
+
+def _start_of(day):
+    return datetime.combine(day, datetime.min.time())
+
+
+def _on_days(query, column, days):
+    """Restrict query to rows whose column falls on one of days (all rows if None)"""
+    if days is None:
+        return query
+    # The range bound lets the column's index do the work before the per-day match
+    return query.filter(and_(
+        column >= _start_of(min(days)),
+        column < _start_of(max(days) + timedelta(days=1)),
+        day_of(column).in_(days)
+    ))
+
+
+def _distinct_days(*queries):
+    days = set()
+    for query in queries:
+        days.update(day for (day,) in query.distinct() if day)
+    return days
+
+
+def _merge(totals, rows, *columns):
+    for day, *values in rows:
+        totals.setdefault(day, {}).update(zip(columns, values))
+
+
+def _growth_touched_days(since):
+    created_day = day_of(User.created_at)
+    return _distinct_days(
+        db.session.query(created_day).filter(User.created_at >= since),
+        db.session.query(created_day).join(
+            BrandProfile, BrandProfile.user_id == User.id
+        ).join(
+            Booking, Booking.brand_id == BrandProfile.id
+        ).filter(Booking.updated_at >= since)
+    )
+
+
+def _compute_growth(days):
+    created_day = day_of(User.created_at)
+    totals = {}
+
+    signups = db.session.query(
+        created_day,
+        func.count(User.id),
+        func.count(User.id).filter(User.user_type == 'creator'),
+        func.count(User.id).filter(User.user_type == 'brand')
+    )
+    _merge(totals, _on_days(signups, User.created_at, days).group_by(created_day),
+           'signups', 'creator_signups', 'brand_signups')
+
+    activated = db.session.query(
+        created_day, func.count(func.distinct(User.id))
+    ).join(
+        BrandProfile, BrandProfile.user_id == User.id
+    ).join(
+        Booking, Booking.brand_id == BrandProfile.id
+    ).filter(Booking.status.in_(ACTIVATING_BOOKING_STATUSES))
+    _merge(totals, _on_days(activated, User.created_at, days).group_by(created_day), 'activated_users')
+
+    return totals
+
+
+def _revenue_touched_days(since):
+    return _distinct_days(
+        db.session.query(day_of(Payment.created_at)).filter(Payment.updated_at >= since),
+        db.session.query(day_of(WalletTransaction.created_at)).filter(WalletTransaction.updated_at >= since)
+    )
+
+
+def _compute_revenue(days):
+    totals = {}
+
+    payment_day = day_of(Payment.created_at)
+    settled = Payment.status.in_(SETTLED_PAYMENT_STATUSES)
+    payments = db.session.query(
+        payment_day,
+        func.count(Payment.id).filter(settled),
+        func.coalesce(func.sum(Payment.amount).filter(settled), 0),
+        func.count(Payment.id).filter(Payment.status == 'refunded')
+    ).filter(Payment.status.in_(SETTLED_PAYMENT_STATUSES + ('refunded',)))
+    _merge(totals, _on_days(payments, Payment.created_at, days).group_by(payment_day),
+           'gmv_count', 'gmv_amount', 'refunded_count')
+
+    fee_day = day_of(WalletTransaction.created_at)
+    fees = db.session.query(
+        fee_day, func.coalesce(func.sum(WalletTransaction.platform_fee), 0)
+    ).filter(
+        WalletTransaction.transaction_type == 'earning',
+        WalletTransaction.platform_fee.isnot(None)
+    )
+    _merge(totals, _on_days(fees, WalletTransaction.created_at, days).group_by(fee_day), 'platform_fees')
+
+    return totals
+
+
+def _cancellation_events():
+    # Cancellations are dated by their activity event, which never moves -
+    # collaborations.updated_at changes again on later edits
+    return and_(
+        ActivityEvent.category == 'collaborations',
+        ActivityEvent.event_type == 'collaboration_cancelled'
+    )
+
+
+def _marketplace_touched_days(since):
+    return _distinct_days(
+        db.session.query(day_of(Collaboration.created_at)).filter(Collaboration.created_at >= since),
+        db.session.query(day_of(ActivityEvent.created_at)).filter(
+            _cancellation_events(), ActivityEvent.created_at >= since
+        )
+    )
+
+
+def _compute_marketplace(days):
+    totals = {}
+
+    created_day = day_of(Collaboration.created_at)
+    created = db.session.query(created_day, func.count(Collaboration.id))
+    _merge(totals, _on_days(created, Collaboration.created_at, days).group_by(created_day),
+           'collaborations_created')
+
+    cancelled_day = day_of(ActivityEvent.created_at)
+    cancelled = db.session.query(
+        cancelled_day, func.count(func.distinct(ActivityEvent.source_id))
+    ).filter(_cancellation_events())
+    _merge(totals, _on_days(cancelled, ActivityEvent.created_at, days).group_by(cancelled_day),
+           'collaborations_cancelled')
+
+    return totals
+
+
+# rollup table name -> (model, touched days since, compute for days)
+REPORT_ROLLUPS = {
+    'growth_daily_rollup': (GrowthDailyRollup, _growth_touched_days, _compute_growth),
+    'revenue_daily_rollup': (RevenueDailyRollup, _revenue_touched_days, _compute_revenue),
+    'marketplace_daily_rollup': (MarketplaceDailyRollup, _marketplace_touched_days, _compute_marketplace),
+}
+
+
+def refresh_report_rollup(name):
+    """
+    Recompute a report rollup for every day touched since its last refresh
+
+    The first refresh builds the whole history; later ones only recompute the
+    trailing days that recent activity touched.
+
+    Returns:
+        int: Number of days recomputed
+    """
+    model, touched_days, compute = REPORT_ROLLUPS[name]
+
+    started = datetime.utcnow()
+    state = _get_watermark(name)
+    days = touched_days(state.watermark - WATERMARK_OVERLAP) if state.watermark else None
+    if days is not None and not days:
+        state.watermark = started
+        state.refreshed_at = datetime.utcnow()
+        db.session.commit()
+        return 0
+
+    totals = compute(days)
+
+    # Days that no longer have any activity are reset to zero
+    for day in days or ():
+        totals.setdefault(day, {})
+
+    try:
+        query = model.query
+        if days is not None:
+            query = query.filter(model.day.in_(days))
+        query.delete(synchronize_session=False)
+
+        now = datetime.utcnow()
+        db.session.add_all([model(day=day, refreshed_at=now, **values) for day, values in totals.items()])
+
+        state.watermark = started
+        state.refreshed_at = now
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent refresh wrote the same days first
+        db.session.rollback()
+        return 0
+
+    return len(totals)
+
+
+def reset_report_rollup(name):
+    """
+    Forget a rollup's watermark so the next refresh rebuilds its whole history
+
+    Needed after writing source rows dated before the watermark, which the
+    incremental refresh would never look at (e.g. backfilled activity events).
+    """
+    state = _get_watermark(name)
+    state.watermark = None
+    state.refreshed_at = None
+    db.session.commit()
+
+
+def refresh_report_rollups():
+    """Refresh every report rollup. Returns days recomputed per rollup."""
+    return {name: refresh_report_rollup(name) for name in REPORT_ROLLUPS}
+
+
+def get_daily_series(name, start_day):
+    """
+    Rollup values per day from start_day through today
+
+    Past days come from the rollup table (refreshed first if stale); today is
+    computed live. Days without activity are omitted.
+
+    Returns:
+        dict: {date: {column: value}} in day order
+    """
+    model, _, compute = REPORT_ROLLUPS[name]
+    if is_stale(name):
+        refresh_report_rollup(name)
+
+    columns = [c.name for c in model.__table__.columns if c.name not in ('day', 'refreshed_at')]
+    today = datetime.utcnow().date()
+
+    series = {}
+    for row in model.query.filter(model.day >= start_day, model.day < today).order_by(model.day):
+        values = {column: getattr(row, column) for column in columns}
+        if any(values.values()):
+            series[row.day] = values
+
+    if start_day <= today:
+        live = compute({today}).get(today)
+        if live and any(live.values()):
+            series[today] = {column: live.get(column, 0) for column in columns}
+
+    return series
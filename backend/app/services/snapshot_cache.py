@@ -0,0 +1,149 @@
+"""
+Snapshot Cache - Single-flight cached results for expensive read-only computations
+
+A snapshot is a JSON-serializable value plus the time it was computed. Readers
+get the current snapshot while it is younger than max_age. When it goes stale,
+exactly one caller (per cache, across all app instances when Redis is
+available) takes the refresh lock and recomputes. Everyone else keeps getting
+the previous snapshot meanwhile, so N concurrent readers cost one computation
+per max_age.
+
+State lives in Redis when REDIS_URL is reachable, otherwise in process memory,
+where single-flight then holds per process.
+"""
+import json
+import threading
+import time
+import uuid
+from app.services.lazy_store import LazyStore
+
+
+class MemorySnapshotStore:
+    """In-process snapshot store used when Redis is unavailable"""
+
+    def __init__(self):
+        self._snapshots = {}  # name -> (value, computed_at)
+        self._locks = {}  # name -> (token, expires_at)
+        self._guard = threading.Lock()
+
+    def read(self, name):
+        return self._snapshots.get(name)
+
+    def write(self, name, value, computed_at, ttl):
+        self._snapshots[name] = (value, computed_at)
+
+    def delete(self, name):
+        self._snapshots.pop(name, None)
+
+    def acquire(self, name, token, timeout):
+        with self._guard:
+            held = self._locks.get(name)
+            if held and held[1] > time.time():
+                return False
+            self._locks[name] = (token, time.time() + timeout)
+            return True
+
+    def release(self, name, token):
+        with self._guard:
+            held = self._locks.get(name)
+            if held and held[0] == token:
+                del self._locks[name]
+
+
+class RedisSnapshotStore:
+    """Redis snapshot store: one JSON key per snapshot and a SET NX lock per refresh"""
+
+    KEY_PREFIX = 'snapshot:'
+
+    def __init__(self, client):
+        self.client = client
+
+    def read(self, name):
+        raw = self.client.get(f'{self.KEY_PREFIX}{name}')
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data['value'], data['computed_at']
+
+    def write(self, name, value, computed_at, ttl):
+        payload = json.dumps({'value': value, 'computed_at': computed_at})
+        self.client.set(f'{self.KEY_PREFIX}{name}', payload, ex=ttl)
+
+    def delete(self, name):
+        self.client.delete(f'{self.KEY_PREFIX}{name}')
+
+    def acquire(self, name, token, timeout):
+        return bool(self.client.set(f'{self.KEY_PREFIX}{name}:lock', token, nx=True, ex=timeout))
+
+    def release(self, name, token):
+        key = f'{self.KEY_PREFIX}{name}:lock'
+        # Only release our own lock - it may have expired and been taken over
+        if self.client.get(key) == token:
+            self.client.delete(key)
+
+
+class SnapshotCache:
+    """Named single-flight snapshots sharing one store"""
+
+    def __init__(self, redis_url=None, lock_timeout=60, wait_interval=0.05):
+        self.lock_timeout = lock_timeout
+        self.wait_interval = wait_interval
+        self._store = LazyStore('Snapshot cache', RedisSnapshotStore, MemorySnapshotStore, redis_url)
+
+    @property
+    def store(self):
+        """Redis store if it answered on first use, otherwise the in-memory store"""
+        return self._store.get()
+
+    def _refresh(self, name, compute, max_age, token):
+        try:
+            value = compute()
+            computed_at = time.time()
+            # Keep stale snapshots around a while so readers have something during refreshes
+            self.store.write(name, value, computed_at, int(max_age * 10) + self.lock_timeout)
+            return value, computed_at
+        finally:
+            self.store.release(name, token)
+
+    def get(self, name, compute, max_age):
+        """
+        Current snapshot for name, recomputing it single-flight when stale
+
+        Args:
+            name: Snapshot name
+            compute: Callable returning a JSON-serializable value
+            max_age: Seconds a snapshot is served before it is refreshed
+
+        Returns:
+            tuple: (value, computed_at unix timestamp)
+        """
+        snapshot = self.store.read(name)
+        if snapshot and time.time() - snapshot[1] < max_age:
+            return snapshot
+
+        token = uuid.uuid4().hex
+        if self.store.acquire(name, token, self.lock_timeout):
+            return self._refresh(name, compute, max_age, token)
+
+        # Another caller is refreshing - serve the stale snapshot if there is one
+        if snapshot:
+            return snapshot
+
+        # Cold start: wait for the writer rather than piling on
+        deadline = time.time() + self.lock_timeout
+        while time.time() < deadline:
+            time.sleep(self.wait_interval)
+            snapshot = self.store.read(name)
+            if snapshot:
+                return snapshot
+            if self.store.acquire(name, token, self.lock_timeout):
+                return self._refresh(name, compute, max_age, token)
+        return compute(), time.time()
+
+    def invalidate(self, name):
+        """Drop a snapshot so the next reader recomputes it"""
+        self.store.delete(name)
+
+
+# Singleton instance
+snapshot_cache = SnapshotCache()
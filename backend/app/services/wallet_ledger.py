@@ -0,0 +1,374 @@
+"""
+Wallet Ledger - Double-entry, append-only record of every wallet balance movement
+
+The balance columns on the wallets row are running totals. A posting appends its
+ledger legs and moves the matching columns with one
+UPDATE wallets SET col = col + :delta inside the caller's database transaction,
+so the totals and the ledger commit (or roll back) together and reading a balance
+never aggregates history.
+
+Full recomputation is an offline job: take_wallet_snapshots() rolls the ledger
+forward from each wallet's previous snapshot, and reconcile_wallets() compares
+the ledger with the running totals.
+"""
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Wallet, WalletTransaction, WalletLedgerEntry, WalletBalanceSnapshot
+
+# Ledger account -> running total column on wallets (None: ledger only)
+ACCOUNT_COLUMNS = {
+    'pending_clearance': 'pending_clearance',
+    'available': 'available_balance',
+    'cashout_hold': None,
+    'withdrawn': 'withdrawn_total',
+    'external': None,
+}
+
+# Ledger account -> wallet_balance_snapshots column
+SNAPSHOT_COLUMNS = {
+    'pending_clearance': 'pending_clearance',
+    'available': 'available_balance',
+    'cashout_hold': 'cashout_hold',
+    'withdrawn': 'withdrawn_total',
+}
+
+# Running totals that may never go negative (also enforced by CHECK constraints)
+NON_NEGATIVE_COLUMNS = ('available_balance', 'pending_clearance')
+
+ZERO = Decimal('0.00')
+CENT = Decimal('0.01')
+
+
+class InsufficientFundsError(ValueError):
+    """A posting would take a wallet balance below zero"""
+
+
+def to_money(amount):
+    """Round an amount to cents as a Decimal"""
+    return Decimal(str(amount or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def apply_balance_deltas(wallet_id, deltas, allow_overdraft=False):
+    """
+    Atomically add deltas to a wallet's running totals
+
+    Decrements of available_balance / pending_clearance are guarded in the same
+    statement (WHERE col + :delta >= 0), so concurrent debits cannot overdraw a
+    wallet and nothing needs to lock the row beforehand.
+
+    Args:
+        wallet_id: Wallet to update
+        deltas: Dict of wallet column -> Decimal delta
+        allow_overdraft: Skip the guard (reconciliation repairs only)
+
+    Raises:
+        InsufficientFundsError: If a guarded column would go negative
+    """
+    values = {
+        column: func.coalesce(getattr(Wallet, column), 0) + delta
+        for column, delta in deltas.items() if delta
+    }
+    if not values:
+        return
+
+    conditions = [Wallet.id == wallet_id]
+    if not allow_overdraft:
+        conditions.extend(
+            values[column] >= 0
+            for column in NON_NEGATIVE_COLUMNS
+            if column in values and deltas[column] < 0
+        )
+
+    values['updated_at'] = datetime.utcnow()
+    result = db.session.execute(
+        update(Wallet).where(*conditions).values(**values),
+        execution_options={'synchronize_session': 'fetch'}
+    )
+    if result.rowcount == 0:
+        raise InsufficientFundsError("Insufficient balance")
+
+
+def _append_legs(wallet_id, kind, legs, transaction_id=None):
+    """Insert the ledger legs of one posting and return the column deltas they imply"""
+    if sum(amount for _, amount in legs) != ZERO:
+        raise ValueError(f"Unbalanced ledger posting: {legs}")
+
+    deltas = {}
+    for account, amount in legs:
+        if account not in ACCOUNT_COLUMNS:
+            raise ValueError(f"Unknown ledger account: {account}")
+        db.session.add(WalletLedgerEntry(
+            wallet_id=wallet_id,
+            transaction_id=transaction_id,
+            kind=kind,
+            account=account,
+            amount=amount
+        ))
+        column = ACCOUNT_COLUMNS[account]
+        if column:
+            deltas[column] = deltas.get(column, ZERO) + amount
+
+    return deltas
+
+
+def post_transfer(wallet_id, kind, source, destination, amount, transaction=None, earned=False):
+    """
+    Move an amount between two accounts of a wallet
+
+    Appends a balanced pair of ledger entries and updates the running totals in
+    the current database transaction. The caller commits.
+
+    Args:
+        wallet_id: Wallet the money belongs to
+        kind: Posting type, e.g. 'earning', 'clearance', 'cashout'
+        source: Account debited
+        destination: Account credited
+        amount: Positive amount to move
+        transaction: The WalletTransaction this posting records, if any
+        earned: Also add the amount to the wallet's lifetime total_earned
+
+    Returns:
+        Decimal: The amount posted, rounded to cents
+    """
+    amount = to_money(amount)
+    if amount <= ZERO:
+        raise ValueError("Ledger amounts must be positive")
+
+    transaction_id = None
+    if transaction is not None:
+        if transaction.id is None:
+            db.session.flush()
+        transaction_id = transaction.id
+
+    deltas = _append_legs(wallet_id, kind, [(source, -amount), (destination, amount)], transaction_id)
+    if earned:
+        deltas['total_earned'] = amount
+    apply_balance_deltas(wallet_id, deltas)
+
+    return amount
+
+
+def record_transaction(transaction, kind, source, destination, amount=None, earned=False):
+    """
+    Insert a WalletTransaction and post its ledger transfer exactly once
+
+    Runs inside a SAVEPOINT. If the transaction carries an idempotency_key that
+    another request already used (including one committed concurrently), the
+    savepoint is rolled back and the existing transaction is returned instead.
+
+    Args:
+        transaction: New, unsaved WalletTransaction
+        kind, source, destination, earned: As for post_transfer
+        amount: Amount to post, defaults to abs(transaction.amount)
+
+    Returns:
+        tuple: (WalletTransaction, created) - created is False for a duplicate
+    """
+    key = transaction.idempotency_key
+    if key:
+        existing = WalletTransaction.query.filter_by(idempotency_key=key).first()
+        if existing:
+            return existing, False
+
+    try:
+        with db.session.begin_nested():
+            db.session.add(transaction)
+            db.session.flush()
+            post_transfer(
+                transaction.wallet_id, kind, source, destination,
+                abs(transaction.amount) if amount is None else amount,
+                transaction=transaction, earned=earned
+            )
+    except IntegrityError:
+        existing = WalletTransaction.query.filter_by(idempotency_key=key).first() if key else None
+        if existing is None:
+            raise
+        return existing, False
+
+    return transaction, True
+
+
+def post_transfers_bulk(kind, source, destination, postings):
+    """
+    Move amounts between the same two accounts for many transactions at once
+
+    Inserts all ledger legs in one statement and adjusts every affected wallet
+    with one grouped UPDATE (col = col + CASE wallets.id WHEN ... END), however
+    many transactions each wallet has in the batch. The caller commits.
+
+    Args:
+        kind: Posting type, e.g. 'clearance'
+        source: Account debited
+        destination: Account credited
+        postings: Iterable of (wallet_id, transaction_id, amount)
+
+    Returns:
+        dict: wallet_id -> total Decimal amount moved
+    """
+    entries = []
+    totals = {}
+    for wallet_id, transaction_id, amount in postings:
+        amount = to_money(amount)
+        if amount <= ZERO:
+            raise ValueError("Ledger amounts must be positive")
+        entries.append({'wallet_id': wallet_id, 'transaction_id': transaction_id, 'kind': kind,
+                        'account': source, 'amount': -amount, 'created_at': datetime.utcnow()})
+        entries.append({'wallet_id': wallet_id, 'transaction_id': transaction_id, 'kind': kind,
+                        'account': destination, 'amount': amount, 'created_at': datetime.utcnow()})
+        totals[wallet_id] = totals.get(wallet_id, ZERO) + amount
+
+    if not entries:
+        return totals
+
+    db.session.execute(insert(WalletLedgerEntry), entries)
+
+    delta = case(totals, value=Wallet.id, else_=ZERO)
+    values = {'updated_at': datetime.utcnow()}
+    for account, sign in ((source, -1), (destination, 1)):
+        column = ACCOUNT_COLUMNS[account]
+        if column:
+            values[column] = func.coalesce(getattr(Wallet, column), 0) + sign * delta
+
+    db.session.execute(
+        update(Wallet).where(Wallet.id.in_(list(totals))).values(**values),
+        execution_options={'synchronize_session': False}
+    )
+
+    return totals
+
+
+# ============================================================================
+# OFFLINE: SNAPSHOTS AND RECONCILIATION
+# ============================================================================
+
+def derive_balances(wallet_ids=None, up_to_entry_id=None):
+    """
+    Rebuild account balances from the latest snapshot plus the ledger entries after it
+
+    Returns:
+        dict: wallet_id -> ({account: Decimal}, last_entry_id)
+    """
+    if up_to_entry_id is None:
+        up_to_entry_id = db.session.query(func.coalesce(func.max(WalletLedgerEntry.id), 0)).scalar()
+
+    latest = db.session.query(
+        func.max(WalletBalanceSnapshot.id).label('id')
+    ).group_by(WalletBalanceSnapshot.wallet_id)
+    if wallet_ids is not None:
+        latest = latest.filter(WalletBalanceSnapshot.wallet_id.in_(wallet_ids))
+    latest = latest.subquery()
+
+    derived = {}
+    for snapshot in WalletBalanceSnapshot.query.join(latest, WalletBalanceSnapshot.id == latest.c.id):
+        balances = {account: to_money(getattr(snapshot, column)) for account, column in SNAPSHOT_COLUMNS.items()}
+        derived[snapshot.wallet_id] = (balances, snapshot.last_entry_id)
+
+    cutoffs = db.session.query(
+        WalletBalanceSnapshot.wallet_id, WalletBalanceSnapshot.last_entry_id
+    ).join(latest, WalletBalanceSnapshot.id == latest.c.id).subquery()
+
+    tail = db.session.query(
+        WalletLedgerEntry.wallet_id,
+        WalletLedgerEntry.account,
+        func.sum(WalletLedgerEntry.amount),
+        func.max(WalletLedgerEntry.id)
+    ).outerjoin(
+        cutoffs, cutoffs.c.wallet_id == WalletLedgerEntry.wallet_id
+    ).filter(
+        WalletLedgerEntry.id > func.coalesce(cutoffs.c.last_entry_id, 0),
+        WalletLedgerEntry.id <= up_to_entry_id,
+        WalletLedgerEntry.account != 'external'
+    ).group_by(WalletLedgerEntry.wallet_id, WalletLedgerEntry.account)
+    if wallet_ids is not None:
+        tail = tail.filter(WalletLedgerEntry.wallet_id.in_(wallet_ids))
+
+    for wallet_id, account, total, max_id in tail:
+        balances, last_entry_id = derived.setdefault(
+            wallet_id, ({account: ZERO for account in SNAPSHOT_COLUMNS}, 0)
+        )
+        balances[account] += to_money(total)
+        derived[wallet_id] = (balances, max(last_entry_id, max_id))
+
+    return derived
+
+
+def take_wallet_snapshots():
+    """
+    Scheduled job: record the ledger-derived balances of every wallet that moved
+    since its last snapshot. Should be run daily.
+
+    Returns:
+        int: Number of snapshots written
+    """
+    up_to_entry_id = db.session.query(func.coalesce(func.max(WalletLedgerEntry.id), 0)).scalar()
+    latest_ids = dict(db.session.query(
+        WalletBalanceSnapshot.wallet_id, func.max(WalletBalanceSnapshot.last_entry_id)
+    ).group_by(WalletBalanceSnapshot.wallet_id).all())
+
+    created = 0
+    for wallet_id, (balances, last_entry_id) in derive_balances(up_to_entry_id=up_to_entry_id).items():
+        if latest_ids.get(wallet_id) == last_entry_id:
+            continue
+        db.session.add(WalletBalanceSnapshot(
+            wallet_id=wallet_id,
+            last_entry_id=last_entry_id,
+            **{column: balances[account] for account, column in SNAPSHOT_COLUMNS.items()}
+        ))
+        created += 1
+
+    db.session.commit()
+    return created
+
+
+def reconcile_wallets(repair=False, chunk_size=500):
+    """
+    Offline job: compare every wallet's running totals with its ledger
+
+    Wallet rows are locked while a chunk is compared so in-flight postings
+    cannot land between reading the totals and reading the ledger. total_earned
+    is a lifetime statistic outside the ledger accounts and is not compared.
+
+    Args:
+        repair: Reset drifted running totals to the ledger-derived balances
+
+    Returns:
+        list: Dicts describing each drifted wallet column
+    """
+    drift = []
+    last_id = 0
+
+    while True:
+        wallets = Wallet.query.filter(Wallet.id > last_id).order_by(Wallet.id).limit(chunk_size).with_for_update().all()
+        if not wallets:
+            break
+        last_id = wallets[-1].id
+
+        derived = derive_balances(wallet_ids=[wallet.id for wallet in wallets])
+
+        for wallet in wallets:
+            balances = derived.get(wallet.id, ({}, 0))[0]
+            deltas = {}
+            for account, column in ACCOUNT_COLUMNS.items():
+                if not column:
+                    continue
+                expected = balances.get(account, ZERO)
+                actual = to_money(getattr(wallet, column))
+                if expected != actual:
+                    drift.append({
+                        'wallet_id': wallet.id,
+                        'user_id': wallet.user_id,
+                        'column': column,
+                        'running_total': float(actual),
+                        'ledger': float(expected)
+                    })
+                    deltas[column] = expected - actual
+
+            if repair and deltas:
+                apply_balance_deltas(wallet.id, deltas, allow_overdraft=True)
+
+        db.session.commit()
+
+    return drift
@@ -1,89 +1,79 @@
 """
 Wallet Service - Handles all wallet-related operations
 """
+import base64
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from app import db
+from app.services import wallet_ledger
 from app.models import (
-    Wallet, WalletTransaction, CreatorProfile,
-    Collaboration, CashoutRequest
+    Wallet, WalletTransaction, CreatorProfile, BrandProfile,
+    Collaboration
 )
 
+# Transaction history page size limit, and where the optional COUNT stops
+HISTORY_MAX_LIMIT = 100
+HISTORY_TOTAL_CAP = 1000
+
+# Transactions cleared per UPDATE ... RETURNING chunk
+CLEARANCE_BATCH_SIZE = 500
+
+# pg advisory lock id for clear_pending_transactions (any constant bigint)
+CLEARANCE_LOCK_KEY = 7301001
+
 
 def get_or_create_wallet(user_id):
     """Get existing wallet or create new one for user"""
     wallet = Wallet.query.filter_by(user_id=user_id).first()
 
     if not wallet:
-        wallet = Wallet(user_id=user_id)
-        db.session.add(wallet)
-        db.session.commit()
+        try:
+            with db.session.begin_nested():
+                wallet = Wallet(user_id=user_id)
+                db.session.add(wallet)
+            db.session.commit()
+        except IntegrityError:
+            # Created by a concurrent request
+            wallet = Wallet.query.filter_by(user_id=user_id).one()
 
     return wallet
 
 
-def calculate_wallet_balances(user_id):
-    """Calculate and update all wallet balances for a user"""
-    wallet = get_or_create_wallet(user_id)
-
-    # Calculate pending clearance
-    pending_clearance = db.session.query(
-        func.coalesce(func.sum(WalletTransaction.amount), 0)
-    ).filter(
-        WalletTransaction.user_id == user_id,
-        WalletTransaction.status == 'pending_clearance',
-        WalletTransaction.available_at > datetime.utcnow()
-    ).scalar()
-
-    # Calculate available balance
-    available_balance = db.session.query(
-        func.coalesce(func.sum(WalletTransaction.amount), 0)
-    ).filter(
-        WalletTransaction.user_id == user_id,
-        WalletTransaction.status == 'available'
-    ).scalar()
-
-    # Calculate total withdrawn
-    withdrawn_total = db.session.query(
-        func.coalesce(func.sum(CashoutRequest.amount), 0)
-    ).filter(
-        CashoutRequest.user_id == user_id,
-        CashoutRequest.status == 'completed'
-    ).scalar()
-
-    # Calculate total earned (lifetime, NET after fees)
-    total_earned = db.session.query(
-        func.coalesce(func.sum(WalletTransaction.net_amount), 0)
-    ).filter(
-        WalletTransaction.user_id == user_id,
-        WalletTransaction.transaction_type == 'earning'
-    ).scalar()
-
-    # Update wallet
-    wallet.pending_clearance = float(pending_clearance)
-    wallet.available_balance = float(available_balance)
-    wallet.withdrawn_total = float(withdrawn_total)
-    wallet.total_earned = float(total_earned)
-    wallet.updated_at = datetime.utcnow()
-
-    db.session.commit()
+def get_wallet_balances(user_id):
+    """
+    Get a user's wallet with its current balances
 
-    return wallet
+    Balances are running totals kept up to date by wallet_ledger postings, so
+    this is a single row read. Recomputing them from history is the offline
+    reconciliation job (wallet_ledger.reconcile_wallets).
+    """
+    return get_or_create_wallet(user_id)
 
 
 def get_pending_clearance_transactions(user_id):
     """Get all transactions in pending clearance with progress"""
-    transactions = WalletTransaction.query.filter(
+    now = datetime.utcnow()
+
+    # One query: collaboration and brand name are joined in, not loaded per row
+    rows = db.session.query(
+        WalletTransaction, Collaboration.id, BrandProfile.company_name
+    ).outerjoin(
+        Collaboration, Collaboration.id == WalletTransaction.collaboration_id
+    ).outerjoin(
+        BrandProfile, BrandProfile.id == Collaboration.brand_id
+    ).filter(
         WalletTransaction.user_id == user_id,
         WalletTransaction.status == 'pending_clearance',
-        WalletTransaction.available_at > datetime.utcnow()
+        WalletTransaction.available_at > now
     ).order_by(WalletTransaction.available_at.asc()).all()
 
     result = []
-    for txn in transactions:
+    for txn, collaboration_id, brand_name in rows:
         # Calculate days remaining
         days_total = txn.clearance_days or 30
-        days_elapsed = (datetime.utcnow() - txn.completed_at).days if txn.completed_at else 0
+        days_elapsed = (now - txn.completed_at).days if txn.completed_at else 0
         days_remaining = max(0, days_total - days_elapsed)
         progress_percentage = min(100, (days_elapsed / days_total) * 100)
 
@@ -92,13 +82,11 @@ def get_pending_clearance_transactions(user_id):
         txn_dict['progress_percentage'] = round(progress_percentage, 1)
 
         # Add collaboration/booking details if available
-        if txn.collaboration_id:
-            collab = Collaboration.query.get(txn.collaboration_id)
-            if collab:
-                txn_dict['collaboration'] = {
-                    'id': collab.id,
-                    'brand_name': collab.brand.company_name if collab.brand else 'Unknown'
-                }
+        if collaboration_id:
+            txn_dict['collaboration'] = {
+                'id': collaboration_id,
+                'brand_name': brand_name or 'Unknown'
+            }
 
         result.append(txn_dict)
 
@@ -142,60 +130,152 @@ def get_wallet_statistics(user_id):
     }
 
 
-def clear_pending_transactions():
+def clear_pending_transactions(batch_size=CLEARANCE_BATCH_SIZE):
     """
-    Scheduled job: Clear transactions that have passed 30-day period
-    Should be run daily
+    Scheduled job: Clear transactions that have passed their clearance period
+    Should be run hourly
+
+    Matured transactions are flipped to available with one UPDATE ... RETURNING
+    per chunk of batch_size rows, and the affected wallets are adjusted with one
+    grouped ledger posting per chunk. A Postgres advisory lock makes concurrent
+    runs from several app instances a no-op instead of double work.
+
+    Returns:
+        int: Number of transactions cleared
     """
-    now = datetime.utcnow()
+    with clearance_lock() as acquired:
+        if not acquired:
+            print("Clearance job already running elsewhere, skipping")
+            return 0
+
+        cleared_count = 0
+        while True:
+            now = datetime.utcnow()
+
+            matured = select(WalletTransaction.id).where(
+                WalletTransaction.status == 'pending_clearance',
+                WalletTransaction.available_at <= now
+            ).order_by(WalletTransaction.id).limit(batch_size).with_for_update(skip_locked=True)
+
+            cleared = db.session.execute(
+                update(WalletTransaction)
+                .where(WalletTransaction.id.in_(matured))
+                .values(status='available', cleared_at=now, updated_at=now)
+                .returning(WalletTransaction.id, WalletTransaction.wallet_id, WalletTransaction.amount),
+                execution_options={'synchronize_session': False}
+            ).all()
+
+            if cleared:
+                wallet_ledger.post_transfers_bulk(
+                    'clearance', 'pending_clearance', 'available',
+                    [(wallet_id, transaction_id, amount) for transaction_id, wallet_id, amount in cleared]
+                )
+            db.session.commit()
+
+            cleared_count += len(cleared)
+            if len(cleared) < batch_size:
+                break
 
-    # Find all transactions ready to clear
-    ready_transactions = WalletTransaction.query.filter(
-        WalletTransaction.status == 'pending_clearance',
-        WalletTransaction.available_at <= now
-    ).all()
+    return cleared_count
 
-    cleared_count = 0
-    for transaction in ready_transactions:
-        # Update transaction status
-        transaction.status = 'available'
-        transaction.cleared_at = now
 
-        # Recalculate wallet balances
-        calculate_wallet_balances(transaction.user_id)
+@contextmanager
+def clearance_lock():
+    """
+    Hold a Postgres session advisory lock for the duration of a clearance run
 
-        cleared_count += 1
+    Yields True if this process got the lock. On databases without advisory
+    locks (SQLite in development) it always yields True.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        yield True
+        return
 
-    db.session.commit()
+    with db.engine.connect() as connection:
+        acquired = connection.execute(
+            select(func.pg_try_advisory_lock(CLEARANCE_LOCK_KEY))
+        ).scalar()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(select(func.pg_advisory_unlock(CLEARANCE_LOCK_KEY)))
 
-    return cleared_count
 
+def encode_history_cursor(transaction):
+    """Opaque cursor pointing just after a transaction in history order"""
+    raw = f"{transaction.created_at.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_history_cursor(cursor):
+    """Inverse of encode_history_cursor. Raises ValueError for a malformed cursor."""
+    try:
+        created_at, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(transaction_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def get_transaction_history(user_id, limit=50, offset=0, transaction_type=None, cursor=None, include_total=False):
+    """
+    Get paginated transaction history, newest first
+
+    Pass the previous page's next_cursor as cursor for keyset pagination (an
+    index range scan however deep the page). offset is kept for older clients.
+    The COUNT only runs when include_total is set, and stops at HISTORY_TOTAL_CAP.
+    """
+    limit = max(1, min(limit, HISTORY_MAX_LIMIT))
 
-def get_transaction_history(user_id, limit=50, offset=0, transaction_type=None):
-    """Get paginated transaction history"""
     query = WalletTransaction.query.filter_by(user_id=user_id)
 
     if transaction_type:
         query = query.filter_by(transaction_type=transaction_type)
 
-    total = query.count()
+    total = None
+    total_capped = False
+    if include_total:
+        capped = query.with_entities(WalletTransaction.id).limit(HISTORY_TOTAL_CAP + 1).subquery()
+        total = db.session.query(func.count()).select_from(capped).scalar()
+        if total > HISTORY_TOTAL_CAP:
+            total, total_capped = HISTORY_TOTAL_CAP, True
+
+    if cursor:
+        created_at, transaction_id = decode_history_cursor(cursor)
+        query = query.filter(or_(
+            WalletTransaction.created_at < created_at,
+            and_(WalletTransaction.created_at == created_at, WalletTransaction.id < transaction_id)
+        ))
+        offset = 0
 
     transactions = query.order_by(
-        WalletTransaction.created_at.desc()
-    ).limit(limit).offset(offset).all()
+        WalletTransaction.created_at.desc(), WalletTransaction.id.desc()
+    ).limit(limit + 1).offset(offset).all()
 
-    return {
+    has_more = len(transactions) > limit
+    transactions = transactions[:limit]
+
+    result = {
         'transactions': [t.to_dict() for t in transactions],
-        'total': total,
         'limit': limit,
-        'offset': offset
+        'offset': offset,
+        'has_more': has_more,
+        'next_cursor': encode_history_cursor(transactions[-1]) if has_more else None
     }
+    if include_total:
+        result['total'] = total
+        result['total_capped'] = total_capped
+
+    return result
 
 
-def credit_brand_wallet(user_id, amount, transaction_type, description, metadata=None):
+def credit_brand_wallet(user_id, amount, transaction_type, description, metadata=None, idempotency_key=None):
     """
     Credit a brand's wallet with refunded amount
     Used when bookings are rejected or collaborations are cancelled
+
+    Pass an idempotency_key (e.g. 'booking:42:refund') to make retries safe:
+    a repeated credit returns the original transaction without paying twice.
     """
     wallet = get_or_create_wallet(user_id)
 
@@ -208,13 +288,12 @@ def credit_brand_wallet(user_id, amount, transaction_type, description, metadata
         status='available',  # Immediately available
         clearance_required=False,
         description=description,
+        idempotency_key=idempotency_key,
         transaction_metadata=metadata or {}
     )
-    db.session.add(transaction)
 
-    # Update wallet balance
-    wallet.available_balance = float(wallet.available_balance or 0) + float(amount)
-    wallet.updated_at = datetime.utcnow()
+    # Insert and update wallet balance atomically
+    transaction, _ = wallet_ledger.record_transaction(transaction, 'credit', 'external', 'available')
 
     db.session.commit()
     return transaction
@@ -226,4 +305,4 @@ def get_wallet_transactions(user_id, page=1, per_page=20):
     Helper function for API endpoints
     """
     offset = (page - 1) * per_page
-    return get_transaction_history(user_id, limit=per_page, offset=offset)
+    return get_transaction_history(user_id, limit=per_page, offset=offset, include_total=True)
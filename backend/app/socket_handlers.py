@@ -1,7 +1,15 @@
+from flask import request, session
 from flask_socketio import emit, join_room, leave_room
 from flask_jwt_extended import decode_token
-from app import socketio
-from app.models import User
+from sqlalchemy import update
+from app import socketio, db
+from app.models import User, Notification
+from app.services.presence_service import presence_service, HEARTBEAT_INTERVAL
+from app.services.report_jobs import job_room
+from app.services.admin_auth_cache import get_admin_auth
+
+# Upper bound on ids accepted in a single read-receipt event
+MAX_READ_RECEIPT_BATCH = 500
 
 
 @socketio.on('connect')
@@ -13,12 +21,20 @@ def handle_connect(auth):
             token_data = decode_token(auth['token'])
             user_id = token_data['sub']
 
+            # Remember the authenticated user for the lifetime of this socket
+            session['user_id'] = int(user_id)
+            presence_service.connect(user_id, request.sid)
+
             # Join user-specific room for targeted notifications
             room = f'user_{user_id}'
             join_room(room)
 
             print(f'User {user_id} connected and joined room {room}')
-            emit('connection_success', {'message': 'Connected to notification service', 'room': room})
+            emit('connection_success', {
+                'message': 'Connected to notification service',
+                'room': room,
+                'heartbeat_interval': HEARTBEAT_INTERVAL
+            })
         else:
             print('Client connected without authentication')
 
@@ -30,55 +46,140 @@ def handle_connect(auth):
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection"""
+    user_id = session.get('user_id')
+    if user_id:
+        presence_service.disconnect(user_id, request.sid)
     print('Client disconnected')
 
 
+@socketio.on('presence_heartbeat')
+def handle_presence_heartbeat(data=None):
+    """Keep the authenticated user's presence alive for another TTL"""
+    user_id = session.get('user_id')
+    if user_id:
+        presence_service.heartbeat(user_id, request.sid)
+
+
+@socketio.on('presence_query')
+def handle_presence_query(data):
+    """Bulk presence lookup, e.g. for the conversation list"""
+    try:
+        user_ids = (data or {}).get('user_ids') or []
+        online = presence_service.online_user_ids(user_ids[:500])
+        emit('presence_status', {'online_user_ids': sorted(online)})
+    except Exception as e:
+        print(f'Error querying presence: {str(e)}')
+
+
 @socketio.on('join_notification_room')
-def handle_join_room(data):
-    """Allow user to explicitly join their notification room"""
+def handle_join_room(data=None):
+    """Allow the authenticated user to explicitly join their own notification room"""
     try:
-        user_id = data.get('user_id')
-        if user_id:
-            room = f'user_{user_id}'
-            join_room(room)
-            emit('joined_room', {'room': room})
-            print(f'User {user_id} joined notification room')
+        # The room always comes from the socket's session, never from the payload,
+        # so a socket cannot listen in on another user's notifications
+        user_id = session.get('user_id')
+        if not user_id:
+            emit('room_error', {'error': 'Authentication required'})
+            return
+
+        room = f'user_{user_id}'
+        join_room(room)
+        emit('joined_room', {'room': room})
+        print(f'User {user_id} joined notification room')
     except Exception as e:
         print(f'Error joining room: {str(e)}')
 
 
 @socketio.on('leave_notification_room')
-def handle_leave_room(data):
-    """Allow user to leave their notification room"""
+def handle_leave_room(data=None):
+    """Allow the authenticated user to leave their own notification room"""
     try:
-        user_id = data.get('user_id')
-        if user_id:
-            room = f'user_{user_id}'
-            leave_room(room)
-            emit('left_room', {'room': room})
-            print(f'User {user_id} left notification room')
+        user_id = session.get('user_id')
+        if not user_id:
+            return
+
+        room = f'user_{user_id}'
+        leave_room(room)
+        emit('left_room', {'room': room})
+        print(f'User {user_id} left notification room')
     except Exception as e:
         print(f'Error leaving room: {str(e)}')
 
 
-@socketio.on('mark_notification_read')
-def handle_mark_read(data):
-    """Handle marking notification as read via Socket.IO"""
-    try:
-        notification_id = data.get('notification_id')
-        user_id = data.get('user_id')
+@socketio.on('subscribe_report_job')
+def handle_subscribe_report_job(data):
+    """Join the room notified when a background report job finishes"""
+    user_id = session.get('user_id')
+    if not user_id:
+        emit('report_job_error', {'error': 'Authentication required'})
+        return
+
+    # Report results are admin-only, like the routes that produce them
+    auth = get_admin_auth(user_id)
+    if not auth or not auth['is_admin'] or not auth['is_active']:
+        emit('report_job_error', {'error': 'Admin access required'})
+        return
 
-        from app.models import Notification
-        from app import db
+    job_id = (data or {}).get('job_id')
+    if not isinstance(job_id, str) or not job_id:
+        emit('report_job_error', {'error': 'job_id is required'})
+        return
 
-        notification = Notification.query.get(notification_id)
-        if notification and notification.user_id == user_id:
-            notification.is_read = True
-            db.session.commit()
+    join_room(job_room(job_id))
+    emit('report_job_subscribed', {'job_id': job_id})
 
-            # Broadcast to user's room
-            emit('notification_marked_read', {'notification_id': notification_id}, room=f'user_{user_id}')
+
+@socketio.on('mark_notification_read')
+def handle_mark_read(data):
+    """
+    Handle marking notifications as read via Socket.IO
+
+    Accepts {'notification_ids': [...]} (or a single legacy 'notification_id') and
+    applies them with one UPDATE scoped to the user authenticated on this socket.
+    """
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            emit('notification_read_error', {'error': 'Authentication required'})
+            return
+
+        data = data or {}
+        notification_ids = data.get('notification_ids')
+        if notification_ids is None and data.get('notification_id') is not None:
+            notification_ids = [data.get('notification_id')]
+
+        if not isinstance(notification_ids, list) or not notification_ids:
+            emit('notification_read_error', {'error': 'notification_ids must be a non-empty list'})
+            return
+
+        try:
+            notification_ids = list({int(nid) for nid in notification_ids})
+        except (TypeError, ValueError):
+            emit('notification_read_error', {'error': 'notification_ids must be integers'})
+            return
+
+        if len(notification_ids) > MAX_READ_RECEIPT_BATCH:
+            emit('notification_read_error', {
+                'error': f'At most {MAX_READ_RECEIPT_BATCH} notification_ids per batch'
+            })
+            return
+
+        result = db.session.execute(
+            update(Notification)
+            .where(
+                Notification.user_id == user_id,
+                Notification.id.in_(notification_ids),
+                Notification.is_read.is_(False)
+            )
+            .values(is_read=True)
+            .returning(Notification.id)
+        )
+        marked_ids = [row[0] for row in result]
+        db.session.commit()
+
+        # Single acknowledgement to every socket the user has open
+        emit('notifications_marked_read', {'notification_ids': marked_ids}, room=f'user_{user_id}')
 
     except Exception as e:
-        print(f'Error marking notification as read: {str(e)}')
+        print(f'Error marking notifications as read: {str(e)}')
         db.session.rollback()
@@ -0,0 +1,25 @@
+"""
+Id lists for bulk admin actions
+"""
+from flask import current_app
+
+
+def parse_id_list(data, key):
+    """
+    Distinct integer ids from data[key], in the order given
+
+    Raises:
+        ValueError: if the list is missing, empty, holds non-integers or is
+            longer than ADMIN_BULK_MAX_IDS
+    """
+    ids = (data or {}).get(key)
+    if not isinstance(ids, list) or not ids:
+        raise ValueError(f'{key} must be a non-empty list of ids')
+    if any(isinstance(value, bool) or not isinstance(value, int) for value in ids):
+        raise ValueError(f'{key} must only contain integer ids')
+
+    limit = current_app.config.get('ADMIN_BULK_MAX_IDS', 500)
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > limit:
+        raise ValueError(f'At most {limit} ids can be processed per request')
+    return ids
@@ -0,0 +1,96 @@
+"""
+Targeted, coalesced Socket.IO events for collaboration updates.
+
+Updates are only sent to the brand and creator participant rooms (user_<id>).
+Several updates to the same collaboration inside COALESCE_WINDOW seconds are
+merged into a single 'collaboration_updated' event carrying only the fields
+that changed, so clients can patch their local copy instead of refetching.
+"""
+import copy
+import threading
+from datetime import datetime
+from decimal import Decimal
+from app import socketio
+
+# Seconds to wait for further updates to the same collaboration before emitting
+COALESCE_WINDOW = 0.5
+
+_pending = {}
+_lock = threading.Lock()
+
+
+def _serialize(value):
+    """Make a column value JSON friendly for the Socket.IO payload"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (list, dict)):
+        # Copy JSON columns so later in-place edits don't leak into the delta
+        return copy.deepcopy(value)
+    return value
+
+
+def _flush(collaboration_id):
+    """Emit the merged delta for a collaboration to its participant rooms"""
+    with _lock:
+        entry = _pending.pop(collaboration_id, None)
+
+    if not entry:
+        return
+
+    payload = {
+        'collaboration_id': collaboration_id,
+        'changes': entry['changes'],
+        'updated_at': entry['updated_at']
+    }
+
+    for user_id in entry['rooms']:
+        try:
+            socketio.emit('collaboration_updated', payload, room=f'user_{user_id}', namespace='/')
+        except Exception as e:
+            print(f"Socket.IO emit error for collaboration {collaboration_id}: {e}")
+
+
+def queue_collaboration_update(collaboration, changed_fields=None):
+    """
+    Queue a collaboration_updated event for the brand and creator of a collaboration
+
+    Args:
+        collaboration: Collaboration object (already committed)
+        changed_fields: Iterable of column names that changed. Their current values
+            are captured now and merged with any other pending changes.
+    """
+    participant_user_ids = set()
+    if collaboration.brand:
+        participant_user_ids.add(collaboration.brand.user_id)
+    if collaboration.creator:
+        participant_user_ids.add(collaboration.creator.user_id)
+
+    if not participant_user_ids:
+        return
+
+    changes = {
+        field: _serialize(getattr(collaboration, field, None))
+        for field in (changed_fields or [])
+    }
+    updated_at = _serialize(collaboration.updated_at or datetime.utcnow())
+
+    with _lock:
+        entry = _pending.get(collaboration.id)
+        if entry:
+            # A flush is already scheduled - merge into it
+            entry['changes'].update(changes)
+            entry['rooms'].update(participant_user_ids)
+            entry['updated_at'] = updated_at
+            return
+
+        _pending[collaboration.id] = {
+            'changes': changes,
+            'rooms': participant_user_ids,
+            'updated_at': updated_at
+        }
+
+    timer = threading.Timer(COALESCE_WINDOW, _flush, args=(collaboration.id,))
+    timer.daemon = True
+    timer.start()
@@ -0,0 +1,42 @@
+"""
+Request-scoped current user
+
+Routes used to start with User.query.get(get_jwt_identity()) and then look up
+the matching CreatorProfile or BrandProfile, often more than once per request
+once decorators and helpers repeated the lookup. get_current_user loads the
+user and both profile relationships in one query, the first time it is asked
+for in a request, and keeps it on flask.g for the rest of the request.
+"""
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import User
+
+
+def get_current_user():
+    """The authenticated User for this request, or None if it no longer exists"""
+    if '_current_user' not in g:
+        user_id = get_jwt_identity()
+        g._current_user = db.session.get(
+            User, int(user_id),
+            options=[joinedload(User.creator_profile), joinedload(User.brand_profile)]
+        ) if user_id is not None else None
+    return g._current_user
+
+
+def get_current_profile(user_type=None):
+    """
+    The current user's CreatorProfile or BrandProfile, matching their user_type
+
+    Args:
+        user_type: 'creator' or 'brand' to get None for users of the other type
+    """
+    user = get_current_user()
+    if not user or (user_type and user.user_type != user_type):
+        return None
+    if user.user_type == 'creator':
+        return user.creator_profile
+    if user.user_type == 'brand':
+        return user.brand_profile
+    return None
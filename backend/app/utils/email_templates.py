@@ -0,0 +1,197 @@
+"""
+Precompiled email templates
+
+HTML templates live in app/templates/emails and are compiled once by
+init_email_templates() at startup. Jinja compiles the static markup of each
+template into constants, so a render only formats the dynamic values.
+
+The plain-text alternative is derived once per template from its HTML source
+(tags stripped, links written out) and compiled alongside it, so every email
+gets a text part without a second hand-maintained copy.
+
+Identical renders (same template and context) are served from an LRU cache.
+"""
+import html
+import os
+import re
+import threading
+from functools import lru_cache
+from jinja2 import Environment, DictLoader, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'emails')
+
+# Per-template values consumed by the shared layouts
+TEMPLATE_DEFAULTS = {
+    'cashout_request_admin': {
+        'header_background': 'linear-gradient(135deg, #7c3aed 0%, #a855f7 100%)',
+        'accent_color': '#7c3aed'
+    },
+    'cashout_completed': {
+        'header_background': 'linear-gradient(135deg, #7c3aed 0%, #a855f7 100%)',
+        'accent_color': '#7c3aed'
+    },
+    'payment_verified': {
+        'header_background': 'linear-gradient(135deg, #3b82f6 0%, #60a5fa 100%)',
+        'accent_color': '#3b82f6'
+    },
+}
+
+_html_env = None
+_text_env = None
+_init_lock = threading.Lock()
+
+
+# ============================================================================
+# FILTERS
+# ============================================================================
+
+def format_currency(amount):
+    """Format amount as currency"""
+    return f"${float(amount or 0):,.2f}"
+
+
+def format_date(date_obj):
+    """Format datetime object"""
+    if not date_obj:
+        return 'N/A'
+    return date_obj.strftime('%B %d, %Y at %I:%M %p')
+
+
+def format_method(method):
+    """Turn a payment method key like bank_transfer into 'Bank Transfer'"""
+    return (method or '').replace('_', ' ').title()
+
+
+# ============================================================================
+# HTML -> TEXT
+# ============================================================================
+
+_HEAD_RE = re.compile(r'<head\b.*?</head>', re.IGNORECASE | re.DOTALL)
+_LINK_RE = re.compile(r'<a\b[^>]*href="([^"]*)"[^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+_LIST_ITEM_RE = re.compile(r'<li\b[^>]*>', re.IGNORECASE)
+_BLOCK_END_RE = re.compile(r'<br\s*/?>|</(p|div|h[1-6]|tr)>', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def html_source_to_text_source(source):
+    """Convert an HTML template source into a plain-text template source"""
+    source = _HEAD_RE.sub('', source)
+    source = _LINK_RE.sub(lambda m: f"{' '.join(m.group(2).split())}: {m.group(1)}", source)
+    source = _LIST_ITEM_RE.sub('- ', source)
+    source = _BLOCK_END_RE.sub('\n', source)
+    source = _TAG_RE.sub('', source)
+    return html.unescape(source)
+
+
+def _tidy_text(text):
+    """Strip indentation left over from the HTML layout and collapse blank lines"""
+    lines = [' '.join(line.split()) for line in text.splitlines()]
+    tidy = []
+    for line in lines:
+        if line or (tidy and tidy[-1]):
+            tidy.append(line)
+    return '\n'.join(tidy).strip() + '\n'
+
+
+# ============================================================================
+# ENVIRONMENTS
+# ============================================================================
+
+def _add_filters(env):
+    env.filters['currency'] = format_currency
+    env.filters['long_date'] = format_date
+    env.filters['method_label'] = format_method
+
+
+def init_email_templates():
+    """Compile every email template (HTML and derived text) once"""
+    global _html_env, _text_env
+
+    with _init_lock:
+        if _html_env is not None:
+            return
+
+        html_env = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            autoescape=select_autoescape(['html']),
+            auto_reload=False,
+            cache_size=-1,
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+        _add_filters(html_env)
+
+        names = sorted(name for name in os.listdir(TEMPLATE_DIR) if name.endswith('.html'))
+        text_sources = {}
+        for name in names:
+            html_env.get_template(name)
+            with open(os.path.join(TEMPLATE_DIR, name), encoding='utf-8') as f:
+                text_sources[name] = html_source_to_text_source(f.read())
+
+        text_env = Environment(
+            loader=DictLoader(text_sources),
+            autoescape=False,
+            auto_reload=False,
+            cache_size=-1,
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+        _add_filters(text_env)
+        for name in names:
+            text_env.get_template(name)
+
+        _html_env, _text_env = html_env, text_env
+        _render_cached.cache_clear()
+
+
+def _freeze(context):
+    """Make a template context hashable for the render cache (raises TypeError if it can't be)"""
+    frozen = []
+    for key, value in sorted(context.items()):
+        if isinstance(value, list):
+            value = tuple(tuple(item) if isinstance(item, list) else item for item in value)
+        hash(value)
+        frozen.append((key, value))
+    return tuple(frozen)
+
+
+@lru_cache(maxsize=256)
+def _render_cached(name, frozen_context):
+    return _render(name, dict(frozen_context))
+
+
+def _render(name, context):
+    template_name = f'{name}.html'
+    full_context = {**TEMPLATE_DEFAULTS.get(name, {}), **context}
+    html_body = _html_env.get_template(template_name).render(full_context)
+    text_body = _tidy_text(_text_env.get_template(template_name).render(full_context))
+    return html_body, text_body
+
+
+def render_email(name, cache=True, **context):
+    """
+    Render an email template
+
+    Args:
+        name: Template name without extension, e.g. 'otp'
+        cache: Set to False for one-off renders carrying secrets (OTP codes,
+            reset links) so they are not kept in memory
+        **context: Template variables. Keep them to plain values (str, numbers,
+            datetimes, lists of tuples) so the render can be cached.
+
+    Returns:
+        tuple: (html_body, text_body)
+    """
+    if _html_env is None:
+        init_email_templates()
+
+    if not cache:
+        return _render(name, context)
+
+    try:
+        frozen_context = _freeze(context)
+    except TypeError:
+        # Unhashable context - render without caching
+        return _render(name, context)
+
+    return _render_cached(name, frozen_context)
@@ -0,0 +1,200 @@
+"""
+Sparse fieldsets - fields= and expand= query parameters for list endpoints
+
+List endpoints serialize every column of every row plus nested relations,
+whether or not the client shows them. An endpoint that declares a FieldsetSpec
+lets the client ask for less:
+
+    ?fields=id,status,amount    only these columns are selected and returned
+    ?expand=creator,brand       only these relations are loaded and returned
+    ?expand=                    no relations at all
+
+Without the parameters the response is unchanged. fields names the listed
+model's own columns (plus any computed fields the spec declares); expanded
+relations are serialized in full. Expanded relations are loaded with one
+SELECT ... IN per relation rather than one query per row.
+"""
+from datetime import date, datetime
+from flask import request
+from sqlalchemy import inspect
+from sqlalchemy.orm import contains_eager, load_only, selectinload
+
+
+class Expansion:
+    """
+    A relation the client can expand
+
+    Args:
+        serialize: Callable turning the related object into a dict
+        nested: Dotted relationship paths on the related model that serialize
+            reads, loaded along with it (e.g. 'user', 'campaign.brand')
+        joined: The endpoint query already joins this relation; load it from
+            that join instead of a separate query
+        relationship: Relationship name, when it differs from the expansion
+            name. None with serialize=None declares an expansion the route
+            loads and serializes itself.
+    """
+
+    def __init__(self, serialize=None, nested=(), joined=False, relationship=None):
+        self.serialize = serialize
+        self.nested = nested
+        self.joined = joined
+        self.relationship = relationship
+
+    def property(self, model, name):
+        if self.serialize is None and self.relationship is None:
+            return None
+        return inspect(model).relationships[self.relationship or name]
+
+    def loader(self, model, name):
+        prop = self.property(model, name)
+        if prop is None:
+            return None
+        option = contains_eager(prop.class_attribute) if self.joined else selectinload(prop.class_attribute)
+        nested_options = []
+        for path in self.nested:
+            target = prop.mapper.class_
+            nested_option = None
+            for step in path.split('.'):
+                attr = inspect(target).relationships[step]
+                nested_option = selectinload(attr.class_attribute) if nested_option is None \
+                    else nested_option.selectinload(attr.class_attribute)
+                target = attr.mapper.class_
+            nested_options.append(nested_option)
+        return option.options(*nested_options) if nested_options else option
+
+
+class FieldsetSpec:
+    """
+    The fields and expansions a list endpoint supports
+
+    Args:
+        model: The model the endpoint lists
+        expansions: Expansion name -> Expansion
+        default_expand: Expansions used when the request has no expand=
+            (defaults to all of them, matching the unfiltered response)
+        computed: Name -> (callable, column names it reads) for fields that
+            are derived from columns rather than stored
+        load_always: Columns the endpoint itself reads (filters, sorting),
+            loaded even when the client does not ask for them
+    """
+
+    def __init__(self, model, expansions=None, default_expand=None, computed=None, load_always=()):
+        self.model = model
+        self.expansions = expansions or {}
+        self.default_expand = list(self.expansions) if default_expand is None else default_expand
+        self.computed = computed or {}
+        self.load_always = load_always
+
+    @property
+    def columns(self):
+        return {attr.key for attr in inspect(self.model).column_attrs}
+
+    def parse(self, args=None):
+        """
+        Fieldset requested by the current request's fields= and expand=
+
+        Raises:
+            ValueError: for unknown field or expansion names
+        """
+        args = request.args if args is None else args
+
+        fields = None
+        if args.get('fields'):
+            fields = _split(args['fields'])
+            unknown = set(fields) - self.columns - set(self.computed)
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+        if 'expand' in args:
+            expand = _split(args['expand'])
+            unknown = set(expand) - set(self.expansions)
+            if unknown:
+                raise ValueError(f"Unknown expansions: {', '.join(sorted(unknown))}")
+        else:
+            expand = list(self.default_expand)
+
+        return Fieldset(self, fields, expand)
+
+
+class Fieldset:
+    """The columns and relations one request asked for"""
+
+    def __init__(self, spec, fields, expand):
+        self.spec = spec
+        self.fields = fields
+        self.expand = expand
+
+    def includes(self, name):
+        """Whether the response should carry this field"""
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return name in self.expand
+
+    def apply(self, query):
+        """Restrict the columns query selects and eager-load the expanded relations"""
+        model = self.spec.model
+        options = []
+
+        if self.fields is not None:
+            columns = {'id', *self.spec.load_always}
+            for name in self.fields:
+                if name in self.spec.computed:
+                    columns.update(self.spec.computed[name][1])
+                else:
+                    columns.add(name)
+            mapper = inspect(model)
+            for name in self.expand:
+                prop = self.spec.expansions[name].property(model, name)
+                if prop is not None:
+                    # The foreign key the relation is loaded through
+                    columns.update(mapper.get_property_by_column(c).key for c in prop.local_columns)
+            options.append(load_only(*[getattr(model, name) for name in sorted(columns)]))
+
+        for name in self.expand:
+            loader = self.spec.expansions[name].loader(model, name)
+            if loader is not None:
+                options.append(loader)
+
+        return query.options(*options) if options else query
+
+    def serialize(self, obj, full):
+        """
+        Dict for obj with the requested fields and expansions
+
+        Args:
+            obj: Model instance from a query passed through apply()
+            full: Callable returning obj's complete dict, used when no fields= was given
+        """
+        if self.fields is None:
+            data = full(obj)
+        else:
+            data = {'id': obj.id}
+            for name in self.fields:
+                if name not in self.spec.computed:
+                    data[name] = _json_value(getattr(obj, name))
+
+        for name, (compute, _) in self.spec.computed.items():
+            if self.includes(name) and name not in data:
+                data[name] = compute(obj)
+
+        for name in self.expand:
+            expansion = self.spec.expansions[name]
+            if expansion.serialize is None:
+                continue
+            related = getattr(obj, expansion.relationship or name)
+            if related is not None:
+                data[name] = expansion.serialize(related)
+
+        return data
+
+
+def _split(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
@@ -1,9 +1,21 @@
+from sqlalchemy import insert
 from app import db, socketio
 from app.models import Notification
+from app.services.presence_service import presence_service
 from flask_socketio import emit
 
 
-def create_notification(user_id, notification_type, title, message, action_url=None):
+def is_user_online(user_id):
+    """True if the user currently has the app open on any device"""
+    return presence_service.is_online(user_id)
+
+
+def online_user_ids(user_ids):
+    """Bulk presence lookup - returns the subset of user_ids that are online"""
+    return presence_service.online_user_ids(user_ids)
+
+
+def create_notification(user_id, notification_type, title, message, action_url=None, email_fallback=None):
     """
     Create a notification and emit it via Socket.IO
 
@@ -13,6 +25,8 @@ def create_notification(user_id, notification_type, title, message, action_url=N
         title: Notification title
         message: Notification message
         action_url: Optional URL for the notification action
+        email_fallback: Optional callable that sends the equivalent email. It is only
+            called when the user is offline, since online users see the real-time event.
 
     Returns:
         Notification object
@@ -32,6 +46,14 @@ def create_notification(user_id, notification_type, title, message, action_url=N
         # Emit real-time notification via Socket.IO
         socketio.emit('new_notification', notification.to_dict(), room=f'user_{user_id}')
 
+        if email_fallback and not is_user_online(user_id):
+            try:
+                email_fallback()
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error sending fallback email: {str(e)}")
+
         return notification
     except Exception as e:
         db.session.rollback()
@@ -39,6 +61,39 @@ def create_notification(user_id, notification_type, title, message, action_url=N
         return None
 
 
+def queue_notifications(notifications):
+    """
+    Add several notifications to the current transaction with one multi-row insert
+
+    The caller commits, then passes the result to emit_notifications.
+
+    Args:
+        notifications: Iterable of dicts with user_id, notification_type, title, message and optional action_url
+
+    Returns:
+        list: Notification payloads to emit after commit
+    """
+    rows = [
+        {
+            'user_id': item['user_id'],
+            'type': item['notification_type'],
+            'title': item['title'],
+            'message': item['message'],
+            'action_url': item.get('action_url')
+        }
+        for item in notifications
+    ]
+    if not rows:
+        return []
+    return [notification.to_dict() for notification in db.session.scalars(insert(Notification).returning(Notification), rows)]
+
+
+def emit_notifications(payloads):
+    """Emit queued notifications via Socket.IO once their transaction has committed"""
+    for payload in payloads:
+        socketio.emit('new_notification', payload, room=f"user_{payload['user_id']}")
+
+
 def notify_new_booking(creator_id, brand_name, booking_id):
     """Notify creator of a new booking"""
     return create_notification(
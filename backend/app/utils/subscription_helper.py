@@ -2,6 +2,7 @@
 Helper functions for subscription-related operations
 """
 from app.models import Subscription, SubscriptionPlan
+from app.services.platform_fee_service import platform_fee_resolver
 
 
 def get_brand_platform_fee_percentage(brand_user_id):
@@ -16,21 +17,7 @@ def get_brand_platform_fee_percentage(brand_user_id):
         - Pro: 10%
         - Premium: 5%
     """
-    # Get active subscription for brand
-    subscription = Subscription.query.filter_by(
-        user_id=brand_user_id,
-        status='active'
-    ).first()
-
-    if not subscription or not subscription.plan:
-        # Default to 10% if no subscription found
-        return 10.0
-
-    # Get platform fee from subscription plan
-    fee_percentage = subscription.plan.platform_fee_percentage
-
-    # Return fee percentage, default to 10% if not set
-    return float(fee_percentage) if fee_percentage is not None else 10.0
+    return platform_fee_resolver.for_user(brand_user_id)
 
 
 def get_brand_subscription_plan(brand_user_id):
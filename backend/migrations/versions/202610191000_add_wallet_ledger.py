@@ -0,0 +1,82 @@
+"""add wallet ledger entries and balance snapshots
+
+Revision ID: 202610191000
+Revises: 202610190900
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191000'
+down_revision = '202610190900'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('wallet_ledger_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('wallet_id', sa.Integer(), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=True),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('account', sa.String(length=20), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['wallet_id'], ['wallets.id'], ),
+        sa.ForeignKeyConstraint(['transaction_id'], ['wallet_transactions.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_wallet_ledger_entries_wallet_id_id', 'wallet_ledger_entries', ['wallet_id', 'id'], unique=False)
+
+    op.create_table('wallet_balance_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('wallet_id', sa.Integer(), nullable=False),
+        sa.Column('last_entry_id', sa.Integer(), nullable=False),
+        sa.Column('pending_clearance', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('available_balance', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('cashout_hold', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('withdrawn_total', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['wallet_id'], ['wallets.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_wallet_balance_snapshots_wallet_id_id', 'wallet_balance_snapshots', ['wallet_id', 'id'], unique=False)
+
+    # Opening entries: post every wallet's pre-ledger balances so the ledger
+    # reproduces the running totals from the first posting onwards. Amounts of
+    # cashouts still in flight were already taken out of available_balance and
+    # are opened in the cashout_hold account they will be paid or refunded from.
+    for account, column in (('pending_clearance', 'pending_clearance'),
+                            ('available', 'available_balance'),
+                            ('withdrawn', 'withdrawn_total')):
+        op.execute(f"""
+            INSERT INTO wallet_ledger_entries (wallet_id, kind, account, amount, created_at)
+            SELECT id, 'opening', '{account}', {column}, CURRENT_TIMESTAMP
+            FROM wallets
+            WHERE COALESCE({column}, 0) <> 0
+        """)
+    op.execute("""
+        INSERT INTO wallet_ledger_entries (wallet_id, kind, account, amount, created_at)
+        SELECT wallet_id, 'opening', 'cashout_hold', SUM(amount), CURRENT_TIMESTAMP
+        FROM cashout_requests
+        WHERE status IN ('pending', 'approved', 'processing')
+        GROUP BY wallet_id
+        HAVING SUM(amount) <> 0
+    """)
+    op.execute("""
+        INSERT INTO wallet_ledger_entries (wallet_id, kind, account, amount, created_at)
+        SELECT wallet_id, 'opening', 'external', -SUM(amount), CURRENT_TIMESTAMP
+        FROM wallet_ledger_entries
+        WHERE kind = 'opening'
+        GROUP BY wallet_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_wallet_balance_snapshots_wallet_id_id', table_name='wallet_balance_snapshots')
+    op.drop_table('wallet_balance_snapshots')
+    op.drop_index('ix_wallet_ledger_entries_wallet_id_id', table_name='wallet_ledger_entries')
+    op.drop_table('wallet_ledger_entries')
@@ -0,0 +1,23 @@
+"""add wallet transaction clearance index
+
+Revision ID: 202610191100
+Revises: 202610191000
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191100'
+down_revision = '202610191000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_wallet_transactions_status_available_at', 'wallet_transactions', ['status', 'available_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_wallet_transactions_status_available_at', table_name='wallet_transactions')
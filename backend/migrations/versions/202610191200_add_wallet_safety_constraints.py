@@ -0,0 +1,60 @@
+"""add wallet overdraft checks and transaction idempotency keys
+
+Revision ID: 202610191200
+Revises: 202610191100
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191200'
+down_revision = '202610191100'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases set up with migrations/add_briefs_and_milestones.py already have
+    # milestone_id and its foreign key
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('wallet_transactions')}
+    if 'milestone_id' not in columns:
+        op.add_column('wallet_transactions', sa.Column('milestone_id', sa.Integer(), nullable=True))
+    foreign_keys = inspector.get_foreign_keys('wallet_transactions')
+    if not any(fk['constrained_columns'] == ['milestone_id'] for fk in foreign_keys):
+        op.create_foreign_key('fk_wallet_transactions_milestone_id', 'wallet_transactions', 'collaboration_milestones', ['milestone_id'], ['id'])
+
+    op.add_column('wallet_transactions', sa.Column('idempotency_key', sa.String(length=100), nullable=True))
+    # Key milestone payouts made before this migration the way release_milestone_escrow
+    # keys new ones, so they still count as released. Only the earliest row per
+    # milestone gets the key in case a legacy double payout exists.
+    op.execute("""
+        UPDATE wallet_transactions
+        SET idempotency_key = 'milestone:' || CAST(milestone_id AS VARCHAR) || ':release'
+        WHERE id IN (
+            SELECT MIN(id) FROM wallet_transactions
+            WHERE transaction_type = 'milestone_earning' AND milestone_id IS NOT NULL
+            GROUP BY milestone_id
+        )
+    """)
+    op.create_unique_constraint('uq_wallet_transactions_idempotency_key', 'wallet_transactions', ['idempotency_key'])
+
+    # NOT VALID: enforce on every new write without failing on legacy rows;
+    # run `flask reconcile-wallets --repair` and VALIDATE CONSTRAINT afterwards
+    op.execute('ALTER TABLE wallets ADD CONSTRAINT ck_wallets_available_balance_non_negative CHECK (available_balance >= 0) NOT VALID')
+    op.execute('ALTER TABLE wallets ADD CONSTRAINT ck_wallets_pending_clearance_non_negative CHECK (pending_clearance >= 0) NOT VALID')
+
+
+def downgrade():
+    op.drop_constraint('ck_wallets_pending_clearance_non_negative', 'wallets', type_='check')
+    op.drop_constraint('ck_wallets_available_balance_non_negative', 'wallets', type_='check')
+    op.drop_constraint('uq_wallet_transactions_idempotency_key', 'wallet_transactions', type_='unique')
+    op.drop_column('wallet_transactions', 'idempotency_key')
+    # Only undo milestone_id if this migration added it (its foreign key carries our name)
+    foreign_keys = sa.inspect(op.get_bind()).get_foreign_keys('wallet_transactions')
+    if any(fk['name'] == 'fk_wallet_transactions_milestone_id' for fk in foreign_keys):
+        op.drop_constraint('fk_wallet_transactions_milestone_id', 'wallet_transactions', type_='foreignkey')
+        op.drop_column('wallet_transactions', 'milestone_id')
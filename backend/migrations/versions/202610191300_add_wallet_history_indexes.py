@@ -0,0 +1,25 @@
+"""add wallet transaction indexes for pending clearance and history
+
+Revision ID: 202610191300
+Revises: 202610191200
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191300'
+down_revision = '202610191200'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_wallet_transactions_user_status_available_at', 'wallet_transactions', ['user_id', 'status', 'available_at'], unique=False)
+    op.create_index('ix_wallet_transactions_user_created_at', 'wallet_transactions', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_wallet_transactions_user_created_at', table_name='wallet_transactions')
+    op.drop_index('ix_wallet_transactions_user_status_available_at', table_name='wallet_transactions')
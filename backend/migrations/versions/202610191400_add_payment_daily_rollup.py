@@ -0,0 +1,47 @@
+"""add payment daily rollup and rollup watermarks
+
+Revision ID: 202610191400
+Revises: 202610191300
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191400'
+down_revision = '202610191300'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rollup_watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('payment_daily_rollup',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('completed_count', sa.Integer(), nullable=False),
+        sa.Column('completed_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('verified_count', sa.Integer(), nullable=False),
+        sa.Column('verified_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_index('ix_payments_status', 'payments', ['status'], unique=False)
+    op.create_index('ix_payments_created_at', 'payments', ['created_at'], unique=False)
+    op.create_index('ix_payments_verified_at', 'payments', ['verified_at'], unique=False)
+    op.create_index('ix_payments_updated_at', 'payments', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_payments_updated_at', table_name='payments')
+    op.drop_index('ix_payments_verified_at', table_name='payments')
+    op.drop_index('ix_payments_created_at', table_name='payments')
+    op.drop_index('ix_payments_status', table_name='payments')
+    op.drop_table('payment_daily_rollup')
+    op.drop_table('rollup_watermarks')
@@ -0,0 +1,41 @@
+"""add paynow_polls for the background Paynow status poller
+
+Revision ID: 202610191500
+Revises: 202610191400
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191500'
+down_revision = '202610191400'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('paynow_polls',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('poll_url', sa.String(length=500), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('paynow_status', sa.String(length=50), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_poll_at', sa.DateTime(), nullable=False),
+        sa.Column('last_polled_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('poll_url')
+    )
+    op.create_index('ix_paynow_polls_status_next_poll', 'paynow_polls', ['status', 'next_poll_at'], unique=False)
+    op.create_index('ix_payments_paynow_poll_url', 'payments', ['paynow_poll_url'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_payments_paynow_poll_url', table_name='payments')
+    op.drop_index('ix_paynow_polls_status_next_poll', table_name='paynow_polls')
+    op.drop_table('paynow_polls')
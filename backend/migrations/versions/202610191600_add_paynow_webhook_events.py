@@ -0,0 +1,43 @@
+"""add paynow_webhook_events and index payments.paynow_reference
+
+Revision ID: 202610191600
+Revises: 202610191500
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191600'
+down_revision = '202610191500'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('paynow_webhook_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_key', sa.String(length=64), nullable=False),
+        sa.Column('reference', sa.String(length=100), nullable=True),
+        sa.Column('paynow_reference', sa.String(length=100), nullable=True),
+        sa.Column('paynow_status', sa.String(length=50), nullable=True),
+        sa.Column('poll_url', sa.String(length=500), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('state', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_key')
+    )
+    op.create_index('ix_paynow_webhook_events_state_id', 'paynow_webhook_events', ['state', 'id'], unique=False)
+    op.create_index('ix_payments_paynow_reference', 'payments', ['paynow_reference'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_payments_paynow_reference', table_name='payments')
+    op.drop_index('ix_paynow_webhook_events_state_id', table_name='paynow_webhook_events')
+    op.drop_table('paynow_webhook_events')
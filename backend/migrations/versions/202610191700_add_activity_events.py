@@ -0,0 +1,46 @@
+"""add activity_events
+
+Revision ID: 202610191700
+Revises: 202610191600
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191700'
+down_revision = '202610191600'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('activity_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=40), nullable=False),
+        sa.Column('category', sa.String(length=20), nullable=False),
+        sa.Column('source_type', sa.String(length=20), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('status', sa.String(length=30), nullable=True),
+        sa.Column('link', sa.String(length=255), nullable=True),
+        sa.Column('meta', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_activity_events_created_id', 'activity_events', ['created_at', 'id'], unique=False)
+    op.create_index('ix_activity_events_category_created_id', 'activity_events', ['category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_activity_events_amount', 'activity_events', ['amount'], unique=False)
+    op.create_index('ix_activity_events_source', 'activity_events', ['source_type', 'source_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_activity_events_source', table_name='activity_events')
+    op.drop_index('ix_activity_events_amount', table_name='activity_events')
+    op.drop_index('ix_activity_events_category_created_id', table_name='activity_events')
+    op.drop_index('ix_activity_events_created_id', table_name='activity_events')
+    op.drop_table('activity_events')
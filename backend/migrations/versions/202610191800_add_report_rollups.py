@@ -0,0 +1,60 @@
+"""add growth, revenue and marketplace daily rollups
+
+Revision ID: 202610191800
+Revises: 202610191700
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191800'
+down_revision = '202610191700'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('growth_daily_rollup',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('signups', sa.Integer(), nullable=False),
+        sa.Column('creator_signups', sa.Integer(), nullable=False),
+        sa.Column('brand_signups', sa.Integer(), nullable=False),
+        sa.Column('activated_users', sa.Integer(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('revenue_daily_rollup',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('gmv_count', sa.Integer(), nullable=False),
+        sa.Column('gmv_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('refunded_count', sa.Integer(), nullable=False),
+        sa.Column('platform_fees', sa.Numeric(precision=12, scale=2), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('marketplace_daily_rollup',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('collaborations_created', sa.Integer(), nullable=False),
+        sa.Column('collaborations_cancelled', sa.Integer(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('day')
+    )
+    op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False)
+    op.create_index('ix_bookings_updated_at', 'bookings', ['updated_at'], unique=False)
+    op.create_index('ix_collaborations_created_at', 'collaborations', ['created_at'], unique=False)
+    op.create_index('ix_wallet_transactions_created_at', 'wallet_transactions', ['created_at'], unique=False)
+    op.create_index('ix_wallet_transactions_updated_at', 'wallet_transactions', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_wallet_transactions_updated_at', table_name='wallet_transactions')
+    op.drop_index('ix_wallet_transactions_created_at', table_name='wallet_transactions')
+    op.drop_index('ix_collaborations_created_at', table_name='collaborations')
+    op.drop_index('ix_bookings_updated_at', table_name='bookings')
+    op.drop_index('ix_users_created_at', table_name='users')
+    op.drop_table('marketplace_daily_rollup')
+    op.drop_table('revenue_daily_rollup')
+    op.drop_table('growth_daily_rollup')
@@ -0,0 +1,54 @@
+"""add user_risk_scores
+
+Revision ID: 202610191900
+Revises: 202610191800
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610191900'
+down_revision = '202610191800'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_risk_scores',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('dispute_count', sa.Integer(), nullable=False),
+        sa.Column('creator_cancellations', sa.Integer(), nullable=False),
+        sa.Column('brand_cancellations', sa.Integer(), nullable=False),
+        sa.Column('failed_payments', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_user_risk_scores_score', 'user_risk_scores', ['score'], unique=False)
+    op.create_index('ix_user_risk_scores_dispute_count', 'user_risk_scores', ['dispute_count'], unique=False)
+    op.create_index('ix_user_risk_scores_creator_cancellations', 'user_risk_scores', ['creator_cancellations'], unique=False)
+    op.create_index('ix_user_risk_scores_brand_cancellations', 'user_risk_scores', ['brand_cancellations'], unique=False)
+    op.create_index('ix_user_risk_scores_failed_payments', 'user_risk_scores', ['failed_payments'], unique=False)
+
+    op.create_index('ix_disputes_raised_by_user_id', 'disputes', ['raised_by_user_id'], unique=False)
+    op.create_index('ix_disputes_against_user_id', 'disputes', ['against_user_id'], unique=False)
+    op.create_index('ix_collaborations_status_updated_at', 'collaborations', ['status', 'updated_at'], unique=False)
+    op.create_index('ix_bookings_payment_status_brand', 'bookings', ['payment_status', 'brand_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_bookings_payment_status_brand', table_name='bookings')
+    op.drop_index('ix_collaborations_status_updated_at', table_name='collaborations')
+    op.drop_index('ix_disputes_against_user_id', table_name='disputes')
+    op.drop_index('ix_disputes_raised_by_user_id', table_name='disputes')
+
+    op.drop_index('ix_user_risk_scores_failed_payments', table_name='user_risk_scores')
+    op.drop_index('ix_user_risk_scores_brand_cancellations', table_name='user_risk_scores')
+    op.drop_index('ix_user_risk_scores_creator_cancellations', table_name='user_risk_scores')
+    op.drop_index('ix_user_risk_scores_dispute_count', table_name='user_risk_scores')
+    op.drop_index('ix_user_risk_scores_score', table_name='user_risk_scores')
+    op.drop_table('user_risk_scores')
@@ -0,0 +1,45 @@
+"""add report_jobs
+
+Revision ID: 202610192000
+Revises: 202610191900
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610192000'
+down_revision = '202610191900'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('report_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('report', sa.String(length=50), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('spec_hash', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['requested_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_report_jobs_spec_hash_status', 'report_jobs', ['spec_hash', 'status'], unique=False)
+    op.create_index('ix_report_jobs_status_created_at', 'report_jobs', ['status', 'created_at'], unique=False)
+    op.create_index('ix_report_jobs_expires_at', 'report_jobs', ['expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_report_jobs_expires_at', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_status_created_at', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_spec_hash_status', table_name='report_jobs')
+    op.drop_table('report_jobs')
@@ -0,0 +1,40 @@
+"""add trigram indexes for admin user search
+
+Revision ID: 202610192100
+Revises: 202610192000
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '202610192100'
+down_revision = '202610192000'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = (
+    ('ix_users_email_trgm', 'users', 'email'),
+    ('ix_creator_profiles_username_trgm', 'creator_profiles', 'username'),
+    ('ix_brand_profiles_company_name_trgm', 'brand_profiles', 'company_name'),
+)
+
+
+def upgrade():
+    # pg_trgm is PostgreSQL only; other backends keep using the plain indexes
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in TRIGRAM_INDEXES:
+        op.create_index(name, table, [column], unique=False,
+                        postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,33 @@
+"""add GIN index on creator social_links for featured eligibility
+
+Revision ID: 202610192200
+Revises: 202610192100
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '202610192200'
+down_revision = '202610192100'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # jsonb key-existence (?) index; PostgreSQL only
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        'CREATE INDEX IF NOT EXISTS ix_creator_profiles_social_links_gin '
+        'ON creator_profiles USING gin ((social_links::jsonb))'
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('DROP INDEX IF EXISTS ix_creator_profiles_social_links_gin')
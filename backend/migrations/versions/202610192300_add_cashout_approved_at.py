@@ -0,0 +1,35 @@
+"""add approved_at to cashout requests
+
+Revision ID: 202610192300
+Revises: 202610192200
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '202610192300'
+down_revision = '202610192200'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('cashout_requests', sa.Column('approved_at', sa.DateTime(), nullable=True))
+
+    # Approval wrote the withdrawal record, so its creation time is when the cashout was approved
+    op.execute("""
+        UPDATE cashout_requests
+        SET approved_at = (
+            SELECT MIN(wallet_transactions.created_at) FROM wallet_transactions
+            WHERE wallet_transactions.cashout_request_id = cashout_requests.id
+              AND wallet_transactions.transaction_type = 'withdrawal'
+        )
+        WHERE status IN ('approved', 'processing', 'completed')
+    """)
+
+
+def downgrade():
+    op.drop_column('cashout_requests', 'approved_at')
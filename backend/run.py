@@ -1,4 +1,5 @@
 import os
+import click
 from app import create_app, socketio, db
 
 app = create_app(os.getenv('FLASK_ENV', 'development'))
@@ -87,7 +88,114 @@ def seed_db():
     print('Database seeded successfully!')
 
 
+@app.cli.command()
+def drain_email_outbox():
+    """Send every due email in the outbox once and exit"""
+    from app.services.email_queue import email_queue
+
+    total = 0
+    while True:
+        processed = email_queue.process_batch()
+        if not processed:
+            break
+        total += processed
+    print(f'Processed {total} queued emails')
+
+
+@app.cli.command()
+def purge_email_outbox():
+    """Delete delivered and failed emails older than EMAIL_OUTBOX_RETENTION_DAYS"""
+    from app.services.email_queue import email_queue
+
+    print(f'Deleted {email_queue.purge_outbox()} old outbox emails')
+
+
+@app.cli.command()
+def snapshot_wallets():
+    """Record ledger-derived balances for wallets that moved since their last snapshot"""
+    from app.services.wallet_ledger import take_wallet_snapshots
+
+    print(f'Wrote {take_wallet_snapshots()} wallet snapshots')
+
+
+@app.cli.command()
+@click.option('--repair', is_flag=True, help='Reset drifted running totals to the ledger balances')
+def reconcile_wallets(repair):
+    """Compare wallet running totals with the ledger"""
+    from app.services.wallet_ledger import reconcile_wallets as run_reconciliation
+
+    drift = run_reconciliation(repair=repair)
+    for item in drift:
+        print(f"Wallet {item['wallet_id']} (user {item['user_id']}) {item['column']}: "
+              f"running total {item['running_total']:.2f}, ledger {item['ledger']:.2f}")
+    print(f"{len(drift)} drifted balances{' repaired' if repair else ''}")
+
+
+@app.cli.command()
+def refresh_rollups():
+    """Bring the admin statistics rollup tables up to date"""
+    from app.services import rollup_service
+
+    print(f'payment_daily_rollup: {rollup_service.refresh_payment_daily_rollup()} days refreshed')
+    for name, days in rollup_service.refresh_report_rollups().items():
+        print(f'{name}: {days} days refreshed')
+
+
+@app.cli.command()
+def compute_risk_scores():
+    """Rebuild the per-user risk scores behind the admin risk report"""
+    from app.services import risk_service
+
+    print(f'{risk_service.refresh_risk_scores()} users with risk signals')
+
+
+@app.cli.command()
+def run_report_jobs():
+    """Run every queued admin report job in this process"""
+    from app.services.report_jobs import report_job_queue
+
+    processed = 0
+    while report_job_queue.process_next():
+        processed += 1
+    print(f'Ran {processed} report jobs, purged {report_job_queue.purge_expired()} expired')
+
+
+@app.cli.command()
+@click.option('--batch-size', default=1000, help='Source rows read and events written per transaction')
+def backfill_activity(batch_size):
+    """Write activity feed events for rows created before the activity hooks"""
+    from app.services.activity_service import backfill_activity_events
+
+    written = backfill_activity_events(batch_size=batch_size)
+    for event_type, count in written.items():
+        if count:
+            print(f'{event_type}: {count}')
+    print(f'Backfilled {sum(written.values())} activity events')
+
+
+@app.cli.command()
+def poll_paynow():
+    """Poll every due Paynow payment once and apply the results"""
+    from app.services.paynow_poller import paynow_poller
+
+    total = 0
+    while True:
+        polled = paynow_poller.run_once()
+        if not polled:
+            break
+        total += polled
+    print(f'Polled {total} Paynow payments')
+
+
 if __name__ == '__main__':
+    # Drain emails left in the outbox by a previous run
+    from app.services.email_queue import email_queue
+    email_queue.start()
+
+    # Apply Paynow payments confirmed while the server was down
+    from app.services.paynow_poller import paynow_poller
+    paynow_poller.start()
+
     # Use socketio.run instead of app.run for WebSocket support
     socketio.run(
         app,
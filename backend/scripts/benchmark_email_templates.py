@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of email template render throughput
+
+Measures renders/second for each precompiled email template (HTML + text),
+both uncached and through the render cache. Needs no database or SMTP server.
+
+Usage: python scripts/benchmark_email_templates.py [iterations]
+"""
+import sys
+import os
+import time
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.utils.email_templates import init_email_templates, render_email
+
+SAMPLES = {
+    'otp': {'otp_code': '482913', 'purpose_text': 'verify your account'},
+    'verification': {'verification_url': 'https://bantubuzz.com/verify-email/abc123'},
+    'password_reset': {'reset_url': 'https://bantubuzz.com/reset-password/abc123'},
+    'cashout_request_admin': {
+        'reference': 'CR-20261019-42-1234', 'creator_id': 42, 'amount': 250.0,
+        'cashout_fee': 0.0, 'net_amount': 250.0, 'payment_method': 'ecocash',
+        'requested_at': datetime(2026, 10, 19, 9, 30),
+        'payment_details': [('Phone', '0771234567'), ('Name', 'Tariro M')],
+        'creator_notes': 'Thanks!'
+    },
+    'cashout_completed': {
+        'reference': 'CR-20261019-42-1234', 'amount': 250.0, 'cashout_fee': 0.0,
+        'net_amount': 250.0, 'payment_method': 'ecocash', 'transaction_reference': 'EC123',
+        'processed_at': datetime(2026, 10, 19, 12, 0), 'admin_notes': None
+    },
+    'payment_verified': {
+        'booking_id': 1001, 'amount': 150.0, 'payment_method': 'bank_transfer',
+        'verified_at': datetime(2026, 10, 19, 10, 15)
+    },
+}
+
+
+def bench(name, context, iterations, cache):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render_email(name, cache=cache, **context)
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    start = time.perf_counter()
+    init_email_templates()
+    print(f"Compiled templates in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"{iterations} renders per template\n")
+    print(f"{'template':<24}{'uncached/s':>14}{'cached/s':>14}")
+    print('-' * 52)
+
+    for name, context in SAMPLES.items():
+        uncached = bench(name, context, iterations, cache=False)
+        cached = bench(name, context, iterations, cache=True)
+        print(f"{name:<24}{uncached:>14,.0f}{cached:>14,.0f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
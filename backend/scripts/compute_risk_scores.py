@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Scheduled job to rebuild the per-user risk scores behind the admin risk report
+Should run nightly via cron. Disputes, cancellations and failed payments update
+the affected users as they happen; the nightly rebuild ages cancellations out
+of the 30 day window and repairs anything changed outside the ORM.
+"""
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.risk_service import refresh_risk_scores
+
+
+def main():
+    """Recompute user_risk_scores from disputes, collaborations and bookings"""
+    app = create_app('production')
+
+    with app.app_context():
+        try:
+            print(f"[{datetime.now()}] Starting risk scoring job...")
+
+            flagged = refresh_risk_scores()
+
+            print(f"[{datetime.now()}] Risk scoring finished: {flagged} users with risk signals")
+            return 0
+        except Exception as e:
+            print(f"[{datetime.now()}] ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Scheduled job to snapshot wallet ledgers and reconcile running balances
+Should run nightly via cron. Reports drift only; repair with
+`flask reconcile-wallets --repair` after investigating.
+"""
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.services.wallet_ledger import take_wallet_snapshots, reconcile_wallets
+
+
+def main():
+    """Snapshot every wallet that moved, then compare ledgers with running totals"""
+    app = create_app('production')
+
+    with app.app_context():
+        try:
+            print(f"[{datetime.now()}] Starting wallet reconciliation job...")
+
+            snapshots = take_wallet_snapshots()
+            print(f"[{datetime.now()}] Wrote {snapshots} wallet snapshots")
+
+            drift = reconcile_wallets()
+            for item in drift:
+                print(f"[{datetime.now()}] DRIFT wallet {item['wallet_id']} (user {item['user_id']}) "
+                      f"{item['column']}: running total {item['running_total']:.2f}, ledger {item['ledger']:.2f}")
+
+            print(f"[{datetime.now()}] Reconciliation finished with {len(drift)} drifted balances")
+
+            return 1 if drift else 0
+        except Exception as e:
+            print(f"[{datetime.now()}] ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return 1
+
+
+if __name__ == '__main__':
+    exit(main())
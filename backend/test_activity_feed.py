@@ -0,0 +1,193 @@
+"""
+Test the activity_events stream behind the admin activity feed
+
+Checks that:
+1. Creating rows and changing their status appends events, one INSERT per flush
+2. Cursor pages walk the whole feed newest first with no gaps or repeats
+3. Category and high-value filters apply before pagination
+4. The backfill recreates the history and is safe to re-run
+5. The endpoint resolves brand and creator names
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import ActivityEvent, User, CreatorProfile, BrandProfile, Package, Booking, Payment
+from app.services import activity_service
+
+BOOKINGS = 60
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        creator_user = User(email='creator@example.com', password='password123', user_type='creator')
+        db.session.add_all([admin, brand_user, creator_user])
+        db.session.flush()
+
+        brand = BrandProfile(user_id=brand_user.id, company_name='Feed Test Ltd')
+        creator = CreatorProfile(user_id=creator_user.id, username='feedcreator')
+        db.session.add_all([brand, creator])
+        db.session.flush()
+        package = Package(creator_id=creator.id, title='Reel', description='One reel', price=10, duration_days=7)
+        db.session.add(package)
+        db.session.commit()
+
+        # Spread bookings over the last few days, some of them high value
+        now = datetime.utcnow()
+        for i in range(BOOKINGS):
+            amount = 150 if i % 4 == 0 else 20
+            booking = Booking(package_id=package.id, creator_id=creator.id, brand_id=brand.id,
+                              amount=amount, total_price=amount, created_at=now - timedelta(hours=i))
+            db.session.add(booking)
+        db.session.commit()
+        return create_access_token(identity=str(admin.id)), brand.id, creator.id
+
+
+def test_hooks(app, brand_id, creator_id):
+    """Creations and status changes append events, one multi-row INSERT per flush"""
+    with app.app_context():
+        assert ActivityEvent.query.filter_by(event_type='user_registered').count() == 3
+        assert ActivityEvent.query.filter_by(event_type='booking_created').count() == BOOKINGS
+
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('INSERT INTO activity_events'):
+                statements.append(statement)
+
+        bookings = Booking.query.order_by(Booking.id).limit(3).all()
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            for booking in bookings:
+                booking.status = 'completed'
+            db.session.add(Payment(booking_id=bookings[0].id, user_id=1, amount=20, status='pending'))
+            db.session.commit()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+
+        assert len(statements) == 1, statements
+        assert ActivityEvent.query.filter_by(event_type='booking_completed').count() == 3
+        assert ActivityEvent.query.filter_by(event_type='payment_made').count() == 1
+
+        # Re-saving the same status is not a new event
+        bookings[0].status = 'completed'
+        bookings[1].notes = 'Updated'
+        db.session.commit()
+        assert ActivityEvent.query.filter_by(event_type='booking_completed').count() == 3
+    print('[OK] Hooks append creation and status events in one INSERT per flush')
+
+
+def walk(app, query, per_page):
+    events, cursor = [], None
+    while True:
+        page, cursor = activity_service.get_feed_page(query, per_page, cursor=cursor)
+        events.extend(page)
+        if not cursor:
+            return events
+
+
+def test_keyset_pages(app):
+    """Cursor pages cover the feed newest first without gaps or repeats"""
+    with app.app_context():
+        query = activity_service.feed_query('all')
+        expected = [e.id for e in ActivityEvent.query.order_by(
+            ActivityEvent.created_at.desc(), ActivityEvent.id.desc()
+        )]
+
+        events = walk(app, query, 7)
+        assert [e.id for e in events] == expected
+        assert len(expected) == activity_service.count_feed(query)
+
+        # Page 5 by offset fallback matches page 5 by cursor
+        by_offset, _ = activity_service.get_feed_page(query, 7, page=5)
+        assert [e.id for e in by_offset] == expected[28:35]
+    print(f'[OK] Keyset pages walked all {len(expected)} events in order')
+
+
+def test_filters(app):
+    """Category and high-value filters narrow the stream before it is paged"""
+    with app.app_context():
+        high = walk(app, activity_service.feed_query('bookings', high_value=True), 4)
+        created = [e for e in high if e.event_type == 'booking_created']
+        assert len(created) == BOOKINGS // 4, len(created)
+        assert all(e.category == 'bookings' and e.amount >= 100 for e in high)
+
+        recent = walk(app, activity_service.feed_query('bookings', since=datetime.utcnow() - timedelta(hours=9.5)), 50)
+        assert all(e.created_at >= datetime.utcnow() - timedelta(hours=10) for e in recent)
+        assert 10 <= len(recent) <= 13, len(recent)
+    print('[OK] Category, date and high-value filters apply before paging')
+
+
+def test_backfill(app):
+    """The backfill rebuilds history with source timestamps and is idempotent"""
+    with app.app_context():
+        before = {row.event_type: row.count for row in db.session.query(
+            ActivityEvent.event_type, db.func.count().label('count')
+        ).group_by(ActivityEvent.event_type)}
+        oldest_id, oldest_created_at = db.session.query(Booking.id, Booking.created_at).order_by(Booking.created_at).first()
+
+        ActivityEvent.query.delete()
+        db.session.commit()
+
+        written = activity_service.backfill_activity_events(batch_size=25)
+        assert {k: v for k, v in written.items() if v} == before, (written, before)
+        created = ActivityEvent.query.filter_by(source_type='booking', source_id=oldest_id,
+                                                event_type='booking_created').one()
+        assert created.created_at == oldest_created_at
+
+        assert sum(activity_service.backfill_activity_events().values()) == 0
+    print(f'[OK] Backfill rebuilt {sum(before.values())} events and is safe to re-run')
+
+
+def test_endpoint(app, token):
+    """The feed endpoint pages by cursor and resolves names"""
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    first = client.get('/api/admin/activity/feed?category=bookings&per_page=10', headers=headers)
+    assert first.status_code == 200, first.get_json()
+    data = first.get_json()['data']
+    assert data['events'][0]['description'] == 'Feed Test Ltd → feedcreator', data['events'][0]
+    assert data['pagination']['total'] >= BOOKINGS
+
+    cursor = data['pagination']['next_cursor']
+    second = client.get(f'/api/admin/activity/feed?category=bookings&per_page=10&cursor={cursor}', headers=headers)
+    second_ids = {e['id'] for e in second.get_json()['data']['events']}
+    assert len(second_ids) == 10 and not second_ids & {e['id'] for e in data['events']}
+
+    bad = client.get('/api/admin/activity/feed?cursor=nonsense', headers=headers)
+    assert bad.status_code == 400, bad.status_code
+    print('[OK] Endpoint pages by cursor and resolves names')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Activity Feed Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token, brand_id, creator_id = setup(app)
+        test_hooks(app, brand_id, creator_id)
+        test_keyset_pages(app)
+        test_filters(app)
+        test_backfill(app)
+        test_endpoint(app, token)
+        print('\nAll activity feed tests passed')
+    finally:
+        os.unlink(_db_file.name)
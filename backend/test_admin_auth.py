@@ -0,0 +1,170 @@
+"""
+Test request-scoped user loading and cached admin authorization
+
+Checks that:
+1. Admin routes authorize from the cache instead of reloading the admin each request
+2. Deactivating an admin revokes access on their next request
+3. Role checks and the consolidated decorator on the extended admin routes still hold
+4. Profile and brand wallet routes load the user and profile in a single query
+5. Deleting an admin revokes access on their next request
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ.pop('REDIS_URL', None)  # Keep the cache in process memory
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, BrandProfile
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        users = {}
+        for name, role in (('super', 'super_admin'), ('moderator', 'moderator')):
+            admin = User(email=f'{name}@example.com', password='password123', user_type='brand')
+            admin.is_admin = True
+            admin.admin_role = role
+            db.session.add(admin)
+            users[name] = admin
+
+        brand = User(email='brand@example.com', password='password123', user_type='brand')
+        db.session.add(brand)
+        db.session.flush()
+        db.session.add(BrandProfile(user_id=brand.id, company_name='Acme'))
+        users['brand'] = brand
+
+        db.session.commit()
+        ids = {name: user.id for name, user in users.items()}
+        tokens = {name: create_access_token(identity=str(user_id)) for name, user_id in ids.items()}
+        return ids, tokens
+
+
+def request(app, client, method, url, token, **kwargs):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.open(url, method=method, headers={'Authorization': f'Bearer {token}'}, **kwargs)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return response, statements
+
+
+def auth_lookups(statements):
+    return [s for s in statements if s.startswith('SELECT users.is_admin AS users_is_admin, users.admin_role')]
+
+
+def test_cached_authorization(app, client, tokens):
+    """The second admin request does not look the admin up again"""
+    first, first_statements = request(app, client, 'GET', '/api/admin/collaborations', tokens['super'])
+    assert first.status_code == 200, first.get_json()
+    assert len(auth_lookups(first_statements)) == 1, first_statements
+
+    second, second_statements = request(app, client, 'GET', '/api/admin/users', tokens['super'])
+    assert second.status_code == 200, second.get_json()
+    assert not auth_lookups(second_statements), second_statements
+    print('[OK] Second admin request authorized from the cache')
+
+
+def test_deactivation(app, client, ids, tokens):
+    """A deactivated admin is refused on their very next request"""
+    warm, _ = request(app, client, 'GET', '/api/admin/users', tokens['moderator'])
+    assert warm.status_code == 200
+
+    response, _ = request(app, client, 'PUT', f"/api/admin/users/{ids['moderator']}/deactivate",
+                          tokens['super'], json={'reason': 'test'})
+    assert response.status_code == 200, response.get_json()
+
+    refused, _ = request(app, client, 'GET', '/api/admin/users', tokens['moderator'])
+    assert refused.status_code == 403 and refused.get_json()['error'] == 'Account is suspended'
+    refused, _ = request(app, client, 'GET', '/api/admin/collaborations', tokens['moderator'])
+    assert refused.status_code == 403
+
+    response, _ = request(app, client, 'PUT', f"/api/admin/users/{ids['moderator']}/activate", tokens['super'])
+    assert response.status_code == 200
+    allowed, _ = request(app, client, 'GET', '/api/admin/users', tokens['moderator'])
+    assert allowed.status_code == 200
+    print('[OK] Deactivation and reactivation took effect on the next request')
+
+
+def test_roles(app, client, ids, tokens):
+    """Role checks, non-admins and unknown users"""
+    response, _ = request(app, client, 'DELETE', f"/api/admin/users/{ids['brand']}", tokens['moderator'])
+    assert response.status_code == 403 and response.get_json()['your_role'] == 'moderator'
+
+    response, _ = request(app, client, 'GET', '/api/admin/collaborations', tokens['brand'])
+    assert response.status_code == 403 and response.get_json()['error'] == 'Admin access required'
+
+    with app.app_context():
+        ghost = create_access_token(identity='9999')
+    response, _ = request(app, client, 'GET', '/api/admin/users', ghost)
+    assert response.status_code == 404
+
+    response = client.get('/api/admin/users')
+    assert response.status_code == 401
+    print('[OK] Roles, non-admins, unknown users and missing tokens are refused')
+
+
+def test_current_user(app, client, tokens):
+    """The brand profile route loads user and profile in one statement"""
+    response, statements = request(app, client, 'GET', '/api/brands/profile', tokens['brand'])
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['company_name'] == 'Acme'
+    loads = [s for s in statements if 'FROM users' in s or 'FROM brand_profiles' in s]
+    assert len(loads) == 1 and 'brand_profiles' in loads[0], loads
+
+    response, _ = request(app, client, 'GET', '/api/brands/saved-creators', tokens['super'])
+    assert response.status_code == 404
+
+    response, statements = request(app, client, 'GET', '/api/brand/wallet/', tokens['brand'])
+    assert response.status_code == 200, response.get_json()
+    assert len([s for s in statements if s.startswith('SELECT users.')]) == 1, statements
+    print('[OK] Profile and wallet routes loaded the user in one statement')
+
+
+def test_deletion(app, client, ids, tokens):
+    """A deleted admin is refused on their very next request"""
+    warm, _ = request(app, client, 'GET', '/api/admin/users', tokens['moderator'])
+    assert warm.status_code == 200
+
+    response, _ = request(app, client, 'DELETE', f"/api/admin/users/{ids['moderator']}", tokens['super'])
+    assert response.status_code == 200, response.get_json()
+
+    refused, _ = request(app, client, 'GET', '/api/admin/users', tokens['moderator'])
+    assert refused.status_code == 404, refused.get_json()
+    print('[OK] Deleting an admin revoked their cached access')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Admin Authorization Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        ids, tokens = setup(app)
+        client = app.test_client()
+        test_cached_authorization(app, client, tokens)
+        test_deactivation(app, client, ids, tokens)
+        test_roles(app, client, ids, tokens)
+        test_current_user(app, client, tokens)
+        test_deletion(app, client, ids, tokens)
+        print('\nAll admin authorization tests passed')
+    finally:
+        os.unlink(_db_file.name)
@@ -0,0 +1,128 @@
+"""
+Test the admin user directory
+
+Checks that:
+1. Profiles are loaded with the page, so the statement count does not grow with page size
+2. Search matches email, creator username and brand company name
+3. LIKE wildcards in a search term are matched literally
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, CreatorProfile, BrandProfile
+
+CREATORS = 30
+BRANDS = 30
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        db.session.add(admin)
+
+        for i in range(CREATORS):
+            user = User(email=f'creator{i}@example.com', password='password123', user_type='creator')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(CreatorProfile(user_id=user.id, username=f'maker_{i}', categories=['Fashion']))
+
+        for i in range(BRANDS):
+            user = User(email=f'brand{i}@example.com', password='password123', user_type='brand')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(BrandProfile(user_id=user.id, company_name=f'Harare Foods {i}' if i % 2 else f'Acme {i}'))
+
+        # Matches on a literal underscore only
+        user = User(email='underscore@example.com', password='password123', user_type='creator')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(CreatorProfile(user_id=user.id, username='plain'))
+
+        db.session.commit()
+        return create_access_token(identity=str(admin.id))
+
+
+def fetch(client, token, query):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with client.application.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(f'/api/admin/users?{query}', headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['data'], len(statements)
+
+
+def test_eager_profiles(client, token):
+    """Page size does not change the number of statements"""
+    fetch(client, token, 'per_page=1')  # Warm the admin authorization cache
+    small, small_count = fetch(client, token, 'per_page=5')
+    large, large_count = fetch(client, token, 'per_page=60')
+    assert len(large['users']) == 60 and large['pagination']['total'] == CREATORS + BRANDS + 2
+    assert small_count == large_count, (small_count, large_count)
+
+    profiles = [u['profile'] for u in large['users'] if u['user_type'] == 'creator']
+    assert profiles and all(p['username'] and p['categories'] is not None for p in profiles)
+    assert any(u.get('profile', {}).get('company_name') for u in large['users'])
+    print(f'[OK] 5 and 60 user pages both ran {large_count} statements')
+
+
+def test_search(client, token):
+    """Search covers email, creator username and brand company name"""
+    by_username, _ = fetch(client, token, 'search=MAKER_1&per_page=100')
+    assert {u['profile']['username'] for u in by_username['users']} == {'maker_1'} | {f'maker_{i}' for i in range(10, 20)}
+
+    by_company, _ = fetch(client, token, 'search=harare&per_page=100')
+    assert by_company['pagination']['total'] == BRANDS // 2
+    assert all(u['profile']['company_name'].startswith('Harare') for u in by_company['users'])
+
+    by_email, _ = fetch(client, token, 'search=brand2&user_type=brand')
+    assert {u['email'] for u in by_email['users']} == {'brand2@example.com'} | {f'brand{i}@example.com' for i in range(20, 30)}
+    print('[OK] Search matched usernames, company names and emails')
+
+
+def test_wildcards(client, token):
+    """% and _ in a search term are not wildcards"""
+    percent, _ = fetch(client, token, 'search=%25')
+    assert percent['pagination']['total'] == 0
+
+    underscore, _ = fetch(client, token, 'search=_&user_type=creator&per_page=100')
+    assert underscore['pagination']['total'] == CREATORS  # Every maker_ username, not 'plain'
+    print('[OK] LIKE wildcards in search terms are matched literally')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Admin User Directory Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token = setup(app)
+        client = app.test_client()
+        test_eager_profiles(client, token)
+        test_search(client, token)
+        test_wildcards(client, token)
+        print('\nAll admin user directory tests passed')
+    finally:
+        os.unlink(_db_file.name)
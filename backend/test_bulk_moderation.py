@@ -0,0 +1,221 @@
+"""
+Test bulk admin moderation endpoints
+
+Checks that:
+1. A batch of users is verified with one UPDATE and one notification INSERT
+2. Users already in the target state are skipped, and bulk suspension revokes admin access
+3. Pending cashouts are approved set-based, with withdrawal records, activity events and notifications
+4. Pending verification applications are approved and their creators verified
+5. Malformed or oversized id lists are rejected
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ.pop('REDIS_URL', None)  # Keep the admin authorization cache in process memory
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import (
+    User, CreatorProfile, Notification, Wallet, WalletTransaction, CashoutRequest,
+    VerificationApplication, ActivityEvent
+)
+
+USERS = 200
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        admin.admin_role = 'super_admin'
+        moderator = User(email='moderator@example.com', password='password123', user_type='brand')
+        moderator.is_admin = True
+        moderator.admin_role = 'moderator'
+        db.session.add_all([admin, moderator])
+
+        creators = []
+        for i in range(USERS):
+            user = User(email=f'creator{i}@example.com', password='password123', user_type='creator')
+            db.session.add(user)
+            db.session.flush()
+            creator = CreatorProfile(user_id=user.id, username=f'creator{i}')
+            db.session.add(creator)
+            creators.append((user, creator))
+        db.session.flush()
+
+        for i, (user, creator) in enumerate(creators[:10]):
+            wallet = Wallet(user_id=user.id)
+            db.session.add(wallet)
+            db.session.flush()
+            db.session.add(CashoutRequest(
+                request_reference=f'CR-{i:06d}', user_id=user.id, creator_id=creator.id, wallet_id=wallet.id,
+                amount=20 + i, payment_method='ecocash', payment_details={'phone': '0771234567'},
+                status='pending' if i < 8 else 'rejected'
+            ))
+            db.session.add(VerificationApplication(
+                creator_id=creator.id, real_name=f'Creator {i}', id_type='national_id', id_number=f'ID{i}',
+                status='pending' if i % 2 == 0 else 'rejected'
+            ))
+
+        db.session.commit()
+        tokens = {
+            'admin': create_access_token(identity=str(admin.id)),
+            'moderator': create_access_token(identity=str(moderator.id)),
+        }
+        return tokens, moderator.id, [user.id for user, _ in creators]
+
+
+def send(app, client, method, url, token, body):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.open(url, method=method, json=body, headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return response, statements
+
+
+def writes(statements, prefix):
+    return [s for s in statements if s.startswith(prefix)]
+
+
+def test_bulk_verify(app, client, tokens, user_ids):
+    """200 users verified in one request, one UPDATE and one notification INSERT"""
+    response, statements = send(app, client, 'PUT', '/api/admin/users/bulk/verify', tokens['admin'],
+                                {'user_ids': user_ids + [999999]})
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()['data']
+    assert data['updated'] == user_ids and data['skipped'] == [999999]
+    assert len(writes(statements, 'UPDATE users')) == 1, statements
+    assert len(writes(statements, 'INSERT INTO notifications')) == 1, statements
+
+    with app.app_context():
+        assert User.query.filter(User.id.in_(user_ids), User.is_verified.is_(True)).count() == USERS
+        assert Notification.query.filter_by(title='Account Verified').count() == USERS
+
+    again, _ = send(app, client, 'PUT', '/api/admin/users/bulk/verify', tokens['admin'], {'user_ids': user_ids[:5]})
+    assert again.get_json()['data'] == {'updated': [], 'skipped': user_ids[:5]}
+    with app.app_context():
+        assert Notification.query.filter_by(title='Account Verified').count() == USERS
+    print(f'[OK] Verified {USERS} users in {len(statements)} statements; repeats were skipped')
+
+
+def test_bulk_suspend(app, client, tokens, moderator_id, user_ids):
+    """Bulk suspension takes effect on a cached admin's next request"""
+    assert client.get('/api/admin/users', headers={'Authorization': f"Bearer {tokens['moderator']}"}).status_code == 200
+
+    response, _ = send(app, client, 'PUT', '/api/admin/users/bulk/deactivate', tokens['admin'],
+                       {'user_ids': [moderator_id] + user_ids[:3], 'reason': 'Spam'})
+    assert response.status_code == 200 and len(response.get_json()['data']['updated']) == 4
+
+    refused = client.get('/api/admin/users', headers={'Authorization': f"Bearer {tokens['moderator']}"})
+    assert refused.status_code == 403
+    with app.app_context():
+        notification = Notification.query.filter_by(user_id=user_ids[0], title='Account Suspended').one()
+        assert 'Reason: Spam' in notification.message
+
+    response, _ = send(app, client, 'PUT', '/api/admin/users/bulk/activate', tokens['admin'],
+                       {'user_ids': [moderator_id] + user_ids[:3]})
+    assert len(response.get_json()['data']['updated']) == 4
+    print('[OK] Bulk suspension revoked admin access immediately and notified each user')
+
+
+def test_bulk_cashouts(app, client, tokens):
+    """Pending cashouts approved with set-based writes"""
+    with app.app_context():
+        cashout_ids = [c.id for c in CashoutRequest.query.order_by(CashoutRequest.id)]
+
+    response, statements = send(app, client, 'PUT', '/api/admin/cashouts/bulk/approve', tokens['admin'],
+                                {'cashout_ids': cashout_ids})
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()['data']
+    assert data['approved'] == cashout_ids[:8] and data['skipped'] == cashout_ids[8:]
+    for table in ('UPDATE cashout_requests', 'INSERT INTO wallet_transactions',
+                  'INSERT INTO activity_events', 'INSERT INTO notifications'):
+        assert len(writes(statements, table)) == 1, (table, statements)
+
+    with app.app_context():
+        approved = CashoutRequest.query.filter_by(status='approved').all()
+        assert len(approved) == 8 and all(c.approved_at for c in approved)
+        withdrawals = WalletTransaction.query.filter_by(transaction_type='withdrawal', status='withdrawn').all()
+        assert sorted(t.cashout_request_id for t in withdrawals) == cashout_ids[:8]
+        assert all(t.user_id == db.session.get(Wallet, t.wallet_id).user_id for t in withdrawals)
+        events = ActivityEvent.query.filter_by(event_type='cashout_approved').all()
+        assert sorted(e.source_id for e in events) == cashout_ids[:8]
+        assert Notification.query.filter_by(title='Cashout Approved').count() == 8
+
+    again, _ = send(app, client, 'PUT', '/api/admin/cashouts/bulk/approve', tokens['admin'], {'cashout_ids': cashout_ids})
+    assert again.get_json()['data']['approved'] == []
+    print(f'[OK] Approved 8 cashouts in {len(statements)} statements; others were skipped')
+
+
+def test_bulk_verification(app, client, tokens):
+    """Pending verification applications approved and their creators verified"""
+    with app.app_context():
+        application_ids = [a.id for a in VerificationApplication.query.order_by(VerificationApplication.id)]
+
+    response, statements = send(app, client, 'POST', '/api/admin/verification/applications/bulk/approve',
+                                tokens['admin'], {'application_ids': application_ids})
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['approved'] == application_ids[::2] and body['skipped'] == application_ids[1::2]
+    assert len(writes(statements, 'UPDATE creator_profiles')) == 1
+
+    with app.app_context():
+        approved = VerificationApplication.query.filter_by(status='approved').all()
+        assert len(approved) == 5 and all(a.reviewed_by and a.reviewed_at for a in approved)
+        verified = {c.id for c in CreatorProfile.query.filter_by(is_verified=True)}
+        assert verified == {a.creator_id for a in approved}
+    print('[OK] Approved 5 verification applications and verified their creators')
+
+
+def test_validation(app, client, tokens, user_ids):
+    """Bad id lists and unknown actions are rejected; non-admins are refused"""
+    for body in ({}, {'user_ids': []}, {'user_ids': 'all'}, {'user_ids': ['1']}, {'user_ids': [True]},
+                 {'user_ids': list(range(1, 502))}):
+        response, _ = send(app, client, 'PUT', '/api/admin/users/bulk/verify', tokens['admin'], body)
+        assert response.status_code == 400, (body, response.get_json())
+
+    response, _ = send(app, client, 'PUT', '/api/admin/users/bulk/delete', tokens['admin'], {'user_ids': [1]})
+    assert response.status_code == 404
+
+    with app.app_context():
+        creator_token = create_access_token(identity=str(user_ids[0]))
+    response, _ = send(app, client, 'PUT', '/api/admin/cashouts/bulk/approve', creator_token, {'cashout_ids': [1]})
+    assert response.status_code == 403
+    print('[OK] Malformed, oversized and unauthorized bulk requests were rejected')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Bulk Moderation Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        tokens, moderator_id, user_ids = setup(app)
+        client = app.test_client()
+        test_bulk_verify(app, client, tokens, user_ids)
+        test_bulk_suspend(app, client, tokens, moderator_id, user_ids)
+        test_bulk_cashouts(app, client, tokens)
+        test_bulk_verification(app, client, tokens)
+        test_validation(app, client, tokens, user_ids)
+        print('\nAll bulk moderation tests passed')
+    finally:
+        os.unlink(_db_file.name)
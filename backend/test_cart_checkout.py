@@ -0,0 +1,172 @@
+"""
+Test that cart checkout runs in a constant number of database round trips
+
+Checks out a small cart and a 25 package cart against a local fake Paynow
+initiate endpoint, counting SQL statements, and verifies that:
+1. Both carts execute the same number of statements
+2. Every booking, payment record, creator notification and activity event is created
+3. A failed Paynow initiation leaves no bookings behind
+
+Uses a throwaway SQLite database.
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_INTEGRATION_ID'] = '1234'
+os.environ['PAYNOW_INTEGRATION_KEY'] = 'test-integration-key'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from paynow import Paynow
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, CreatorProfile, BrandProfile, Package, Booking, Payment, Notification, ActivityEvent
+
+INTEGRATION_KEY = 'test-integration-key'
+CREATORS = 5
+LARGE_CART = 25
+
+
+class FakePaynowInitiate(BaseHTTPRequestHandler):
+    """Accepts every transaction, or rejects them all when `fail` is set"""
+    fail = False
+
+    def do_POST(self):
+        if self.fail:
+            fields = [('status', 'Error'), ('error', 'Invalid amount')]
+        else:
+            fields = [
+                ('status', 'Ok'),
+                ('browserurl', 'https://paynow.example/pay/abc'),
+                ('pollurl', 'https://paynow.example/poll?guid=abc-123')
+            ]
+            joined = ''.join(value for _, value in fields) + INTEGRATION_KEY.lower()
+            fields.append(('hash', hashlib.sha512(joined.encode('utf-8')).hexdigest().upper()))
+
+        body = urlencode(fields).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def setup(app):
+    """A brand and LARGE_CART packages spread over CREATORS creators"""
+    with app.app_context():
+        db.create_all()
+
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        db.session.add(brand_user)
+        db.session.flush()
+        db.session.add(BrandProfile(user_id=brand_user.id, company_name='Cart Test Ltd'))
+
+        package_ids = []
+        for i in range(CREATORS):
+            creator_user = User(email=f'creator{i}@example.com', password='password123', user_type='creator')
+            db.session.add(creator_user)
+            db.session.flush()
+            creator = CreatorProfile(user_id=creator_user.id)
+            db.session.add(creator)
+            db.session.flush()
+            for j in range(LARGE_CART // CREATORS):
+                package = Package(creator_id=creator.id, title=f'Package {i}-{j}', description='Test',
+                                  price=10 + j, duration_days=7)
+                db.session.add(package)
+                db.session.flush()
+                package_ids.append(package.id)
+
+        db.session.commit()
+        return brand_user.id, package_ids
+
+
+def checkout(app, client, token, package_ids):
+    """POST /cart/checkout and count the SQL statements it executed"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.post('/api/bookings/cart/checkout', json={'package_ids': package_ids},
+                               headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return response, len(statements)
+
+
+def test_constant_round_trips(app, client, token, package_ids):
+    """A 25 package cart costs the same number of statements as a 2 package cart"""
+    small, small_count = checkout(app, client, token, package_ids[:2])
+    large, large_count = checkout(app, client, token, package_ids)
+    assert small.status_code == 200, small.get_json()
+    assert large.status_code == 200, large.get_json()
+    assert small_count == large_count, (small_count, large_count)
+
+    booking_ids = large.get_json()['booking_ids']
+    assert len(booking_ids) == LARGE_CART
+    with app.app_context():
+        assert Booking.query.filter(Booking.id.in_(booking_ids)).count() == LARGE_CART
+        payments = Payment.query.filter(Payment.booking_id.in_(booking_ids)).all()
+        assert len(payments) == LARGE_CART
+        assert {p.external_reference for p in payments} == {large.get_json()['cart_ref']}
+        assert {p.paynow_poll_url for p in payments} == {'https://paynow.example/poll?guid=abc-123'}
+        assert Notification.query.count() == 2 + LARGE_CART
+        assert Booking.query.filter(Booking.id.in_(booking_ids), Booking.payment_reference.is_(None)).count() == 0
+        events = ActivityEvent.query.filter(ActivityEvent.source_type == 'booking',
+                                            ActivityEvent.source_id.in_(booking_ids)).all()
+        assert {e.event_type for e in events} == {'booking_created'} and len(events) == LARGE_CART
+        assert ActivityEvent.query.filter_by(event_type='payment_made').count() == 2 + LARGE_CART
+    print(f'[OK] 2 and {LARGE_CART} package carts both ran {large_count} statements')
+
+
+def test_paynow_failure_rolls_back(app, client, token, package_ids):
+    """Bookings are not left behind when Paynow rejects the payment"""
+    with app.app_context():
+        before = Booking.query.count()
+
+    FakePaynowInitiate.fail = True
+    try:
+        response, _ = checkout(app, client, token, package_ids[:3])
+    finally:
+        FakePaynowInitiate.fail = False
+    assert response.status_code == 400, response.get_json()
+
+    with app.app_context():
+        assert Booking.query.count() == before
+    print('[OK] Failed Paynow initiation leaves no bookings')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Cart Checkout Test')
+    print('=' * 60)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakePaynowInitiate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    Paynow.URL_INITIATE_TRANSACTION = f'http://127.0.0.1:{server.server_address[1]}/initiate'
+    try:
+        app = create_app('production')
+        brand_user_id, package_ids = setup(app)
+        with app.app_context():
+            token = create_access_token(identity=str(brand_user_id))
+        client = app.test_client()
+        test_constant_round_trips(app, client, token, package_ids)
+        test_paynow_failure_rolls_back(app, client, token, package_ids)
+        print('\nAll cart checkout tests passed')
+    finally:
+        server.shutdown()
+        os.unlink(_db_file.name)
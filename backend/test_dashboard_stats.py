@@ -0,0 +1,219 @@
+"""
+Test the single-pass admin dashboard statistics and their shared snapshot
+
+Checks that:
+1. The statistics match the seeded data
+2. They are computed in a fixed, small number of statements
+3. Concurrent readers of a stale or missing snapshot trigger one computation
+4. Repeated dashboard requests within the snapshot age reuse the snapshot
+5. Quick actions count pending cancellations the same way as the statistics
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ.pop('REDIS_URL', None)  # Exercise the in-memory snapshot store
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import (
+    User, CreatorProfile, BrandProfile, Collaboration, CashoutRequest, Payment, Wallet, WalletTransaction
+)
+from app.services.dashboard_service import compute_dashboard_stats, DASHBOARD_SNAPSHOT
+from app.services.snapshot_cache import SnapshotCache, snapshot_cache
+
+MAX_STATEMENTS = 10
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        admin.is_verified = True
+        suspended = User(email='suspended@example.com', password='password123', user_type='brand')
+        suspended.is_active = False
+        db.session.add_all([admin, suspended])
+
+        creators = []
+        for i in range(3):
+            user = User(email=f'creator{i}@example.com', password='password123', user_type='creator')
+            user.is_verified = i == 0
+            db.session.add(user)
+            db.session.flush()
+            profile = CreatorProfile(user_id=user.id, username=f'creator{i}')
+            profile.is_featured = i == 0
+            creators.append((user, profile))
+            db.session.add(profile)
+
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        db.session.add(brand_user)
+        db.session.flush()
+        brand = BrandProfile(user_id=brand_user.id, company_name='Dashboard Test Ltd')
+        db.session.add(brand)
+        db.session.flush()
+
+        creator_user, creator = creators[1]
+        for status, amount, cancellation in (('in_progress', 100, None),
+                                             ('in_progress', 50, {'status': 'pending', 'reason': 'Late'}),
+                                             ('completed', 70, None),
+                                             ('cancelled', 30, {'status': 'approved'})):
+            db.session.add(Collaboration(
+                collaboration_type='package', brand_id=brand.id, creator_id=creator.id, title=f'{status} work',
+                amount=amount, status=status, start_date=datetime.utcnow(), cancellation_request=cancellation
+            ))
+
+        wallet = Wallet(user_id=creator_user.id)
+        db.session.add(wallet)
+        db.session.flush()
+        for i, status in enumerate(('pending', 'pending', 'approved', 'completed')):
+            db.session.add(CashoutRequest(
+                request_reference=f'CR-{i:06d}', user_id=creator_user.id, creator_id=creator.id,
+                wallet_id=wallet.id, amount=20 + i, payment_method='ecocash',
+                payment_details={'phone': '0771234567'}, status=status
+            ))
+
+        old = datetime.utcnow() - timedelta(days=60)
+        for amount, status, created_at in ((100, 'completed', None), (40, 'paid', None),
+                                           (25, 'pending', None), (200, 'completed', old)):
+            payment = Payment(user_id=brand_user.id, amount=amount, payment_method='paynow', status=status)
+            if created_at:
+                payment.created_at = created_at
+            db.session.add(payment)
+
+        for fee, created_at in ((15, None), (5, old)):
+            transaction = WalletTransaction(wallet_id=wallet.id, user_id=creator_user.id, transaction_type='earning',
+                                            amount=85, status='available', platform_fee=fee)
+            if created_at:
+                transaction.created_at = created_at
+            db.session.add(transaction)
+
+        db.session.commit()
+        return create_access_token(identity=str(admin.id))
+
+
+def count_statements(app, fn):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            result = fn()
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+    return result, len(statements)
+
+
+def test_statistics(app):
+    """Single-pass aggregates match the seeded data"""
+    stats, statements = count_statements(app, compute_dashboard_stats)
+
+    users = stats['users']
+    assert users['total'] == 5 and users['creators'] == 3 and users['brands'] == 2, users
+    assert users['unverified_creators'] == 2 and users['unverified_brands'] == 1, users
+    assert users['suspended'] == 1 and users['new_today'] == 6, users
+
+    assert stats['collaborations'] == {'active': 2, 'completed': 1, 'cancelled': 1, 'pending_cancellations': 1}
+    assert stats['cashouts'] == {'pending_count': 2, 'pending_amount': 41.0, 'approved_pending_processing': 1}
+
+    revenue = stats['revenue']
+    assert revenue['transaction_volume'] == 340.0 and revenue['transaction_volume_week'] == 140.0, revenue
+    assert revenue['platform_revenue'] == 20.0 and revenue['platform_revenue_week'] == 15.0, revenue
+    assert revenue['in_escrow'] == 150.0, revenue
+    assert stats['featured_creators'] == 1
+
+    recent = stats['recent_activity']
+    assert len(recent['cashouts']) == 4 and recent['cashouts'][0]['creator_name'] == 'creator1'
+    assert len(recent['users']) == 6
+    assert [c['reason'] for c in recent['cancellations']] == ['Late']
+
+    assert statements <= MAX_STATEMENTS, statements
+    print(f'[OK] Dashboard statistics computed in {statements} statements')
+
+
+def test_single_flight():
+    """Many concurrent readers of a missing, then stale, snapshot compute it once each time"""
+    cache = SnapshotCache(redis_url='')
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'value': len(calls)}
+
+    def read_all():
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('stats', compute, 0.5)))
+                   for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    cold = read_all()
+    assert len(calls) == 1 and all(value == {'value': 1} for value, _ in cold), calls
+
+    time.sleep(0.6)
+    stale = read_all()
+    assert len(calls) == 2, calls
+    # Readers that lost the race were served the previous snapshot meanwhile
+    assert {value['value'] for value, _ in stale} <= {1, 2}
+    print('[OK] Concurrent readers triggered one computation per refresh')
+
+
+def test_endpoint_reuses_snapshot(app, token):
+    """A second dashboard request within the snapshot age runs no statistics queries"""
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    with app.app_context():
+        snapshot_cache.invalidate(DASHBOARD_SNAPSHOT)
+
+    first, first_count = count_statements(app, lambda: client.get('/api/admin/dashboard/stats', headers=headers))
+    second, second_count = count_statements(app, lambda: client.get('/api/admin/dashboard/stats', headers=headers))
+    assert first.status_code == 200 and second.status_code == 200, first.get_json()
+    assert first.get_json()['data'] == second.get_json()['data']
+    assert first.get_json()['generated_at'] == second.get_json()['generated_at']
+    assert second_count < first_count and second_count <= 2, (first_count, second_count)
+    print(f'[OK] Cached dashboard request ran {second_count} statements (cold: {first_count})')
+
+
+def test_quick_actions(app, token):
+    """Quick action counts agree with the seeded data"""
+    client = app.test_client()
+    response = client.get('/api/admin/dashboard/quick-actions', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['data']['pending_cancellations'] == 1, response.get_json()
+    print('[OK] Quick actions counted the pending cancellation')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Dashboard Statistics Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token = setup(app)
+        test_statistics(app)
+        test_single_flight()
+        test_endpoint_reuses_snapshot(app, token)
+        test_quick_actions(app, token)
+        print('\nAll dashboard statistics tests passed')
+    finally:
+        os.unlink(_db_file.name)
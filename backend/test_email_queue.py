@@ -0,0 +1,227 @@
+"""
+Test script for the email delivery queue
+
+Runs against a local aiosmtpd server (pip install aiosmtpd) and a throwaway
+SQLite database, and checks that:
+1. A burst of messages is sent over one pooled SMTP connection
+2. The connection is reused by the next batch
+3. Queued outbox rows are delivered and marked sent
+4. Delivery failures are retried with backoff instead of being dropped
+5. Queued rows belong to the caller's transaction and are discarded on rollback
+6. Old delivered rows are purged
+7. Creating a booking queues confirmations to the brand and the creator
+"""
+import os
+import socket
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+sys.path.insert(0, os.path.dirname(__file__))
+
+from aiosmtpd.controller import Controller
+from app import create_app, db
+from flask_jwt_extended import create_access_token
+from app.models import EmailOutbox, User, CreatorProfile, BrandProfile, Package
+from app.services.email_queue import SMTPConnectionPool, build_message, deliver_batch, email_queue
+
+
+class RecordingHandler:
+    """aiosmtpd handler that records messages and the connection they arrived on"""
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.peers.add(session.peer)
+        return '250 Message accepted for delivery'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=_free_port())
+    controller.start()
+    return controller, handler
+
+
+def make_app(port):
+    app = create_app('production')
+    app.config.update(
+        MAIL_SERVER='127.0.0.1',
+        MAIL_PORT=port,
+        MAIL_USE_TLS=False,
+        MAIL_USERNAME=None,
+        MAIL_PASSWORD=None,
+        MAIL_SUPPRESS_SEND=False,
+        EMAIL_WORKERS=0,  # Drive the queue by hand
+        EMAIL_RETRY_BACKOFF_SECONDS=30
+    )
+    email_queue.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_burst_uses_one_connection():
+    """A burst and a follow-up batch share one authenticated connection"""
+    controller, handler = start_smtp_server()
+    try:
+        pool = SMTPConnectionPool('127.0.0.1', controller.port, use_tls=False, size=1)
+
+        burst = [
+            (i, build_message(f'admin{i}@example.com', 'Cashout alert', '<p>alert</p>', 'alert', 'BantuBuzz <noreply@example.com>'))
+            for i in range(10)
+        ]
+        results = deliver_batch(pool, burst)
+        assert all(result is None for result in results.values()), results
+
+        follow_up = [(99, build_message('creator@example.com', 'Booking', None, 'confirmed', 'noreply@example.com'))]
+        assert deliver_batch(pool, follow_up) == {99: None}
+
+        assert len(handler.messages) == 11
+        assert len(handler.peers) == 1, f'expected one connection, saw {len(handler.peers)}'
+        assert pool.connections_opened == 1
+        pool.close_all()
+        print('[OK] 11 messages delivered over a single SMTP connection')
+    finally:
+        controller.stop()
+
+
+def test_outbox_rows_are_delivered():
+    """Queued rows are sent by process_batch and marked sent"""
+    controller, handler = start_smtp_server()
+    try:
+        app = make_app(controller.port)
+        with app.app_context():
+            email_queue.enqueue_many([
+                {'to_email': f'user{i}@example.com', 'subject': 'Welcome', 'text_body': 'Hello'}
+                for i in range(5)
+            ])
+            db.session.commit()
+            assert email_queue.process_batch() == 5
+
+            statuses = {row.status for row in EmailOutbox.query.all()}
+            assert statuses == {'sent'}, statuses
+            assert len(handler.messages) == 5
+            assert len(handler.peers) == 1
+
+            EmailOutbox.query.delete()
+            db.session.commit()
+        email_queue.pool.close_all()
+        print('[OK] Outbox rows delivered and marked sent')
+    finally:
+        controller.stop()
+
+
+def test_failures_are_retried_with_backoff():
+    """With the server down, rows stay pending with a backed-off next attempt"""
+    controller, _ = start_smtp_server()
+    port = controller.port
+    controller.stop()
+
+    app = make_app(port)
+    with app.app_context():
+        row = email_queue.enqueue('creator@example.com', 'Payment verified', '<p>paid</p>', 'paid')
+        db.session.commit()
+        assert email_queue.process_batch() == 1
+
+        row = db.session.get(EmailOutbox, row.id)
+        assert row.status == 'pending', row.status
+        assert row.attempts == 1
+        assert row.last_error
+        assert row.next_attempt_at > datetime.utcnow()
+
+        # Not due yet, so nothing is claimed
+        assert email_queue.process_batch() == 0
+
+        EmailOutbox.query.delete()
+        db.session.commit()
+    print('[OK] Failed delivery scheduled for retry')
+
+
+def test_rollback_discards_queued_rows():
+    """Emails queued in a transaction that rolls back are never sent"""
+    app = make_app(_free_port())
+    with app.app_context():
+        email_queue.enqueue('user@example.com', 'Your code: 123456', text_body='123456')
+        assert EmailOutbox.query.count() == 1
+        db.session.rollback()
+        assert EmailOutbox.query.count() == 0
+        assert email_queue.process_batch() == 0
+    print('[OK] Rolled back transaction discarded its queued email')
+
+
+def test_purge_old_rows():
+    """Delivered rows past the retention period are deleted; recent and pending rows stay"""
+    app = make_app(_free_port())
+    with app.app_context():
+        old = datetime.utcnow() - timedelta(days=30)
+        db.session.add_all([
+            EmailOutbox(to_email='a@example.com', subject='Your code: 111111', status='sent', sent_at=old),
+            EmailOutbox(to_email='b@example.com', subject='Reset link', status='failed', created_at=old),
+            EmailOutbox(to_email='c@example.com', subject='Your code: 222222', status='sent', sent_at=datetime.utcnow()),
+            EmailOutbox(to_email='d@example.com', subject='Welcome', status='pending', created_at=old)
+        ])
+        db.session.commit()
+
+        assert email_queue.purge_outbox() == 2
+        assert sorted(row.to_email for row in EmailOutbox.query) == ['c@example.com', 'd@example.com']
+
+        EmailOutbox.query.delete()
+        db.session.commit()
+    print('[OK] Old delivered and failed rows purged')
+
+
+def test_booking_confirmation():
+    """A new booking queues one confirmation each for the brand and the creator"""
+    app = make_app(_free_port())
+    with app.app_context():
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        creator_user = User(email='creator@example.com', password='password123', user_type='creator')
+        db.session.add_all([brand_user, creator_user])
+        db.session.flush()
+        creator = CreatorProfile(user_id=creator_user.id, username='creator')
+        db.session.add_all([creator, BrandProfile(user_id=brand_user.id, company_name='Acme')])
+        db.session.flush()
+        package = Package(creator_id=creator.id, title='Launch Reel', description='One reel', price=40, duration_days=7)
+        db.session.add(package)
+        db.session.commit()
+        package_id = package.id
+        token = create_access_token(identity=str(brand_user.id))
+
+    response = app.test_client().post('/api/bookings/', json={'package_id': package_id},
+                                      headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 201, response.get_json()
+
+    with app.app_context():
+        rows = EmailOutbox.query.filter_by(subject='New Booking Confirmation - Launch Reel').all()
+        assert sorted(row.to_email for row in rows) == ['brand@example.com', 'creator@example.com'], rows
+        assert {row.status for row in rows} == {'pending'}
+    print('[OK] New booking queued confirmations for the brand and the creator')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Email Queue Test')
+    print('=' * 60)
+    try:
+        test_burst_uses_one_connection()
+        test_outbox_rows_are_delivered()
+        test_failures_are_retried_with_backoff()
+        test_rollback_discards_queued_rows()
+        test_purge_old_rows()
+        test_booking_confirmation()
+        print('\nAll email queue tests passed')
+    finally:
+        os.unlink(_db_file.name)
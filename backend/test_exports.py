@@ -0,0 +1,153 @@
+"""
+Test the streaming admin exports
+
+Inserts several chunks' worth of payments, wallet transactions and cashouts,
+then checks that each export:
+1. Streams in multiple chunks rather than one buffered body
+2. Returns every row, in CSV and in JSON Lines
+3. Applies its filters and rejects bad parameters before streaming
+4. Marks a file cut short by a mid-stream failure and aborts the response
+
+Uses a throwaway SQLite database.
+"""
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from app import create_app, db
+from app.models import User, CreatorProfile, Payment, Wallet, WalletTransaction, CashoutRequest
+from app.services import export_service
+
+ROWS = 2500  # Several EXPORT_CHUNK_ROWS chunks
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        creator_user = User(email='creator@example.com', password='password123', user_type='creator')
+        db.session.add_all([admin, creator_user])
+        db.session.flush()
+        creator = CreatorProfile(user_id=creator_user.id)
+        wallet = Wallet(user_id=creator_user.id)
+        db.session.add_all([creator, wallet])
+        db.session.flush()
+
+        start = datetime(2026, 1, 1)
+        db.session.execute(insert(Payment), [
+            {'user_id': creator_user.id, 'amount': 10 + i % 7, 'status': 'completed' if i % 2 else 'pending',
+             'payment_method': 'paynow', 'created_at': start + timedelta(hours=i)}
+            for i in range(ROWS)
+        ])
+        db.session.execute(insert(WalletTransaction), [
+            {'wallet_id': wallet.id, 'user_id': creator_user.id, 'transaction_type': 'earning', 'amount': 5,
+             'status': 'available', 'transaction_metadata': {'i': i}, 'created_at': start + timedelta(hours=i)}
+            for i in range(ROWS)
+        ])
+        db.session.execute(insert(CashoutRequest), [
+            {'request_reference': f'CR-{i:06d}', 'user_id': creator_user.id, 'creator_id': creator.id,
+             'wallet_id': wallet.id, 'amount': 20, 'payment_method': 'ecocash',
+             'payment_details': {'phone': '0771234567'}, 'status': 'completed', 'requested_at': start}
+            for i in range(ROWS)
+        ])
+        db.session.commit()
+        return create_access_token(identity=str(admin.id))
+
+
+def fetch(client, token, path):
+    response = client.get(path, headers={'Authorization': f'Bearer {token}'}, buffered=False)
+    chunks = list(response.response) if response.status_code == 200 else []
+    return response, chunks
+
+
+def test_streams_every_row(client, token):
+    """Each export streams all rows over several chunks"""
+    for name in ('payments', 'wallet-transactions', 'cashouts'):
+        response, chunks = fetch(client, token, f'/api/admin/exports/{name}')
+        assert response.status_code == 200, response.get_json()
+        assert response.mimetype == 'text/csv'
+        assert len(chunks) > ROWS // export_service.EXPORT_CHUNK_ROWS, len(chunks)
+
+        rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+        assert len(rows) == ROWS, (name, len(rows))
+        assert rows[0]['user_email'] == 'creator@example.com'
+
+        response, chunks = fetch(client, token, f'/api/admin/exports/{name}?format=jsonl')
+        lines = b''.join(chunks).decode('utf-8').splitlines()
+        assert len(lines) == ROWS and json.loads(lines[-1])['id'], (name, len(lines))
+    print(f'[OK] payments, wallet transactions and cashouts streamed {ROWS} rows each in chunks')
+
+
+def test_filters(client, token):
+    """Status and date filters narrow the export; bad input is a 400"""
+    _, chunks = fetch(client, token, '/api/admin/exports/payments?status=completed&format=jsonl')
+    assert len(b''.join(chunks).splitlines()) == ROWS // 2
+
+    _, chunks = fetch(client, token, '/api/admin/exports/payments?format=jsonl'
+                      '&start_date=2026-01-01T00:00:00&end_date=2026-01-01T23:59:59')
+    assert len(b''.join(chunks).splitlines()) == 24
+
+    response, _ = fetch(client, token, '/api/admin/exports/payments?format=xlsx')
+    assert response.status_code == 400
+    response, _ = fetch(client, token, '/api/admin/exports/cashouts?start_date=yesterday')
+    assert response.status_code == 400
+    print('[OK] Filters applied and bad parameters rejected')
+
+def test_failure_mid_stream(client, token):
+    """A failure after the headers are sent ends the file with a marker and aborts the stream"""
+    stream_rows = export_service.stream_rows
+
+    def failing_stream(query, export_format='csv', chunk_rows=export_service.EXPORT_CHUNK_ROWS):
+        rows = stream_rows(query, export_format, chunk_rows)
+        yield next(rows)
+        yield next(rows)
+        raise RuntimeError('connection lost')
+
+    export_service.stream_rows = failing_stream
+    try:
+        for export_format, marker in (('csv', b'EXPORT FAILED'), ('jsonl', b'"complete": false')):
+            response = client.get(f'/api/admin/exports/payments?format={export_format}',
+                                  headers={'Authorization': f'Bearer {token}'}, buffered=False)
+            assert response.status_code == 200
+            chunks = []
+            try:
+                for chunk in response.response:
+                    chunks.append(chunk)
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError('stream ended cleanly after a failure')
+            assert marker in chunks[-1], chunks[-1]
+    finally:
+        export_service.stream_rows = stream_rows
+    print('[OK] Failed export ended with an incomplete-file marker and aborted the stream')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Admin Export Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token = setup(app)
+        client = app.test_client()
+        test_streams_every_row(client, token)
+        test_filters(client, token)
+        test_failure_mid_stream(client, token)
+        print('\nAll export tests passed')
+    finally:
+        os.unlink(_db_file.name)
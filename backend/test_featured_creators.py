@@ -0,0 +1,143 @@
+"""
+Test the admin featured-creator listing and reordering
+
+Checks that:
+1. Eligible creators are listed from one joined query, whatever the page size
+2. The platform filter matches social_links keys, not text inside the links
+3. Reordering writes every featured creator's order in a single UPDATE
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, CreatorProfile
+
+CREATORS = 24
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        db.session.add(admin)
+
+        for i in range(CREATORS):
+            user = User(email=f'creator{i}@example.com', password='password123', user_type='creator')
+            user.is_verified = i != 0  # creator0 is not eligible
+            db.session.add(user)
+            db.session.flush()
+            links = [{'tiktok': f'https://tiktok.com/@c{i}'},
+                     {'instagram': f'https://instagram.com/c{i}'},
+                     {'youtube': f'https://youtube.com/c{i}?ref=tiktok'}][i % 3]
+            profile = CreatorProfile(user_id=user.id, username=f'creator{i}', follower_count=i * 100,
+                                     social_links=links, categories=['Music'])
+            profile.is_featured = i < 4
+            profile.featured_type = 'general' if i < 4 else None
+            profile.featured_order = i
+            db.session.add(profile)
+
+        db.session.commit()
+        return create_access_token(identity=str(admin.id))
+
+
+def count_statements(app, fn):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return result, statements
+
+
+def test_listing(app, client, headers):
+    """One joined query per page, with the compact fields the grid uses"""
+    def fetch(query):
+        response = client.get(f'/api/admin/creators/eligible-for-featured?{query}', headers=headers)
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()['data']
+
+    fetch('per_page=1')  # Warm the admin authorization cache
+    small, small_statements = count_statements(app, lambda: fetch('per_page=5'))
+    large, large_statements = count_statements(app, lambda: fetch('per_page=50'))
+    assert len(small_statements) == len(large_statements), (small_statements, large_statements)
+    assert large['pagination']['total'] == CREATORS - 1
+
+    first = large['creators'][0]
+    assert not first['is_featured'] and first['username'] == f'creator{CREATORS - 1}'
+    assert set(first) == {'id', 'username', 'profile_picture', 'follower_count', 'categories',
+                          'social_links', 'is_featured', 'featured_type', 'user'}
+    assert first['user']['email'] == f'creator{CREATORS - 1}@example.com'
+    print(f'[OK] Eligible creators listed in {len(large_statements)} statements for 5 or 50 rows')
+
+    tiktok = fetch('platform=tiktok&per_page=50')['creators']
+    assert tiktok and all('tiktok' in c['social_links'] for c in tiktok)
+    assert len(tiktok) == len([i for i in range(1, CREATORS) if i % 3 == 0])
+    instagram = fetch('platform=instagram&per_page=50')['creators']
+    assert all(set(c['social_links']) == {'instagram'} for c in instagram)
+    print('[OK] Platform filter matched social_links keys only')
+
+
+def test_reorder(app, client, headers):
+    """Featured creators are reordered in one UPDATE; others are left alone"""
+    with app.app_context():
+        featured = [c.id for c in CreatorProfile.query.filter_by(is_featured=True).order_by(CreatorProfile.id)]
+        not_featured = CreatorProfile.query.filter_by(is_featured=False).first().id
+
+    orders = [{'creator_id': creator_id, 'order': len(featured) - i} for i, creator_id in enumerate(featured)]
+    orders.append({'creator_id': not_featured, 'order': 99})
+
+    response, statements = count_statements(app, lambda: client.put(
+        '/api/admin/creators/featured/reorder', json={'creator_orders': orders}, headers=headers
+    ))
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['message'] == f'Reordered {len(featured)} featured creators'
+    updates = [s for s in statements if s.startswith('UPDATE creator_profiles')]
+    assert len(updates) == 1, updates
+
+    with app.app_context():
+        stored = dict(db.session.query(CreatorProfile.id, CreatorProfile.featured_order).filter(
+            CreatorProfile.id.in_(featured + [not_featured])
+        ).all())
+    assert [stored[creator_id] for creator_id in featured] == [len(featured) - i for i in range(len(featured))]
+    assert stored[not_featured] != 99
+
+    bad = client.put('/api/admin/creators/featured/reorder',
+                     json={'creator_orders': [{'creator_id': 'x'}]}, headers=headers)
+    assert bad.status_code == 400
+    print(f'[OK] Reordered {len(featured)} featured creators in one UPDATE')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Featured Creators Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token = setup(app)
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {token}'}
+        test_listing(app, client, headers)
+        test_reorder(app, client, headers)
+        print('\nAll featured creator tests passed')
+    finally:
+        os.unlink(_db_file.name)
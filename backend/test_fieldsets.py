@@ -0,0 +1,192 @@
+"""
+Test fields= and expand= on list endpoints
+
+Checks that:
+1. Without the parameters the responses keep their full shape
+2. fields= limits the columns selected from the database and returned
+3. expand= controls which relations are loaded and returned, a page at a time
+4. Unknown field and expansion names are rejected
+5. The featured creators endpoint is unaffected
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, CreatorProfile, BrandProfile, Package, Booking, Collaboration, Payment
+
+CREATORS = 6
+BOOKINGS = 30
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        db.session.add(admin)
+
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        db.session.add(brand_user)
+        db.session.flush()
+        brand = BrandProfile(user_id=brand_user.id, company_name='Acme')
+        db.session.add(brand)
+
+        creators = []
+        for i in range(CREATORS):
+            user = User(email=f'creator{i}@example.com', password='password123', user_type='creator')
+            db.session.add(user)
+            db.session.flush()
+            creator = CreatorProfile(user_id=user.id, username=f'creator{i}', follower_count=i * 100,
+                                     gallery_images=[{'url': f'/g/{i}.jpg'}], categories=['Music'])
+            db.session.add(creator)
+            db.session.flush()
+            db.session.add(Package(creator_id=creator.id, title=f'Reel {i}', description='One reel',
+                                   price=10 + i, duration_days=7))
+            creators.append(creator)
+        db.session.flush()
+
+        packages = Package.query.all()
+        for i in range(BOOKINGS):
+            creator = creators[i % CREATORS]
+            db.session.add(Booking(package_id=packages[i % CREATORS].id, creator_id=creator.id, brand_id=brand.id,
+                                   amount=10, total_price=10, notes='Long booking notes ' * 20))
+            collaboration = Collaboration(collaboration_type='package', brand_id=brand.id, creator_id=creator.id,
+                                          title=f'Collab {i}', amount=10, start_date=datetime.utcnow())
+            db.session.add(collaboration)
+            db.session.flush()
+            if i % 2:
+                db.session.add(Payment(collaboration_id=collaboration.id, user_id=brand_user.id, amount=10,
+                                       payment_method='paynow', status='completed'))
+
+        db.session.commit()
+        return create_access_token(identity=str(admin.id))
+
+
+def get(app, client, url, token):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return response, statements
+
+
+def test_bookings(app, client, token):
+    """Admin bookings: full by default, sparse on request"""
+    full, _ = get(app, client, '/api/admin/bookings?limit=5', token)
+    assert full.status_code == 200, full.get_json()
+    booking = full.get_json()['bookings'][0]
+    assert {'notes', 'package', 'creator', 'brand', 'payment_type_display'} <= set(booking)
+    assert booking['creator']['user']['email'].startswith('creator')
+
+    url = '/api/admin/bookings?fields=status,total_price,payment_type_display&expand=brand,package'
+    small, small_statements = get(app, client, url + '&limit=5', token)
+    large, large_statements = get(app, client, url + '&limit=30', token)
+    assert large.status_code == 200, large.get_json()
+    assert len(small_statements) == len(large_statements), (small_statements, large_statements)
+
+    booking = large.get_json()['bookings'][0]
+    assert set(booking) == {'id', 'status', 'total_price', 'payment_type_display', 'brand', 'package'}
+    assert booking['payment_type_display'] == 'Package Purchase'
+    assert booking['brand']['company_name'] == 'Acme' and booking['package']['title'].startswith('Reel')
+
+    select = next(s for s in large_statements if s.startswith('SELECT bookings.'))
+    assert 'bookings.notes' not in select and 'bookings.total_price' in select, select
+    print(f'[OK] Sparse bookings ran {len(large_statements)} statements for 5 or 30 rows, without notes')
+
+
+def test_collaborations(app, client, token):
+    """Admin collaborations: relations loaded a page at a time, and only when expanded"""
+    small, small_statements = get(app, client, '/api/admin/collaborations?per_page=5', token)
+    large, large_statements = get(app, client, '/api/admin/collaborations?per_page=30', token)
+    assert large.status_code == 200, large.get_json()
+    assert len(small_statements) == len(large_statements), (len(small_statements), len(large_statements))
+
+    collaborations = large.get_json()['data']['collaborations']
+    assert all(c['brand']['email'] == 'brand@example.com' and c['creator']['email'] for c in collaborations)
+    assert len([c for c in collaborations if c['payment']]) == BOOKINGS // 2
+    assert 'deliverables' in collaborations[0]
+
+    bare, bare_statements = get(app, client, '/api/admin/collaborations?fields=title,status&expand=', token)
+    collaboration = bare.get_json()['data']['collaborations'][0]
+    assert set(collaboration) == {'id', 'title', 'status'}
+    assert len(bare_statements) == 2, bare_statements  # The page and its count, nothing else
+    print(f'[OK] Collaborations ran {len(large_statements)} statements for 5 or 30 rows; '
+          f'{len(bare_statements)} with no expansions')
+
+
+def test_creators(app, client, token):
+    """Public creator list leaves out the gallery when it is not asked for"""
+    full, _ = get(app, client, '/api/creators/', token)
+    assert full.status_code == 200, full.get_json()
+    creator = full.get_json()['creators'][0]
+    assert creator['gallery_images'] and creator['user'] and creator['badges']
+
+    sparse, statements = get(app, client, '/api/creators/?fields=username,follower_count,display_name&expand=', token)
+    creators = sparse.get_json()['creators']
+    assert len(creators) == CREATORS
+    assert set(creators[0]) == {'id', 'username', 'follower_count', 'display_name', 'review_stats',
+                                'cheapest_package_price', 'total_packages', 'is_featured'}
+    select = next(s for s in statements if 'FROM creator_profiles JOIN users' in s)
+    assert 'gallery_images' not in select, select
+    print('[OK] Creator list returned the requested fields without gallery columns')
+
+
+def test_featured(app, client, token):
+    """The homepage featured list still returns full creators"""
+    with app.app_context():
+        User.query.filter_by(user_type='creator').update({'is_verified': True})
+        db.session.commit()
+
+    response, _ = get(app, client, '/api/creators/featured', token)
+    assert response.status_code == 200, response.get_json()
+    creators = response.get_json()['creators']
+    assert len(creators) == 4 and all(c['user'] and 'review_stats' in c for c in creators)
+    print('[OK] Featured creators returned full profiles')
+
+
+def test_validation(app, client, token):
+    """Unknown names are a 400"""
+    for url in ('/api/admin/bookings?fields=password_hash', '/api/admin/bookings?expand=messages',
+                '/api/admin/collaborations?fields=nope', '/api/creators/?expand=packages'):
+        response, _ = get(app, client, url, token)
+        assert response.status_code == 400, (url, response.get_json())
+    print('[OK] Unknown fields and expansions were rejected')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Sparse Fieldsets Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token = setup(app)
+        client = app.test_client()
+        test_bookings(app, client, token)
+        test_collaborations(app, client, token)
+        test_creators(app, client, token)
+        test_featured(app, client, token)
+        test_validation(app, client, token)
+        print('\nAll sparse fieldset tests passed')
+    finally:
+        os.unlink(_db_file.name)
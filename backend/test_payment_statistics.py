@@ -0,0 +1,176 @@
+"""
+Test admin payment statistics served from the daily rollup and a live aggregate
+
+Checks that:
+1. The statistics match totals computed directly from the seeded payments
+2. They take the same small number of statements however many payments exist,
+   and never load payment rows
+3. A refresh only recomputes the days touched since the watermark
+4. A change to an old payment reaches the statistics after the next refresh
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ['EMAIL_WORKERS'] = '0'  # Leave queued emails in the outbox
+os.environ.pop('REDIS_URL', None)  # Keep the admin authorization cache in process memory
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, CreatorProfile, BrandProfile, Booking, Payment, PaymentDailyRollup
+from app.services import rollup_service
+
+DAYS = 60
+
+
+def setup(app):
+    """Completed, verified and pending payments spread over the last DAYS days"""
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        admin.admin_role = 'super_admin'
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        creator_user = User(email='creator@example.com', password='password123', user_type='creator')
+        db.session.add_all([admin, brand_user, creator_user])
+        db.session.flush()
+        brand = BrandProfile(user_id=brand_user.id, company_name='Acme')
+        creator = CreatorProfile(user_id=creator_user.id, username='creator')
+        db.session.add_all([brand, creator])
+        db.session.flush()
+
+        add_payments(brand_user.id, range(DAYS))
+        db.session.add(Booking(creator_id=creator.id, brand_id=brand.id, amount=25, total_price=25,
+                               payment_status='pending', proof_of_payment='/uploads/pop.pdf'))
+        db.session.commit()
+        return create_access_token(identity=str(admin.id)), brand_user.id
+
+
+def add_payments(user_id, days_ago):
+    now = datetime.utcnow()
+    for day in days_ago:
+        created = now - timedelta(days=day, minutes=1)
+        db.session.add_all([
+            Payment(user_id=user_id, amount=10 + day, status='completed', created_at=created,
+                    verified_at=created + timedelta(minutes=1)),
+            Payment(user_id=user_id, amount=3, status='failed', created_at=created)
+        ])
+        if day % 10 == 0:
+            db.session.add(Payment(user_id=user_id, amount=7, status='pending', created_at=created))
+
+
+def expected():
+    """The statistics computed the slow way, from every row"""
+    today_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    month_start = today_start.replace(day=1)
+    payments = Payment.query.all()
+    completed = [p for p in payments if p.status == 'completed']
+    pending = [p for p in payments if p.status == 'pending']
+    bookings = Booking.query.filter(Booking.payment_status == 'pending', Booking.proof_of_payment.isnot(None)).all()
+    verified_today = [p for p in completed if p.verified_at and p.verified_at >= today_start]
+    month = [p for p in completed if p.created_at >= month_start]
+    return {
+        'pending_count': len(pending) + len(bookings),
+        'pending_amount': float(sum(p.amount for p in pending) + sum(b.amount for b in bookings)),
+        'verified_today_count': len(verified_today),
+        'verified_today_amount': float(sum(p.amount for p in verified_today)),
+        'month_count': len(month),
+        'month_amount': float(sum(p.amount for p in month)),
+        'total_verified_count': len(completed),
+        'total_verified_amount': float(sum(p.amount for p in completed))
+    }
+
+
+def get_statistics(app, client, token):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get('/api/admin/payments/statistics', headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['statistics'], statements
+
+
+def payment_row_loads(statements):
+    return [s for s in statements if 'payments.id AS payments_id' in s]
+
+
+def test_matches_direct_totals(app, client, token):
+    """Rollup plus live aggregate equal the totals over every row"""
+    statistics, _ = get_statistics(app, client, token)
+    with app.app_context():
+        assert statistics == expected(), (statistics, expected())
+        assert PaymentDailyRollup.query.count() >= DAYS - 1
+    print(f'[OK] Statistics over {DAYS} days of payments match the direct totals')
+
+
+def test_fixed_statement_count(app, client, token, brand_user_id):
+    """Ten times the payments, same statements, no payment rows loaded"""
+    _, before = get_statistics(app, client, token)
+
+    with app.app_context():
+        for _ in range(9):
+            add_payments(brand_user_id, range(DAYS))
+        db.session.commit()
+        rollup_service.refresh_payment_daily_rollup()
+
+    statistics, after = get_statistics(app, client, token)
+    assert len(after) == len(before), (before, after)
+    assert not payment_row_loads(after), payment_row_loads(after)
+    with app.app_context():
+        assert statistics == expected(), (statistics, expected())
+    print(f'[OK] {len(after)} statements with 10x the payments, none loading payment rows')
+
+
+def test_incremental_refresh(app, client, token):
+    """Only days touched since the watermark are recomputed, and changes show up"""
+    with app.app_context():
+        # Settle the seeded rows outside the watermark overlap
+        Payment.query.update({'updated_at': datetime.utcnow() - timedelta(hours=1)}, synchronize_session=False)
+        db.session.commit()
+        assert rollup_service.refresh_payment_daily_rollup() == 0
+
+        old = Payment.query.filter(Payment.status == 'failed').order_by(Payment.created_at).first()
+        old.status = 'completed'
+        old.verified_at = old.created_at
+        db.session.commit()
+
+        assert rollup_service.refresh_payment_daily_rollup() == 1
+
+    statistics, _ = get_statistics(app, client, token)
+    with app.app_context():
+        assert statistics == expected(), (statistics, expected())
+    print('[OK] Refresh recomputed the one touched day and the change reached the statistics')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Payment Statistics Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token, brand_user_id = setup(app)
+        client = app.test_client()
+        test_matches_direct_totals(app, client, token)
+        test_fixed_statement_count(app, client, token, brand_user_id)
+        test_incremental_refresh(app, client, token)
+        print('\nAll payment statistics tests passed')
+    finally:
+        os.unlink(_db_file.name)
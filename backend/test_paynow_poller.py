@@ -0,0 +1,259 @@
+"""
+Test the background Paynow poller against a local fake Paynow server
+
+Checks that:
+1. Cart payments sharing one poll URL are polled once and applied together
+2. Pending URLs back off exponentially and are not re-polled before they are due
+3. Cancelled and failing URLs are handled without blocking the others
+4. Slow URLs are polled concurrently on the bounded pool
+5. Status endpoints read the cached state and never call Paynow
+6. Webhooks are verified, deduplicated and applied by the poller, not the request
+
+Uses a throwaway SQLite database.
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlencode
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_INTEGRATION_KEY'] = 'test-integration-key'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'  # Cycles are run explicitly below
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app, db
+from app.models import (
+    User, CreatorProfile, BrandProfile, Package, Booking, Payment, Collaboration,
+    CreatorSubscription, PaynowPoll, PaynowWebhookEvent
+)
+from app.services.paynow_poller import paynow_poller
+from app.services.payment_service import check_payment_status
+
+INTEGRATION_KEY = 'test-integration-key'
+SLOW_URLS = 16
+SLOW_DELAY = 0.3
+
+
+class FakePaynow(BaseHTTPRequestHandler):
+    """Answers POST /<guid> with the status configured in `statuses`"""
+    statuses = {}
+    hits = {}
+    lock = threading.Lock()
+
+    def do_POST(self):
+        guid = self.path.strip('/')
+        with self.lock:
+            self.hits[guid] = self.hits.get(guid, 0) + 1
+        status = self.statuses.get(guid, 'Sent')
+
+        if status == 'slow':
+            time.sleep(SLOW_DELAY)
+            status = 'Paid'
+        if status == 'error500':
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        body = urlencode(signed([
+            ('reference', guid), ('paynowreference', '12345'), ('amount', '10.00'),
+            ('status', status), ('pollurl', f'http://localhost/{guid}')
+        ])).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-www-form-urlencoded')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def signed(fields):
+    """Append the Paynow hash to (key, value) pairs"""
+    joined = ''.join(value for _, value in fields) + INTEGRATION_KEY
+    return fields + [('hash', hashlib.sha512(joined.encode('utf-8')).hexdigest().upper())]
+
+
+def start_fake_paynow():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakePaynow)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def setup(app, base_url):
+    """A brand, a creator, a cart of three bookings and a few standalone payments"""
+    with app.app_context():
+        db.create_all()
+
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        creator_user = User(email='creator@example.com', password='password123', user_type='creator')
+        db.session.add_all([brand_user, creator_user])
+        db.session.flush()
+
+        brand = BrandProfile(user_id=brand_user.id, company_name='Poller Test Ltd')
+        creator = CreatorProfile(user_id=creator_user.id)
+        db.session.add_all([brand, creator])
+        db.session.flush()
+
+        package = Package(creator_id=creator.id, title='Reel', description='One reel', price=10, duration_days=7)
+        db.session.add(package)
+        db.session.flush()
+
+        def booking_with_payment(poll_url, external_reference=None):
+            booking = Booking(package_id=package.id, creator_id=creator.id, brand_id=brand.id,
+                              amount=10, total_price=10)
+            db.session.add(booking)
+            db.session.flush()
+            db.session.add(Payment(
+                booking_id=booking.id, user_id=brand_user.id, amount=10, payment_method='paynow',
+                payment_type='automated', status='pending', escrow_status='pending',
+                paynow_poll_url=poll_url, external_reference=external_reference
+            ))
+            return booking.id
+
+        cart_ids = [booking_with_payment(f'{base_url}/cart', 'CART-1_2_3') for _ in range(3)]
+        single_id = booking_with_payment(f'{base_url}/single')
+        pending_id = booking_with_payment(f'{base_url}/pending')
+        booking_with_payment(f'{base_url}/broken')
+        for i in range(SLOW_URLS):
+            booking_with_payment(f'{base_url}/slow{i}')
+
+        subscription = CreatorSubscription(creator_id=creator.id, plan_id=1, status='pending_payment',
+                                           payment_method='paynow', paynow_poll_url=f'{base_url}/creator-sub')
+        db.session.add(subscription)
+        db.session.commit()
+
+        FakePaynow.statuses.update({
+            'cart': 'Paid', 'single': 'Paid', 'pending': 'Sent',
+            'broken': 'error500', 'creator-sub': 'Cancelled'
+        })
+        FakePaynow.statuses.update({f'slow{i}': 'slow' for i in range(SLOW_URLS)})
+
+        return cart_ids, single_id, pending_id, subscription.id
+
+
+def test_cycle_applies_transitions(app, cart_ids, single_id, subscription_id):
+    """One cycle marks cart and single payments paid and cancels the creator subscription"""
+    with app.app_context():
+        started = time.monotonic()
+        polled = paynow_poller.run_once()
+        elapsed = time.monotonic() - started
+
+        assert polled == 5 + SLOW_URLS, polled
+        assert FakePaynow.hits['cart'] == 1, FakePaynow.hits
+
+        # Slow URLs ran on the pool, not one after another
+        assert elapsed < SLOW_URLS * SLOW_DELAY / 2, elapsed
+
+        for booking in Booking.query.filter(Booking.id.in_(cart_ids)):
+            assert booking.payment_status == 'paid' and booking.status == 'accepted', booking
+        collaborations = Collaboration.query.filter(Collaboration.booking_id.in_(cart_ids)).count()
+        assert collaborations == 3, collaborations
+        assert Payment.query.filter(Payment.booking_id.in_(cart_ids), Payment.status == 'completed').count() == 3
+
+        single = db.session.get(Booking, single_id)
+        assert single.payment_status == 'paid' and single.status == 'pending'
+        assert Payment.query.filter_by(booking_id=single_id).one().escrow_status == 'escrowed'
+        assert Collaboration.query.filter_by(booking_id=single_id).count() == 0
+
+        subscription = db.session.get(CreatorSubscription, subscription_id)
+        assert subscription.status == 'cancelled', subscription.status
+    print(f'[OK] One cycle polled {polled} URLs in {elapsed:.2f}s and applied every transition')
+
+
+def test_backoff(app, base_url):
+    """Pending and failing URLs back off and are skipped until due"""
+    with app.app_context():
+        pending = PaynowPoll.query.filter_by(poll_url=f'{base_url}/pending').one()
+        broken = PaynowPoll.query.filter_by(poll_url=f'{base_url}/broken').one()
+        assert pending.status == 'pending' and pending.attempts == 1 and pending.paynow_status == 'sent'
+        assert broken.status == 'pending' and broken.last_error, broken.last_error
+        assert pending.next_poll_at > datetime.utcnow()
+
+        hits_before = dict(FakePaynow.hits)
+        assert paynow_poller.run_once() == 0
+        assert FakePaynow.hits == hits_before
+
+        # Once due again the delay doubles
+        pending.next_poll_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+        assert paynow_poller.run_once() == 1
+        db.session.refresh(pending)
+        assert pending.attempts == 2
+        delay = (pending.next_poll_at - pending.last_polled_at).total_seconds()
+        assert delay == paynow_poller.backoff_base * 2, delay
+    print('[OK] Pending and failing URLs back off exponentially')
+
+
+def test_status_endpoints_read_cache(app, pending_id, single_id):
+    """check_payment_status answers from the database without calling Paynow"""
+    with app.app_context():
+        hits_before = dict(FakePaynow.hits)
+        pending = check_payment_status(db.session.get(Booking, pending_id))
+        paid = check_payment_status(db.session.get(Booking, single_id))
+        assert FakePaynow.hits == hits_before
+        assert pending['paid'] is False and pending['status'] == 'sent', pending
+        assert paid['paid'] is True, paid
+    print('[OK] Status endpoints read cached state only')
+
+
+def test_webhook_fast_path(app):
+    """Callbacks are queued once, repeats are dropped and the poller applies them"""
+    client = app.test_client()
+    with app.app_context():
+        booking_id = db.session.query(Payment.booking_id).filter(Payment.paynow_poll_url.like('%/pending')).scalar()
+        payment = Payment.query.filter_by(booking_id=booking_id).one()
+        payment.paynow_reference = '98765'
+        db.session.commit()
+
+    fields = signed([
+        ('reference', f'BOOKING-{booking_id}'), ('paynowreference', '98765'),
+        ('amount', '10.00'), ('status', 'Paid')
+    ])
+    for _ in range(3):
+        response = client.post('/api/bookings/payment-webhook', data=dict(fields))
+        assert response.status_code == 200, response.get_json()
+
+    tampered = [(key, '1.00' if key == 'amount' else value) for key, value in fields]
+    response = client.post('/api/bookings/payment-webhook', data=dict(tampered))
+    assert response.status_code == 400, response.status_code
+
+    with app.app_context():
+        assert PaynowWebhookEvent.query.count() == 1
+        # Acknowledged, not yet applied
+        assert db.session.get(Booking, booking_id).payment_status == 'pending'
+
+        hits_before = dict(FakePaynow.hits)
+        assert paynow_poller.process_webhook_events() == 1
+        assert FakePaynow.hits == hits_before
+
+        assert db.session.get(Booking, booking_id).payment_status == 'paid'
+        assert PaynowWebhookEvent.query.one().state == 'processed'
+        assert PaynowPoll.query.filter(PaynowPoll.poll_url.like('%/pending')).one().status == 'paid'
+    print('[OK] Webhook verified, deduplicated and applied asynchronously')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Paynow Poller Test')
+    print('=' * 60)
+    server, base_url = start_fake_paynow()
+    try:
+        app = create_app('production')
+        cart_ids, single_id, pending_id, subscription_id = setup(app, base_url)
+        test_cycle_applies_transitions(app, cart_ids, single_id, subscription_id)
+        test_backoff(app, base_url)
+        test_status_endpoints_read_cache(app, pending_id, single_id)
+        test_webhook_fast_path(app)
+        print('\nAll Paynow poller tests passed')
+    finally:
+        server.shutdown()
+        os.unlink(_db_file.name)
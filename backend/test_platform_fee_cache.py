@@ -0,0 +1,189 @@
+"""
+Test platform fee caching and its invalidation on subscription changes
+
+Checks that:
+1. A resolved fee is served from the cache without touching the database
+2. Subscribing, upgrading and cancelling drop the brand's cached fee
+3. Admin plan changes, cancellations and reactivations drop the brand's cached fee
+4. Editing a plan drops every cached fee
+5. An invalidation is only applied if the transaction commits
+
+Uses the in-memory fee store and a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ['EMAIL_WORKERS'] = '0'  # Leave queued emails in the outbox
+os.environ.pop('REDIS_URL', None)  # Exercise the in-memory fee store
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db
+from app.models import User, BrandProfile, Subscription, SubscriptionPlan
+from app.services.platform_fee_service import platform_fee_resolver, MemoryFeeStore, DEFAULT_PLATFORM_FEE
+
+PLAN_FEES = {'free': 8.0, 'pro': 5.0, 'premium': 3.0}
+
+
+def setup(app):
+    """Three plans with distinct fees, an admin and two brands without subscriptions"""
+    with app.app_context():
+        db.create_all()
+
+        plans = {}
+        for order, (slug, fee) in enumerate(PLAN_FEES.items()):
+            price = 0 if slug == 'free' else 10 * (order + 1)
+            plans[slug] = SubscriptionPlan(name=slug.title(), slug=slug, price_monthly=price, price_yearly=price * 10,
+                                           platform_fee_percentage=fee, display_order=order)
+        db.session.add_all(plans.values())
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        admin.admin_role = 'super_admin'
+        brands = [User(email=f'brand{i}@example.com', password='password123', user_type='brand') for i in range(2)]
+        db.session.add_all([admin] + brands)
+        db.session.flush()
+        db.session.add_all([BrandProfile(user_id=user.id, company_name=f'Brand {user.id}') for user in brands])
+        db.session.commit()
+
+        tokens = {'admin': create_access_token(identity=str(admin.id))}
+        tokens.update({user.id: create_access_token(identity=str(user.id)) for user in brands})
+        return {slug: plan.id for slug, plan in plans.items()}, [user.id for user in brands], tokens
+
+
+def resolve(app, user_id):
+    """The brand's fee and the number of statements it took to resolve"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            fee = platform_fee_resolver.for_user(user_id)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+    return fee, len(statements)
+
+
+def warm(app, user_id, expected_fee):
+    """Resolve once so the fee is cached, then check it is served from the cache"""
+    resolve(app, user_id)
+    fee, statements = resolve(app, user_id)
+    assert fee == expected_fee, (fee, expected_fee)
+    assert statements == 0, statements
+    assert platform_fee_resolver.store.get(user_id) == expected_fee
+
+
+def request(client, method, url, token, body=None):
+    response = client.open(url, method=method, json=body or {}, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code in (200, 201), (url, response.get_json())
+    return response.get_json()
+
+
+def subscription_id(app, user_id):
+    with app.app_context():
+        return Subscription.query.filter_by(user_id=user_id).order_by(Subscription.id.desc()).first().id
+
+
+def test_cached(app, user_ids):
+    """A brand without a subscription resolves to the default fee, then hits the cache"""
+    assert isinstance(platform_fee_resolver.store, MemoryFeeStore)
+    fee, statements = resolve(app, user_ids[0])
+    assert fee == DEFAULT_PLATFORM_FEE and statements == 1, (fee, statements)
+    warm(app, user_ids[0], DEFAULT_PLATFORM_FEE)
+    print('[OK] Resolved fee in one query, then served it from the cache')
+
+
+def test_brand_changes(app, client, plan_ids, user_ids, tokens):
+    """Subscribe, upgrade and cancel each drop the cached fee"""
+    user_id = user_ids[0]
+    token = tokens[user_id]
+
+    warm(app, user_id, DEFAULT_PLATFORM_FEE)
+    request(client, 'POST', '/api/subscriptions/subscribe', token, {'plan_id': plan_ids['free']})
+    assert resolve(app, user_id)[0] == PLAN_FEES['free']
+
+    warm(app, user_id, PLAN_FEES['free'])
+    request(client, 'PUT', '/api/subscriptions/upgrade', token, {'plan_id': plan_ids['pro']})
+    assert resolve(app, user_id)[0] == PLAN_FEES['pro']
+
+    # Cancelling at period end keeps the plan, but the entry is still re-read
+    warm(app, user_id, PLAN_FEES['pro'])
+    request(client, 'PUT', '/api/subscriptions/cancel', token, {'reason': 'Testing'})
+    assert platform_fee_resolver.store.get(user_id) is None
+    assert resolve(app, user_id) == (PLAN_FEES['pro'], 1)
+    print('[OK] Subscribe, upgrade and cancel dropped the cached fee')
+
+
+def test_admin_changes(app, client, plan_ids, user_ids, tokens):
+    """Admin change-plan, cancel and reactivate each drop the cached fee"""
+    user_id = user_ids[0]
+    sub_id = subscription_id(app, user_id)
+    base = f'/api/admin/subscriptions/{sub_id}'
+
+    warm(app, user_id, PLAN_FEES['pro'])
+    request(client, 'PUT', f'{base}/change-plan', tokens['admin'], {'plan_id': plan_ids['premium']})
+    assert resolve(app, user_id)[0] == PLAN_FEES['premium']
+
+    warm(app, user_id, PLAN_FEES['premium'])
+    request(client, 'PUT', f'{base}/cancel', tokens['admin'], {'immediate': True})
+    assert resolve(app, user_id)[0] == DEFAULT_PLATFORM_FEE
+
+    warm(app, user_id, DEFAULT_PLATFORM_FEE)
+    request(client, 'PUT', f'{base}/reactivate', tokens['admin'])
+    assert resolve(app, user_id)[0] == PLAN_FEES['premium']
+    print('[OK] Admin change-plan, cancel and reactivate dropped the cached fee')
+
+
+def test_plan_edit(app, client, plan_ids, user_ids, tokens):
+    """Editing any plan drops every brand's cached fee"""
+    warm(app, user_ids[0], PLAN_FEES['premium'])
+    warm(app, user_ids[1], DEFAULT_PLATFORM_FEE)
+
+    request(client, 'PUT', f'/api/admin/subscription-plans/{plan_ids["pro"]}', tokens['admin'],
+            {'description': 'Edited'})
+    for user_id in user_ids:
+        assert platform_fee_resolver.store.get(user_id) is None, user_id
+    assert resolve(app, user_ids[0]) == (PLAN_FEES['premium'], 1)
+    print('[OK] Plan edit dropped every cached fee')
+
+
+def test_rollback(app, user_ids):
+    """An invalidation recorded in a rolled back transaction is discarded"""
+    user_id = user_ids[0]
+    warm(app, user_id, PLAN_FEES['premium'])
+    with app.app_context():
+        subscription = Subscription.query.filter_by(user_id=user_id, status='active').one()
+        subscription.plan_id = SubscriptionPlan.query.filter_by(slug='pro').one().id
+        platform_fee_resolver.invalidate_on_commit(user_id)
+        db.session.rollback()
+        db.session.commit()
+    assert platform_fee_resolver.store.get(user_id) == PLAN_FEES['premium']
+    print('[OK] Rolled back invalidation left the cached fee in place')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Platform Fee Cache Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        plan_ids, user_ids, tokens = setup(app)
+        client = app.test_client()
+        test_cached(app, user_ids)
+        test_brand_changes(app, client, plan_ids, user_ids, tokens)
+        test_admin_changes(app, client, plan_ids, user_ids, tokens)
+        test_plan_edit(app, client, plan_ids, user_ids, tokens)
+        test_rollback(app, user_ids)
+        print('\nAll platform fee cache tests passed')
+    finally:
+        os.unlink(_db_file.name)
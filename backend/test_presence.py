@@ -0,0 +1,109 @@
+"""
+Test reference-counted, TTL based presence tracking
+
+Checks that:
+1. A user stays online until their last socket disconnects
+2. Sockets that stop heartbeating age out after the TTL, and heartbeats keep them alive
+3. Bulk lookups return only the online subset
+4. Socket.IO connect, heartbeat, query and disconnect events drive the registry
+
+Uses the in-memory store and a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+import time
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ['EMAIL_WORKERS'] = '0'  # Leave queued emails in the outbox
+os.environ.pop('REDIS_URL', None)  # Exercise the in-memory presence store
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from app import create_app, db, socketio
+from app.models import User
+from app.services.presence_service import PresenceService, MemoryPresenceStore, presence_service
+
+TTL = 1
+
+
+def test_refcounting():
+    """Two tabs: closing one keeps the user online, closing both takes them offline"""
+    presence = PresenceService(ttl=TTL)
+    assert isinstance(presence.store, MemoryPresenceStore)
+
+    presence.connect(1, 'tab-a')
+    presence.connect('1', 'tab-b')  # String ids from JWT identities count as the same user
+    assert presence.socket_count(1) == 2
+
+    presence.disconnect(1, 'tab-a')
+    assert presence.is_online(1) and presence.socket_count(1) == 1
+
+    presence.disconnect(1, 'tab-a')  # Duplicate disconnects are harmless
+    presence.disconnect(1, 'tab-b')
+    assert not presence.is_online(1) and presence.socket_count(1) == 0
+    print('[OK] User stayed online until their last socket disconnected')
+
+
+def test_ttl_expiry():
+    """A socket that misses its heartbeats expires; a heartbeating one does not"""
+    presence = PresenceService(ttl=TTL)
+    presence.connect(2, 'crashed')
+    presence.connect(3, 'alive')
+
+    deadline = time.time() + TTL * 2
+    while time.time() < deadline:
+        presence.heartbeat(3, 'alive')
+        time.sleep(TTL / 4)
+
+    assert not presence.is_online(2)
+    assert presence.is_online(3)
+    assert presence.online_user_ids([2, 3, None, '3', 4]) == {3}
+    assert presence.online_user_ids([]) == set()
+    print(f'[OK] Silent socket expired after the {TTL}s TTL; heartbeating socket stayed online')
+
+
+def test_socket_events(app):
+    """Connect, presence_query and disconnect over Socket.IO"""
+    with app.app_context():
+        db.create_all()
+        users = [User(email=f'user{i}@example.com', password='password123', user_type='brand') for i in range(2)]
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+        token = create_access_token(identity=str(user_ids[0]))
+
+    first = socketio.test_client(app, auth={'token': token})
+    second = socketio.test_client(app, auth={'token': token})
+    assert presence_service.socket_count(user_ids[0]) == 2
+
+    received = first.get_received()
+    success = [e['args'][0] for e in received if e['name'] == 'connection_success']
+    assert success and success[0]['heartbeat_interval'] > 0, received
+
+    first.emit('presence_heartbeat')
+    first.emit('presence_query', {'user_ids': user_ids})
+    status = [e['args'][0] for e in first.get_received() if e['name'] == 'presence_status']
+    assert status == [{'online_user_ids': [user_ids[0]]}], status
+
+    first.disconnect()
+    assert presence_service.is_online(user_ids[0])
+    second.disconnect()
+    assert not presence_service.is_online(user_ids[0])
+    print('[OK] Socket events kept the presence registry in step')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Presence Test')
+    print('=' * 60)
+    try:
+        test_refcounting()
+        test_ttl_expiry()
+        test_socket_events(create_app('production'))
+        print('\nAll presence tests passed')
+    finally:
+        os.unlink(_db_file.name)
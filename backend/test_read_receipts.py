@@ -0,0 +1,142 @@
+"""
+Test batched notification read receipts over Socket.IO
+
+Checks that:
+1. A batch of ids is marked read with one UPDATE ... RETURNING
+2. The UPDATE only touches the socket user's own unread notifications
+3. Every socket the user has open gets one acknowledgement with the marked ids
+4. Batches over MAX_READ_RECEIPT_BATCH, malformed ids and unauthenticated sockets are rejected
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ['EMAIL_WORKERS'] = '0'  # Leave queued emails in the outbox
+os.environ.pop('REDIS_URL', None)  # Keep presence in process memory
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db, socketio
+from app.models import User, Notification
+from app.socket_handlers import MAX_READ_RECEIPT_BATCH
+
+NOTIFICATIONS = 20
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        users = {}
+        for name in ('reader', 'other'):
+            user = User(email=f'{name}@example.com', password='password123', user_type='brand')
+            db.session.add(user)
+            users[name] = user
+        db.session.flush()
+
+        for user in users.values():
+            for i in range(NOTIFICATIONS):
+                db.session.add(Notification(user_id=user.id, title=f'Update {i}', message='Something happened',
+                                            type='info'))
+        db.session.commit()
+
+        ids = {name: [n.id for n in Notification.query.filter_by(user_id=user.id).order_by(Notification.id)]
+               for name, user in users.items()}
+        tokens = {name: create_access_token(identity=str(user.id)) for name, user in users.items()}
+        return ids, tokens
+
+
+def emit(app, socket, payload):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        socket.emit('mark_notification_read', payload)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    return statements
+
+
+def events(socket, name):
+    return [e['args'][0] for e in socket.get_received() if e['name'] == name]
+
+
+def test_batch(app, ids, tokens):
+    """Half of the reader's notifications, plus someone else's, in one UPDATE"""
+    socket = socketio.test_client(app, auth={'token': tokens['reader']})
+    second_tab = socketio.test_client(app, auth={'token': tokens['reader']})
+    socket.get_received()
+    second_tab.get_received()
+
+    batch = ids['reader'][:10] + ids['other'][:5]
+    statements = emit(app, socket, {'notification_ids': batch + batch[:3]})
+    updates = [s for s in statements if s.startswith('UPDATE notifications')]
+    assert len(updates) == 1 and 'RETURNING' in updates[0], statements
+
+    acks = events(socket, 'notifications_marked_read')
+    assert len(acks) == 1 and sorted(acks[0]['notification_ids']) == ids['reader'][:10], acks
+    assert events(second_tab, 'notifications_marked_read') == acks
+
+    with app.app_context():
+        read = {n.id for n in Notification.query.filter_by(is_read=True)}
+        assert read == set(ids['reader'][:10]), read
+
+    # Already read: nothing left to mark
+    emit(app, socket, {'notification_ids': ids['reader'][:10]})
+    assert events(socket, 'notifications_marked_read') == [{'notification_ids': []}]
+
+    # A single legacy id still works
+    emit(app, socket, {'notification_id': ids['reader'][10]})
+    assert events(socket, 'notifications_marked_read') == [{'notification_ids': [ids['reader'][10]]}]
+    socket.disconnect()
+    second_tab.disconnect()
+    print(f'[OK] Marked 10 of {len(batch)} ids read in one statement; other users were untouched')
+
+
+def test_rejected(app, ids, tokens):
+    """Oversized, malformed and unauthenticated batches change nothing"""
+    socket = socketio.test_client(app, auth={'token': tokens['reader']})
+    socket.get_received()
+
+    oversized = ids['reader'][11:] + list(range(100000, 100000 + MAX_READ_RECEIPT_BATCH))
+    for payload in ({'notification_ids': oversized}, {'notification_ids': []},
+                    {'notification_ids': 'all'}, {'notification_ids': ['x']}, {}):
+        statements = emit(app, socket, payload)
+        assert not [s for s in statements if s.startswith('UPDATE')], (payload, statements)
+        assert events(socket, 'notification_read_error'), payload
+    socket.disconnect()
+
+    anonymous = socketio.test_client(app)
+    anonymous.emit('mark_notification_read', {'notification_ids': ids['reader'][11:]})
+    assert events(anonymous, 'notification_read_error') == [{'error': 'Authentication required'}]
+    anonymous.disconnect()
+
+    with app.app_context():
+        assert Notification.query.filter_by(is_read=True).count() == 11
+    print(f'[OK] Batches over {MAX_READ_RECEIPT_BATCH} ids, malformed ids and anonymous sockets were rejected')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Read Receipt Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        ids, tokens = setup(app)
+        test_batch(app, ids, tokens)
+        test_rejected(app, ids, tokens)
+        print('\nAll read receipt tests passed')
+    finally:
+        os.unlink(_db_file.name)
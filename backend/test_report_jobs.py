@@ -0,0 +1,187 @@
+"""
+Test background admin report jobs and their cached results
+
+Checks that:
+1. Report specs are validated and normalized before they are hashed
+2. Identical requests share one job while it runs and reuse its result until it expires
+3. Admin subscribers get a Socket.IO event when a job completes; others cannot subscribe
+4. Jobs abandoned by a dead worker are picked up again, and expired jobs are purged
+5. Worker threads run queued jobs in the background
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ['REPORT_JOB_WORKERS'] = '0'  # Run jobs explicitly until the worker test
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import create_app, db, socketio
+from app.models import User, ReportJob
+from app.services import report_service
+from app.services.report_jobs import report_job_queue
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        db.session.add(admin)
+        for i in range(5):
+            db.session.add(User(email=f'creator{i}@example.com', password='password123', user_type='creator'))
+        db.session.commit()
+        return create_access_token(identity=str(admin.id))
+
+
+def post(client, token, body):
+    return client.post('/api/admin/report-jobs', json=body, headers={'Authorization': f'Bearer {token}'})
+
+
+def test_validation(client, token):
+    """Unknown reports and parameters are rejected"""
+    for body in ({'report': 'nonsense'}, {'report': 'growth', 'params': {'days': 'many'}},
+                 {'report': 'growth', 'params': {'days': 45}}, {'report': 'risk', 'params': {'days': 30}}):
+        response = post(client, token, body)
+        assert response.status_code == 400, (body, response.get_json())
+    print('[OK] Invalid report specs are rejected')
+
+
+def test_shared_job(app, client, token):
+    """Identical specs share a job; subscribers hear when it completes"""
+    headers = {'Authorization': f'Bearer {token}'}
+    first = post(client, token, {'report': 'growth', 'params': {'days': 90}})
+    assert first.status_code == 202, first.get_json()
+    job = first.get_json()['data']
+    assert job['status'] == 'queued' and not first.get_json()['reused']
+
+    # Same spec, spelled differently, while the job is still queued
+    second = post(client, token, {'report': 'growth', 'params': {'days': '90'}})
+    assert second.get_json()['data']['id'] == job['id'] and second.get_json()['reused']
+    other = post(client, token, {'report': 'growth'})
+    assert other.get_json()['data']['id'] != job['id']
+
+    with app.app_context():
+        creator_token = create_access_token(identity=str(User.query.filter_by(is_admin=False).first().id))
+    outsider = socketio.test_client(app, auth={'token': creator_token})
+    outsider.get_received()
+    outsider.emit('subscribe_report_job', {'job_id': job['id']})
+    assert [e['name'] for e in outsider.get_received()] == ['report_job_error']
+
+    socket = socketio.test_client(app, auth={'token': token})
+    socket.emit('subscribe_report_job', {'job_id': job['id']})
+    socket.get_received()
+
+    with app.app_context():
+        while report_job_queue.process_next():
+            pass
+
+    events = [e for e in socket.get_received() if e['name'] == 'report_job_completed']
+    assert [e['args'][0] for e in events] == [{'job_id': job['id'], 'report': 'growth', 'status': 'completed'}], events
+    assert not [e for e in outsider.get_received() if e['name'] == 'report_job_completed']
+    socket.disconnect()
+    outsider.disconnect()
+
+    response = client.get(f"/api/admin/report-jobs/{job['id']}", headers=headers)
+    assert response.status_code == 200
+    with app.app_context():
+        assert response.get_json()['data']['result'] == report_service.growth_report(90)
+    print('[OK] Identical requests shared one job and only the admin subscriber was notified')
+
+
+def test_cached_result(app, client, token):
+    """A completed result is served without running the report until it expires"""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        cached = post(client, token, {'report': 'growth', 'params': {'days': 90}})
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    assert cached.status_code == 200 and cached.get_json()['reused'], cached.get_json()
+    assert cached.get_json()['data']['result']['total_users'] == 6
+    assert not any('growth_daily_rollup' in s for s in statements), statements
+
+    job_id = cached.get_json()['data']['id']
+    with app.app_context():
+        db.session.get(ReportJob, job_id).expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+    fresh = post(client, token, {'report': 'growth', 'params': {'days': 90}})
+    assert fresh.status_code == 202 and fresh.get_json()['data']['id'] != job_id
+
+    with app.app_context():
+        assert report_job_queue.purge_expired() == 1
+        assert db.session.get(ReportJob, job_id) is None
+    print(f'[OK] Cached result served in {len(statements)} statements; expired result re-queued and purged')
+
+
+def test_abandoned_job(app):
+    """A job left running by a dead worker is run again after the timeout"""
+    with app.app_context():
+        job, _ = report_job_queue.submit('marketplace-health')
+        job.status = 'running'
+        job.started_at = datetime.utcnow() - report_job_queue.timeout - timedelta(seconds=1)
+        db.session.commit()
+
+        while report_job_queue.process_next():
+            pass
+        job = db.session.get(ReportJob, job.id)
+        assert job.status == 'completed' and job.result['collaboration_ratio']['total'] == 0
+    print('[OK] Abandoned job was picked up again')
+
+
+def test_worker(app, client, token):
+    """Worker threads run queued jobs without an explicit drain"""
+    report_job_queue.worker_count = 1
+    report_job_queue.poll_interval = 0.1
+    try:
+        response = post(client, token, {'report': 'revenue', 'params': {'months': 12}})
+        job_id = response.get_json()['data']['id']
+
+        deadline = time.time() + 10
+        status = None
+        while time.time() < deadline:
+            status = client.get(f'/api/admin/report-jobs/{job_id}',
+                                headers={'Authorization': f'Bearer {token}'}).get_json()['data']['status']
+            if status == 'completed':
+                break
+            time.sleep(0.05)
+        assert status == 'completed', status
+    finally:
+        report_job_queue.stop()
+    print('[OK] Background worker completed the queued job')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Report Jobs Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token = setup(app)
+        client = app.test_client()
+        test_validation(client, token)
+        test_shared_job(app, client, token)
+        test_cached_result(app, client, token)
+        test_abandoned_job(app)
+        test_worker(app, client, token)
+        print('\nAll report job tests passed')
+    finally:
+        os.unlink(_db_file.name)
@@ -0,0 +1,199 @@
+"""
+Test the precomputed user_risk_scores behind the admin risk report
+
+Checks that:
+1. The nightly rebuild counts disputes, recent cancellations and failed payments
+2. Raising a dispute, cancelling a collaboration or failing a payment rescores
+   the users involved in the same transaction
+3. The rebuild ages cancellations out of the 30 day window
+4. The risk report serves the stored scores in a fixed number of statements
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, select, update
+from app import create_app, db
+from app.models import (
+    User, CreatorProfile, BrandProfile, Package, Booking, Collaboration, Dispute, UserRiskScore, ActivityEvent
+)
+from app.services import risk_service
+
+CREATORS = 5
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        db.session.add_all([admin, brand_user])
+        db.session.flush()
+        brand = BrandProfile(user_id=brand_user.id, company_name='Risk Test Ltd')
+        db.session.add(brand)
+
+        creators = []
+        for i in range(CREATORS):
+            user = User(email=f'creator{i}@example.com', password='password123', user_type='creator')
+            db.session.add(user)
+            db.session.flush()
+            profile = CreatorProfile(user_id=user.id, username=f'creator{i}')
+            db.session.add(profile)
+            creators.append(profile)
+        db.session.flush()
+
+        package = Package(creator_id=creators[0].id, title='Reel', description='One reel', price=10, duration_days=7)
+        db.session.add(package)
+        db.session.flush()
+
+        # creator0: two disputes against them and two cancellations
+        for i in range(2):
+            db.session.add(Dispute(reference=f'DISP-{i:04d}', raised_by_user_id=brand_user.id,
+                                   against_user_id=creators[0].user_id, issue_type='quality',
+                                   description='Late delivery'))
+            db.session.add(Collaboration(collaboration_type='package', brand_id=brand.id, creator_id=creators[0].id,
+                                         title=f'Cancelled {i}', amount=10, start_date=datetime.utcnow(),
+                                         status='cancelled'))
+
+        # One active collaboration per creator, and three failed booking payments for the brand
+        for creator in creators:
+            db.session.add(Collaboration(collaboration_type='package', brand_id=brand.id, creator_id=creator.id,
+                                         title=f'Work for {creator.username}', amount=10,
+                                         start_date=datetime.utcnow()))
+        for _ in range(3):
+            db.session.add(Booking(package_id=package.id, creator_id=creators[0].id, brand_id=brand.id,
+                                   amount=10, total_price=10, payment_status='failed'))
+        db.session.commit()
+
+        ids = {'admin': admin.id, 'brand': brand_user.id, 'brand_profile': brand.id,
+               'creators': [c.user_id for c in creators], 'creator_profiles': [c.id for c in creators]}
+        return create_access_token(identity=str(admin.id)), ids
+
+
+def scores():
+    return {row.user_id: row for row in UserRiskScore.query}
+
+
+def test_rebuild(app, ids):
+    """The nightly rebuild matches the seeded signals"""
+    with app.app_context():
+        assert risk_service.refresh_risk_scores() == 2
+
+        stored = scores()
+        creator = stored[ids['creators'][0]]
+        assert (creator.dispute_count, creator.creator_cancellations, creator.failed_payments) == (2, 2, 0)
+        assert creator.score == 2 * 3 + 2 * 2
+
+        brand = stored[ids['brand']]
+        assert (brand.dispute_count, brand.brand_cancellations, brand.failed_payments) == (2, 2, 3)
+        assert brand.score == 2 * 3 + 2 * 2 + 3
+    print('[OK] Rebuild counted disputes, cancellations and failed payments')
+
+
+def test_incremental(app, ids):
+    """Changes rescore the users involved as part of the same commit"""
+    with app.app_context():
+        creator_user = ids['creators'][1]
+        db.session.add(Dispute(reference='DISP-0100', raised_by_user_id=ids['brand'], against_user_id=creator_user,
+                               issue_type='non_delivery', description='Nothing delivered'))
+        db.session.commit()
+        assert scores()[creator_user].dispute_count == 1
+        assert scores()[ids['brand']].dispute_count == 3
+
+        collaboration = Collaboration.query.filter_by(creator_id=ids['creator_profiles'][1]).first()
+        collaboration.status = 'cancelled'
+        db.session.commit()
+        assert scores()[creator_user].creator_cancellations == 1
+        assert scores()[ids['brand']].brand_cancellations == 3
+
+        booking = Booking.query.filter_by(payment_status='failed').first()
+        booking.payment_status = 'paid'
+        db.session.commit()
+        assert scores()[ids['brand']].failed_payments == 2
+
+        # A rolled back cancellation leaves the scores alone
+        collaboration = Collaboration.query.filter_by(creator_id=ids['creator_profiles'][2]).first()
+        collaboration.status = 'cancelled'
+        db.session.flush()
+        assert ids['creators'][2] in scores()
+        db.session.rollback()
+        assert ids['creators'][2] not in scores()
+    print('[OK] Disputes, cancellations and payment changes rescored the users involved')
+
+
+def test_window(app, ids):
+    """Cancellations older than 30 days drop out at the next rebuild, even if edited since"""
+    with app.app_context():
+        collaboration_ids = select(Collaboration.id).where(Collaboration.creator_id == ids['creator_profiles'][1])
+        db.session.execute(update(ActivityEvent).where(
+            ActivityEvent.source_type == 'collaboration',
+            ActivityEvent.source_id.in_(collaboration_ids),
+            ActivityEvent.event_type == 'collaboration_cancelled'
+        ).values(created_at=datetime.utcnow() - timedelta(days=40)))
+        db.session.execute(update(Collaboration).where(
+            Collaboration.id.in_(collaboration_ids)
+        ).values(updated_at=datetime.utcnow()))
+        db.session.commit()
+        assert scores()[ids['creators'][1]].creator_cancellations == 1
+
+        risk_service.refresh_risk_scores()
+        assert scores()[ids['creators'][1]].creator_cancellations == 0
+        assert scores()[ids['brand']].brand_cancellations == 2
+    print('[OK] Rebuild aged cancellations out of the 30 day window')
+
+
+def test_report(app, token, ids):
+    """The risk report reads the stored scores"""
+    client = app.test_client()
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get('/api/admin/reports/risk', headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()['data']
+    disputes = {u['user_id']: u['dispute_count'] for u in data['users_with_multiple_disputes']}
+    assert disputes == {ids['brand']: 3, ids['creators'][0]: 2}, disputes
+    cancellations = [(u['user_id'], u['cancellation_count']) for u in data['users_with_recent_cancellations']]
+    assert cancellations == [(ids['creators'][0], 2), (ids['brand'], 2)], cancellations
+    assert [(u['user_id'], u['failed_count']) for u in data['failed_payment_accounts']] == [(ids['brand'], 2)]
+    assert data['highest_risk_users'][0]['user_id'] == ids['brand']
+    assert data['scores_computed_at']
+    assert not any('disputes' in s for s in statements), statements
+    print(f'[OK] Risk report served stored scores in {len(statements)} statements')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Risk Scores Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token, ids = setup(app)
+        test_rebuild(app, ids)
+        test_incremental(app, ids)
+        test_window(app, ids)
+        test_report(app, token, ids)
+        print('\nAll risk score tests passed')
+    finally:
+        os.unlink(_db_file.name)
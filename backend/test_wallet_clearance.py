@@ -0,0 +1,182 @@
+"""
+Test the chunked wallet clearance job
+
+Checks that:
+1. Matured transactions are cleared one set-based UPDATE per chunk, not one per row
+2. Each wallet's pending and available balances move by exactly what cleared
+3. Transactions still inside their clearance period are left alone
+4. A second run, or a run that cannot take the clearance lock, clears nothing
+5. The ledger reconciles with the running totals afterwards
+
+Uses a throwaway SQLite database by default. Point TEST_DATABASE_URL at an empty
+Postgres database to exercise the real advisory lock and SKIP LOCKED.
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Use a throwaway database before the app config is imported
+_db_file = None
+if os.getenv('TEST_DATABASE_URL'):
+    os.environ['DATABASE_URL'] = os.environ['TEST_DATABASE_URL']
+else:
+    _db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ['EMAIL_WORKERS'] = '0'  # Leave queued emails in the outbox
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import event, func, select
+from app import create_app, db
+from app.models import User, Wallet, WalletTransaction
+from app.services import wallet_ledger, wallet_service
+from app.services.wallet_service import clear_pending_transactions, get_or_create_wallet, CLEARANCE_LOCK_KEY
+
+WALLETS = 4
+MATURED_PER_WALLET = 6
+BATCH_SIZE = 5
+
+
+def setup(app):
+    """WALLETS creators, each with matured and still-pending earnings"""
+    with app.app_context():
+        db.create_all()
+
+        past = datetime.utcnow() - timedelta(days=1)
+        future = datetime.utcnow() + timedelta(days=7)
+        user_ids = []
+        for w in range(WALLETS):
+            user = User(email=f'creator{w}@example.com', password='password123', user_type='creator')
+            db.session.add(user)
+            db.session.flush()
+            wallet = get_or_create_wallet(user.id)
+            for i in range(MATURED_PER_WALLET + 1):
+                wallet_ledger.record_transaction(WalletTransaction(
+                    wallet_id=wallet.id, user_id=user.id, transaction_type='earning', amount=10 + i,
+                    status='pending_clearance', clearance_required=True,
+                    available_at=past if i < MATURED_PER_WALLET else future,
+                    idempotency_key=f'clearance-test:{w}:{i}'
+                ), 'earning', 'external', 'pending_clearance', earned=True)
+            user_ids.append(user.id)
+        db.session.commit()
+        return user_ids
+
+
+def run(app, **kwargs):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            cleared = clear_pending_transactions(**kwargs)
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+    return cleared, statements
+
+
+def test_chunked_clearance(app, user_ids):
+    """Matured rows cleared a chunk at a time, balances moved once per row"""
+    matured = WALLETS * MATURED_PER_WALLET
+    cleared, statements = run(app, batch_size=BATCH_SIZE)
+    assert cleared == matured, cleared
+
+    chunks = -(-matured // BATCH_SIZE) + (1 if matured % BATCH_SIZE == 0 else 0)
+    transaction_updates = [s for s in statements if s.startswith('UPDATE wallet_transactions')]
+    assert len(transaction_updates) == chunks, (chunks, transaction_updates)
+    wallet_updates = [s for s in statements if s.startswith('UPDATE wallets')]
+    assert len(wallet_updates) <= chunks, wallet_updates
+
+    matured_amount = Decimal(sum(10 + i for i in range(MATURED_PER_WALLET)))
+    with app.app_context():
+        for user_id in user_ids:
+            wallet = Wallet.query.filter_by(user_id=user_id).one()
+            assert wallet.available_balance == matured_amount, wallet.available_balance
+            assert wallet.pending_clearance == Decimal(10 + MATURED_PER_WALLET), wallet.pending_clearance
+
+        statuses = dict(db.session.execute(
+            select(WalletTransaction.status, func.count()).group_by(WalletTransaction.status)
+        ).all())
+        assert statuses == {'available': matured, 'pending_clearance': WALLETS}, statuses
+        assert WalletTransaction.query.filter_by(status='available').filter(
+            WalletTransaction.cleared_at.is_(None)).count() == 0
+    print(f'[OK] Cleared {matured} transactions in {len(transaction_updates)} chunked UPDATEs')
+
+
+def test_nothing_left(app):
+    """A repeat run finds nothing to clear"""
+    cleared, statements = run(app, batch_size=BATCH_SIZE)
+    assert cleared == 0
+    assert len([s for s in statements if s.startswith('UPDATE wallet_transactions')]) == 1
+    print('[OK] Repeat run cleared nothing')
+
+
+def test_lock_held_elsewhere(app, user_ids):
+    """With the clearance lock held by another run, this run skips"""
+    with app.app_context():
+        wallet = Wallet.query.filter_by(user_id=user_ids[0]).one()
+        wallet_ledger.record_transaction(WalletTransaction(
+            wallet_id=wallet.id, user_id=user_ids[0], transaction_type='earning', amount=5,
+            status='pending_clearance', available_at=datetime.utcnow() - timedelta(hours=1),
+            idempotency_key='clearance-test:late'
+        ), 'earning', 'external', 'pending_clearance', earned=True)
+        db.session.commit()
+
+        if db.engine.dialect.name == 'postgresql':
+            holder = db.engine.connect()
+            holder.execute(select(func.pg_advisory_lock(CLEARANCE_LOCK_KEY)))
+        else:
+            # SQLite has no advisory locks; stand in for a run holding it
+            holder = None
+            original = wallet_service.clearance_lock
+
+            @contextmanager
+            def held():
+                yield False
+            wallet_service.clearance_lock = held
+
+    try:
+        cleared, statements = run(app)
+        assert cleared == 0
+        assert not [s for s in statements if s.startswith('UPDATE')], statements
+    finally:
+        if holder is not None:
+            holder.execute(select(func.pg_advisory_unlock(CLEARANCE_LOCK_KEY)))
+            holder.close()
+        else:
+            wallet_service.clearance_lock = original
+
+    cleared, _ = run(app)
+    assert cleared == 1
+    print('[OK] Run skipped while the clearance lock was held, and cleared once released')
+
+
+def test_ledger_reconciles(app):
+    """The running totals match the ledger"""
+    with app.app_context():
+        drift = wallet_ledger.reconcile_wallets()
+        assert drift == [], drift
+    print('[OK] Ledger reconciles with running totals')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Wallet Clearance Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        user_ids = setup(app)
+        test_chunked_clearance(app, user_ids)
+        test_nothing_left(app)
+        test_lock_held_elsewhere(app, user_ids)
+        test_ledger_reconciles(app)
+        print('\nAll wallet clearance tests passed')
+    finally:
+        if _db_file:
+            os.unlink(_db_file.name)
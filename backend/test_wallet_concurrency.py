@@ -0,0 +1,222 @@
+"""
+Concurrency stress test for wallet credits and cashouts
+
+Runs many escrow releases, duplicate releases, idempotent credits and
+cashouts in parallel threads against ONE creator wallet, then checks that:
+1. Every collaboration was paid exactly once (duplicates lost on the idempotency key)
+2. No update was lost - running totals equal the sum of what was posted
+3. Concurrent cashouts never overdraw the available balance
+4. The ledger reconciles with the running totals
+5. A milestone paid out before idempotency keys existed is not paid again
+
+Uses a throwaway SQLite database by default. Point TEST_DATABASE_URL at an empty
+Postgres database to exercise real row-level concurrency.
+"""
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+# Use a throwaway database before the app config is imported
+_db_file = None
+if os.getenv('TEST_DATABASE_URL'):
+    os.environ['DATABASE_URL'] = os.environ['TEST_DATABASE_URL']
+else:
+    _db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app, db
+from app.models import (
+    User, CreatorProfile, BrandProfile, Collaboration, CollaborationMilestone, Payment,
+    Wallet, WalletTransaction, CashoutRequest
+)
+from app.services import wallet_ledger
+from app.services.wallet_service import credit_brand_wallet
+from app.services.payment_service import release_escrow_to_wallet, release_milestone_escrow
+from app.services.cashout_service import submit_cashout_request
+
+COLLABORATIONS = 20
+RELEASES_PER_COLLABORATION = 3
+CREDIT_REPEATS = 5
+CASHOUT_ATTEMPTS = 10
+
+
+def run_parallel(app, jobs):
+    """Run callables in parallel threads, each in its own app context. Returns (results, errors)."""
+    results, errors = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(jobs))
+
+    def worker(job):
+        with app.app_context():
+            barrier.wait()
+            try:
+                outcome = job()
+                with lock:
+                    results.append(outcome)
+            except Exception as e:
+                db.session.rollback()
+                with lock:
+                    errors.append(str(e))
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(job,)) for job in jobs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def setup(app):
+    """One brand, one creator and COLLABORATIONS completed, paid collaborations"""
+    with app.app_context():
+        db.create_all()
+
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        creator_user = User(email='creator@example.com', password='password123', user_type='creator')
+        db.session.add_all([brand_user, creator_user])
+        db.session.flush()
+
+        brand = BrandProfile(user_id=brand_user.id, company_name='Stress Test Ltd')
+        creator = CreatorProfile(user_id=creator_user.id)
+        db.session.add_all([brand, creator])
+        db.session.flush()
+
+        collaboration_ids = []
+        for i in range(COLLABORATIONS):
+            collaboration = Collaboration(
+                collaboration_type='package', brand_id=brand.id, creator_id=creator.id,
+                title=f'Collaboration {i}', amount=100, status='completed', start_date=datetime.utcnow()
+            )
+            db.session.add(collaboration)
+            db.session.flush()
+            # Brand paid the price plus the 10% free-tier upfront fee
+            db.session.add(Payment(
+                user_id=brand_user.id, collaboration_id=collaboration.id, amount=110,
+                status='paid', escrow_status='escrowed'
+            ))
+            collaboration_ids.append(collaboration.id)
+
+        db.session.commit()
+        return creator_user.id, collaboration_ids
+
+
+def test_parallel_escrow_releases(app, creator_user_id, collaboration_ids):
+    """Every collaboration released by several threads at once is paid exactly once"""
+    jobs = [
+        (lambda collaboration_id=collaboration_id: release_escrow_to_wallet(collaboration_id).id)
+        for collaboration_id in collaboration_ids
+        for _ in range(RELEASES_PER_COLLABORATION)
+    ]
+    results, errors = run_parallel(app, jobs)
+
+    with app.app_context():
+        earnings = WalletTransaction.query.filter_by(user_id=creator_user_id, transaction_type='earning').all()
+        assert len(earnings) == COLLABORATIONS, f'expected {COLLABORATIONS} earnings, got {len(earnings)}'
+        assert len(results) == COLLABORATIONS, results
+        assert len(errors) == COLLABORATIONS * (RELEASES_PER_COLLABORATION - 1), errors
+        assert all('already released' in error for error in errors), set(errors)
+
+        # $100 - 15% commission per collaboration
+        expected = sum(Decimal(str(t.amount)) for t in earnings)
+        assert expected == Decimal('85.00') * COLLABORATIONS, expected
+
+        wallet = Wallet.query.filter_by(user_id=creator_user_id).one()
+        assert wallet.pending_clearance == expected, (wallet.pending_clearance, expected)
+        assert wallet.total_earned == expected, (wallet.total_earned, expected)
+    print(f'[OK] {len(jobs)} parallel releases paid {COLLABORATIONS} collaborations exactly once')
+
+
+def test_idempotent_credits(app, creator_user_id):
+    """A credit retried in parallel with the same key lands once"""
+    jobs = [
+        lambda: credit_brand_wallet(
+            creator_user_id, 100, 'credit', 'Stress test credit', idempotency_key='stress:credit:1'
+        ).id
+        for _ in range(CREDIT_REPEATS)
+    ]
+    results, errors = run_parallel(app, jobs)
+    assert not errors, errors
+    assert len(set(results)) == 1, results
+
+    with app.app_context():
+        wallet = Wallet.query.filter_by(user_id=creator_user_id).one()
+        assert wallet.available_balance == Decimal('100.00'), wallet.available_balance
+    print(f'[OK] {CREDIT_REPEATS} parallel retries of one credit landed once')
+
+
+def test_parallel_cashouts_never_overdraw(app, creator_user_id):
+    """Concurrent $30 cashouts against $100 can take at most $90"""
+    jobs = [
+        lambda: submit_cashout_request(creator_user_id, {
+            'amount': 30, 'payment_method': 'ecocash', 'payment_details': {'phone': '0771234567'}
+        }).id
+        for _ in range(CASHOUT_ATTEMPTS)
+    ]
+    results, errors = run_parallel(app, jobs)
+
+    with app.app_context():
+        wallet = Wallet.query.filter_by(user_id=creator_user_id).one()
+        held = CashoutRequest.query.filter_by(user_id=creator_user_id).count()
+
+        assert held == len(results) and 1 <= held <= 3, (held, results, errors)
+        assert wallet.available_balance >= 0, wallet.available_balance
+        assert wallet.available_balance == Decimal('100.00') - 30 * held, (wallet.available_balance, held)
+    print(f'[OK] {CASHOUT_ATTEMPTS} parallel cashouts: {len(results)} accepted, balance never negative')
+
+
+def test_ledger_reconciles(app):
+    """The running totals match the ledger after all of the above"""
+    with app.app_context():
+        drift = wallet_ledger.reconcile_wallets()
+        assert drift == [], drift
+    print('[OK] Ledger reconciles with running totals')
+
+
+def test_legacy_milestone_release(app, creator_user_id, collaboration_ids):
+    """A milestone earning recorded without an idempotency key still blocks a second release"""
+    with app.app_context():
+        milestone = CollaborationMilestone(
+            collaboration_id=collaboration_ids[0], milestone_number=1, title='Legacy milestone',
+            expected_deliverables=['1 Reel'], price=50, status='completed'
+        )
+        db.session.add(milestone)
+        db.session.flush()
+        wallet = Wallet.query.filter_by(user_id=creator_user_id).one()
+        db.session.add(WalletTransaction(
+            wallet_id=wallet.id, user_id=creator_user_id, transaction_type='milestone_earning',
+            amount=42.5, status='available', milestone_id=milestone.id, collaboration_id=collaboration_ids[0]
+        ))
+        db.session.commit()
+
+        try:
+            release_milestone_escrow(milestone.id)
+        except ValueError as e:
+            assert 'already released' in str(e), e
+        else:
+            raise AssertionError('legacy milestone payout was released again')
+        assert WalletTransaction.query.filter_by(milestone_id=milestone.id).count() == 1
+    print('[OK] Milestone paid before idempotency keys was not paid again')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Wallet Concurrency Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        creator_user_id, collaboration_ids = setup(app)
+        test_parallel_escrow_releases(app, creator_user_id, collaboration_ids)
+        test_idempotent_credits(app, creator_user_id)
+        test_parallel_cashouts_never_overdraw(app, creator_user_id)
+        test_ledger_reconciles(app)
+        test_legacy_milestone_release(app, creator_user_id, collaboration_ids)
+        print('\nAll wallet concurrency tests passed')
+    finally:
+        if _db_file:
+            os.unlink(_db_file.name)
@@ -0,0 +1,158 @@
+"""
+Test that admin wallet operations post through the ledger
+
+Checks that:
+1. Rejecting a cashout returns the held amount to the available balance
+2. Admin escrow release pays the creator once, through the ledger
+3. An approved cancellation splits the amount between brand and creator through the ledger
+4. The ledger reconciles with the running totals afterwards
+
+Uses a throwaway SQLite database.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+
+# Use a throwaway database before the app config is imported
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['PAYNOW_POLLER_ENABLED'] = 'false'
+os.environ['EMAIL_WORKERS'] = '0'  # Leave queued emails in the outbox
+os.environ.pop('REDIS_URL', None)  # Keep the admin authorization cache in process memory
+sys.path.insert(0, os.path.dirname(__file__))
+
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import (
+    User, CreatorProfile, BrandProfile, Collaboration, Wallet, WalletTransaction, CashoutRequest
+)
+from app.services import wallet_ledger
+from app.services.wallet_service import credit_brand_wallet, get_or_create_wallet
+from app.services.cashout_service import submit_cashout_request
+
+
+def setup(app):
+    with app.app_context():
+        db.create_all()
+
+        admin = User(email='admin@example.com', password='password123', user_type='brand')
+        admin.is_admin = True
+        admin.admin_role = 'super_admin'
+        creator_user = User(email='creator@example.com', password='password123', user_type='creator')
+        brand_user = User(email='brand@example.com', password='password123', user_type='brand')
+        db.session.add_all([admin, creator_user, brand_user])
+        db.session.flush()
+        creator = CreatorProfile(user_id=creator_user.id, username='creator')
+        brand = BrandProfile(user_id=brand_user.id, company_name='Acme')
+        db.session.add_all([creator, brand])
+        db.session.flush()
+
+        collaboration_ids = {}
+        for name, status, progress in (('release', 'completed', 100), ('cancel', 'in_progress', 60)):
+            collaboration = Collaboration(
+                collaboration_type='package', brand_id=brand.id, creator_id=creator.id, title=name,
+                amount=50, status=status, progress_percentage=progress, start_date=datetime.utcnow()
+            )
+            db.session.add(collaboration)
+            db.session.flush()
+            collaboration_ids[name] = collaboration.id
+        db.session.get(Collaboration, collaboration_ids['cancel']).cancellation_request = {
+            'status': 'pending', 'reason': 'Brief changed'
+        }
+        db.session.commit()
+
+        credit_brand_wallet(creator_user.id, 100, 'credit', 'Opening credit', idempotency_key='ledger:credit:1')
+        get_or_create_wallet(brand_user.id)
+        users = {'creator': creator_user.id, 'brand': brand_user.id}
+        return create_access_token(identity=str(admin.id)), users, collaboration_ids
+
+
+def balances_of(user_id):
+    """Ledger-derived account balances of the user's wallet, after checking the running totals agree"""
+    wallet = Wallet.query.filter_by(user_id=user_id).one()
+    balances, _ = wallet_ledger.derive_balances([wallet.id])[wallet.id]
+    assert balances['available'] == wallet.available_balance, (balances, wallet.available_balance)
+    return balances
+
+
+def test_reject_cashout(app, client, token, users):
+    """A rejected cashout releases its hold"""
+    with app.app_context():
+        cashout_id = submit_cashout_request(users['creator'], {
+            'amount': 40, 'payment_method': 'ecocash', 'payment_details': {'phone': '0771234567'}
+        }).id
+        balances = balances_of(users['creator'])
+        assert balances['available'] == Decimal('60.00') and balances['cashout_hold'] == Decimal('40.00'), balances
+
+    response = client.put(f'/api/admin/cashouts/{cashout_id}/reject', json={'reason': 'Wrong number'},
+                          headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200, response.get_json()
+
+    with app.app_context():
+        balances = balances_of(users['creator'])
+        assert balances['available'] == Decimal('100.00') and balances['cashout_hold'] == Decimal('0.00'), balances
+        transaction = WalletTransaction.query.filter_by(cashout_request_id=cashout_id).one()
+        assert transaction.status == 'cancelled'
+        assert db.session.get(CashoutRequest, cashout_id).status == 'rejected'
+
+    again = client.put(f'/api/admin/cashouts/{cashout_id}/reject', json={},
+                       headers={'Authorization': f'Bearer {token}'})
+    assert again.status_code == 400
+    print('[OK] Rejected cashout returned $40 from the hold to the available balance')
+
+
+def test_escrow_release(app, client, token, users, collaboration_ids):
+    """Admin escrow release credits the creator once"""
+    url = f"/api/admin/collaborations/{collaboration_ids['release']}/escrow/release"
+    response = client.post(url, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['data']['creator_new_balance'] == 150
+
+    again = client.post(url, headers={'Authorization': f'Bearer {token}'})
+    assert again.status_code == 400, again.get_json()
+
+    with app.app_context():
+        assert balances_of(users['creator'])['available'] == Decimal('150.00')
+        assert Wallet.query.filter_by(user_id=users['creator']).one().total_earned == Decimal('50.00')
+    print('[OK] Escrow release credited $50 once through the ledger')
+
+
+def test_cancellation(app, client, token, users, collaboration_ids):
+    """A cancellation at 60% progress refunds the brand 25% and pays the creator 75%"""
+    url = f"/api/admin/collaborations/{collaboration_ids['cancel']}/cancellation/approve"
+    response = client.put(url, json={'admin_notes': 'Agreed'}, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()['data']['brand_refund'] == 12.5
+
+    with app.app_context():
+        assert balances_of(users['brand'])['available'] == Decimal('12.50')
+        assert balances_of(users['creator'])['available'] == Decimal('187.50')
+        assert db.session.get(Collaboration, collaboration_ids['cancel']).status == 'cancelled'
+    print('[OK] Cancellation refunded $12.50 and paid $37.50 through the ledger')
+
+
+def test_ledger_reconciles(app):
+    """The running totals match the ledger"""
+    with app.app_context():
+        drift = wallet_ledger.reconcile_wallets()
+        assert drift == [], drift
+    print('[OK] Ledger reconciles with running totals')
+
+
+if __name__ == '__main__':
+    print('=' * 60)
+    print('Wallet Ledger Test')
+    print('=' * 60)
+    try:
+        app = create_app('production')
+        token, users, collaboration_ids = setup(app)
+        client = app.test_client()
+        test_reject_cashout(app, client, token, users)
+        test_escrow_release(app, client, token, users, collaboration_ids)
+        test_cancellation(app, client, token, users, collaboration_ids)
+        test_ledger_reconciles(app)
+        print('\nAll wallet ledger tests passed')
+    finally:
+        os.unlink(_db_file.name)
@@ -6,7 +6,7 @@ import { useNotifications } from '../contexts/NotificationContext';
 const NotificationBell = () => {
   const [isOpen, setIsOpen] = useState(false);
   const dropdownRef = useRef(null);
-  const { notifications, unreadCount, markAsRead, markAllAsRead } = useNotifications();
+  const { notifications, unreadCount, markManyAsRead, markAllAsRead } = useNotifications();
 
   // Close dropdown when clicking outside
   useEffect(() => {
@@ -20,10 +20,21 @@ const NotificationBell = () => {
     return () => document.removeEventListener('mousedown', handleClickOutside);
   }, []);
 
-  const handleNotificationClick = (notification) => {
-    if (!notification.is_read) {
-      markAsRead(notification.id);
+  const displayedNotifications = notifications.slice(0, 10);
+
+  // Opening the drawer reads everything it shows, in one batched receipt
+  const visibleUnreadKey = displayedNotifications
+    .filter(notification => !notification.is_read)
+    .map(notification => notification.id)
+    .join(',');
+
+  useEffect(() => {
+    if (isOpen && visibleUnreadKey) {
+      markManyAsRead(visibleUnreadKey.split(',').map(Number));
     }
+  }, [isOpen, visibleUnreadKey, markManyAsRead]);
+
+  const handleNotificationClick = () => {
     setIsOpen(false);
   };
 
@@ -56,8 +67,6 @@ const NotificationBell = () => {
     return date.toLocaleDateString();
   };
 
-  const displayedNotifications = notifications.slice(0, 10);
-
   return (
     <div className="relative" ref={dropdownRef}>
       {/* Notification Bell Button */}
@@ -102,7 +111,7 @@ const NotificationBell = () => {
                   <Link
                     key={notification.id}
                     to={notification.action_url || '#'}
-                    onClick={() => handleNotificationClick(notification)}
+                    onClick={handleNotificationClick}
                     className={`block px-4 py-3 hover:bg-gray-50 transition-colors ${
                       !notification.is_read ? 'bg-primary/10' : ''
                     }`}
@@ -5,6 +5,9 @@ import toast from 'react-hot-toast';
 
 const NotificationContext = createContext(null);
 
+// Matches MAX_READ_RECEIPT_BATCH on the server, which rejects larger batches
+const READ_RECEIPT_BATCH = 500;
+
 export const useNotifications = () => {
   const context = useContext(NotificationContext);
   if (!context) {
@@ -99,7 +102,7 @@ export const NotificationProvider = ({ children }) => {
         setIsConnected(true);
 
         // Join user-specific notification room
-        socketInstance.emit('join_notification_room', { user_id: user.id });
+        socketInstance.emit('join_notification_room');
       });
 
       socketInstance.on('disconnect', () => {
@@ -107,14 +110,27 @@ export const NotificationProvider = ({ children }) => {
         setIsConnected(false);
       });
 
+      let heartbeatTimer = null;
+
       socketInstance.on('connection_success', (data) => {
         console.log('Notification service ready:', data);
+
+        // Keep presence alive so the server can skip emails while we are online
+        clearInterval(heartbeatTimer);
+        const intervalSeconds = data.heartbeat_interval || 20;
+        heartbeatTimer = setInterval(() => {
+          socketInstance.emit('presence_heartbeat');
+        }, intervalSeconds * 1000);
       });
 
       socketInstance.on('connection_error', (error) => {
         console.error('Notification connection error:', error);
       });
 
+      socketInstance.on('notification_read_error', ({ error }) => {
+        console.error('Error marking notifications as read:', error);
+      });
+
       // Listen for new notifications
       socketInstance.on('new_notification', (notification) => {
         console.log('New notification received:', notification);
@@ -138,14 +154,16 @@ export const NotificationProvider = ({ children }) => {
         });
       });
 
-      // Listen for notification marked as read
-      socketInstance.on('notification_marked_read', ({ notification_id }) => {
+      // Listen for batched read receipts (one event per batch of ids)
+      socketInstance.on('notifications_marked_read', ({ notification_ids = [] }) => {
+        if (notification_ids.length === 0) return;
+        const readIds = new Set(notification_ids);
         setNotifications(prev =>
           prev.map(notif =>
-            notif.id === notification_id ? { ...notif, is_read: true } : notif
+            readIds.has(notif.id) ? { ...notif, is_read: true } : notif
           )
         );
-        setUnreadCount(prev => Math.max(0, prev - 1));
+        setUnreadCount(prev => Math.max(0, prev - notification_ids.length));
       });
 
       setSocket(socketInstance);
@@ -155,37 +173,47 @@ export const NotificationProvider = ({ children }) => {
 
       // Cleanup on unmount
       return () => {
+        clearInterval(heartbeatTimer);
         socketInstance.disconnect();
       };
     }
   }, [fetchNotifications, playNotificationSound]);
 
-  // Mark notification as read
-  const markAsRead = useCallback(async (notificationId) => {
+  // Mark several notifications as read in one write
+  const markManyAsRead = useCallback(async (notificationIds) => {
+    if (!notificationIds || notificationIds.length === 0) return;
+
+    // Over Socket.IO the server applies the whole batch in one UPDATE and
+    // acknowledges with a single notifications_marked_read event
+    if (socket && socket.connected) {
+      for (let i = 0; i < notificationIds.length; i += READ_RECEIPT_BATCH) {
+        socket.emit('mark_notification_read', {
+          notification_ids: notificationIds.slice(i, i + READ_RECEIPT_BATCH),
+        });
+      }
+      return;
+    }
+
     try {
-      await notificationsAPI.markAsRead(notificationId);
+      await Promise.all(notificationIds.map(id => notificationsAPI.markAsRead(id)));
 
-      // Update local state
+      const readIds = new Set(notificationIds);
       setNotifications(prev =>
         prev.map(notif =>
-          notif.id === notificationId ? { ...notif, is_read: true } : notif
+          readIds.has(notif.id) ? { ...notif, is_read: true } : notif
         )
       );
-      setUnreadCount(prev => Math.max(0, prev - 1));
-
-      // Emit socket event
-      if (socket) {
-        const user = JSON.parse(localStorage.getItem('user') || '{}');
-        socket.emit('mark_notification_read', {
-          notification_id: notificationId,
-          user_id: user.id
-        });
-      }
+      setUnreadCount(prev => Math.max(0, prev - notificationIds.length));
     } catch (error) {
-      console.error('Error marking notification as read:', error);
+      console.error('Error marking notifications as read:', error);
     }
   }, [socket]);
 
+  // Mark notification as read
+  const markAsRead = useCallback((notificationId) => {
+    return markManyAsRead([notificationId]);
+  }, [markManyAsRead]);
+
   // Mark all notifications as read
   const markAllAsRead = useCallback(async () => {
     try {
@@ -215,10 +243,12 @@ export const NotificationProvider = ({ children }) => {
   };
 
   const value = {
+    socket,
     notifications,
     unreadCount,
     isConnected,
     markAsRead,
+    markManyAsRead,
     markAllAsRead,
     fetchNotifications,
   };
@@ -4,6 +4,12 @@ import api, { bookingsAPI, BASE_URL } from '../services/api';
 import AdminLayout from '../components/admin/AdminLayout';
 import StatusBadge from '../components/admin/StatusBadge';
 
+// Only the columns and relations the table and detail panel show
+const BOOKING_FIELDS = [
+  'status', 'booking_type', 'payment_category', 'payment_type_display', 'brand_id', 'creator_id',
+  'package_id', 'created_at', 'payment_method', 'payment_status', 'proof_of_payment', 'total_price',
+].join(',');
+
 export default function AdminBookings() {
   const [bookings, setBookings] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -17,7 +23,9 @@ export default function AdminBookings() {
   const fetchBookings = async () => {
     try {
       setLoading(true);
-      const response = await api.get(`/admin/bookings${filter !== 'all' ? `?status=${filter}` : ''}`);
+      const params = { fields: BOOKING_FIELDS, expand: 'creator,brand,package' };
+      if (filter !== 'all') params.status = filter;
+      const response = await api.get('/admin/bookings', { params });
       setBookings(response.data.bookings || []);
     } catch (err) {
       setError(err.response?.data?.error || 'Failed to load bookings');
@@ -51,9 +51,13 @@ const CollaborationDetails = () => {
 
     const handleCollaborationUpdate = (data) => {
       if (data.collaboration_id === parseInt(id)) {
-        console.log('Collaboration updated, refreshing...');
         toast.info('Collaboration updated');
-        fetchCollaboration();
+        if (data.changes && Object.keys(data.changes).length > 0) {
+          // Apply the changed-fields delta instead of refetching the whole record
+          setCollaboration(prev => prev ? { ...prev, ...data.changes, updated_at: data.updated_at } : prev);
+        } else {
+          fetchCollaboration();
+        }
       }
     };
 
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import AdminLayout from '../../components/admin/AdminLayout';
 import api from '../../services/api';
@@ -132,6 +132,8 @@ export default function Activity() {
   const [days, setDays] = useState(7);
   const [highValue, setHighValue] = useState(false);
   const [page, setPage] = useState(1);
+  // Keyset cursors: cursors.current[n] fetches page n (page 1 needs none)
+  const cursors = useRef({});
 
   const fetchFeed = useCallback(async () => {
     setLoading(true);
@@ -143,11 +145,14 @@ export default function Activity() {
         page,
         per_page: 50,
       });
+      if (cursors.current[page]) params.set('cursor', cursors.current[page]);
       const res = await api.get(`/admin/activity/feed?${params}`);
       if (res.data.success) {
+        const nextPagination = res.data.data.pagination || { page: 1, pages: 1, total: 0 };
+        if (nextPagination.next_cursor) cursors.current[page + 1] = nextPagination.next_cursor;
         setEvents(res.data.data.events || []);
         setAnomalies(res.data.data.anomalies || {});
-        setPagination(res.data.data.pagination || { page: 1, pages: 1, total: 0 });
+        setPagination(nextPagination);
       }
     } catch (err) {
       console.error('Failed to fetch activity feed', err);
@@ -161,9 +166,9 @@ export default function Activity() {
   }, [fetchFeed]);
 
   // Reset to page 1 when filters change
-  const handleCategoryChange = (val) => { setCategory(val); setPage(1); };
-  const handleDaysChange = (val) => { setDays(val); setPage(1); };
-  const handleHighValueChange = () => { setHighValue(v => !v); setPage(1); };
+  const handleCategoryChange = (val) => { cursors.current = {}; setCategory(val); setPage(1); };
+  const handleDaysChange = (val) => { cursors.current = {}; setDays(val); setPage(1); };
+  const handleHighValueChange = () => { cursors.current = {}; setHighValue(v => !v); setPage(1); };
 
   const totalAnomalies = (anomalies.overdue_collaborations || 0) + (anomalies.stuck_bookings || 0);
 
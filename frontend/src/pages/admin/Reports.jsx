@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react';
 import { toast } from 'react-hot-toast';
 import adminAPI from '../../services/adminAPI';
 import AdminLayout from '../../components/admin/AdminLayout';
+import { useNotifications } from '../../contexts/NotificationContext';
 import {
   ChartBarIcon,
   BanknotesIcon,
@@ -11,7 +12,12 @@ import {
   UsersIcon,
 } from '@heroicons/react/24/outline';
 
+// How often to check a running report job (slower when a socket will announce completion)
+const JOB_POLL_MS = 2000;
+const JOB_POLL_WITH_SOCKET_MS = 10000;
+
 export default function AdminReports() {
+  const { socket } = useNotifications();
   const [activeTab, setActiveTab] = useState('growth');
   const [loading, setLoading] = useState(true);
   const [growthData, setGrowthData] = useState(null);
@@ -24,30 +30,75 @@ export default function AdminReports() {
     fetchReportData();
   }, [activeTab, period]);
 
+  // Resolve once a report job has completed or failed, via socket event or polling
+  const waitForJob = (jobId) =>
+    new Promise((resolve, reject) => {
+      let timer;
+      let done = false;
+      const pollMs = socket?.connected ? JOB_POLL_WITH_SOCKET_MS : JOB_POLL_MS;
+
+      const finish = (callback, value) => {
+        if (done) return;
+        done = true;
+        clearTimeout(timer);
+        socket?.off('report_job_completed', onCompleted);
+        callback(value);
+      };
+
+      const check = async () => {
+        try {
+          const res = await adminAPI.get(`/admin/report-jobs/${jobId}`);
+          const job = res.data.data;
+          if (job.status === 'completed' || job.status === 'failed') {
+            finish(resolve, job);
+            return;
+          }
+        } catch (error) {
+          finish(reject, error);
+          return;
+        }
+        if (!done) {
+          clearTimeout(timer);
+          timer = setTimeout(check, pollMs);
+        }
+      };
+
+      const onCompleted = ({ job_id }) => {
+        if (job_id === jobId) check();
+      };
+
+      if (socket?.connected) {
+        socket.on('report_job_completed', onCompleted);
+        socket.emit('subscribe_report_job', { job_id: jobId });
+      }
+      check();
+    });
+
+  // Run a report as a background job; identical recent requests reuse the stored result
+  const runReport = async (report, params = {}) => {
+    const res = await adminAPI.post('/admin/report-jobs', { report, params });
+    let job = res.data.data;
+    if (job.status !== 'completed') {
+      job = await waitForJob(job.id);
+    }
+    if (job.status !== 'completed') {
+      throw new Error(job.error || 'Report failed');
+    }
+    return job.result;
+  };
+
   const fetchReportData = async () => {
     try {
       setLoading(true);
 
       if (activeTab === 'growth' && !growthData) {
-        const res = await adminAPI.get(
-          `/admin/reports/growth?days=${period.growth}`
-        );
-        setGrowthData(res.data.data);
+        setGrowthData(await runReport('growth', { days: period.growth }));
       } else if (activeTab === 'revenue' && !revenueData) {
-        const res = await adminAPI.get(
-          `/admin/reports/revenue?months=${period.revenue}`
-        );
-        setRevenueData(res.data.data);
+        setRevenueData(await runReport('revenue', { months: period.revenue }));
       } else if (activeTab === 'health' && !healthData) {
-        const res = await adminAPI.get(
-          `/admin/reports/marketplace-health`
-        );
-        setHealthData(res.data.data);
+        setHealthData(await runReport('marketplace-health'));
       } else if (activeTab === 'risk' && !riskData) {
-        const res = await adminAPI.get(
-          `/admin/reports/risk`
-        );
-        setRiskData(res.data.data);
+        setRiskData(await runReport('risk'));
       }
     } catch (error) {
       console.error('Error fetching report data:', error);
@@ -330,7 +381,14 @@ export default function AdminReports() {
               {/* Risk Tab */}
               {activeTab === 'risk' && riskData && (
                 <div className="space-y-6">
-                  <h2 className="text-xl font-semibold">Risk Monitoring</h2>
+                  <div>
+                    <h2 className="text-xl font-semibold">Risk Monitoring</h2>
+                    {riskData.scores_computed_at && (
+                      <p className="text-sm text-gray-500">
+                        Scores rebuilt {new Date(riskData.scores_computed_at).toLocaleString()}
+                      </p>
+                    )}
+                  </div>
 
                   {/* Users with Multiple Disputes */}
                   <div>
@@ -7,6 +7,7 @@ import {
   activateUser,
   deactivateUser,
   deleteUser,
+  bulkUpdateUsers,
 } from '../../services/adminAPI';
 import AdminLayout from '../../components/admin/AdminLayout';
 import StatusBadge from '../../components/admin/StatusBadge';
@@ -25,9 +26,11 @@ export default function AdminUsers() {
   });
   const [pagination, setPagination] = useState({ page: 1, per_page: 20, total: 0 });
   const [actionLoading, setActionLoading] = useState(null);
+  const [selected, setSelected] = useState([]);
 
   useEffect(() => {
     fetchUsers();
+    setSelected([]);
   }, [filters, pagination.page]);
 
   const fetchUsers = async () => {
@@ -103,6 +106,36 @@ export default function AdminUsers() {
     }
   };
 
+  const toggleSelected = (userId) => {
+    setSelected((current) =>
+      current.includes(userId) ? current.filter((id) => id !== userId) : [...current, userId]
+    );
+  };
+
+  const toggleSelectAll = () => {
+    setSelected(selected.length === users.length ? [] : users.map((user) => user.id));
+  };
+
+  const handleBulkAction = async (action) => {
+    let reason;
+    if (action === 'deactivate') {
+      reason = prompt(`Enter reason for suspending ${selected.length} users:`);
+      if (!reason) return;
+    }
+    try {
+      setActionLoading('bulk');
+      const response = await bulkUpdateUsers(action, selected, reason);
+      const { updated, skipped } = response.data.data;
+      toast.success(`${updated.length} users updated${skipped.length ? `, ${skipped.length} unchanged` : ''}`);
+      setSelected([]);
+      fetchUsers();
+    } catch (error) {
+      toast.error(error.response?.data?.error || 'Bulk action failed');
+    } finally {
+      setActionLoading(null);
+    }
+  };
+
   const handleDelete = async (userId) => {
     if (!confirm('Are you sure you want to DELETE this user? This action cannot be undone!')) return;
     try {
@@ -133,7 +166,7 @@ export default function AdminUsers() {
               <MagnifyingGlassIcon className="absolute left-3 top-1/2 -translate-y-1/2 h-5 w-5 text-gray-400" />
               <input
                 type="text"
-                placeholder="Search by email..."
+                placeholder="Search by email, username or company..."
                 value={filters.search}
                 onChange={(e) => setFilters({ ...filters, search: e.target.value })}
                 className="w-full pl-10 pr-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-primary focus:border-primary"
@@ -175,12 +208,45 @@ export default function AdminUsers() {
           </div>
         </div>
 
+        {/* Bulk Actions */}
+        {selected.length > 0 && (
+          <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-4 flex items-center justify-between">
+            <span className="text-sm text-gray-700">
+              <span className="font-medium">{selected.length}</span> selected
+            </span>
+            <div className="flex space-x-2">
+              {[
+                ['verify', 'Verify', 'text-green-700 border-green-300 hover:bg-green-50'],
+                ['activate', 'Activate', 'text-green-700 border-green-300 hover:bg-green-50'],
+                ['deactivate', 'Suspend', 'text-orange-700 border-orange-300 hover:bg-orange-50'],
+              ].map(([action, label, className]) => (
+                <button
+                  key={action}
+                  onClick={() => handleBulkAction(action)}
+                  disabled={actionLoading === 'bulk'}
+                  className={`px-3 py-1 border rounded-md text-sm disabled:opacity-50 ${className}`}
+                >
+                  {label}
+                </button>
+              ))}
+            </div>
+          </div>
+        )}
+
         {/* Users Table */}
         <div className="bg-white rounded-lg shadow-sm border border-gray-200 overflow-hidden">
           <div className="overflow-x-auto">
             <table className="min-w-full divide-y divide-gray-200">
               <thead className="bg-gray-50">
                 <tr>
+                  <th className="pl-6 py-3 text-left">
+                    <input
+                      type="checkbox"
+                      checked={users.length > 0 && selected.length === users.length}
+                      onChange={toggleSelectAll}
+                      className="rounded border-gray-300 text-primary focus:ring-primary"
+                    />
+                  </th>
                   <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">User</th>
                   <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Type</th>
                   <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Status</th>
@@ -191,17 +257,25 @@ export default function AdminUsers() {
               <tbody className="bg-white divide-y divide-gray-200">
                 {loading ? (
                   <tr>
-                    <td colSpan="5" className="px-6 py-12 text-center text-gray-500">
+                    <td colSpan="6" className="px-6 py-12 text-center text-gray-500">
                       <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-primary mx-auto" />
                     </td>
                   </tr>
                 ) : users.length === 0 ? (
                   <tr>
-                    <td colSpan="5" className="px-6 py-12 text-center text-gray-500">No users found</td>
+                    <td colSpan="6" className="px-6 py-12 text-center text-gray-500">No users found</td>
                   </tr>
                 ) : (
                   users.map((user) => (
                     <tr key={user.id} className="hover:bg-gray-50">
+                      <td className="pl-6 py-4">
+                        <input
+                          type="checkbox"
+                          checked={selected.includes(user.id)}
+                          onChange={() => toggleSelected(user.id)}
+                          className="rounded border-gray-300 text-primary focus:ring-primary"
+                        />
+                      </td>
                       <td className="px-6 py-4 whitespace-nowrap">
                         <div>
                           <div className="font-medium text-gray-900">{user.email}</div>
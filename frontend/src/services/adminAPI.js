@@ -87,6 +87,11 @@ export const deleteUser = (userId) => {
   return adminAPI.delete(`/admin/users/${userId}`);
 };
 
+// action: 'verify' | 'unverify' | 'activate' | 'deactivate'
+export const bulkUpdateUsers = (action, userIds, reason) => {
+  return adminAPI.put(`/admin/users/bulk/${action}`, { user_ids: userIds, reason });
+};
+
 // ============================================================================
 // CATEGORY MANAGEMENT
 // ============================================================================
@@ -243,6 +248,14 @@ export const approveCashout = (cashoutId) => {
   return adminAPI.put(`/admin/cashouts/${cashoutId}/approve`);
 };
 
+export const bulkApproveCashouts = (cashoutIds) => {
+  return adminAPI.put('/admin/cashouts/bulk/approve', { cashout_ids: cashoutIds });
+};
+
+export const bulkApproveVerifications = (applicationIds) => {
+  return adminAPI.post('/admin/verification/applications/bulk/approve', { application_ids: applicationIds });
+};
+
 export const rejectCashout = (cashoutId, reason) => {
   return adminAPI.put(`/admin/cashouts/${cashoutId}/reject`, { reason });
 };